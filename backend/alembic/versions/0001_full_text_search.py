@@ -0,0 +1,59 @@
+"""Add generated full-text search vectors with GIN indexes
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0001_full_text_search
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0001_full_text_search"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Table, text search configuration and weighted columns of each search vector
+SEARCH_VECTORS = [
+    ("contact", "simple", [("first_name", "A"), ("last_name", "A"), ("company_name", "B"), ("email", "C")]),
+    ("company", "simple", [("name", "A"), ("industry", "B")]),
+    ("lead", "english", [("title", "A"), ("description", "B")]),
+    ("opportunity", "english", [("name", "A"), ("description", "B")]),
+    ("marketing_campaign", "english", [("name", "A"), ("description", "B")]),
+]
+
+
+def _expression(config, columns):
+    """Build the generated column expression (same as search_vector_expression)."""
+    return " || ".join(
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def upgrade() -> None:
+    """Add the search_vector columns and build their GIN indexes without blocking writes."""
+    for table, config, columns in SEARCH_VECTORS:
+        op.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS search_vector tsvector '
+            f"GENERATED ALWAYS AS ({_expression(config, columns)}) STORED"
+        )
+
+    with op.get_context().autocommit_block():
+        for table, _, _ in SEARCH_VECTORS:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_search_vector '
+                f'ON "{table}" USING gin (search_vector)'
+            )
+
+
+def downgrade() -> None:
+    """Drop the search_vector columns and their indexes."""
+    with op.get_context().autocommit_block():
+        for table, _, _ in SEARCH_VECTORS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_search_vector")
+
+    for table, _, _ in SEARCH_VECTORS:
+        op.execute(f'ALTER TABLE "{table}" DROP COLUMN IF EXISTS search_vector')
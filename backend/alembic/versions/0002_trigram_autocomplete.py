@@ -0,0 +1,46 @@
+"""Add pg_trgm GIN indexes for contact and company autocomplete
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0002_trigram_autocomplete
+Revises: 0001_full_text_search
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_trigram_autocomplete"
+down_revision = "0001_full_text_search"
+branch_labels = None
+depends_on = None
+
+# Index, table and indexed expression (same as the models' autocomplete_text)
+TRIGRAM_INDEXES = [
+    (
+        "ix_contact_autocomplete_trgm",
+        "contact",
+        "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' "
+        "|| coalesce(email, '') || ' ' || coalesce(company_name, ''))"
+    ),
+    ("ix_company_autocomplete_trgm", "company", "lower(coalesce(name, ''))"),
+]
+
+
+def upgrade() -> None:
+    """Enable pg_trgm and build the trigram indexes without blocking writes."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, table, expression in TRIGRAM_INDEXES:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                f'ON "{table}" USING gin (({expression}) gin_trgm_ops)'
+            )
+
+
+def downgrade() -> None:
+    """Drop the trigram indexes."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,54 @@
+"""Add the contact dedupe key and the duplicate pair table
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0003_contact_dedupe
+Revises: 0002_trigram_autocomplete
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_contact_dedupe"
+down_revision = "0002_trigram_autocomplete"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the dedupe key (backfilled by scripts/find_duplicate_contacts.py) and the pair table."""
+    op.execute('ALTER TABLE "contact" ADD COLUMN IF NOT EXISTS dedupe_key VARCHAR(64)')
+
+    op.create_table(
+        "contact_duplicate",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("contact_id", sa.Integer, sa.ForeignKey("contact.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("duplicate_id", sa.Integer, sa.ForeignKey("contact.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("score", sa.Float, nullable=False),
+        sa.Column("reasons", sa.String(100), nullable=True),
+        sa.Column("status", sa.Enum("PENDING", "DISMISSED", name="duplicatestatus"), nullable=False),
+        sa.Column("updated_by", sa.Integer, sa.ForeignKey("user.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.UniqueConstraint("contact_id", "duplicate_id", name="uq_contact_duplicate_pair"),
+    )
+    op.create_index("ix_contact_duplicate_id", "contact_duplicate", ["id"])
+    op.create_index("ix_contact_duplicate_contact_id", "contact_duplicate", ["contact_id"])
+    op.create_index("ix_contact_duplicate_duplicate_id", "contact_duplicate", ["duplicate_id"])
+    op.create_index("ix_contact_duplicate_status", "contact_duplicate", ["status"])
+
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contact_dedupe_key ON "contact" (dedupe_key)')
+
+
+def downgrade() -> None:
+    """Drop the pair table and the dedupe key."""
+    op.drop_table("contact_duplicate")
+    op.execute("DROP TYPE IF EXISTS duplicatestatus")
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_contact_dedupe_key")
+    op.execute('ALTER TABLE "contact" DROP COLUMN IF EXISTS dedupe_key')
@@ -0,0 +1,53 @@
+"""Add the saved search and materialized result tables
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0004_saved_searches
+Revises: 0003_contact_dedupe
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_saved_searches"
+down_revision = "0003_contact_dedupe"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the saved search tables."""
+    op.create_table(
+        "saved_search",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("filters", sa.JSON, nullable=False),
+        sa.Column("scope_member_ids", sa.JSON, nullable=True),
+        sa.Column("time_dependent", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column("result_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("refreshed_at", sa.DateTime, nullable=True),
+        sa.Column("owner_id", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("created_by", sa.Integer, sa.ForeignKey("user.id"), nullable=True),
+        sa.Column("updated_by", sa.Integer, sa.ForeignKey("user.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+    )
+    op.create_index("ix_saved_search_id", "saved_search", ["id"])
+    op.create_index("ix_saved_search_entity_type", "saved_search", ["entity_type"])
+    op.create_index("ix_saved_search_owner_id", "saved_search", ["owner_id"])
+
+    op.create_table(
+        "saved_search_member",
+        sa.Column("saved_search_id", sa.Integer, sa.ForeignKey("saved_search.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("entity_id", sa.Integer, primary_key=True),
+    )
+
+
+def downgrade() -> None:
+    """Drop the saved search tables."""
+    op.drop_table("saved_search_member")
+    op.drop_table("saved_search")
@@ -0,0 +1,42 @@
+"""Add the lead score history and the lead activity lead index
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0005_lead_scores
+Revises: 0004_saved_searches
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005_lead_scores"
+down_revision = "0004_saved_searches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the score history and index activities by lead for the scoring batches."""
+    op.create_table(
+        "lead_scores",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("lead_id", sa.Integer, sa.ForeignKey("lead.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("score", sa.SmallInteger, nullable=False),
+        sa.Column("is_qualified", sa.Boolean, nullable=False),
+        sa.Column("model_version", sa.String(20), nullable=False),
+        sa.Column("scored_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_lead_scores_lead_id", "lead_scores", ["lead_id"])
+
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lead_activity_lead_id ON lead_activity (lead_id)")
+
+
+def downgrade() -> None:
+    """Drop the score history and the activity index."""
+    op.drop_table("lead_scores")
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_lead_activity_lead_id")
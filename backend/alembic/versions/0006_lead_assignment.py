@@ -0,0 +1,41 @@
+"""Add the lead assignment profiles
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0006_lead_assignment
+Revises: 0005_lead_scores
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006_lead_assignment"
+down_revision = "0005_lead_scores"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the assignment profile table."""
+    op.create_table(
+        "lead_assignment_profile",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id", ondelete="CASCADE"), nullable=False, unique=True),
+        sa.Column("territory", sa.String(50), nullable=True),
+        sa.Column("capacity", sa.Integer, nullable=False),
+        sa.Column("weight", sa.Float, nullable=False, server_default="1.0"),
+        sa.Column("is_accepting", sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.Column("updated_by", sa.Integer, sa.ForeignKey("user.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+    )
+    op.create_index("ix_lead_assignment_profile_id", "lead_assignment_profile", ["id"])
+    op.create_index("ix_lead_assignment_profile_territory", "lead_assignment_profile", ["territory"])
+
+
+def downgrade() -> None:
+    """Drop the assignment profile table."""
+    op.drop_table("lead_assignment_profile")
@@ -0,0 +1,33 @@
+"""Add the lead ingestion idempotency keys
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0007_lead_ingest_keys
+Revises: 0006_lead_assignment
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_lead_ingest_keys"
+down_revision = "0006_lead_assignment"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the idempotency key table."""
+    op.create_table(
+        "lead_ingest_key",
+        sa.Column("key", sa.String(100), primary_key=True),
+        sa.Column("lead_id", sa.Integer, sa.ForeignKey("lead.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_lead_ingest_key_created_at", "lead_ingest_key", ["created_at"])
+
+
+def downgrade() -> None:
+    """Drop the idempotency key table."""
+    op.drop_table("lead_ingest_key")
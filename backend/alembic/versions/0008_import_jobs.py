@@ -0,0 +1,52 @@
+"""Add the CSV import jobs
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0008_import_jobs
+Revises: 0007_lead_ingest_keys
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_import_jobs"
+down_revision = "0007_lead_ingest_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the import job table."""
+    op.create_table(
+        "import_job",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("file_path", sa.String(500), nullable=False),
+        sa.Column("error_report_path", sa.String(500), nullable=True),
+        sa.Column("total_bytes", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("processed_bytes", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("rows_processed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("rows_created", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("rows_updated", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("rows_failed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("error_message", sa.Text, nullable=True),
+        sa.Column("started_at", sa.DateTime, nullable=True),
+        sa.Column("finished_at", sa.DateTime, nullable=True),
+        sa.Column("scope_member_ids", sa.JSON, nullable=True),
+        sa.Column("created_by", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+    )
+    op.create_index("ix_import_job_id", "import_job", ["id"])
+    op.create_index("ix_import_job_status", "import_job", ["status"])
+    op.create_index("ix_import_job_created_by", "import_job", ["created_by"])
+
+
+def downgrade() -> None:
+    """Drop the import job table."""
+    op.drop_table("import_job")
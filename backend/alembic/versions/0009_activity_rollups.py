@@ -0,0 +1,82 @@
+"""Add the activity rollup columns and the follow-up task table
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0009_activity_rollups
+Revises: 0008_import_jobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_activity_rollups"
+down_revision = "0008_import_jobs"
+branch_labels = None
+depends_on = None
+
+# Rolled-up tables with their activity table and its foreign key
+ROLLUP_TABLES = (
+    ("lead", "lead_activity", "lead_id"),
+    ("contact", "contact_activity", "contact_id"),
+    ("opportunity", "opportunity_activity", "opportunity_id"),
+)
+
+
+def upgrade() -> None:
+    """Add the rollups (backfilled by scripts/backfill_activity_rollups.py) and the task table."""
+    for table, _, _ in ROLLUP_TABLES:
+        op.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS activity_count INTEGER NOT NULL DEFAULT 0')
+        op.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS last_activity_date DATE')
+
+    op.create_table(
+        "follow_up_task",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.Integer, nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("reason", sa.String(50), nullable=False),
+        sa.Column("due_date", sa.Date, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="open"),
+        sa.Column("assignee_id", sa.Integer, sa.ForeignKey("user.id"), nullable=True),
+        sa.Column("completed_at", sa.DateTime, nullable=True),
+        sa.Column("completed_by", sa.Integer, sa.ForeignKey("user.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+    )
+    op.create_index("ix_follow_up_task_id", "follow_up_task", ["id"])
+    op.create_index("ix_follow_up_task_assignee_id", "follow_up_task", ["assignee_id"])
+    op.create_index("ix_follow_up_task_entity", "follow_up_task", ["entity_type", "entity_id", "status"])
+    op.create_index(
+        "uq_follow_up_task_open_sla", "follow_up_task", ["entity_type", "entity_id"], unique=True,
+        postgresql_where=sa.text("status = 'open' AND reason = 'sla'")
+    )
+
+    with op.get_context().autocommit_block():
+        for table, activity_table, foreign_key in ROLLUP_TABLES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_last_activity_date "
+                f'ON "{table}" (last_activity_date)'
+            )
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{activity_table}_{foreign_key} "
+                f"ON {activity_table} ({foreign_key})"
+            )
+
+
+def downgrade() -> None:
+    """Drop the task table and the rollups."""
+    op.drop_table("follow_up_task")
+
+    with op.get_context().autocommit_block():
+        for table, activity_table, foreign_key in ROLLUP_TABLES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_last_activity_date")
+            if table != "lead":
+                # The lead activity index predates this revision
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{activity_table}_{foreign_key}")
+
+    for table, _, _ in ROLLUP_TABLES:
+        op.execute(f'ALTER TABLE "{table}" DROP COLUMN IF EXISTS last_activity_date')
+        op.execute(f'ALTER TABLE "{table}" DROP COLUMN IF EXISTS activity_count')
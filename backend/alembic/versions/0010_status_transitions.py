@@ -0,0 +1,51 @@
+"""Add the lead and opportunity status history
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0010_status_transitions
+Revises: 0009_activity_rollups
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_status_transitions"
+down_revision = "0009_activity_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the transition table and seed each record's current status as its creation entry."""
+    op.create_table(
+        "status_transition",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.Integer, nullable=False),
+        sa.Column("from_status", sa.String(30), nullable=True),
+        sa.Column("to_status", sa.String(30), nullable=False),
+        sa.Column("transitioned_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), nullable=True),
+    )
+
+    # Enum columns store the member names; the history stores the values
+    op.execute(
+        "INSERT INTO status_transition (entity_type, entity_id, to_status, transitioned_at, user_id) "
+        "SELECT 'lead', id, lower(status::text), created_at, created_by FROM lead"
+    )
+    op.execute(
+        "INSERT INTO status_transition (entity_type, entity_id, to_status, transitioned_at, user_id) "
+        "SELECT 'opportunity', id, lower(stage::text), created_at, created_by FROM opportunity"
+    )
+
+    op.create_index(
+        "ix_status_transition_entity", "status_transition", ["entity_type", "entity_id", "transitioned_at"]
+    )
+    op.create_index("ix_status_transition_time", "status_transition", ["entity_type", "transitioned_at"])
+
+
+def downgrade() -> None:
+    """Drop the transition table."""
+    op.drop_table("status_transition")
@@ -0,0 +1,50 @@
+"""Store refresh tokens as SHA-256 hashes with rotation families
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0011_refresh_token_hash
+Revises: 0010_status_transitions
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011_refresh_token_hash"
+down_revision = "0010_status_transitions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the plain token column with its hash and give every existing token its own family."""
+    op.add_column("refresh_token", sa.Column("token_hash", sa.String(64), nullable=True))
+    op.add_column("refresh_token", sa.Column("family_id", sa.String(36), nullable=True))
+
+    # Same hash as RefreshTokenRepository.hash_token, so issued tokens keep working
+    op.execute(
+        "UPDATE refresh_token SET "
+        "token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex'), "
+        "family_id = md5(id::text || random()::text)::uuid::text"
+    )
+
+    op.alter_column("refresh_token", "token_hash", nullable=False)
+    op.alter_column("refresh_token", "family_id", nullable=False)
+    op.create_index("ix_refresh_token_token_hash", "refresh_token", ["token_hash"], unique=True)
+    op.create_index("ix_refresh_token_family_id", "refresh_token", ["family_id"])
+
+    # Drops ix_refresh_token_token with the column
+    op.drop_column("refresh_token", "token")
+
+
+def downgrade() -> None:
+    """Restore the plain token column; the hashed tokens cannot be recovered and are dropped."""
+    op.execute("DELETE FROM refresh_token")
+    op.add_column("refresh_token", sa.Column("token", sa.String(255), nullable=False))
+    op.create_index("ix_refresh_token_token", "refresh_token", ["token"], unique=True)
+
+    op.drop_index("ix_refresh_token_family_id", table_name="refresh_token")
+    op.drop_index("ix_refresh_token_token_hash", table_name="refresh_token")
+    op.drop_column("refresh_token", "family_id")
+    op.drop_column("refresh_token", "token_hash")
@@ -0,0 +1,28 @@
+"""Add the heartbeat of running import jobs
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0012_import_job_heartbeat
+Revises: 0011_refresh_token_hash
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0012_import_job_heartbeat"
+down_revision = "0011_refresh_token_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the heartbeat column, starting running jobs' leases now."""
+    op.add_column("import_job", sa.Column("heartbeat_at", sa.DateTime, nullable=True))
+    op.execute("UPDATE import_job SET heartbeat_at = now() WHERE status = 'running'")
+
+
+def downgrade() -> None:
+    """Drop the heartbeat column."""
+    op.drop_column("import_job", "heartbeat_at")
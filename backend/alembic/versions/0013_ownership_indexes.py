@@ -0,0 +1,38 @@
+"""Index the ownership columns filtered on by scoped queries
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0013_ownership_indexes
+Revises: 0012_import_job_heartbeat
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0013_ownership_indexes"
+down_revision = "0012_import_job_heartbeat"
+branch_labels = None
+depends_on = None
+
+# Tables whose rows are scoped to their owner and creator
+SCOPED_TABLES = ("contact", "lead", "opportunity", "marketing_campaign")
+
+# Ownership columns of the scoped tables
+OWNERSHIP_COLUMNS = ("owner_id", "created_by")
+
+
+def upgrade() -> None:
+    """Create the ownership indexes without blocking writes."""
+    with op.get_context().autocommit_block():
+        for table in SCOPED_TABLES:
+            for column in OWNERSHIP_COLUMNS:
+                op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column} ON "{table}" ({column})')
+
+
+def downgrade() -> None:
+    """Drop the ownership indexes."""
+    with op.get_context().autocommit_block():
+        for table in SCOPED_TABLES:
+            for column in OWNERSHIP_COLUMNS:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{column}")
@@ -0,0 +1,39 @@
+"""Add the encryption key version table
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0014_encryption_keys
+Revises: 0013_ownership_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0014_encryption_keys"
+down_revision = "0013_ownership_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the encryption key version table."""
+    op.create_table(
+        "encryption_key",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("key_name", sa.String(100), nullable=False),
+        sa.Column("key_version", sa.Integer, nullable=False),
+        sa.Column("rotation_date", sa.DateTime, nullable=True),
+        sa.Column("active", sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+    )
+    op.create_index("ix_encryption_key_id", "encryption_key", ["id"])
+    op.create_index("ix_encryption_key_key_name", "encryption_key", ["key_name"])
+
+
+def downgrade() -> None:
+    """Drop the encryption key version table."""
+    op.drop_table("encryption_key")
@@ -0,0 +1,81 @@
+"""Add the contact email and phone blind indexes
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0015_contact_blind_indexes
+Revises: 0014_encryption_keys
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from config.settings import BLIND_INDEX_BACKFILL_BATCH_SIZE
+from src.models.contact import contact_derived_keys
+
+# revision identifiers, used by Alembic.
+revision = "0015_contact_blind_indexes"
+down_revision = "0014_encryption_keys"
+branch_labels = None
+depends_on = None
+
+# Contact columns read and written by the backfill
+contact = sa.table(
+    "contact",
+    sa.column("id", sa.Integer),
+    sa.column("email", sa.String),
+    sa.column("phone", sa.String),
+    sa.column("last_name", sa.String),
+    sa.column("email_bidx", sa.String),
+    sa.column("phone_bidx", sa.String),
+    sa.column("dedupe_key", sa.String),
+)
+
+
+def _backfill() -> None:
+    """Derive the blind indexes and dedupe keys of the stored contacts in ID batches."""
+    bind = op.get_bind()
+    statement = contact.update().where(contact.c.id == sa.bindparam("contact_id")).values(
+        email_bidx=sa.bindparam("new_email_bidx"),
+        phone_bidx=sa.bindparam("new_phone_bidx"),
+        dedupe_key=sa.bindparam("new_dedupe_key"),
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(contact.c.id, contact.c.email, contact.c.phone, contact.c.last_name)
+            .where(contact.c.id > last_id)
+            .order_by(contact.c.id)
+            .limit(BLIND_INDEX_BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        # Same derivation as on assignment, decrypting encrypted emails and phones first
+        params = []
+        for row in rows:
+            keys = contact_derived_keys(row.email, row.phone, row.last_name)
+            params.append({"contact_id": row.id, **{f"new_{column}": key for column, key in keys.items()}})
+        bind.execute(statement, params)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Add the blind index columns, backfill them with the dedupe keys and index them."""
+    op.execute('ALTER TABLE "contact" ADD COLUMN IF NOT EXISTS email_bidx VARCHAR(64)')
+    op.execute('ALTER TABLE "contact" ADD COLUMN IF NOT EXISTS phone_bidx VARCHAR(64)')
+    _backfill()
+
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contact_email_bidx ON "contact" (email_bidx)')
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contact_phone_bidx ON "contact" (phone_bidx)')
+
+
+def downgrade() -> None:
+    """Drop the blind indexes."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_contact_phone_bidx")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_contact_email_bidx")
+    op.execute('ALTER TABLE "contact" DROP COLUMN IF EXISTS phone_bidx')
+    op.execute('ALTER TABLE "contact" DROP COLUMN IF EXISTS email_bidx')
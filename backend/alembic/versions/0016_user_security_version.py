@@ -0,0 +1,32 @@
+"""Add the security version of users
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0016_user_security_version
+Revises: 0015_contact_blind_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0016_user_security_version"
+down_revision = "0015_contact_blind_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the security version, starting every existing user at 1, and index the users' update time."""
+    op.add_column("user", sa.Column("security_version", sa.Integer, nullable=False, server_default="1"))
+
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_updated_at ON "user" (updated_at)')
+
+
+def downgrade() -> None:
+    """Drop the update time index and the security version."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_updated_at")
+    op.drop_column("user", "security_version")
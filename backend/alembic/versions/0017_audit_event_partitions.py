@@ -0,0 +1,143 @@
+"""Move the audit log to the monthly partitioned audit_event table
+
+Author Sadeq Obaid and Abdallah Obaid
+
+Revision ID: 0017_audit_event_partitions
+Revises: 0016_user_security_version
+Create Date: 2026-10-18
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from config.settings import AUDIT_PARTITION_MONTHS_AHEAD
+from src.auth.audit_partitions import AuditPartitionManager, add_months, month_start
+
+# revision identifiers, used by Alembic.
+revision = "0017_audit_event_partitions"
+down_revision = "0016_user_security_version"
+branch_labels = None
+depends_on = None
+
+# Names partitions the way the audit maintainer does
+partitions = AuditPartitionManager("audit_event")
+
+# Columns of audit_event taken from audit_log when it has them, with the fallback otherwise
+COPIED_COLUMNS = {
+    "id": None,
+    "created_at": None,
+    "updated_at": "now()",
+    "is_active": "true",
+    "user_id": "NULL",
+    "action": None,
+    "resource_type": None,
+    "description": None,
+    "ip_address": "NULL",
+    "user_agent": "NULL",
+    "old_values": "NULL",
+    "new_values": "NULL",
+}
+
+
+def _copy_expressions(columns: set) -> dict:
+    """
+    Build the audit_log expressions filling the audit_event columns.
+
+    The audit_log table was declared by two models with different layouts
+    (timestamp and details instead of created_at and description, string
+    resource IDs), so the expressions follow the columns it actually has.
+
+    Args:
+        columns: Column names of audit_log
+
+    Returns:
+        dict: SQL expression by audit_event column
+    """
+    expressions = {
+        column: f'"{column}"' if column in columns else fallback for column, fallback in COPIED_COLUMNS.items()
+    }
+    if "created_at" not in columns:
+        expressions["created_at"] = '"timestamp"' if "timestamp" in columns else "now()"
+    if "description" not in columns:
+        expressions["description"] = '"details"' if "details" in columns else "NULL"
+    if "updated_at" not in columns:
+        expressions["updated_at"] = expressions["created_at"]
+
+    expressions["resource_id"] = (
+        """CASE WHEN "resource_id"::text ~ '^[0-9]{1,9}$' THEN "resource_id"::text::integer END"""
+        if "resource_id" in columns else "NULL"
+    )
+    generated_event_id = """md5("id"::text || random()::text)::uuid::text"""
+    expressions["event_id"] = (
+        f'COALESCE("event_id", {generated_event_id})' if "event_id" in columns else generated_event_id
+    )
+    return expressions
+
+
+def upgrade() -> None:
+    """Create the partitioned table with partitions from the oldest logged month on and copy audit_log into it."""
+    op.execute(
+        "CREATE TABLE audit_event ("
+        "id SERIAL NOT NULL, "
+        "created_at TIMESTAMP NOT NULL DEFAULT now(), "
+        "updated_at TIMESTAMP NOT NULL DEFAULT now(), "
+        "is_active BOOLEAN NOT NULL DEFAULT true, "
+        'user_id INTEGER REFERENCES "user" (id), '
+        "action VARCHAR(50) NOT NULL, "
+        "resource_type VARCHAR(50) NOT NULL, "
+        "resource_id INTEGER, "
+        "description TEXT, "
+        "ip_address VARCHAR(50), "
+        "user_agent VARCHAR(255), "
+        "old_values JSON, "
+        "new_values JSON, "
+        "event_id VARCHAR(36) NOT NULL, "
+        "PRIMARY KEY (id, created_at), "
+        "CONSTRAINT uq_audit_event_event_id UNIQUE (event_id, created_at)"
+        ") PARTITION BY RANGE (created_at)"
+    )
+    # Indexes on the (still empty) parent are created on every partition
+    op.create_index("ix_audit_event_id", "audit_event", ["id"])
+    op.create_index("ix_audit_event_action", "audit_event", ["action"])
+    op.create_index("ix_audit_event_resource_type", "audit_event", ["resource_type"])
+    op.create_index("ix_audit_event_resource_id", "audit_event", ["resource_id"])
+    op.create_index("ix_audit_event_user_created", "audit_event", ["user_id", "created_at"])
+    op.create_index("ix_audit_event_resource_created", "audit_event", ["resource_type", "resource_id", "created_at"])
+
+    bind = op.get_bind()
+    has_log = sa.inspect(bind).has_table("audit_log")
+    expressions = {}
+    oldest = newest = None
+    if has_log:
+        expressions = _copy_expressions({column["name"] for column in sa.inspect(bind).get_columns("audit_log")})
+        oldest, newest = bind.execute(sa.text(
+            f"SELECT min({expressions['created_at']}), max({expressions['created_at']}) FROM audit_log"
+        )).one()
+
+    now = month_start(datetime.utcnow())
+    start = min(month_start(oldest), now) if oldest is not None else now
+    end = add_months(max(month_start(newest), now) if newest is not None else now, 1)
+    end = max(end, add_months(now, AUDIT_PARTITION_MONTHS_AHEAD + 1))
+    while start < end:
+        op.execute(
+            f'CREATE TABLE "{partitions.partition_name(start)}" PARTITION OF audit_event '
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{add_months(start, 1).isoformat(sep=' ')}')"
+        )
+        start = add_months(start, 1)
+
+    if has_log:
+        op.execute(
+            f"INSERT INTO audit_event ({', '.join(expressions)}) "
+            f"SELECT {', '.join(expressions.values())} FROM audit_log"
+        )
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('audit_event', 'id'), COALESCE(max(id), 0) + 1, false) "
+            "FROM audit_event"
+        )
+
+
+def downgrade() -> None:
+    """Drop the partitioned table and its partitions; audit_log still holds the history copied on upgrade."""
+    op.execute("DROP TABLE IF EXISTS audit_event")
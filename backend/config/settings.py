@@ -17,7 +17,12 @@ APP_VERSION = os.getenv("APP_VERSION", "1.0.0")
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 API_PREFIX = os.getenv("API_PREFIX", "/api/v1")
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-for-development-only")
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+STATELESS_AUTH_ENABLED = os.getenv("STATELESS_AUTH_ENABLED", "False").lower() == "true"
+SECURITY_VERSION_REFRESH_SECONDS = int(os.getenv("SECURITY_VERSION_REFRESH_SECONDS", "30"))
+SECURITY_VERSION_FULL_RELOAD_SECONDS = int(os.getenv("SECURITY_VERSION_FULL_RELOAD_SECONDS", "900"))
 
 # CORS settings
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
@@ -28,4 +33,118 @@ LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
 
 # Security settings
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "your-encryption-key-for-development-only")
+ENCRYPTION_SALT = os.getenv("ENCRYPTION_SALT", "c2FsZXMtYXV0b21hdGlvbg==")
+ENCRYPTION_KEY_VERSION = int(os.getenv("ENCRYPTION_KEY_VERSION", "1"))
+ENCRYPTION_PREVIOUS_KEYS = os.getenv("ENCRYPTION_PREVIOUS_KEYS", "")  # "version:key,version:key"
+ENCRYPTION_BATCH_WORKERS = int(os.getenv("ENCRYPTION_BATCH_WORKERS", "4"))
+ENCRYPTION_BATCH_CHUNK_SIZE = int(os.getenv("ENCRYPTION_BATCH_CHUNK_SIZE", "256"))
+BLIND_INDEX_KEY = os.getenv("BLIND_INDEX_KEY", "your-blind-index-key-for-development-only")
+BLIND_INDEX_BACKFILL_BATCH_SIZE = int(os.getenv("BLIND_INDEX_BACKFILL_BATCH_SIZE", "1000"))
 PASSWORD_HASH_ALGORITHM = os.getenv("PASSWORD_HASH_ALGORITHM", "bcrypt")
+
+# Access scoping settings
+SCOPED_RLS_ENABLED = os.getenv("SCOPED_RLS_ENABLED", "False").lower() == "true"
+
+# Token janitor settings
+TOKEN_JANITOR_ENABLED = os.getenv("TOKEN_JANITOR_ENABLED", "True").lower() == "true"
+TOKEN_JANITOR_INTERVAL_SECONDS = int(os.getenv("TOKEN_JANITOR_INTERVAL_SECONDS", "3600"))
+TOKEN_JANITOR_BATCH_SIZE = int(os.getenv("TOKEN_JANITOR_BATCH_SIZE", "1000"))
+TOKEN_JANITOR_THROTTLE_MS = int(os.getenv("TOKEN_JANITOR_THROTTLE_MS", "50"))
+# Daily token partitions created ahead (never fewer than REFRESH_TOKEN_EXPIRE_DAYS)
+TOKEN_PARTITION_DAYS_AHEAD = int(os.getenv("TOKEN_PARTITION_DAYS_AHEAD", "3"))
+
+# Audit pipeline settings
+AUDIT_PIPELINE_ENABLED = os.getenv("AUDIT_PIPELINE_ENABLED", "True").lower() == "true"
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200"))
+AUDIT_SPILL_ENABLED = os.getenv("AUDIT_SPILL_ENABLED", "True").lower() == "true"
+AUDIT_SPILL_DIR = os.getenv("AUDIT_SPILL_DIR", "data/audit_spill")
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "2"))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "0"))  # 0 keeps all partitions attached
+AUDIT_MAINTENANCE_ENABLED = os.getenv("AUDIT_MAINTENANCE_ENABLED", "True").lower() == "true"
+AUDIT_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("AUDIT_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+AUDIT_ARCHIVE_ENABLED = os.getenv("AUDIT_ARCHIVE_ENABLED", "False").lower() == "true"
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "")  # Required for archiving; storage shared by every host
+AUDIT_ARCHIVE_AFTER_DAYS = int(os.getenv("AUDIT_ARCHIVE_AFTER_DAYS", "90"))
+AUDIT_ARCHIVE_BLOCK_ROWS = int(os.getenv("AUDIT_ARCHIVE_BLOCK_ROWS", "1000"))
+AUDIT_CAPTURE_CHANGES = os.getenv("AUDIT_CAPTURE_CHANGES", "True").lower() == "true"
+
+# Autocomplete settings
+AUTOCOMPLETE_MIN_LENGTH = int(os.getenv("AUTOCOMPLETE_MIN_LENGTH", "2"))
+AUTOCOMPLETE_CANDIDATES = int(os.getenv("AUTOCOMPLETE_CANDIDATES", "200"))
+AUTOCOMPLETE_CACHE_SIZE = int(os.getenv("AUTOCOMPLETE_CACHE_SIZE", "1024"))
+AUTOCOMPLETE_CACHE_TTL_SECONDS = int(os.getenv("AUTOCOMPLETE_CACHE_TTL_SECONDS", "30"))
+
+# Global search settings
+SEARCH_SOURCE_TIMEOUT_MS = int(os.getenv("SEARCH_SOURCE_TIMEOUT_MS", "300"))
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "10"))
+
+# In-process search settings
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "postgres")  # postgres or memory
+SEARCH_SNAPSHOT_PATH = os.getenv("SEARCH_SNAPSHOT_PATH", "data/search_index.snapshot")
+
+# Duplicate detection settings
+DEDUPE_MATCH_THRESHOLD = float(os.getenv("DEDUPE_MATCH_THRESHOLD", "0.8"))
+DEDUPE_MAX_BLOCK_SIZE = int(os.getenv("DEDUPE_MAX_BLOCK_SIZE", "200"))
+DEDUPE_BATCH_SIZE = int(os.getenv("DEDUPE_BATCH_SIZE", "1000"))
+
+# Saved search settings
+SAVED_SEARCH_MAINTAINER_ENABLED = os.getenv("SAVED_SEARCH_MAINTAINER_ENABLED", "True").lower() == "true"
+SAVED_SEARCH_FLUSH_INTERVAL_MS = int(os.getenv("SAVED_SEARCH_FLUSH_INTERVAL_MS", "500"))
+SAVED_SEARCH_TIME_REFRESH_SECONDS = int(os.getenv("SAVED_SEARCH_TIME_REFRESH_SECONDS", "3600"))
+
+# Lead scoring settings
+LEAD_SCORING_BATCH_SIZE = int(os.getenv("LEAD_SCORING_BATCH_SIZE", "50000"))
+LEAD_QUALIFICATION_THRESHOLD = int(os.getenv("LEAD_QUALIFICATION_THRESHOLD", "60"))
+LEAD_SCORE_RECENCY_HALF_LIFE_DAYS = float(os.getenv("LEAD_SCORE_RECENCY_HALF_LIFE_DAYS", "14"))
+LEAD_RESCORE_WORKER_ENABLED = os.getenv("LEAD_RESCORE_WORKER_ENABLED", "True").lower() == "true"
+LEAD_RESCORE_DEBOUNCE_MS = int(os.getenv("LEAD_RESCORE_DEBOUNCE_MS", "2000"))
+LEAD_RESCORE_MAX_DELAY_MS = int(os.getenv("LEAD_RESCORE_MAX_DELAY_MS", "10000"))
+LEAD_RESCORE_CACHE_SIZE = int(os.getenv("LEAD_RESCORE_CACHE_SIZE", "100000"))
+LEAD_RESCORE_CACHE_TTL_SECONDS = int(os.getenv("LEAD_RESCORE_CACHE_TTL_SECONDS", "300"))
+
+# Lead assignment settings
+LEAD_ASSIGNMENT_DEFAULT_CAPACITY = int(os.getenv("LEAD_ASSIGNMENT_DEFAULT_CAPACITY", "50"))
+LEAD_ASSIGNMENT_REBUILD_SECONDS = int(os.getenv("LEAD_ASSIGNMENT_REBUILD_SECONDS", "300"))
+
+# Lead ingestion settings
+LEAD_INGEST_ENABLED = os.getenv("LEAD_INGEST_ENABLED", "True").lower() == "true"
+LEAD_INGEST_API_KEYS = [key for key in os.getenv("LEAD_INGEST_API_KEYS", "").split(",") if key]
+LEAD_INGEST_QUEUE_SIZE = int(os.getenv("LEAD_INGEST_QUEUE_SIZE", "20000"))
+LEAD_INGEST_BATCH_SIZE = int(os.getenv("LEAD_INGEST_BATCH_SIZE", "500"))
+LEAD_INGEST_FLUSH_INTERVAL_MS = int(os.getenv("LEAD_INGEST_FLUSH_INTERVAL_MS", "200"))
+LEAD_INGEST_MAX_REQUEST_LEADS = int(os.getenv("LEAD_INGEST_MAX_REQUEST_LEADS", "1000"))
+LEAD_INGEST_RETRY_SECONDS = int(os.getenv("LEAD_INGEST_RETRY_SECONDS", "5"))
+LEAD_INGEST_KEY_TTL_HOURS = int(os.getenv("LEAD_INGEST_KEY_TTL_HOURS", "72"))
+LEAD_INGEST_AUTO_ASSIGN = os.getenv("LEAD_INGEST_AUTO_ASSIGN", "True").lower() == "true"
+
+# Import settings
+IMPORT_RUNNER_ENABLED = os.getenv("IMPORT_RUNNER_ENABLED", "True").lower() == "true"
+IMPORT_STORAGE_DIR = os.getenv("IMPORT_STORAGE_DIR", "data/imports")  # Storage shared by every host running imports
+IMPORT_MAX_UPLOAD_MB = int(os.getenv("IMPORT_MAX_UPLOAD_MB", "1024"))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+IMPORT_VALIDATION_WORKERS = int(os.getenv("IMPORT_VALIDATION_WORKERS", "0"))
+IMPORT_JOB_LEASE_SECONDS = int(os.getenv("IMPORT_JOB_LEASE_SECONDS", "600"))
+
+# Lead conversion settings
+LEAD_CONVERT_MAX_LEADS = int(os.getenv("LEAD_CONVERT_MAX_LEADS", "5000"))
+
+# Activity rollup settings
+ACTIVITY_ROLLUP_MAINTAINER_ENABLED = os.getenv("ACTIVITY_ROLLUP_MAINTAINER_ENABLED", "True").lower() == "true"
+ACTIVITY_ROLLUP_FLUSH_INTERVAL_MS = int(os.getenv("ACTIVITY_ROLLUP_FLUSH_INTERVAL_MS", "1000"))
+ACTIVITY_ROLLUP_BATCH_SIZE = int(os.getenv("ACTIVITY_ROLLUP_BATCH_SIZE", "1000"))
+
+# SLA monitor settings
+SLA_MONITOR_ENABLED = os.getenv("SLA_MONITOR_ENABLED", "True").lower() == "true"
+SLA_MONITOR_INTERVAL_SECONDS = int(os.getenv("SLA_MONITOR_INTERVAL_SECONDS", "3600"))
+SLA_MONITOR_BATCH_SIZE = int(os.getenv("SLA_MONITOR_BATCH_SIZE", "1000"))
+SLA_LEAD_DAYS = int(os.getenv("SLA_LEAD_DAYS", "7"))
+SLA_OPPORTUNITY_DAYS = int(os.getenv("SLA_OPPORTUNITY_DAYS", "14"))
+SLA_CONTACT_DAYS = int(os.getenv("SLA_CONTACT_DAYS", "90"))
+SLA_TASK_DUE_DAYS = int(os.getenv("SLA_TASK_DUE_DAYS", "1"))
+
+# Analytics settings
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "256"))
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+ANALYTICS_MAX_RANGE_DAYS = int(os.getenv("ANALYTICS_MAX_RANGE_DAYS", "366"))
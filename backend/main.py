@@ -9,7 +9,33 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from config.settings import APP_NAME, APP_VERSION, API_PREFIX, DEBUG, CORS_ORIGINS
+from config.settings import (
+    APP_NAME,
+    APP_VERSION,
+    API_PREFIX,
+    DEBUG,
+    CORS_ORIGINS,
+    TOKEN_JANITOR_ENABLED,
+    AUDIT_PIPELINE_ENABLED,
+    AUDIT_MAINTENANCE_ENABLED,
+    SAVED_SEARCH_MAINTAINER_ENABLED,
+    LEAD_RESCORE_WORKER_ENABLED,
+    LEAD_INGEST_ENABLED,
+    IMPORT_RUNNER_ENABLED,
+    ACTIVITY_ROLLUP_MAINTAINER_ENABLED,
+    SLA_MONITOR_ENABLED
+)
+from src.auth.token_janitor import token_janitor
+from src.auth.audit_logging import audit_pipeline, audit_maintainer
+from src.repositories.search_repository import global_search_repository
+from src.repositories.saved_search_repository import saved_search_maintainer
+from src.repositories.lead_repository import lead_rescoring_worker
+from src.repositories.ingestion_repository import lead_ingestion_pipeline
+from src.repositories.import_repository import import_job_runner
+from src.repositories.activity_repository import activity_rollup_maintainer
+from src.repositories.sla_repository import sla_monitor
+from src.utils.database_utils import db_session
+from src.utils.inverted_index import search_engine
 
 # Create FastAPI application
 app = FastAPI(
@@ -31,6 +57,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Background services
+@app.on_event("startup")
+async def start_background_services():
+    """
+    Start background services on application startup.
+    """
+    if TOKEN_JANITOR_ENABLED:
+        token_janitor.start()
+    
+    if AUDIT_PIPELINE_ENABLED:
+        audit_pipeline.start()
+    
+    if AUDIT_MAINTENANCE_ENABLED:
+        audit_maintainer.start()
+    
+    if SAVED_SEARCH_MAINTAINER_ENABLED:
+        saved_search_maintainer.start()
+    
+    if ACTIVITY_ROLLUP_MAINTAINER_ENABLED:
+        activity_rollup_maintainer.start()
+    
+    if LEAD_RESCORE_WORKER_ENABLED:
+        lead_rescoring_worker.start()
+    
+    if search_engine.enabled:
+        with db_session() as db:
+            global_search_repository.load_search_index(db)
+    
+    if LEAD_INGEST_ENABLED:
+        lead_ingestion_pipeline.start()
+    
+    if IMPORT_RUNNER_ENABLED:
+        import_job_runner.start()
+    
+    if SLA_MONITOR_ENABLED:
+        sla_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    """
+    Stop background services on application shutdown.
+    """
+    token_janitor.stop(timeout=5)
+    audit_pipeline.stop(timeout=10)
+    audit_maintainer.stop(timeout=10)
+    sla_monitor.stop(timeout=10)
+    # Imported and ingested leads feed the rescoring worker and activity rollups, which feed saved searches
+    import_job_runner.stop(timeout=30)
+    lead_ingestion_pipeline.stop(timeout=10)
+    lead_rescoring_worker.stop(timeout=5)
+    activity_rollup_maintainer.stop(timeout=5)
+    saved_search_maintainer.stop(timeout=5)
+    
+    if search_engine.enabled:
+        search_engine.save()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -0,0 +1,52 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Activity rollup backfill script for the Sales Automation System.
+This script recomputes the activity counts and latest activity dates of
+all leads, contacts and opportunities, e.g. after adding the rollup columns.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.database import SessionLocal
+from config.settings import ACTIVITY_ROLLUP_BATCH_SIZE
+from src.repositories.activity_repository import ActivityRollupMaintainer, ROLLUP_ENTITIES
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to backfill the activity rollups.
+    """
+    parser = argparse.ArgumentParser(description="Recompute activity rollups")
+    parser.add_argument("--entity-type", choices=list(ROLLUP_ENTITIES), action="append")
+    parser.add_argument("--batch-size", type=int, default=ACTIVITY_ROLLUP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    maintainer = ActivityRollupMaintainer(batch_size=args.batch_size)
+    db = SessionLocal()
+    try:
+        for entity_type in args.entity_type or ROLLUP_ENTITIES:
+            started = time.perf_counter()
+            refreshed = maintainer.backfill(db, entity_type)
+            logger.info(f"Backfilled {refreshed} {entity_type} rollups in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
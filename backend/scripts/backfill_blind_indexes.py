@@ -0,0 +1,53 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Blind index backfill script for the Sales Automation System.
+This script computes the blind indexes of existing contacts.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.database import SessionLocal
+from config.settings import BLIND_INDEX_BACKFILL_BATCH_SIZE
+from src.repositories.contact_repository import ContactRepository
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to backfill the blind indexes.
+    """
+    parser = argparse.ArgumentParser(description="Backfill contact blind indexes")
+    parser.add_argument("--batch-size", type=int, default=BLIND_INDEX_BACKFILL_BATCH_SIZE)
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every index, e.g. after a key change")
+    parser.add_argument("--encrypted", action="store_true", help="Stored emails and phone numbers are (partly) encrypted")
+    args = parser.parse_args()
+
+    decrypt_many = None
+    if args.encrypted:
+        from src.auth.encryption import data_encryption
+        decrypt_many = data_encryption.plaintext_many
+
+    db = SessionLocal()
+    try:
+        updated = ContactRepository().backfill_blind_indexes(db, args.batch_size, args.rebuild, decrypt_many)
+        logger.info(f"Blind index backfill completed: {updated} contacts updated")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
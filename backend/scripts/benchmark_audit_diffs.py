@@ -0,0 +1,98 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Audit diff benchmark for the Sales Automation System.
+This script compares the audit payload bytes written per update with
+full-row old/new values and with field-level diffs.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.database import SessionLocal
+from src.models.contact import Contact
+from src.auth.audit_diff import capture_changes, snapshot
+from src.repositories.contact_repository import ContactRepository
+from src.utils.database_utils import init_db
+
+# Fields changed by the benchmark updates, like typical edits from the UI
+FIELDS = ["first_name", "last_name", "job_title", "department", "city", "notes", "source"]
+
+
+def payload_bytes(old_values, new_values) -> int:
+    """
+    Get the size of an audit payload as stored in the JSON columns.
+
+    Args:
+        old_values: Old values
+        new_values: New values
+
+    Returns:
+        int: Payload size in bytes
+    """
+    return len(json.dumps(old_values).encode()) + len(json.dumps(new_values).encode())
+
+
+def main():
+    """
+    Main function to run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark audit payload size per update")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--fields", type=int, default=1, help="Fields changed per update")
+    args = parser.parse_args()
+
+    init_db()
+    repository = ContactRepository()
+
+    db = SessionLocal()
+    try:
+        contact = Contact(
+            first_name="Bench",
+            last_name="Mark",
+            email=f"bench_{int(time.time())}@example.com",
+            notes="Benchmark contact " * 10
+        )
+        db.add(contact)
+        db.commit()
+        db.refresh(contact)
+
+        full_sizes = []
+        diff_sizes = []
+
+        for i in range(args.iterations):
+            before = snapshot(contact)
+            for field in random.sample(FIELDS, args.fields):
+                setattr(contact, field, f"{field} {i}")
+
+            old_values, new_values = capture_changes(
+                contact, repository.audit_exclude_fields, repository.audit_redact_fields
+            )
+            diff_sizes.append(payload_bytes(old_values, new_values))
+
+            db.commit()
+            db.refresh(contact)
+            full_sizes.append(payload_bytes(before, snapshot(contact)))
+
+        full = statistics.mean(full_sizes)
+        diff = statistics.mean(diff_sizes)
+        print(f"full rows: {full:.0f} bytes per update")
+        print(f"    diffs: {diff:.0f} bytes per update ({diff / full:.1%} of full rows)")
+
+        # Remove benchmark data
+        db.delete(contact)
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
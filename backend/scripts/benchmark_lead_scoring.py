@@ -0,0 +1,267 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Lead scoring benchmark for the Sales Automation System.
+This script compares scoring leads one at a time in Python with scoring
+columnar batches with the vectorized model, on synthetic features. With
+--database it also seeds the synthetic leads into the configured
+PostgreSQL database and times the full rescoring path: loading the
+features in batches, scoring them and writing every score back with the
+unnest statements, against rescoring one lead at a time through the ORM.
+Run it against a scratch database, as the full path rescores every lead.
+"""
+
+import argparse
+import math
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, func, insert, select, text
+
+from config.database import SessionLocal, engine
+from src.models.contact import Contact
+from src.models.lead import Lead, LeadActivity, LeadScore, LeadSource, LeadStatus
+from src.repositories.lead_repository import LeadRepository
+from src.utils.lead_scoring import (
+    LeadScoringModel, SOURCE_POINTS, STATUS_POINTS, VALUE_POINTS, ACTIVITY_POINTS, RECENCY_POINTS,
+    COMPLETENESS_POINTS, FULL_VALUE, FULL_ACTIVITY_COUNT, COMPLETENESS_FIELDS
+)
+
+
+def synthetic_features(count: int, today: np.datetime64, seed: int = 42):
+    """
+    Generate random lead features.
+
+    Args:
+        count: Number of leads
+        today: Current date
+        seed: Random seed
+
+    Returns:
+        Dict[str, np.ndarray]: Feature arrays
+    """
+    rng = np.random.default_rng(seed)
+    value = rng.lognormal(9, 2, count)
+    value[rng.random(count) < 0.3] = np.nan
+    last_activity = today - rng.integers(0, 365, count).astype("timedelta64[D]")
+    last_activity[rng.random(count) < 0.2] = np.datetime64("NaT")
+
+    return {
+        "source": rng.integers(-1, len(LeadSource), count).astype(np.int8),
+        "status": rng.integers(0, len(LeadStatus), count).astype(np.int8),
+        "estimated_value": value,
+        "activity_count": rng.poisson(3, count).astype(np.int32),
+        "last_activity": last_activity,
+        "contact_fields": rng.integers(0, COMPLETENESS_FIELDS + 1, count).astype(np.int8)
+    }
+
+
+def score_one(model: LeadScoringModel, source, status, value, activity_count, days, contact_fields) -> int:
+    """
+    Score one lead with plain Python arithmetic (the per-row baseline).
+
+    Returns:
+        int: Score
+    """
+    score = SOURCE_POINTS.get(source, 0) + STATUS_POINTS[status]
+    if value is not None and value > 0:
+        score += VALUE_POINTS * min(math.log1p(value) / math.log1p(FULL_VALUE), 1.0)
+    score += ACTIVITY_POINTS * min(activity_count, FULL_ACTIVITY_COUNT) / FULL_ACTIVITY_COUNT
+    if days is not None:
+        score += RECENCY_POINTS * 2 ** (-max(days, 0) / model.recency_half_life_days)
+    score += COMPLETENESS_POINTS * contact_fields / COMPLETENESS_FIELDS
+    return min(max(round(score), 0), 100)
+
+
+def seed_database(features, marker: str, batch_size: int) -> None:
+    """
+    Insert the synthetic leads, one contact per ten leads and their activities.
+
+    Every lead is stored with a score of -1, so the timed run writes all of them back.
+
+    Args:
+        features: Feature arrays from synthetic_features
+        marker: Title of the seeded leads and first name of the seeded contacts
+        batch_size: Rows per insert
+    """
+    count = len(features["source"])
+    sources = list(LeadSource) + [None]
+    statuses = list(LeadStatus)
+    completeness = ("email", "phone", "job_title", "company_name")
+
+    with engine.begin() as conn:
+        contacts = [
+            {
+                "first_name": marker,
+                **{field: f"{field}-{i}" if n < i % (len(completeness) + 1) else None for n, field in enumerate(completeness)}
+            }
+            for i in range(-(-count // 10))
+        ]
+        for start in range(0, len(contacts), batch_size):
+            conn.execute(insert(Contact.__table__), contacts[start:start + batch_size])
+        contact_ids = conn.execute(
+            select(Contact.id).where(Contact.first_name == marker).order_by(Contact.id)
+        ).scalars().all()
+
+        for start in range(0, count, batch_size):
+            end = min(start + batch_size, count)
+            conn.execute(insert(Lead.__table__), [
+                {
+                    "title": marker,
+                    "status": statuses[features["status"][i]],
+                    "source": sources[features["source"][i]],
+                    "estimated_value": None if np.isnan(features["estimated_value"][i]) else float(features["estimated_value"][i]),
+                    "score": -1,
+                    "contact_id": contact_ids[i // 10]
+                }
+                for i in range(start, end)
+            ])
+
+        # Activities are generated in SQL: zero to six per lead within the last year
+        conn.execute(text(
+            "INSERT INTO lead_activity (lead_id, activity_type, subject, date, created_at, updated_at, is_active) "
+            "SELECT lead.id, 'call', :marker, current_date - (lead.id * 37 + n) % 365, now(), now(), true "
+            "FROM lead CROSS JOIN LATERAL generate_series(1, lead.id % 7) AS n "
+            "WHERE lead.title = :marker"
+        ), {"marker": marker})
+
+
+def rescore_per_row(db, model, lead_ids, today) -> None:
+    """
+    Rescore leads one at a time through the ORM (the per-row baseline of the full path).
+
+    Args:
+        db: Database session
+        model: Scoring model
+        lead_ids: IDs of the leads to rescore
+        today: Current date
+    """
+    for lead_id in lead_ids:
+        lead = db.get(Lead, lead_id)
+        contact = db.get(Contact, lead.contact_id)
+        activity_count, last_activity = db.execute(
+            select(func.count(), func.max(LeadActivity.date)).where(LeadActivity.lead_id == lead_id)
+        ).one()
+        contact_fields = sum((
+            contact.email is not None,
+            contact.phone is not None or contact.mobile is not None,
+            contact.job_title is not None,
+            contact.company_id is not None or contact.company_name is not None
+        ))
+        days = None if last_activity is None else (today - last_activity).days
+
+        lead.score = score_one(model, lead.source, lead.status, lead.estimated_value, activity_count, days, contact_fields)
+        lead.is_qualified = lead.status == LeadStatus.QUALIFIED or (
+            lead.score >= model.qualification_threshold and lead.status != LeadStatus.UNQUALIFIED
+        )
+        db.add(LeadScore(lead_id=lead_id, score=lead.score, is_qualified=lead.is_qualified, model_version=model.version))
+        db.commit()
+
+
+def benchmark_database(args, model: LeadScoringModel, features) -> None:
+    """
+    Time the full rescoring path on the database and print the results.
+
+    Args:
+        args: Command line arguments
+        model: Scoring model
+        features: Feature arrays from synthetic_features
+    """
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("--database needs PostgreSQL, whose unnest write-back is being measured")
+
+    marker = f"bench_{int(time.time())}"
+    started = time.perf_counter()
+    seed_database(features, marker, args.batch_size)
+    print(f"    seeded: {args.leads} leads in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = LeadRepository().rescore(db, batch_size=args.batch_size, model=model)
+        full_path = time.perf_counter() - started
+
+        lead_ids = db.execute(
+            select(Lead.id).where(Lead.title == marker).order_by(Lead.id).limit(args.db_row_sample)
+        ).scalars().all()
+        started = time.perf_counter()
+        rescore_per_row(db, model, lead_ids, date.today())
+        per_row = (time.perf_counter() - started) * args.leads / max(len(lead_ids), 1)
+
+        print(f"  per-row: {per_row:.1f}s for {args.leads} leads through the ORM (extrapolated from {len(lead_ids)})")
+        print(
+            f" full path: {full_path:.1f}s for {result['scored']} leads, {result['changed']} written back "
+            f"({result['scored'] / full_path:,.0f} leads/s)"
+        )
+        print(f"   speedup: {per_row / full_path:.0f}x")
+    finally:
+        # Remove benchmark data
+        leads = select(Lead.id).where(Lead.title == marker)
+        db.execute(delete(LeadScore).where(LeadScore.lead_id.in_(leads)))
+        db.execute(delete(LeadActivity).where(LeadActivity.lead_id.in_(leads)))
+        db.execute(delete(Lead).where(Lead.title == marker))
+        db.execute(delete(Contact).where(Contact.first_name == marker))
+        db.commit()
+        db.close()
+
+
+def main():
+    """
+    Main function to run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark per-row and vectorized lead scoring")
+    parser.add_argument("--leads", type=int, default=5_000_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--row-sample", type=int, default=200_000, help="Leads scored by the per-row baseline")
+    parser.add_argument("--database", action="store_true", help="Also time the full load, score and write-back path")
+    parser.add_argument("--db-row-sample", type=int, default=10_000, help="Leads rescored by the per-row database baseline")
+    args = parser.parse_args()
+
+    model = LeadScoringModel()
+    today = np.datetime64("today", "D")
+    features = synthetic_features(args.leads, today)
+
+    started = time.perf_counter()
+    for start in range(0, args.leads, args.batch_size):
+        batch = {name: values[start:start + args.batch_size] for name, values in features.items()}
+        model.score(batch, today)
+    vectorized = time.perf_counter() - started
+
+    sample = min(args.row_sample, args.leads)
+    sources = list(LeadSource) + [None]
+    statuses = list(LeadStatus)
+    rows = [
+        (
+            sources[features["source"][i]],
+            statuses[features["status"][i]],
+            None if np.isnan(features["estimated_value"][i]) else float(features["estimated_value"][i]),
+            int(features["activity_count"][i]),
+            None if np.isnat(features["last_activity"][i]) else int((today - features["last_activity"][i]).astype(int)),
+            int(features["contact_fields"][i])
+        )
+        for i in range(sample)
+    ]
+    started = time.perf_counter()
+    row_scores = [score_one(model, *row) for row in rows]
+    per_row = (time.perf_counter() - started) * args.leads / sample
+
+    vector_scores, _ = model.score({name: values[:sample] for name, values in features.items()}, today)
+    mismatches = int(np.count_nonzero(np.abs(vector_scores.astype(int) - np.array(row_scores)) > 1))
+
+    print(f"  per-row: {per_row:.1f}s for {args.leads} leads (extrapolated from {sample})")
+    print(f"vectorized: {vectorized:.1f}s for {args.leads} leads ({args.leads / vectorized:,.0f} leads/s)")
+    print(f"   speedup: {per_row / vectorized:.0f}x, {mismatches} scores differ by more than rounding")
+
+    if args.database:
+        benchmark_database(args, model, features)
+
+
+if __name__ == "__main__":
+    main()
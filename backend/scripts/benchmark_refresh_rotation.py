@@ -0,0 +1,139 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Refresh token rotation benchmark for the Sales Automation System.
+This script compares the latency and round trips of the previous
+multi-query refresh flow with the single-statement rotation.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+
+from config.database import SessionLocal, engine
+from src.models.user import User
+from src.auth.refresh_token import RefreshToken, refresh_token_repository
+from src.utils.database_utils import init_db
+
+
+class StatementCounter:
+    """Counts statements sent to the database."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def legacy_refresh(db, token: str) -> str:
+    """
+    Rotate a token the way refresh_access_token used to.
+
+    Args:
+        db: Database session
+        token: Token string
+
+    Returns:
+        str: New token string
+    """
+    db_token = refresh_token_repository.get_by_token(db, token)
+    user = db.query(User).filter(User.id == db_token.user_id).first()
+
+    # Old revoke re-queried the token, then committed and refreshed it
+    db_token = refresh_token_repository.get_by_token(db, token)
+    db_token.is_revoked = True
+    db.commit()
+    db.refresh(db_token)
+
+    new_token = refresh_token_repository.create(db, user.id, db_token.family_id)
+    db.refresh(new_token)
+    return new_token.token
+
+
+def rotation_refresh(db, token: str) -> str:
+    """
+    Rotate a token with the single-statement rotation.
+
+    Args:
+        db: Database session
+        token: Token string
+
+    Returns:
+        str: New token string
+    """
+    _, new_token = refresh_token_repository.rotate(db, token)
+    return new_token
+
+
+def run(name: str, refresh, db, user: User, iterations: int, counter: StatementCounter) -> None:
+    """
+    Run one benchmark and print its results.
+
+    Args:
+        name: Benchmark name
+        refresh: Refresh function to benchmark
+        db: Database session
+        user: User owning the tokens
+        iterations: Number of refreshes
+        counter: Statement counter
+    """
+    token = refresh_token_repository.create(db, user.id).token
+    timings = []
+    counter.count = 0
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        token = refresh(db, token)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{name:>10}: mean {statistics.mean(timings):.2f} ms, "
+        f"p95 {p95:.2f} ms, {counter.count / iterations:.1f} statements per refresh"
+    )
+
+
+def main():
+    """
+    Main function to run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark refresh token rotation")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    init_db()
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+
+    db = SessionLocal()
+    try:
+        user = User(
+            username=f"bench_{int(time.time())}",
+            email=f"bench_{int(time.time())}@example.com",
+            hashed_password="not-a-real-hash"
+        )
+        db.add(user)
+        db.commit()
+
+        run("legacy", legacy_refresh, db, user, args.iterations, counter)
+        run("rotation", rotation_refresh, db, user, args.iterations, counter)
+
+        # Remove benchmark data
+        db.query(RefreshToken).filter(RefreshToken.user_id == user.id).delete()
+        db.delete(user)
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
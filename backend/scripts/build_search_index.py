@@ -0,0 +1,56 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Search index build script for the Sales Automation System.
+This script writes the in-process search engine snapshot, e.g. to ship a
+warm index with an edge deployment.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.database import SessionLocal
+from src.repositories.search_repository import global_search_repository
+from src.utils.inverted_index import search_engine
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to build the search index snapshot.
+    """
+    parser = argparse.ArgumentParser(description="Build the in-process search index snapshot")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the existing snapshot and index every record")
+    args = parser.parse_args()
+
+    if not search_engine.enabled:
+        logger.error("The in-process search engine is disabled (set SEARCH_BACKEND=memory)")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            for source in global_search_repository.sources.values():
+                source.repository.reindex(db)
+        else:
+            global_search_repository.load_search_index(db)
+    finally:
+        db.close()
+
+    search_engine.save()
+
+
+if __name__ == "__main__":
+    main()
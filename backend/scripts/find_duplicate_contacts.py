@@ -0,0 +1,53 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Duplicate contact detection script for the Sales Automation System.
+This script scans all contacts for likely duplicates and records them for review.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.database import SessionLocal
+from config.settings import DEDUPE_MATCH_THRESHOLD, DEDUPE_MAX_BLOCK_SIZE, DEDUPE_BATCH_SIZE
+from src.repositories.contact_repository import ContactRepository, contact_duplicate_repository
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to find duplicate contacts.
+    """
+    parser = argparse.ArgumentParser(description="Find duplicate contacts")
+    parser.add_argument("--threshold", type=float, default=DEDUPE_MATCH_THRESHOLD)
+    parser.add_argument("--batch-size", type=int, default=DEDUPE_BATCH_SIZE)
+    parser.add_argument("--max-block-size", type=int, default=DEDUPE_MAX_BLOCK_SIZE)
+    parser.add_argument("--skip-backfill", action="store_true", help="Don't compute missing dedupe keys first")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not args.skip_backfill:
+            updated = ContactRepository().backfill_dedupe_keys(db, args.batch_size)
+            logger.info(f"Dedupe key backfill completed: {updated} contacts updated")
+
+        recorded = contact_duplicate_repository.scan(db, args.threshold, args.batch_size, args.max_block_size)
+        logger.info(f"Duplicate scan completed: {recorded} new pairs recorded")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,8 @@ from pathlib import Path
 # Add the parent directory to sys.path to allow imports
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.utils.database_utils import init_db, check_database_connection
+from src.utils.database_utils import init_db, check_database_connection, db_session
+from src.auth.audit_logging import audit_partition_manager
 from src.utils.migration_utils import apply_migrations
 
 # Configure logging
@@ -48,6 +49,15 @@ def main():
         logger.error(f"Error initializing database: {str(e)}")
         return False
     
+    # Create the current and upcoming audit log partitions
+    try:
+        with db_session() as db:
+            created = audit_partition_manager.ensure_partitions(db)
+        logger.info(f"Audit log partitions created: {created}")
+    except Exception as e:
+        logger.error(f"Error creating audit log partitions: {str(e)}")
+        return False
+    
     # Apply migrations
     if not apply_migrations():
         logger.error("Failed to apply migrations")
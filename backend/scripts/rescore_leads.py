@@ -0,0 +1,53 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Lead rescoring script for the Sales Automation System.
+This script recomputes the scores and qualification flags of all leads,
+e.g. nightly or after the scoring rules change.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.database import SessionLocal
+from config.settings import LEAD_SCORING_BATCH_SIZE
+from src.repositories.lead_repository import LeadRepository
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to rescore all leads.
+    """
+    parser = argparse.ArgumentParser(description="Recompute lead scores")
+    parser.add_argument("--batch-size", type=int, default=LEAD_SCORING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = LeadRepository().rescore(db, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Scored {result['scored']} leads in {elapsed:.1f}s "
+            f"({result['scored'] / max(elapsed, 1e-9):.0f} leads/s), {result['changed']} changed"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
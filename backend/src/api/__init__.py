@@ -7,7 +7,7 @@ This module configures and includes all API endpoints.
 
 from fastapi import APIRouter, FastAPI
 
-from src.api import auth_endpoints, user_endpoints, contact_endpoints, lead_endpoints, marketing_endpoints
+from src.api import auth_endpoints, user_endpoints, contact_endpoints, lead_endpoints, marketing_endpoints, search_endpoints, saved_search_endpoints, ingestion_endpoints, import_endpoints, task_endpoints
 
 # Create main API router
 api_router = APIRouter(prefix="/api/v1")
@@ -18,6 +18,11 @@ api_router.include_router(user_endpoints.router)
 api_router.include_router(contact_endpoints.router)
 api_router.include_router(lead_endpoints.router)
 api_router.include_router(marketing_endpoints.router)
+api_router.include_router(search_endpoints.router)
+api_router.include_router(saved_search_endpoints.router)
+api_router.include_router(ingestion_endpoints.router)
+api_router.include_router(import_endpoints.router)
+api_router.include_router(task_endpoints.router)
 
 # Function to configure the FastAPI app with all routes
 def configure_api_routes(app: FastAPI) -> None:
@@ -16,7 +16,8 @@ from src.auth.authentication import (
     refresh_access_token,
     revoke_token,
     revoke_all_user_tokens,
-    get_current_active_user
+    get_current_active_user,
+    get_current_db_user
 )
 from src.auth.password_security import password_validator
 from src.auth.audit_logging import audit_logger
@@ -224,7 +225,7 @@ async def change_password(
     current_password: str,
     new_password: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_db_user)
 ) -> None:
     """
     Change a user's password.
@@ -282,7 +283,9 @@ async def change_password(
     hashed_password = password_validator.hash_password(new_password)
     
     # Update user
-    user_repository.update(db, db_obj=current_user, obj_in={"hashed_password": hashed_password})
+    user_repository.update(
+        db, db_obj=current_user, obj_in={"hashed_password": hashed_password}, actor_id=current_user.id
+    )
     
     # Revoke all tokens for the user
     revoke_all_user_tokens(db, current_user.id)
@@ -405,7 +408,7 @@ async def reset_password(
     hashed_password = password_validator.hash_password(new_password)
     
     # Update user
-    user_repository.update(db, db_obj=user, obj_in={"hashed_password": hashed_password})
+    user_repository.update(db, db_obj=user, obj_in={"hashed_password": hashed_password}, actor_id=user.id)
     
     # Revoke all tokens for the user
     revoke_all_user_tokens(db, user.id)
@@ -429,7 +432,7 @@ async def reset_password(
 
 @router.get("/me", response_model=Dict[str, Any])
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_db_user)
 ) -> Dict[str, Any]:
     """
     Get information about the current user.
@@ -10,10 +10,15 @@ from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 
 from src.auth.authentication import get_current_active_user
+from src.auth.rbac import get_access_scope
+from src.auth.scoping import AccessScope
 from src.models.user import User
 from src.models.contact import Contact, Company, Tag
-from src.repositories.contact_repository import contact_repository, company_repository, tag_repository
+from src.repositories.contact_repository import (
+    contact_repository, company_repository, tag_repository, contact_duplicate_repository
+)
 from src.utils.database_utils import get_db
+from src.utils.search_utils import search_result
 
 # Create router
 router = APIRouter(
@@ -27,18 +32,23 @@ router = APIRouter(
 async def create_contact(
     contact_data: Dict[str, Any],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Create a new contact.
     
+    The new contact is checked against existing contacts; likely
+    duplicates are recorded for review and listed in the response.
+    
     Args:
         contact_data: Contact data
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
-        Dict[str, Any]: Created contact
+        Dict[str, Any]: Created contact with its possible duplicates
         
     Raises:
         HTTPException: If validation fails
@@ -49,7 +59,15 @@ async def create_contact(
     # Create contact
     contact = contact_repository.create(db, contact_data)
     
-    return contact.to_dict()
+    # Check for duplicates
+    duplicates = contact_duplicate_repository.scoped(scope).check_contact(db, contact)
+    
+    result = contact.to_dict()
+    result["possible_duplicates"] = [
+        {"id": duplicate_id, "score": score, "reasons": reasons}
+        for duplicate_id, score, reasons in duplicates
+    ]
+    return result
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
@@ -58,7 +76,8 @@ async def read_contacts(
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> List[Dict[str, Any]]:
     """
     Get all contacts with pagination and optional search.
@@ -66,26 +85,114 @@ async def read_contacts(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
-        search: Optional search term
+        search: Optional full-text search term (hits are ranked and include a snippet)
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         List[Dict[str, Any]]: List of contacts
     """
     if search:
-        contacts = contact_repository.search(db, search, skip=skip, limit=limit)
-    else:
-        contacts = contact_repository.get_multi(db, skip=skip, limit=limit)
+        results = contact_repository.scoped(scope).full_text_search(db, search, skip=skip, limit=limit)
+        return [search_result(contact, rank, snippet) for contact, rank, snippet in results]
+    
+    contacts = contact_repository.scoped(scope).get_multi(db, skip=skip, limit=limit)
     
     return [contact.to_dict() for contact in contacts]
 
 
+@router.get("/autocomplete", response_model=List[Dict[str, Any]])
+async def autocomplete_contacts(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> List[Dict[str, Any]]:
+    """
+    Suggest contacts by name, email or company while typing.
+    
+    Args:
+        q: Typed text
+        limit: Maximum number of suggestions
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        List[Dict[str, Any]]: Suggestions ranked by similarity
+    """
+    return contact_repository.scoped(scope).autocomplete(db, q, limit=limit)
+
+
+@router.get("/duplicates", response_model=List[Dict[str, Any]])
+async def read_duplicate_contacts(
+    min_score: float = Query(0.0, ge=0, le=1),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> List[Dict[str, Any]]:
+    """
+    Get pairs of possibly duplicate contacts awaiting review.
+    
+    Args:
+        min_score: Minimum match score
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        List[Dict[str, Any]]: Pending pairs, best match first
+    """
+    pairs = contact_duplicate_repository.scoped(scope).get_pending(db, min_score=min_score, skip=skip, limit=limit)
+    
+    return [pair.to_dict() for pair in pairs]
+
+
+@router.post("/duplicates/{pair_id}/dismiss", response_model=Dict[str, Any])
+async def dismiss_duplicate_contacts(
+    pair_id: int = Path(..., gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Mark a pair of contacts as not being duplicates.
+    
+    Args:
+        pair_id: Duplicate pair ID
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        Dict[str, Any]: Dismissed pair
+        
+    Raises:
+        HTTPException: If the pair is not found
+    """
+    try:
+        pair = contact_duplicate_repository.scoped(scope).dismiss(db, pair_id, actor_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    return pair.to_dict()
+
+
 @router.get("/{contact_id}", response_model=Dict[str, Any])
 async def read_contact(
     contact_id: int = Path(..., gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Get a specific contact by ID.
@@ -94,6 +201,7 @@ async def read_contact(
         contact_id: Contact ID
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Contact data
@@ -101,7 +209,7 @@ async def read_contact(
     Raises:
         HTTPException: If contact not found
     """
-    contact = contact_repository.get(db, contact_id)
+    contact = contact_repository.scoped(scope).get(db, contact_id)
     
     if contact is None:
         raise HTTPException(
@@ -117,7 +225,8 @@ async def update_contact(
     contact_id: int = Path(..., gt=0),
     contact_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Update a contact.
@@ -127,6 +236,7 @@ async def update_contact(
         contact_data: Contact data to update
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Updated contact
@@ -134,7 +244,7 @@ async def update_contact(
     Raises:
         HTTPException: If contact not found
     """
-    contact = contact_repository.get(db, contact_id)
+    contact = contact_repository.scoped(scope).get(db, contact_id)
     
     if contact is None:
         raise HTTPException(
@@ -155,7 +265,8 @@ async def update_contact(
 async def delete_contact(
     contact_id: int = Path(..., gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Delete a contact.
@@ -164,6 +275,7 @@ async def delete_contact(
         contact_id: Contact ID
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Deleted contact
@@ -171,7 +283,7 @@ async def delete_contact(
     Raises:
         HTTPException: If contact not found
     """
-    contact = contact_repository.get(db, contact_id)
+    contact = contact_repository.scoped(scope).get(db, contact_id)
     
     if contact is None:
         raise HTTPException(
@@ -251,6 +363,50 @@ async def remove_tag_from_contact(
     return contact.to_dict()
 
 
+@router.post("/{contact_id}/merge", response_model=Dict[str, Any])
+async def merge_contacts(
+    contact_id: int = Path(..., gt=0),
+    merge_data: Dict[str, Any] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Merge duplicate contacts into a contact.
+    
+    Args:
+        contact_id: ID of the contact to keep
+        merge_data: Merge data with "duplicate_ids", the contacts merged into it
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        Dict[str, Any]: Merged contact and the number of rows moved per table
+        
+    Raises:
+        HTTPException: If no duplicates are given or a contact is not found
+    """
+    duplicate_ids = (merge_data or {}).get("duplicate_ids")
+    if not isinstance(duplicate_ids, list) or not duplicate_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="duplicate_ids must be a non-empty list of contact IDs"
+        )
+    
+    try:
+        contact, moved = contact_repository.scoped(scope).merge(
+            db, contact_id, duplicate_ids, actor_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    return {"contact": contact.to_dict(), "moved": moved}
+
+
 # Company endpoints
 @router.post("/companies/", response_model=Dict[str, Any], status_code=status.HTTP_201_CREATED)
 async def create_company(
@@ -295,7 +451,7 @@ async def read_companies(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
-        search: Optional search term
+        search: Optional full-text search term (hits are ranked and include a snippet)
         db: Database session
         current_user: Current authenticated user
         
@@ -303,13 +459,36 @@ async def read_companies(
         List[Dict[str, Any]]: List of companies
     """
     if search:
-        companies = company_repository.search(db, search, skip=skip, limit=limit)
-    else:
-        companies = company_repository.get_multi(db, skip=skip, limit=limit)
+        results = company_repository.full_text_search(db, search, skip=skip, limit=limit)
+        return [search_result(company, rank, snippet) for company, rank, snippet in results]
+    
+    companies = company_repository.get_multi(db, skip=skip, limit=limit)
     
     return [company.to_dict() for company in companies]
 
 
+@router.get("/companies/autocomplete", response_model=List[Dict[str, Any]])
+async def autocomplete_companies(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> List[Dict[str, Any]]:
+    """
+    Suggest companies by name while typing.
+    
+    Args:
+        q: Typed text
+        limit: Maximum number of suggestions
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        List[Dict[str, Any]]: Suggestions ranked by similarity
+    """
+    return company_repository.autocomplete(db, q, limit=limit)
+
+
 @router.get("/companies/{company_id}", response_model=Dict[str, Any])
 async def read_company(
     company_id: int = Path(..., gt=0),
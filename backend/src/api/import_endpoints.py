@@ -0,0 +1,227 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Import API endpoints for the Sales Automation System.
+This module provides endpoints for CSV imports of contacts and leads.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+import os
+import uuid
+
+from config.settings import IMPORT_MAX_UPLOAD_MB
+from src.auth.authentication import get_current_active_user
+from src.auth.permissions import ResourceType, ActionType
+from src.auth.rbac import rbac_handler, get_access_scope
+from src.auth.scoping import AccessScope
+from src.models.import_job import ImportJob
+from src.models.user import User
+from src.repositories.import_repository import import_job_repository, import_job_runner, IMPORT_ENTITY_TYPES
+from src.utils.database_utils import get_db
+
+# Create router
+router = APIRouter(
+    prefix="/imports",
+    tags=["imports"],
+    responses={401: {"description": "Unauthorized"}},
+)
+
+
+def _job_dict(job: ImportJob) -> Dict[str, Any]:
+    """
+    Convert an import job to a response dictionary.
+
+    Args:
+        job: Import job
+
+    Returns:
+        Dict[str, Any]: Import job with its progress and whether an error report exists
+    """
+    result = job.to_dict()
+    result["progress"] = round(job.progress, 4)
+    result["has_error_report"] = job.error_report_path is not None
+    return result
+
+
+def _get_own_job(db: Session, job_id: int, current_user: User) -> ImportJob:
+    """
+    Get an import job of the current user.
+
+    Args:
+        db: Database session
+        job_id: Import job ID
+        current_user: Current authenticated user
+
+    Returns:
+        ImportJob: Import job
+
+    Raises:
+        HTTPException: If the import job is not found or belongs to another user
+    """
+    job = import_job_repository.get(db, job_id)
+
+    if job is None or job.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+
+    return job
+
+
+@router.post("/", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
+async def create_import(
+    request: Request,
+    entity_type: str = Query(..., description="contact or lead"),
+    filename: str = Query("import.csv"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Upload a CSV file of contacts or leads and start importing it.
+
+    The request body is the raw CSV file (UTF-8, header row with column
+    names such as first_name, last_name, email, phone, company_name; lead
+    files also take title, description, source, source_details and
+    estimated_value). It is streamed to the shared import storage and
+    imported in the background; poll the job for progress.
+
+    Args:
+        request: Request with the CSV file as body
+        entity_type: Entity type (contact or lead)
+        filename: Name of the uploaded file
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+
+    Returns:
+        Dict[str, Any]: Created import job
+
+    Raises:
+        HTTPException: If imports aren't running, the entity type is invalid, permission is missing or the file is too large
+    """
+    # Without a runner in this worker the job would wait for another host's runner, or forever
+    if not import_job_runner.is_running:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Imports are not running"
+        )
+
+    if entity_type not in IMPORT_ENTITY_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"entity_type must be one of {', '.join(IMPORT_ENTITY_TYPES)}"
+        )
+
+    if not rbac_handler.has_permission(current_user, ResourceType(entity_type), ActionType.IMPORT):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    max_bytes = IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+    path = import_job_runner.upload_path(uuid.uuid4().hex)
+    total_bytes = 0
+    with open(path, "wb") as upload:
+        async for chunk in request.stream():
+            total_bytes += len(chunk)
+            if total_bytes > max_bytes:
+                break
+            upload.write(chunk)
+
+    if total_bytes > max_bytes or total_bytes == 0:
+        os.remove(path)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if total_bytes else status.HTTP_400_BAD_REQUEST,
+            detail=f"File is larger than {IMPORT_MAX_UPLOAD_MB} MB" if total_bytes else "File is empty"
+        )
+
+    job = import_job_repository.create_job(db, scope, entity_type, filename, str(path), total_bytes)
+    import_job_runner.enqueue(job.id)
+    db.refresh(job)
+
+    return _job_dict(job)
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+async def read_imports(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> List[Dict[str, Any]]:
+    """
+    Get the import jobs of the current user, newest first.
+
+    Args:
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        List[Dict[str, Any]]: Import jobs
+    """
+    return [_job_dict(job) for job in import_job_repository.get_by_user(db, current_user.id, skip=skip, limit=limit)]
+
+
+@router.get("/{job_id}", response_model=Dict[str, Any])
+async def read_import(
+    job_id: int = Path(..., gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Get an import job with its progress.
+
+    Args:
+        job_id: Import job ID
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Dict[str, Any]: Import job
+
+    Raises:
+        HTTPException: If the import job is not found
+    """
+    return _job_dict(_get_own_job(db, job_id, current_user))
+
+
+@router.get("/{job_id}/errors")
+async def read_import_errors(
+    job_id: int = Path(..., gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> FileResponse:
+    """
+    Download the rejected rows of an import job as CSV, with their line numbers and errors.
+
+    Args:
+        job_id: Import job ID
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        FileResponse: Error report
+
+    Raises:
+        HTTPException: If the import job is not found or has no rejected rows
+    """
+    job = _get_own_job(db, job_id, current_user)
+
+    if job.error_report_path is None or not os.path.exists(job.error_report_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job has no error report"
+        )
+
+    return FileResponse(
+        job.error_report_path,
+        media_type="text/csv",
+        filename=f"{os.path.splitext(job.filename)[0]}-errors.csv"
+    )
@@ -0,0 +1,126 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Lead ingestion API endpoints for the Sales Automation System.
+This module provides the endpoint web forms and ad platforms post inbound leads to.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Body
+from fastapi.responses import JSONResponse
+from typing import Dict, Any, Optional
+import hmac
+
+from config.settings import LEAD_INGEST_API_KEYS, LEAD_INGEST_MAX_REQUEST_LEADS, LEAD_INGEST_RETRY_SECONDS
+from src.auth.authentication import get_current_active_user
+from src.models.user import User
+from src.repositories.ingestion_repository import lead_ingestion_pipeline, validate_submission
+
+# Create router
+router = APIRouter(
+    prefix="/ingest",
+    tags=["ingestion"],
+    responses={401: {"description": "Unauthorized"}},
+)
+
+
+def verify_ingest_key(x_api_key: Optional[str] = Header(None)) -> None:
+    """
+    Verify the API key of a lead source.
+
+    Args:
+        x_api_key: Value of the X-API-Key header
+
+    Raises:
+        HTTPException: If the key is missing or unknown
+    """
+    if not x_api_key or not any(
+        hmac.compare_digest(x_api_key.encode(), key.encode()) for key in LEAD_INGEST_API_KEYS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+
+
+@router.post("/leads", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
+async def ingest_leads(
+    payload: Any = Body(...),
+    _: None = Depends(verify_ingest_key)
+) -> Any:
+    """
+    Accept one inbound lead or a batch of them for buffered writing.
+
+    Leads are validated and queued; they are written within moments in
+    batches, so the response only acknowledges receipt. Each lead may
+    carry an idempotency_key, and resubmissions with a known key are
+    reported as duplicates instead of creating a second lead. While the
+    background writer isn't running (LEAD_INGEST_ENABLED is off or it
+    stopped), nothing would drain the queue, so requests are refused
+    with 503.
+
+    Args:
+        payload: A lead object or {"leads": [lead, ...]}
+
+    Returns:
+        Dict[str, Any]: Numbers of accepted and duplicate leads and the rejected leads with their errors
+
+    Raises:
+        HTTPException: If the writer isn't running, or the payload is malformed or has too many leads
+    """
+    if not lead_ingestion_pipeline.is_running:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Lead ingestion is not running",
+            headers={"Retry-After": str(LEAD_INGEST_RETRY_SECONDS)}
+        )
+
+    if isinstance(payload, dict) and "leads" in payload:
+        leads = payload["leads"]
+        if not isinstance(leads, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="leads must be a list"
+            )
+    else:
+        leads = [payload]
+
+    if len(leads) > LEAD_INGEST_MAX_REQUEST_LEADS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {LEAD_INGEST_MAX_REQUEST_LEADS} leads per request"
+        )
+
+    result = {"accepted": 0, "duplicates": 0, "rejected": []}
+    for index, data in enumerate(leads):
+        submission, errors = validate_submission(data)
+        if errors:
+            result["rejected"].append({"index": index, "errors": errors})
+            continue
+
+        outcome = lead_ingestion_pipeline.submit(submission)
+        if outcome == "full":
+            # Leads before this one are queued; the client resends from here
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(LEAD_INGEST_RETRY_SECONDS)},
+                content={**result, "detail": "Ingestion queue is full", "retry_from_index": index}
+            )
+        result["accepted" if outcome == "accepted" else "duplicates"] += 1
+
+    return result
+
+
+@router.get("/metrics", response_model=Dict[str, Any])
+async def read_ingestion_metrics(
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Get lead ingestion metrics (queue depth, throughput and write lag).
+
+    Args:
+        current_user: Current authenticated user
+
+    Returns:
+        Dict[str, Any]: Ingestion metrics
+    """
+    return lead_ingestion_pipeline.get_metrics()
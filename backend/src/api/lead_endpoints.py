@@ -7,13 +7,24 @@ This module provides API endpoints for lead management.
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
+import math
+
+from config.settings import ANALYTICS_MAX_RANGE_DAYS
 
 from src.auth.authentication import get_current_active_user
+from src.auth.permissions import ResourceType, ActionType
+from src.auth.rbac import get_access_scope, rbac_handler
+from src.auth.scoping import AccessScope
 from src.models.user import User
 from src.models.lead import Lead, LeadActivity, Opportunity, OpportunityActivity
 from src.repositories.lead_repository import lead_repository, opportunity_repository
+from src.repositories.assignment_repository import lead_assignment_engine, lead_assignment_profile_repository
+from src.repositories.saved_search_repository import compile_filters
+from src.repositories.transition_repository import status_analytics_repository, TRANSITION_ENTITIES
 from src.utils.database_utils import get_db
+from src.utils.search_utils import search_result
 
 # Create router
 router = APIRouter(
@@ -32,6 +43,9 @@ async def create_lead(
     """
     Create a new lead.
     
+    With "auto_assign": true and no owner_id, the lead is routed to a rep
+    by the assignment engine (optionally for a given "territory").
+    
     Args:
         lead_data: Lead data
         db: Database session
@@ -46,13 +60,19 @@ async def create_lead(
     # Set created_by
     lead_data["created_by"] = current_user.id
     
-    # Set owner_id if not provided
-    if "owner_id" not in lead_data:
+    # Route the lead to a rep on request, otherwise default owner_id to the creator
+    auto_assign = lead_data.pop("auto_assign", False)
+    territory = lead_data.pop("territory", None)
+    if "owner_id" not in lead_data and not auto_assign:
         lead_data["owner_id"] = current_user.id
     
     # Create lead
     lead = lead_repository.create(db, lead_data)
     
+    if auto_assign and lead.owner_id is None:
+        lead_assignment_engine.assign(db, [lead.id], territory=territory)
+        db.refresh(lead)
+    
     # Create initial activity
     activity_data = {
         "lead_id": lead.id,
@@ -73,7 +93,8 @@ async def read_leads(
     owner_id: Optional[int] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> List[Dict[str, Any]]:
     """
     Get all leads with pagination and optional filtering.
@@ -83,31 +104,338 @@ async def read_leads(
         limit: Maximum number of records to return
         status: Optional status filter
         owner_id: Optional owner ID filter
-        search: Optional search term
+        search: Optional full-text search term (hits are ranked and include a snippet)
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         List[Dict[str, Any]]: List of leads
     """
     # Apply filters
     if status:
-        leads = lead_repository.get_by_status(db, status, skip=skip, limit=limit)
+        leads = lead_repository.scoped(scope).get_by_status(db, status, skip=skip, limit=limit)
     elif owner_id:
-        leads = lead_repository.get_by_owner(db, owner_id, skip=skip, limit=limit)
+        leads = lead_repository.scoped(scope).get_by_owner(db, owner_id, skip=skip, limit=limit)
     elif search:
-        leads = lead_repository.search(db, search, skip=skip, limit=limit)
+        results = lead_repository.scoped(scope).full_text_search(db, search, skip=skip, limit=limit)
+        return [search_result(lead, rank, snippet) for lead, rank, snippet in results]
     else:
-        leads = lead_repository.get_multi(db, skip=skip, limit=limit)
+        leads = lead_repository.scoped(scope).get_multi(db, skip=skip, limit=limit)
     
     return [lead.to_dict() for lead in leads]
 
 
+def _check_assign_permission(current_user: User) -> None:
+    """
+    Check that the current user may assign leads.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Raises:
+        HTTPException: If the user lacks the lead assign permission
+    """
+    if not rbac_handler.has_permission(current_user, ResourceType.LEAD, ActionType.ASSIGN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+
+@router.post("/assign", response_model=Dict[str, Any])
+async def assign_leads(
+    assignment_data: Dict[str, Any],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Route open leads to reps by territory, capacity and round-robin in one transaction.
+    
+    Args:
+        assignment_data: Assignment data with lead_ids and an optional territory
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Dict[str, Any]: Assigned owner ID by lead ID (null when no rep had capacity)
+        
+    Raises:
+        HTTPException: If the user lacks permission or no lead IDs are given
+    """
+    _check_assign_permission(current_user)
+    
+    lead_ids = assignment_data.get("lead_ids")
+    if not lead_ids or not isinstance(lead_ids, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lead_ids must be a non-empty list"
+        )
+    
+    assignments = lead_assignment_engine.assign(db, lead_ids, territory=assignment_data.get("territory"))
+    
+    return {
+        "assigned": sum(1 for owner_id in assignments.values() if owner_id is not None),
+        "unassigned": sum(1 for owner_id in assignments.values() if owner_id is None),
+        "assignments": {str(lead_id): owner_id for lead_id, owner_id in assignments.items()}
+    }
+
+
+@router.post("/convert", response_model=Dict[str, Any])
+async def convert_leads_to_opportunities(
+    conversion_data: Dict[str, Any],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Convert many leads to opportunities in one transaction.
+    
+    Leads are selected by lead_ids and/or by filters in the saved search
+    format (e.g. [{"field": "status", "op": "eq", "value": "qualified"}]);
+    already converted leads are skipped. Optional opportunity values
+    (stage, probability, close_date, amount, owner_id) apply to every new
+    opportunity.
+    
+    Args:
+        conversion_data: Conversion data with lead_ids, filters and opportunity
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        Dict[str, Any]: Number of converted leads and the new opportunity ID by lead ID
+        
+    Raises:
+        HTTPException: If the user lacks permission or the selection is invalid
+    """
+    if not rbac_handler.has_permission(current_user, ResourceType.LEAD, ActionType.CONVERT):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    lead_ids = conversion_data.get("lead_ids")
+    if lead_ids is not None and not isinstance(lead_ids, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lead_ids must be a list"
+        )
+    
+    try:
+        condition = None
+        if conversion_data.get("filters"):
+            condition, _ = compile_filters("lead", conversion_data["filters"], current_user.id)
+        
+        conversions = lead_repository.scoped(scope).convert_many(
+            db,
+            conversion_data.get("opportunity") or {},
+            actor_id=current_user.id,
+            lead_ids=lead_ids,
+            condition=condition
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        "converted": len(conversions),
+        "opportunities": {str(lead_id): opportunity_id for lead_id, opportunity_id in conversions.items()}
+    }
+
+
+@router.get("/assignment/reps", response_model=List[Dict[str, Any]])
+async def read_assignment_loads(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> List[Dict[str, Any]]:
+    """
+    Get the current open-lead loads of the reps accepting leads.
+    
+    Args:
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        List[Dict[str, Any]]: Rep loads
+        
+    Raises:
+        HTTPException: If the user lacks permission
+    """
+    _check_assign_permission(current_user)
+    lead_assignment_engine.rebuild(db)
+    
+    return lead_assignment_engine.get_loads()
+
+
+def _coerce_number(
+    data: Dict[str, Any], field: str, convert: Callable[[Any], Any], is_valid: Callable[[Any], bool], detail: str
+) -> None:
+    """
+    Convert a numeric field of a request body in place.
+    
+    Args:
+        data: Request body
+        field: Field name (skipped if missing or null)
+        convert: Conversion to the field's type
+        is_valid: Check of the converted value
+        detail: Error message for invalid values
+        
+    Raises:
+        HTTPException: If the value can't be converted or is invalid
+    """
+    if data.get(field) is None:
+        return
+    
+    try:
+        value = convert(data[field])
+    except (TypeError, ValueError, OverflowError):
+        value = None
+    if value is None or not is_valid(value):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail
+        )
+    data[field] = value
+
+
+@router.put("/assignment/reps/{user_id}", response_model=Dict[str, Any])
+async def update_assignment_profile(
+    profile_data: Dict[str, Any],
+    user_id: int = Path(..., gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Set the territory, capacity, weight and availability of a rep.
+    
+    Args:
+        profile_data: Profile fields
+        user_id: User ID of the rep
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Dict[str, Any]: Saved assignment profile
+        
+    Raises:
+        HTTPException: If the user lacks permission or the values are invalid
+    """
+    _check_assign_permission(current_user)
+    
+    _coerce_number(profile_data, "capacity", int, lambda capacity: capacity >= 0, "capacity must be a non-negative integer")
+    _coerce_number(
+        profile_data, "weight", float, lambda weight: math.isfinite(weight) and weight > 0, "weight must be a positive number"
+    )
+    
+    profile_data["updated_by"] = current_user.id
+    profile = lead_assignment_profile_repository.upsert(db, user_id, profile_data)
+    
+    return profile.to_dict()
+
+
+@router.get("/assignment/metrics", response_model=Dict[str, Any])
+async def read_assignment_metrics(
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Get lead assignment counters, latency and fairness metrics.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Dict[str, Any]: Assignment metrics
+        
+    Raises:
+        HTTPException: If the user lacks permission
+    """
+    _check_assign_permission(current_user)
+    
+    return lead_assignment_engine.get_metrics()
+
+
+def _check_report_permission(current_user: User) -> None:
+    """
+    Check that the current user may read reports.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Raises:
+        HTTPException: If the user lacks the report read permission
+    """
+    if not rbac_handler.has_permission(current_user, ResourceType.REPORT, ActionType.READ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+
+@router.get("/analytics/status", response_model=Dict[str, Any])
+async def read_status_analytics(
+    entity_type: str = Query("lead", description="lead or opportunity"),
+    start: Optional[date] = Query(None, description="First day of the range (defaults to 90 days ago)"),
+    end: Optional[date] = Query(None, description="Last day of the range (defaults to today)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Get status history analytics of leads or opportunities for a date range.
+    
+    Returns the time spent in each status by the stints entered in the
+    range, the conversion of the records created in the range (to
+    converted leads or won opportunities) and how long the records
+    converted in the range took to convert.
+    
+    Args:
+        entity_type: Entity type (lead or opportunity)
+        start: First day of the range
+        end: Last day of the range
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        Dict[str, Any]: Time-in-stage, conversion and velocity analytics
+        
+    Raises:
+        HTTPException: If the parameters are invalid or the user lacks permission
+    """
+    _check_report_permission(current_user)
+    
+    if entity_type not in TRANSITION_ENTITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"entity_type must be one of {', '.join(TRANSITION_ENTITIES)}"
+        )
+    
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end or (end - start).days >= ANALYTICS_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The range must start before it ends and span at most {ANALYTICS_MAX_RANGE_DAYS} days"
+        )
+    
+    return status_analytics_repository.get_analytics(
+        db,
+        entity_type,
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        scope
+    )
+
+
 @router.get("/{lead_id}", response_model=Dict[str, Any])
 async def read_lead(
     lead_id: int = Path(..., gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Get a specific lead by ID.
@@ -116,6 +444,7 @@ async def read_lead(
         lead_id: Lead ID
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Lead data
@@ -123,7 +452,7 @@ async def read_lead(
     Raises:
         HTTPException: If lead not found
     """
-    lead = lead_repository.get(db, lead_id)
+    lead = lead_repository.scoped(scope).get(db, lead_id)
     
     if lead is None:
         raise HTTPException(
@@ -139,7 +468,8 @@ async def update_lead(
     lead_id: int = Path(..., gt=0),
     lead_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Update a lead.
@@ -149,6 +479,7 @@ async def update_lead(
         lead_data: Lead data to update
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Updated lead
@@ -156,7 +487,7 @@ async def update_lead(
     Raises:
         HTTPException: If lead not found
     """
-    lead = lead_repository.get(db, lead_id)
+    lead = lead_repository.scoped(scope).get(db, lead_id)
     
     if lead is None:
         raise HTTPException(
@@ -191,7 +522,8 @@ async def update_lead(
 async def delete_lead(
     lead_id: int = Path(..., gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Delete a lead.
@@ -200,6 +532,7 @@ async def delete_lead(
         lead_id: Lead ID
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Deleted lead
@@ -207,7 +540,7 @@ async def delete_lead(
     Raises:
         HTTPException: If lead not found
     """
-    lead = lead_repository.get(db, lead_id)
+    lead = lead_repository.scoped(scope).get(db, lead_id)
     
     if lead is None:
         raise HTTPException(
@@ -226,7 +559,8 @@ async def create_lead_activity(
     lead_id: int = Path(..., gt=0),
     activity_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Create a new activity for a lead.
@@ -236,6 +570,7 @@ async def create_lead_activity(
         activity_data: Activity data
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Created activity
@@ -243,7 +578,7 @@ async def create_lead_activity(
     Raises:
         HTTPException: If lead not found
     """
-    lead = lead_repository.get(db, lead_id)
+    lead = lead_repository.scoped(scope).get(db, lead_id)
     
     if lead is None:
         raise HTTPException(
@@ -267,7 +602,8 @@ async def read_lead_activities(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> List[Dict[str, Any]]:
     """
     Get all activities for a lead with pagination.
@@ -278,6 +614,7 @@ async def read_lead_activities(
         limit: Maximum number of records to return
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         List[Dict[str, Any]]: List of activities
@@ -285,7 +622,7 @@ async def read_lead_activities(
     Raises:
         HTTPException: If lead not found
     """
-    lead = lead_repository.get(db, lead_id)
+    lead = lead_repository.scoped(scope).get(db, lead_id)
     
     if lead is None:
         raise HTTPException(
@@ -303,7 +640,8 @@ async def convert_lead_to_opportunity(
     lead_id: int = Path(..., gt=0),
     opportunity_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Convert a lead to an opportunity.
@@ -313,6 +651,7 @@ async def convert_lead_to_opportunity(
         opportunity_data: Opportunity data
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Created opportunity
@@ -320,7 +659,7 @@ async def convert_lead_to_opportunity(
     Raises:
         HTTPException: If lead not found or already converted
     """
-    lead = lead_repository.get(db, lead_id)
+    lead = lead_repository.scoped(scope).get(db, lead_id)
     
     if lead is None:
         raise HTTPException(
@@ -362,7 +701,8 @@ async def read_opportunities(
     owner_id: Optional[int] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> List[Dict[str, Any]]:
     """
     Get all opportunities with pagination and optional filtering.
@@ -370,33 +710,67 @@ async def read_opportunities(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
-        status: Optional status filter
+        status: Optional stage filter
         owner_id: Optional owner ID filter
-        search: Optional search term
+        search: Optional full-text search term (hits are ranked and include a snippet)
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         List[Dict[str, Any]]: List of opportunities
     """
     # Apply filters
     if status:
-        opportunities = opportunity_repository.get_by_status(db, status, skip=skip, limit=limit)
+        opportunities = opportunity_repository.scoped(scope).get_by_stage(db, status, skip=skip, limit=limit)
     elif owner_id:
-        opportunities = opportunity_repository.get_by_owner(db, owner_id, skip=skip, limit=limit)
+        opportunities = opportunity_repository.scoped(scope).get_by_owner(db, owner_id, skip=skip, limit=limit)
     elif search:
-        opportunities = opportunity_repository.search(db, search, skip=skip, limit=limit)
+        results = opportunity_repository.scoped(scope).full_text_search(db, search, skip=skip, limit=limit)
+        return [search_result(opportunity, rank, snippet) for opportunity, rank, snippet in results]
     else:
-        opportunities = opportunity_repository.get_multi(db, skip=skip, limit=limit)
+        opportunities = opportunity_repository.scoped(scope).get_multi(db, skip=skip, limit=limit)
     
     return [opportunity.to_dict() for opportunity in opportunities]
 
 
+@router.get("/opportunities/summary", response_model=Dict[str, Any])
+async def read_pipeline_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Get the opportunity pipeline summed by stage, owner and close month.
+    
+    The summary is cached per worker process. A worker drops its cached
+    summaries once it commits an opportunity write itself, but writes
+    committed by other workers only show up when the cached summary
+    expires, so it can be up to ANALYTICS_CACHE_TTL_SECONDS stale.
+    
+    Args:
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        Dict[str, Any]: Totals and per-group counts, amounts, expected revenue
+        and probability-weighted amounts
+        
+    Raises:
+        HTTPException: If the user lacks permission
+    """
+    _check_report_permission(current_user)
+    
+    return opportunity_repository.scoped(scope).get_pipeline_summary(db)
+
+
 @router.get("/opportunities/{opportunity_id}", response_model=Dict[str, Any])
 async def read_opportunity(
     opportunity_id: int = Path(..., gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Get a specific opportunity by ID.
@@ -405,6 +779,7 @@ async def read_opportunity(
         opportunity_id: Opportunity ID
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Opportunity data
@@ -412,7 +787,7 @@ async def read_opportunity(
     Raises:
         HTTPException: If opportunity not found
     """
-    opportunity = opportunity_repository.get(db, opportunity_id)
+    opportunity = opportunity_repository.scoped(scope).get(db, opportunity_id)
     
     if opportunity is None:
         raise HTTPException(
@@ -428,7 +803,8 @@ async def update_opportunity(
     opportunity_id: int = Path(..., gt=0),
     opportunity_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Update an opportunity.
@@ -438,6 +814,7 @@ async def update_opportunity(
         opportunity_data: Opportunity data to update
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Updated opportunity
@@ -445,7 +822,7 @@ async def update_opportunity(
     Raises:
         HTTPException: If opportunity not found
     """
-    opportunity = opportunity_repository.get(db, opportunity_id)
+    opportunity = opportunity_repository.scoped(scope).get(db, opportunity_id)
     
     if opportunity is None:
         raise HTTPException(
@@ -456,19 +833,18 @@ async def update_opportunity(
     # Set updated_by
     opportunity_data["updated_by"] = current_user.id
     
-    # Check if status is changing
-    old_status = opportunity.status
-    new_status = opportunity_data.get("status", old_status)
+    # Opportunities track their status as the stage
+    old_stage = opportunity.stage
     
     # Update opportunity
     updated_opportunity = opportunity_repository.update(db, db_obj=opportunity, obj_in=opportunity_data)
     
-    # Create activity for status change
-    if old_status != new_status:
+    # Create activity for stage change
+    if updated_opportunity.stage != old_stage:
         activity_data = {
             "opportunity_id": opportunity.id,
             "activity_type": "status_change",
-            "description": f"Status changed from {old_status} to {new_status}",
+            "description": f"Stage changed from {old_stage.value} to {updated_opportunity.stage.value}",
             "created_by": current_user.id
         }
         opportunity_repository.add_activity(db, activity_data)
@@ -481,7 +857,8 @@ async def create_opportunity_activity(
     opportunity_id: int = Path(..., gt=0),
     activity_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Create a new activity for an opportunity.
@@ -491,6 +868,7 @@ async def create_opportunity_activity(
         activity_data: Activity data
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Created activity
@@ -498,7 +876,7 @@ async def create_opportunity_activity(
     Raises:
         HTTPException: If opportunity not found
     """
-    opportunity = opportunity_repository.get(db, opportunity_id)
+    opportunity = opportunity_repository.scoped(scope).get(db, opportunity_id)
     
     if opportunity is None:
         raise HTTPException(
@@ -522,7 +900,8 @@ async def read_opportunity_activities(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> List[Dict[str, Any]]:
     """
     Get all activities for an opportunity with pagination.
@@ -533,6 +912,7 @@ async def read_opportunity_activities(
         limit: Maximum number of records to return
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         List[Dict[str, Any]]: List of activities
@@ -540,7 +920,7 @@ async def read_opportunity_activities(
     Raises:
         HTTPException: If opportunity not found
     """
-    opportunity = opportunity_repository.get(db, opportunity_id)
+    opportunity = opportunity_repository.scoped(scope).get(db, opportunity_id)
     
     if opportunity is None:
         raise HTTPException(
@@ -10,10 +10,13 @@ from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 
 from src.auth.authentication import get_current_active_user
+from src.auth.rbac import get_access_scope
+from src.auth.scoping import AccessScope
 from src.models.user import User
 from src.models.marketing import MarketingCampaign, CampaignActivity, CampaignMetric, CampaignStatus, CampaignType, MetricType
 from src.repositories.marketing_repository import MarketingCampaignRepository, CampaignActivityRepository, CampaignMetricRepository
 from src.utils.database_utils import get_db
+from src.utils.search_utils import search_result
 
 # Create repositories
 campaign_repository = MarketingCampaignRepository()
@@ -70,7 +73,8 @@ async def read_campaigns(
     owner_id: Optional[int] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> List[Dict[str, Any]]:
     """
     Get all marketing campaigns with pagination and optional filtering.
@@ -81,9 +85,10 @@ async def read_campaigns(
         status: Optional status filter
         campaign_type: Optional campaign type filter
         owner_id: Optional owner ID filter
-        search: Optional search term
+        search: Optional full-text search term (hits are ranked and include a snippet)
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         List[Dict[str, Any]]: List of campaigns
@@ -92,7 +97,7 @@ async def read_campaigns(
     if status:
         try:
             status_enum = CampaignStatus(status)
-            campaigns = campaign_repository.get_by_status(db, status_enum, skip=skip, limit=limit)
+            campaigns = campaign_repository.scoped(scope).get_by_status(db, status_enum, skip=skip, limit=limit)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -101,18 +106,19 @@ async def read_campaigns(
     elif campaign_type:
         try:
             type_enum = CampaignType(campaign_type)
-            campaigns = campaign_repository.get_by_type(db, type_enum, skip=skip, limit=limit)
+            campaigns = campaign_repository.scoped(scope).get_by_type(db, type_enum, skip=skip, limit=limit)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid campaign type: {campaign_type}"
             )
     elif owner_id:
-        campaigns = campaign_repository.get_by_owner(db, owner_id, skip=skip, limit=limit)
+        campaigns = campaign_repository.scoped(scope).get_by_owner(db, owner_id, skip=skip, limit=limit)
     elif search:
-        campaigns = campaign_repository.search(db, search, skip=skip, limit=limit)
+        results = campaign_repository.scoped(scope).full_text_search(db, search, skip=skip, limit=limit)
+        return [search_result(campaign, rank, snippet) for campaign, rank, snippet in results]
     else:
-        campaigns = campaign_repository.get_multi(db, skip=skip, limit=limit)
+        campaigns = campaign_repository.scoped(scope).get_multi(db, skip=skip, limit=limit)
     
     return [campaign.to_dict() for campaign in campaigns]
 
@@ -145,7 +151,8 @@ async def read_active_campaigns(
 async def read_campaign(
     campaign_id: int = Path(..., gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Get a specific marketing campaign by ID.
@@ -154,6 +161,7 @@ async def read_campaign(
         campaign_id: Campaign ID
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Campaign data
@@ -161,7 +169,7 @@ async def read_campaign(
     Raises:
         HTTPException: If campaign not found
     """
-    campaign = campaign_repository.get(db, campaign_id)
+    campaign = campaign_repository.scoped(scope).get(db, campaign_id)
     
     if campaign is None:
         raise HTTPException(
@@ -177,7 +185,8 @@ async def update_campaign(
     campaign_id: int = Path(..., gt=0),
     campaign_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Update a marketing campaign.
@@ -187,6 +196,7 @@ async def update_campaign(
         campaign_data: Campaign data to update
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Updated campaign
@@ -194,7 +204,7 @@ async def update_campaign(
     Raises:
         HTTPException: If campaign not found
     """
-    campaign = campaign_repository.get(db, campaign_id)
+    campaign = campaign_repository.scoped(scope).get(db, campaign_id)
     
     if campaign is None:
         raise HTTPException(
@@ -215,7 +225,8 @@ async def update_campaign(
 async def delete_campaign(
     campaign_id: int = Path(..., gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
 ) -> Dict[str, Any]:
     """
     Delete a marketing campaign.
@@ -224,6 +235,7 @@ async def delete_campaign(
         campaign_id: Campaign ID
         db: Database session
         current_user: Current authenticated user
+        scope: Access scope of the current user
         
     Returns:
         Dict[str, Any]: Deleted campaign
@@ -231,7 +243,7 @@ async def delete_campaign(
     Raises:
         HTTPException: If campaign not found
     """
-    campaign = campaign_repository.get(db, campaign_id)
+    campaign = campaign_repository.scoped(scope).get(db, campaign_id)
     
     if campaign is None:
         raise HTTPException(
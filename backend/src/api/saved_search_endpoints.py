@@ -0,0 +1,199 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Saved search API endpoints for the Sales Automation System.
+This module provides endpoints for saved searches (smart lists).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+
+from src.auth.authentication import get_current_active_user
+from src.auth.rbac import get_access_scope
+from src.auth.scoping import AccessScope
+from src.models.user import User
+from src.models.saved_search import SavedSearch
+from src.repositories.saved_search_repository import saved_search_repository
+from src.utils.database_utils import get_db
+
+# Create router
+router = APIRouter(
+    prefix="/saved-searches",
+    tags=["saved searches"],
+    responses={401: {"description": "Unauthorized"}},
+)
+
+
+def _get_own_search(db: Session, search_id: int, current_user: User) -> SavedSearch:
+    """
+    Get a saved search of the current user.
+
+    Args:
+        db: Database session
+        search_id: Saved search ID
+        current_user: Current authenticated user
+
+    Returns:
+        SavedSearch: Saved search
+
+    Raises:
+        HTTPException: If the saved search is not found or belongs to another user
+    """
+    search = saved_search_repository.get(db, search_id)
+
+    if search is None or search.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Saved search not found"
+        )
+
+    return search
+
+
+@router.post("/", response_model=Dict[str, Any], status_code=status.HTTP_201_CREATED)
+async def create_saved_search(
+    search_data: Dict[str, Any],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Create a saved search and materialize its results.
+
+    Filters are a list of {"field", "op", "value"} conditions that must
+    all match, e.g. [{"field": "status", "op": "eq", "value": "qualified"},
+    {"field": "owner_id", "op": "eq", "value": "$me"},
+    {"field": "last_activity_date", "op": "older_than_days", "value": 14}].
+
+    Args:
+        search_data: Saved search data with name, entity_type (lead or contact) and filters
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+
+    Returns:
+        Dict[str, Any]: Created saved search
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    try:
+        search = saved_search_repository.create_search(
+            db,
+            scope,
+            name=search_data.get("name") or "Untitled",
+            entity_type=search_data.get("entity_type", "lead"),
+            filters=search_data.get("filters", [])
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return search.to_dict()
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+async def read_saved_searches(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> List[Dict[str, Any]]:
+    """
+    Get the saved searches of the current user with their result counts.
+
+    Args:
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        List[Dict[str, Any]]: Saved searches
+    """
+    return [search.to_dict() for search in saved_search_repository.get_by_owner(db, current_user.id)]
+
+
+@router.get("/{search_id}/results", response_model=Dict[str, Any])
+async def read_saved_search_results(
+    search_id: int = Path(..., gt=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Get a page of the materialized results of a saved search.
+
+    Args:
+        search_id: Saved search ID
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Dict[str, Any]: Result count, refresh time and the page of results
+
+    Raises:
+        HTTPException: If the saved search is not found
+    """
+    search = _get_own_search(db, search_id, current_user)
+    results = saved_search_repository.get_results(db, search, skip=skip, limit=limit)
+
+    return {
+        "count": search.result_count,
+        "refreshed_at": search.refreshed_at.isoformat() if search.refreshed_at else None,
+        "results": [result.to_dict() for result in results]
+    }
+
+
+@router.post("/{search_id}/refresh", response_model=Dict[str, Any])
+async def refresh_saved_search(
+    search_id: int = Path(..., gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Re-run a saved search completely, e.g. after the user's team changed.
+
+    Args:
+        search_id: Saved search ID
+        db: Database session
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+
+    Returns:
+        Dict[str, Any]: Refreshed saved search
+
+    Raises:
+        HTTPException: If the saved search is not found
+    """
+    search = _get_own_search(db, search_id, current_user)
+
+    return saved_search_repository.materialize(db, search, scope).to_dict()
+
+
+@router.delete("/{search_id}", response_model=Dict[str, Any])
+async def delete_saved_search(
+    search_id: int = Path(..., gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Delete a saved search.
+
+    Args:
+        search_id: Saved search ID
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Dict[str, Any]: Deleted saved search
+
+    Raises:
+        HTTPException: If the saved search is not found
+    """
+    _get_own_search(db, search_id, current_user)
+
+    return saved_search_repository.delete(db, id=search_id).to_dict()
@@ -0,0 +1,61 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Search API endpoints for the Sales Automation System.
+This module provides the global search endpoint.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
+
+from src.auth.authentication import get_current_active_user
+from src.auth.rbac import get_access_scope
+from src.auth.scoping import AccessScope
+from src.models.user import User
+from src.repositories.search_repository import global_search_repository
+
+# Create router
+router = APIRouter(
+    prefix="/search",
+    tags=["search"],
+    responses={401: {"description": "Unauthorized"}},
+)
+
+
+@router.get("", response_model=Dict[str, Any])
+async def global_search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    types: Optional[str] = Query(None, description="Comma separated entity types, e.g. contact,lead"),
+    current_user: User = Depends(get_current_active_user),
+    scope: AccessScope = Depends(get_access_scope)
+) -> Dict[str, Any]:
+    """
+    Search contacts, companies, leads, opportunities and campaigns at once.
+    
+    Args:
+        q: Search text
+        limit: Maximum number of hits, blended and per type
+        types: Entity types to search (defaults to all)
+        current_user: Current authenticated user
+        scope: Access scope of the current user
+        
+    Returns:
+        Dict[str, Any]: Blended results, results grouped by type, and the
+        types that timed out or failed
+        
+    Raises:
+        HTTPException: If an unknown type is requested
+    """
+    type_names = [name.strip() for name in types.split(",") if name.strip()] if types else None
+    
+    try:
+        return await run_in_threadpool(
+            global_search_repository.search, q, scope=scope, limit=limit, types=type_names
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
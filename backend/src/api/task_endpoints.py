@@ -0,0 +1,87 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Task API endpoints for the Sales Automation System.
+This module provides endpoints for follow-up tasks.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+
+from src.auth.authentication import get_current_active_user
+from src.models.user import User
+from src.repositories.sla_repository import follow_up_task_repository, TASK_STATUSES
+from src.utils.database_utils import get_db
+
+# Create router
+router = APIRouter(
+    prefix="/tasks",
+    tags=["tasks"],
+    responses={401: {"description": "Unauthorized"}},
+)
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+async def read_tasks(
+    task_status: str = Query("open", alias="status", description="open or done"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> List[Dict[str, Any]]:
+    """
+    Get the follow-up tasks assigned to the current user, most urgent first.
+
+    Args:
+        task_status: Task status (open or done)
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        List[Dict[str, Any]]: Follow-up tasks
+
+    Raises:
+        HTTPException: If the status is invalid
+    """
+    if task_status not in TASK_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"status must be one of {', '.join(TASK_STATUSES)}"
+        )
+
+    tasks = follow_up_task_repository.get_by_assignee(db, current_user.id, task_status, skip=skip, limit=limit)
+    return [task.to_dict() for task in tasks]
+
+
+@router.post("/{task_id}/complete", response_model=Dict[str, Any])
+async def complete_task(
+    task_id: int = Path(..., gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Mark a follow-up task of the current user as done.
+
+    Args:
+        task_id: Task ID
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Dict[str, Any]: Completed task
+
+    Raises:
+        HTTPException: If the task is not found or assigned to another user
+    """
+    task = follow_up_task_repository.get(db, task_id)
+
+    if task is None or task.assignee_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    return follow_up_task_repository.complete(db, task, current_user.id).to_dict()
@@ -0,0 +1,491 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Audit archive module for the Sales Automation System.
+This module provides cold storage of old audit logs in compressed segment files.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
+import logging
+import mmap
+import os
+import tempfile
+import zlib
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.settings import AUDIT_ARCHIVE_DIR, AUDIT_ARCHIVE_AFTER_DAYS, AUDIT_ARCHIVE_BLOCK_ROWS
+from src.utils.database_utils import advisory_lock
+from src.utils.partition_utils import is_partitioned, list_partitions, list_detached_partitions, detach_partition
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Number of archived rows deleted per statement in row mode
+DELETE_BATCH_SIZE = 1000
+
+
+def _encode(value: Any) -> Any:
+    """
+    Encode a column value for a segment.
+
+    Args:
+        value: Column value
+
+    Returns:
+        Any: JSON serializable value
+    """
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _bounds(values: Iterable[Any]) -> List[Any]:
+    """
+    Get the minimum and maximum of the non-null values.
+
+    Args:
+        values: Values
+
+    Returns:
+        List[Any]: [min, max], or [None, None] if all values are null
+    """
+    present = [value for value in values if value is not None]
+    return [min(present), max(present)] if present else [None, None]
+
+
+def _in_bounds(bounds: List[Any], value: Any) -> bool:
+    """
+    Check if a value may occur within min/max bounds.
+
+    Args:
+        bounds: [min, max] bounds
+        value: Value to look for
+
+    Returns:
+        bool: False only if the value is certainly not within the bounds
+    """
+    return bounds[0] is not None and bounds[0] <= value <= bounds[1]
+
+
+class AuditArchive:
+    """
+    Cold storage of audit logs in compressed, append-only segment files.
+
+    Each segment holds the rows of one archived partition (or one batch of
+    rows of an unpartitioned table), ordered by created_at and split into
+    independently zlib-compressed blocks of JSON lines. A sidecar index
+    records the time, user_id and resource_type ranges of the segment and
+    of each block with its byte offsets, so queries memory-map only the
+    segments that can match and decompress only the matching blocks.
+    Segments are never modified after they are written; the index is
+    written last and marks the segment as complete.
+
+    Archived rows are deleted from the database, so the archive directory
+    must be storage shared by every host (e.g. a network mount); without
+    a configured directory nothing is archived.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        archive_dir: str = AUDIT_ARCHIVE_DIR,
+        archive_after_days: int = AUDIT_ARCHIVE_AFTER_DAYS,
+        block_rows: int = AUDIT_ARCHIVE_BLOCK_ROWS
+    ):
+        """
+        Initialize the audit archive.
+
+        Args:
+            table_name: Audit log table name
+            archive_dir: Shared directory of the segment files (empty disables archiving)
+            archive_after_days: Age in days after which rows are archived
+            block_rows: Number of rows per compressed block
+        """
+        self.table_name = table_name
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.archive_after_days = archive_after_days
+        self.block_rows = block_rows
+        self._indexes: List[Dict[str, Any]] = []
+        self._index_names: frozenset = frozenset()
+
+    def _index_path(self, name: str) -> Path:
+        """Get the path of a segment index."""
+        return self.archive_dir / f"{name}.idx.json"
+
+    def _segment_path(self, name: str) -> Path:
+        """Get the path of a segment file."""
+        return self.archive_dir / f"{name}.seg"
+
+    def _block_entry(self, rows: List[Dict[str, Any]], offset: int, length: int) -> Dict[str, Any]:
+        """
+        Build the index entry of a block.
+
+        Args:
+            rows: Encoded rows of the block
+            offset: Byte offset of the block in the segment
+            length: Compressed length of the block
+
+        Returns:
+            Dict[str, Any]: Block index entry
+        """
+        return {
+            "offset": offset,
+            "length": length,
+            "rows": len(rows),
+            "created_at": _bounds(row["created_at"] for row in rows),
+            "user_id": _bounds(row.get("user_id") for row in rows),
+            "resource_type": _bounds(row.get("resource_type") for row in rows)
+        }
+
+    def _fsync_dir(self) -> None:
+        """Flush the archive directory entries, so renamed files survive a crash."""
+        descriptor = os.open(self.archive_dir, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def write_segment(self, name: str, rows: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Write rows into a new segment.
+
+        Args:
+            name: Segment name
+            rows: Rows ordered by created_at
+
+        Returns:
+            Optional[Dict[str, Any]]: Segment index, or None if there were no rows
+        """
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        segment_path = self._segment_path(name)
+        descriptor, temp_name = tempfile.mkstemp(prefix=f"{name}.", suffix=".seg.tmp", dir=self.archive_dir)
+        temp_path = Path(temp_name)
+
+        blocks = []
+        offset = 0
+        block: List[Dict[str, Any]] = []
+
+        def write_block(segment_file) -> None:
+            nonlocal offset
+            payload = zlib.compress("".join(json.dumps(row) + "\n" for row in block).encode(), 6)
+            segment_file.write(payload)
+            blocks.append(self._block_entry(block, offset, len(payload)))
+            offset += len(payload)
+
+        with os.fdopen(descriptor, "wb") as segment_file:
+            for row in rows:
+                block.append({key: _encode(value) for key, value in row.items()})
+                if len(block) >= self.block_rows:
+                    write_block(segment_file)
+                    block = []
+            if block:
+                write_block(segment_file)
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
+
+        if not blocks:
+            temp_path.unlink()
+            return None
+
+        os.replace(temp_path, segment_path)
+
+        index = {
+            "segment": segment_path.name,
+            "rows": sum(entry["rows"] for entry in blocks),
+            "bytes": offset,
+            "archived_at": datetime.utcnow().isoformat(),
+            "created_at": [blocks[0]["created_at"][0], blocks[-1]["created_at"][1]],
+            "user_id": _bounds(value for entry in blocks for value in entry["user_id"]),
+            "resource_type": _bounds(value for entry in blocks for value in entry["resource_type"]),
+            "blocks": blocks
+        }
+
+        descriptor, temp_index_name = tempfile.mkstemp(prefix=f"{name}.", suffix=".idx.tmp", dir=self.archive_dir)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(temp_index_name, self._index_path(name))
+        self._fsync_dir()
+
+        logger.info(f"Archived {index['rows']} audit logs into {segment_path.name} ({offset} bytes)")
+        return index
+
+    def _load_indexes(self) -> List[Dict[str, Any]]:
+        """
+        Get the segment indexes, reloading them when segments were added.
+
+        Returns:
+            List[Dict[str, Any]]: Segment indexes ordered by time, newest first
+        """
+        if self.archive_dir is None or not self.archive_dir.exists():
+            return []
+
+        names = frozenset(path.name for path in self.archive_dir.glob("*.idx.json"))
+        if names != self._index_names:
+            indexes = []
+            for name in names:
+                with open(self.archive_dir / name, encoding="utf-8") as index_file:
+                    indexes.append(json.load(index_file))
+            self._indexes = sorted(indexes, key=lambda index: index["created_at"][1], reverse=True)
+            self._index_names = names
+
+        return self._indexes
+
+    @staticmethod
+    def _may_contain(
+        entry: Dict[str, Any],
+        start: Optional[str],
+        end: Optional[str],
+        user_id: Optional[int],
+        resource_type: Optional[str]
+    ) -> bool:
+        """
+        Check if a segment or block may contain matching rows.
+
+        Args:
+            entry: Segment index or block entry
+            start: Inclusive start (ISO format)
+            end: Inclusive end (ISO format)
+            user_id: User ID filter
+            resource_type: Resource type filter
+
+        Returns:
+            bool: False if the entry's ranges rule out any match
+        """
+        low, high = entry["created_at"]
+        if start is not None and high < start:
+            return False
+        if end is not None and low > end:
+            return False
+        if user_id is not None and not _in_bounds(entry["user_id"], user_id):
+            return False
+        if resource_type is not None and not _in_bounds(entry["resource_type"], resource_type):
+            return False
+        return True
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[int] = None,
+        action: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query archived audit logs, newest first.
+
+        Args:
+            start: Inclusive start date (optional)
+            end: Inclusive end date (optional)
+            user_id: User ID (optional)
+            resource_type: Resource type (optional)
+            resource_id: Resource ID (optional)
+            action: Action (optional)
+            limit: Maximum number of rows to return (optional)
+
+        Returns:
+            List[Dict[str, Any]]: Matching rows with timestamps as datetimes
+        """
+        start_iso = start.isoformat() if start is not None else None
+        end_iso = end.isoformat() if end is not None else None
+
+        results: List[Dict[str, Any]] = []
+        seen = set()
+
+        for index in self._load_indexes():
+            if not self._may_contain(index, start_iso, end_iso, user_id, resource_type):
+                continue
+
+            blocks = [
+                block for block in index["blocks"]
+                if self._may_contain(block, start_iso, end_iso, user_id, resource_type)
+            ]
+            if not blocks:
+                continue
+
+            for row in self._read_blocks(index["segment"], reversed(blocks)):
+                if start_iso is not None and row["created_at"] < start_iso:
+                    continue
+                if end_iso is not None and row["created_at"] > end_iso:
+                    continue
+                if user_id is not None and row.get("user_id") != user_id:
+                    continue
+                if resource_type is not None and row.get("resource_type") != resource_type:
+                    continue
+                if resource_id is not None and row.get("resource_id") != resource_id:
+                    continue
+                if action is not None and row.get("action") != action:
+                    continue
+
+                # Rows archived twice after an interrupted run are returned once
+                if row.get("event_id") in seen:
+                    continue
+                seen.add(row.get("event_id"))
+
+                results.append(row)
+                if limit is not None and len(results) >= limit:
+                    return [self._decode(row) for row in results]
+
+        return [self._decode(row) for row in results]
+
+    def _read_blocks(self, segment: str, blocks: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Read blocks of a memory-mapped segment, newest rows first.
+
+        Args:
+            segment: Segment file name
+            blocks: Block entries, newest first
+
+        Yields:
+            Dict[str, Any]: Encoded rows
+        """
+        with open(self.archive_dir / segment, "rb") as segment_file:
+            with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for block in blocks:
+                    data = zlib.decompress(mapped[block["offset"]:block["offset"] + block["length"]])
+                    rows = [json.loads(line) for line in data.decode().splitlines()]
+                    yield from reversed(rows)
+
+    @staticmethod
+    def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decode the timestamps of an archived row.
+
+        Args:
+            row: Encoded row
+
+        Returns:
+            Dict[str, Any]: Row with timestamps as datetimes
+        """
+        for key in ("created_at", "updated_at"):
+            if isinstance(row.get(key), str):
+                row[key] = datetime.fromisoformat(row[key])
+        return row
+
+    def archive_table(self, db: Session, table_name: str) -> int:
+        """
+        Archive a detached partition and drop it.
+
+        If a previous run wrote the segment but didn't drop the table, the
+        table is only dropped.
+
+        Args:
+            db: Database session
+            table_name: Detached partition table name
+
+        Returns:
+            int: Number of archived rows
+        """
+        archived = 0
+
+        try:
+            if not self._index_path(table_name).exists():
+                result = db.connection().execution_options(
+                    stream_results=True,
+                    max_row_buffer=self.block_rows
+                ).execute(text(f'SELECT * FROM "{table_name}" ORDER BY created_at, id'))
+
+                index = self.write_segment(table_name, (dict(row._mapping) for row in result))
+                archived = index["rows"] if index else 0
+
+            db.execute(text(f'DROP TABLE "{table_name}"'))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error archiving {table_name}: {str(e)}")
+            raise
+
+        return archived
+
+    def archive_rows_before(self, db: Session, cutoff: datetime) -> int:
+        """
+        Archive and delete rows older than a cutoff from an unpartitioned table.
+
+        Args:
+            db: Database session
+            cutoff: Rows created before this are archived
+
+        Returns:
+            int: Number of archived rows
+        """
+        ids: List[int] = []
+
+        def collect(rows) -> Iterator[Dict[str, Any]]:
+            for row in rows:
+                ids.append(row.id)
+                yield dict(row._mapping)
+
+        try:
+            result = db.connection().execution_options(
+                stream_results=True,
+                max_row_buffer=self.block_rows
+            ).execute(
+                text(f'SELECT * FROM "{self.table_name}" WHERE created_at < :cutoff ORDER BY created_at, id'),
+                {"cutoff": cutoff}
+            )
+            self.write_segment(f"{self.table_name}_rows_{datetime.utcnow():%Y%m%d%H%M%S%f}", collect(result))
+
+            for i in range(0, len(ids), DELETE_BATCH_SIZE):
+                db.execute(
+                    text(f'DELETE FROM "{self.table_name}" WHERE id = ANY(:ids)'),
+                    {"ids": ids[i:i + DELETE_BATCH_SIZE]}
+                )
+                db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error archiving rows of {self.table_name}: {str(e)}")
+            raise
+
+        return len(ids)
+
+    def run(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Move audit logs older than the archive age into segments.
+
+        Partitions whose whole range is older than the cutoff are detached
+        and archived together with partitions detached earlier (e.g. by the
+        retention policy). Unpartitioned tables are archived row by row.
+        Only one worker archives at a time, under an advisory lock.
+
+        Args:
+            db: Database session
+            now: Current time (defaults to now)
+
+        Returns:
+            Dict[str, Any]: Archival statistics
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.archive_after_days)
+        stats: Dict[str, Any] = {"cutoff": cutoff, "segments": [], "rows": 0}
+
+        if self.archive_dir is None:
+            logger.warning("Audit archive skipped: AUDIT_ARCHIVE_DIR is not configured")
+            stats["skipped"] = True
+            return stats
+
+        with advisory_lock(db.get_bind(), "audit_archive") as acquired:
+            if not acquired:
+                stats["skipped"] = True
+                return stats
+
+            if not is_partitioned(db, self.table_name):
+                stats["rows"] = self.archive_rows_before(db, cutoff)
+                return stats
+
+            for name, _, upper in list_partitions(db, self.table_name):
+                if upper <= cutoff and name.startswith(f"{self.table_name}_y"):
+                    detach_partition(db, self.table_name, name)
+
+            for name in list_detached_partitions(db, self.table_name):
+                if not name.startswith(f"{self.table_name}_y"):
+                    continue
+                stats["rows"] += self.archive_table(db, name)
+                stats["segments"].append(name)
+
+        return stats
@@ -0,0 +1,134 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Audit diff module for the Sales Automation System.
+This module provides field-level change capture for audit log entries.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import inspect
+
+from src.models.base import BaseModel
+
+# Value recorded for fields whose contents must not be written to the audit log
+REDACTED = "[redacted]"
+
+
+def _diffable_attributes(obj: BaseModel) -> List[Any]:
+    """
+    Get the column attributes of an object that can be changed by the application.
+
+    Generated columns (e.g. search vectors) are left out.
+
+    Args:
+        obj: Database object
+
+    Returns:
+        List[Any]: Column properties
+    """
+    return [
+        attr for attr in inspect(obj).mapper.column_attrs
+        if all(column.computed is None for column in attr.columns)
+    ]
+
+
+def to_json_value(value: Any) -> Any:
+    """
+    Convert a column value into a JSON serializable value.
+
+    Args:
+        value: Column value
+
+    Returns:
+        Any: JSON serializable value
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    return str(value)
+
+
+def capture_changes(
+    obj: BaseModel,
+    exclude: Iterable[str] = (),
+    redact: Iterable[str] = ()
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Capture the pending column changes of an object from its attribute history.
+
+    Must be called before the changes are flushed.
+
+    Args:
+        obj: Modified object
+        exclude: Columns to leave out of the diff
+        redact: Columns whose values are replaced by a marker
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: Old and new values of the changed columns
+    """
+    state = inspect(obj)
+    exclude = set(exclude)
+    redact = set(redact)
+
+    old_values: Dict[str, Any] = {}
+    new_values: Dict[str, Any] = {}
+
+    for attr in _diffable_attributes(obj):
+        if attr.key in exclude:
+            continue
+
+        history = state.attrs[attr.key].load_history()
+        if not history.has_changes():
+            continue
+
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        if old == new:
+            continue
+
+        if attr.key in redact:
+            old, new = REDACTED, REDACTED
+
+        old_values[attr.key] = to_json_value(old)
+        new_values[attr.key] = to_json_value(new)
+
+    return old_values, new_values
+
+
+def snapshot(obj: BaseModel) -> Dict[str, Any]:
+    """
+    Get the current column values of an object in diff form.
+
+    Args:
+        obj: Database object
+
+    Returns:
+        Dict[str, Any]: JSON serializable column values
+    """
+    return {attr.key: to_json_value(getattr(obj, attr.key)) for attr in _diffable_attributes(obj)}
+
+
+def fold_changes(state: Dict[str, Any], old_values_newest_first: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Roll a state back through a sequence of diffs.
+
+    Args:
+        state: State after the newest diff
+        old_values_newest_first: Old values of each diff, newest first
+
+    Returns:
+        Dict[str, Any]: State before the oldest diff
+    """
+    state = dict(state)
+    for old_values in old_values_newest_first:
+        state.update(old_values)
+    return state
@@ -7,23 +7,38 @@ This module provides functionality for comprehensive audit logging.
 
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, JSON
-from sqlalchemy.orm import Session, relationship
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, JSON, Index, UniqueConstraint, func
+from sqlalchemy.orm import Query, Session, relationship
 import json
 import socket
 import uuid
 
 from src.models.base import BaseModel
+from src.auth.audit_pipeline import AuditPipeline
+from src.auth.audit_partitions import AuditPartitionManager, AuditMaintainer
+from src.auth.audit_archive import AuditArchive
+from src.auth.audit_diff import snapshot, fold_changes
 from config.database import Base
+from config.settings import AUDIT_ARCHIVE_ENABLED
 
 
 class AuditLog(BaseModel):
     """
     AuditLog model for the Sales Automation System.
     
-    This class represents an audit log entry in the system.
+    This class represents an audit log entry in the system. The table is
+    range partitioned by month on created_at, so created_at is part of the
+    primary key and of every unique constraint.
     """
-    __tablename__ = 'audit_log'
+    __tablename__ = 'audit_event'
+    __table_args__ = (
+        UniqueConstraint('event_id', 'created_at', name='uq_audit_event_event_id'),
+        Index('ix_audit_event_user_created', 'user_id', 'created_at'),
+        Index('ix_audit_event_resource_created', 'resource_type', 'resource_id', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'}
+    )
+    
+    created_at = Column(DateTime, primary_key=True, default=func.now(), nullable=False)
     
     user_id = Column(Integer, ForeignKey('user.id'), nullable=True)
     action = Column(String(50), nullable=False, index=True)
@@ -34,7 +49,7 @@ class AuditLog(BaseModel):
     user_agent = Column(String(255), nullable=True)
     old_values = Column(JSON, nullable=True)
     new_values = Column(JSON, nullable=True)
-    event_id = Column(String(36), nullable=False, unique=True)
+    event_id = Column(String(36), nullable=False)
     
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
@@ -44,6 +59,55 @@ class AuditLog(BaseModel):
         return f"<AuditLog {self.action} on {self.resource_type}:{self.resource_id} by user {self.user_id}>"
 
 
+def _date_bounded(query: Query, start_date: Optional[datetime], end_date: Optional[datetime]) -> Query:
+    """
+    Restrict an audit log query to a date range.
+    
+    Bounds on created_at let PostgreSQL prune the partitions outside the range.
+    
+    Args:
+        query: Audit log query
+        start_date: Inclusive start date (optional)
+        end_date: Inclusive end date (optional)
+        
+    Returns:
+        Query: Restricted query
+    """
+    if start_date is not None:
+        query = query.filter(AuditLog.created_at >= start_date)
+    if end_date is not None:
+        query = query.filter(AuditLog.created_at <= end_date)
+    return query
+
+
+def _with_archived(query: Query, logs: List[AuditLog], skip: int, limit: int, **filters: Any) -> List[AuditLog]:
+    """
+    Complete a page of audit logs from the archive.
+    
+    Archived logs are always older than the logs in the database, so the
+    archive is only read when the database page comes up short, continuing
+    where the database results end.
+    
+    Args:
+        query: Filtered audit log query the page was read from
+        logs: Page of audit logs read from the database
+        skip: Number of records skipped
+        limit: Maximum number of records to return
+        **filters: Archive query filters
+        
+    Returns:
+        List[AuditLog]: Page of audit logs
+    """
+    if not AUDIT_ARCHIVE_ENABLED or len(logs) >= limit:
+        return logs
+    
+    database_total = skip + len(logs) if logs else query.count()
+    archive_skip = max(skip - database_total, 0)
+    
+    archived = audit_archive.query(limit=archive_skip + limit - len(logs), **filters)[archive_skip:]
+    return logs + [AuditLog(**row) for row in archived]
+
+
 class AuditLogger:
     """Audit logging handler for system activities."""
     
@@ -58,11 +122,17 @@ class AuditLogger:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
         old_values: Optional[Dict[str, Any]] = None,
-        new_values: Optional[Dict[str, Any]] = None
+        new_values: Optional[Dict[str, Any]] = None,
+        commit: bool = True
     ) -> AuditLog:
         """
         Log an activity in the audit log.
         
+        While the audit pipeline is running the entry is queued and written
+        in the background; otherwise it is written immediately. Entries that
+        must not be lost apart from the change they describe are added to
+        the caller's transaction instead (commit=False).
+        
         Args:
             db: Database session
             user_id: User ID (can be None for system actions)
@@ -74,25 +144,37 @@ class AuditLogger:
             user_agent: User agent of the user (optional)
             old_values: Old values before the action (optional)
             new_values: New values after the action (optional)
+            commit: Write the entry on its own; if False it is only added to
+                the session and commits with the caller's transaction
             
         Returns:
-            AuditLog: Created audit log entry
+            AuditLog: Created audit log entry (not yet persisted when queued
+            or left to the caller's commit)
         """
+        event = {
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "description": description,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "old_values": old_values,
+            "new_values": new_values,
+            "event_id": str(uuid.uuid4()),
+            "created_at": datetime.utcnow()
+        }
+        
+        if commit and audit_pipeline.is_running:
+            audit_pipeline.submit(event)
+            return AuditLog(**event)
+        
         # Create audit log entry
-        audit_log = AuditLog(
-            user_id=user_id,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            description=description,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            old_values=old_values,
-            new_values=new_values,
-            event_id=str(uuid.uuid4())
-        )
+        audit_log = AuditLog(**event)
         
         db.add(audit_log)
+        if not commit:
+            return audit_log
         db.commit()
         db.refresh(audit_log)
         
@@ -104,7 +186,9 @@ class AuditLogger:
         resource_type: str,
         resource_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
     ) -> List[AuditLog]:
         """
         Get audit logs for a specific resource.
@@ -115,11 +199,13 @@ class AuditLogger:
             resource_id: ID of the resource
             skip: Number of records to skip
             limit: Maximum number of records to return
+            start_date: Inclusive start date (optional, prunes partitions)
+            end_date: Inclusive end date (optional, prunes partitions)
             
         Returns:
             List[AuditLog]: List of audit logs
         """
-        return db.query(AuditLog).filter(
+        return _date_bounded(db.query(AuditLog), start_date, end_date).filter(
             AuditLog.resource_type == resource_type,
             AuditLog.resource_id == resource_id
         ).order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
@@ -129,7 +215,9 @@ class AuditLogger:
         db: Session,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
     ) -> List[AuditLog]:
         """
         Get audit logs for a specific user.
@@ -139,20 +227,25 @@ class AuditLogger:
             user_id: User ID
             skip: Number of records to skip
             limit: Maximum number of records to return
+            start_date: Inclusive start date (optional, prunes partitions)
+            end_date: Inclusive end date (optional, prunes partitions)
             
         Returns:
-            List[AuditLog]: List of audit logs
+            List[AuditLog]: List of audit logs, including archived ones
         """
-        return db.query(AuditLog).filter(
-            AuditLog.user_id == user_id
-        ).order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
+        query = _date_bounded(db.query(AuditLog), start_date, end_date).filter(AuditLog.user_id == user_id)
+        logs = query.order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
+        
+        return _with_archived(query, logs, skip, limit, user_id=user_id, start=start_date, end=end_date)
     
     @staticmethod
     def get_logs_by_action(
         db: Session,
         action: str,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
     ) -> List[AuditLog]:
         """
         Get audit logs for a specific action.
@@ -162,11 +255,13 @@ class AuditLogger:
             action: Action type
             skip: Number of records to skip
             limit: Maximum number of records to return
+            start_date: Inclusive start date (optional, prunes partitions)
+            end_date: Inclusive end date (optional, prunes partitions)
             
         Returns:
             List[AuditLog]: List of audit logs
         """
-        return db.query(AuditLog).filter(
+        return _date_bounded(db.query(AuditLog), start_date, end_date).filter(
             AuditLog.action == action
         ).order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
     
@@ -189,13 +284,77 @@ class AuditLogger:
             limit: Maximum number of records to return
             
         Returns:
-            List[AuditLog]: List of audit logs
+            List[AuditLog]: List of audit logs, including archived ones
         """
-        return db.query(AuditLog).filter(
-            AuditLog.created_at >= start_date,
-            AuditLog.created_at <= end_date
-        ).order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
+        query = _date_bounded(db.query(AuditLog), start_date, end_date)
+        logs = query.order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
+        
+        return _with_archived(query, logs, skip, limit, start=start_date, end=end_date)
+    
+    @staticmethod
+    def get_state_at(db: Session, obj: BaseModel, at: datetime) -> Dict[str, Any]:
+        """
+        Reconstruct the column values of a record at a point in time.
+        
+        The current values are rolled back through the field-level diffs
+        recorded after the given time, newest first. Changes made without
+        diff capture can't be reverted, and redacted fields keep the
+        redaction marker.
+        
+        Args:
+            db: Database session
+            obj: Current database object
+            at: Point in time
+            
+        Returns:
+            Dict[str, Any]: Column values at the given time
+        """
+        resource_type = obj.__tablename__
+        
+        logs = db.query(AuditLog.old_values).filter(
+            AuditLog.resource_type == resource_type,
+            AuditLog.resource_id == obj.id,
+            AuditLog.old_values.isnot(None),
+            AuditLog.created_at > at
+        ).order_by(AuditLog.created_at.desc()).all()
+        diffs = [old_values for old_values, in logs if old_values]
+        
+        # Diffs older than the live partitions are in the archive
+        if AUDIT_ARCHIVE_ENABLED:
+            diffs.extend(
+                row["old_values"]
+                for row in audit_archive.query(start=at, resource_type=resource_type, resource_id=obj.id)
+                if row.get("old_values") and row["created_at"] > at
+            )
+        
+        return fold_changes(snapshot(obj), diffs)
 
 
 # Create audit logger instance
 audit_logger = AuditLogger()
+
+# Create audit partition manager instance
+audit_partition_manager = AuditPartitionManager(AuditLog.__tablename__)
+
+# Create audit archive instance
+audit_archive = AuditArchive(AuditLog.__tablename__)
+
+
+def maintain_audit_storage(db: Session) -> None:
+    """
+    Maintain the audit log partitions and archive old audit logs.
+    
+    Args:
+        db: Database session
+    """
+    audit_partition_manager.maintain(db)
+    
+    if AUDIT_ARCHIVE_ENABLED:
+        audit_archive.run(db)
+
+
+# Create audit pipeline instance (started by the application)
+audit_pipeline = AuditPipeline(AuditLog, conflict_columns=("event_id", "created_at"))
+
+# Create audit maintainer instance (started by the application, with or without the pipeline)
+audit_maintainer = AuditMaintainer(maintain_audit_storage)
@@ -0,0 +1,228 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Audit partition module for the Sales Automation System.
+This module provides management of the monthly audit log partitions.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+import logging
+import threading
+
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import AUDIT_PARTITION_MONTHS_AHEAD, AUDIT_RETENTION_MONTHS, AUDIT_MAINTENANCE_INTERVAL_SECONDS
+from src.utils.database_utils import advisory_lock
+from src.utils.partition_utils import list_partitions, create_range_partition, detach_partition
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def month_start(value: datetime) -> datetime:
+    """
+    Get the start of the month of a timestamp.
+
+    Args:
+        value: Timestamp
+
+    Returns:
+        datetime: First instant of the month
+    """
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """
+    Shift the start of a month by a number of months.
+
+    Args:
+        value: First instant of a month
+        months: Number of months (may be negative)
+
+    Returns:
+        datetime: First instant of the shifted month
+    """
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+class AuditPartitionManager:
+    """
+    Manager for the monthly range partitions of the audit log table.
+
+    Partitions are created ahead of time so writes never hit a missing
+    partition, and partitions older than the retention period are detached,
+    which removes a whole month of rows without touching them.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD,
+        retention_months: int = AUDIT_RETENTION_MONTHS
+    ):
+        """
+        Initialize the partition manager.
+
+        Args:
+            table_name: Partitioned table name
+            months_ahead: Monthly partitions to keep created ahead of the current month
+            retention_months: Months of partitions to keep attached (0 keeps all)
+        """
+        self.table_name = table_name
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+
+    def partition_name(self, start: datetime) -> str:
+        """
+        Get the name of the partition of a month.
+
+        Args:
+            start: First instant of the month
+
+        Returns:
+            str: Partition name, e.g. audit_event_y2025m01
+        """
+        return f"{self.table_name}_y{start:%Y}m{start:%m}"
+
+    def ensure_partitions(self, db: Session, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create the partitions of the current and upcoming months.
+
+        Args:
+            db: Database session
+            now: Current time (defaults to now)
+
+        Returns:
+            List[str]: Names of the created partitions
+        """
+        current = month_start(now or datetime.utcnow())
+
+        created = []
+        for offset in range(self.months_ahead + 1):
+            start = add_months(current, offset)
+            name = self.partition_name(start)
+            if create_range_partition(db, self.table_name, name, start, add_months(start, 1)):
+                created.append(name)
+        return created
+
+    def detach_expired(self, db: Session, now: Optional[datetime] = None, drop: bool = False) -> List[str]:
+        """
+        Detach the partitions that lie entirely before the retention period.
+
+        Detached partitions remain as standalone tables (for archival)
+        unless drop is set.
+
+        Args:
+            db: Database session
+            now: Current time (defaults to now)
+            drop: Whether to drop the detached tables
+
+        Returns:
+            List[str]: Names of the detached partitions
+        """
+        if self.retention_months <= 0:
+            return []
+
+        cutoff = add_months(month_start(now or datetime.utcnow()), -self.retention_months)
+
+        detached = []
+        for name, _, upper in list_partitions(db, self.table_name):
+            if upper <= cutoff and name.startswith(f"{self.table_name}_y"):
+                detach_partition(db, self.table_name, name, drop=drop)
+                detached.append(name)
+        return detached
+
+    def maintain(self, db: Session) -> None:
+        """
+        Create upcoming partitions and detach expired ones.
+
+        Args:
+            db: Database session
+        """
+        created = self.ensure_partitions(db)
+        detached = self.detach_expired(db)
+
+        if created or detached:
+            logger.info(f"Audit partitions maintained: created {created}, detached {detached}")
+
+
+class AuditMaintainer:
+    """
+    Background service that runs the audit storage maintenance.
+
+    It runs independently of the audit pipeline, so upcoming partitions
+    are created even when audit logs are written synchronously. Every
+    worker runs the maintainer, but a pass only proceeds in the worker
+    holding its advisory lock.
+    """
+
+    def __init__(
+        self,
+        maintenance: Callable[[Session], Any],
+        interval_seconds: int = AUDIT_MAINTENANCE_INTERVAL_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the audit maintainer.
+
+        Args:
+            maintenance: Maintenance callback, run with a session
+            interval_seconds: Seconds between maintenance passes
+            session_factory: Factory for database sessions
+        """
+        self.maintenance = maintenance
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> bool:
+        """
+        Run one maintenance pass.
+
+        Returns:
+            bool: True if the pass ran, False if another worker holds the lock
+        """
+        db = self.session_factory()
+        try:
+            with advisory_lock(db.get_bind(), "audit_maintenance") as acquired:
+                if acquired:
+                    self.maintenance(db)
+                return acquired
+        finally:
+            db.close()
+
+    def _run_forever(self) -> None:
+        """Run maintenance passes until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Audit maintenance failed: {str(e)}")
+            self._stop_event.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the maintainer in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_forever, name="audit-maintainer", daemon=True)
+        self._thread.start()
+        logger.info(f"Audit maintainer started (every {self.interval_seconds} s)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread.
+
+        Args:
+            timeout: Seconds to wait for the current pass to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,398 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Audit pipeline module for the Sales Automation System.
+This module provides asynchronous, batched writing of audit log entries.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import (
+    AUDIT_QUEUE_SIZE,
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL_MS,
+    AUDIT_SPILL_ENABLED,
+    AUDIT_SPILL_DIR
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to replay spilled events
+REPLAY_INTERVAL_SECONDS = 5
+
+
+class AuditPipeline:
+    """
+    Asynchronous audit log writer.
+
+    Events are put on a bounded in-memory queue and written by a background
+    thread in multi-row inserts, flushed every flush interval or as soon as
+    a batch is full. When the queue is full or a write fails, events are
+    appended to a local spill file (fsynced) and replayed once the database
+    accepts writes again. Inserts skip events whose conflict key already
+    exists, so replaying a partially written batch is safe and every event
+    is written at least once.
+    """
+
+    def __init__(
+        self,
+        model: Type[Any],
+        conflict_columns: Sequence[str] = ("event_id",),
+        queue_size: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+        spill_enabled: bool = AUDIT_SPILL_ENABLED,
+        spill_dir: str = AUDIT_SPILL_DIR,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the audit pipeline.
+
+        Args:
+            model: Audit log model the events are written to
+            conflict_columns: Columns of the unique key identifying an event
+            queue_size: Maximum number of queued events
+            batch_size: Maximum number of events per insert
+            flush_interval_ms: Maximum time an event waits for its batch in milliseconds
+            spill_enabled: Whether to spill events to disk instead of dropping them
+            spill_dir: Directory of the spill files
+            session_factory: Factory for database sessions
+        """
+        self.model = model
+        self.conflict_columns = list(conflict_columns)
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.spill_enabled = spill_enabled
+        self.spill_dir = Path(spill_dir)
+        self.session_factory = session_factory
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._spill_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_replay_at = 0.0
+        self.metrics = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "dropped": 0,
+            "write_failures": 0,
+            "last_write_lag_ms": 0.0,
+            "max_write_lag_ms": 0.0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the background writer is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _count(self, metric: str, amount: int = 1) -> None:
+        """
+        Increment a counter metric.
+
+        Args:
+            metric: Metric name
+            amount: Increment
+        """
+        with self._metrics_lock:
+            self.metrics[metric] += amount
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue an audit event for writing.
+
+        Args:
+            event: Column values of the audit log entry, including event_id
+                and created_at
+
+        Returns:
+            bool: True if the event was queued or spilled, False if it was dropped
+        """
+        try:
+            self._queue.put_nowait(event)
+            self._count("enqueued")
+            return True
+        except queue.Full:
+            pass
+
+        if self.spill_enabled:
+            try:
+                self._spill([event])
+                return True
+            except OSError as e:
+                logger.error(f"Error spilling audit event: {str(e)}")
+
+        self._count("dropped")
+        logger.warning(f"Audit queue full, dropped event {event.get('event_id')}")
+        return False
+
+    def _to_row(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert an event into insert values.
+
+        Args:
+            event: Audit event
+
+        Returns:
+            Dict[str, Any]: Column values
+        """
+        row = dict(event)
+        if isinstance(row["created_at"], str):
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+        row.setdefault("updated_at", row["created_at"])
+        row.setdefault("is_active", True)
+        return row
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Write events in a single multi-row insert.
+
+        Args:
+            events: Audit events
+
+        Raises:
+            Exception: If the insert fails
+        """
+        rows = [self._to_row(event) for event in events]
+        statement = insert(self.model.__table__).on_conflict_do_nothing(index_elements=self.conflict_columns)
+
+        db = self.session_factory()
+        try:
+            db.execute(statement, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        lag_ms = (datetime.utcnow() - min(row["created_at"] for row in rows)).total_seconds() * 1000
+        with self._metrics_lock:
+            self.metrics["written"] += len(rows)
+            self.metrics["batches"] += 1
+            self.metrics["last_write_lag_ms"] = round(lag_ms, 2)
+            self.metrics["max_write_lag_ms"] = max(self.metrics["max_write_lag_ms"], round(lag_ms, 2))
+
+    def _flush(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Write a batch of events, spilling them if the write fails.
+
+        Args:
+            events: Audit events
+
+        Returns:
+            bool: True if the events were written to the database
+        """
+        try:
+            self._write(events)
+            return True
+        except Exception as e:
+            self._count("write_failures")
+            logger.error(f"Error writing {len(events)} audit events: {str(e)}")
+
+        if self.spill_enabled:
+            try:
+                self._spill(events)
+                return False
+            except OSError as e:
+                logger.error(f"Error spilling audit events: {str(e)}")
+
+        self._count("dropped", len(events))
+        return False
+
+    def _spill_path(self) -> Path:
+        """Get the spill file of this process."""
+        return self.spill_dir / f"audit-{os.getpid()}.jsonl"
+
+    def _spill(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Append events to the spill file and sync it to disk.
+
+        Args:
+            events: Audit events
+
+        Raises:
+            OSError: If the spill file can't be written
+        """
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in events)
+
+        with self._spill_lock:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._spill_path(), "a", encoding="utf-8") as spill_file:
+                spill_file.write(lines)
+                spill_file.flush()
+                os.fsync(spill_file.fileno())
+
+        self._count("spilled", len(events))
+
+    def _claim_spill_files(self) -> List[Path]:
+        """
+        Claim spill files for replay.
+
+        The spill file of this process is renamed so new spills start a new
+        file. Files of processes that are no longer running are claimed too.
+
+        Returns:
+            List[Path]: Claimed files, oldest first
+        """
+        if not self.spill_dir.exists():
+            return []
+
+        with self._spill_lock:
+            for path in self.spill_dir.glob("audit-*.jsonl"):
+                pid = int(path.stem.split("-")[1])
+                if pid != os.getpid() and _pid_alive(pid):
+                    continue
+                path.rename(path.with_name(f"{path.stem}-{time.time_ns()}.replay"))
+
+        return sorted(self.spill_dir.glob("audit-*.replay"), key=lambda path: path.stat().st_mtime)
+
+    def replay_spilled(self) -> int:
+        """
+        Write spilled events to the database.
+
+        A spill file is deleted only after all of its events were committed,
+        so an interrupted replay is retried from the start of the file.
+
+        Returns:
+            int: Number of replayed events
+        """
+        replayed = 0
+
+        for path in self._claim_spill_files():
+            events = []
+            with open(path, encoding="utf-8") as spill_file:
+                for line in spill_file:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        # Partial line from a crash while spilling
+                        logger.warning(f"Skipping malformed line in {path.name}")
+
+            for i in range(0, len(events), self.batch_size):
+                self._write(events[i:i + self.batch_size])
+
+            path.unlink()
+            replayed += len(events)
+            logger.info(f"Replayed {len(events)} spilled audit events from {path.name}")
+
+        self._count("replayed", replayed)
+        return replayed
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        """
+        Collect the next batch from the queue.
+
+        Returns:
+            List[Dict[str, Any]]: Events, empty if none arrived within the flush interval
+        """
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval_ms / 1000
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        """Write queued events until stopped and the queue is drained."""
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch and not self._flush(batch):
+                self._next_replay_at = time.monotonic() + REPLAY_INTERVAL_SECONDS
+                continue
+
+            if self.spill_enabled and time.monotonic() >= self._next_replay_at:
+                self._next_replay_at = time.monotonic() + REPLAY_INTERVAL_SECONDS
+                try:
+                    self.replay_spilled()
+                except Exception as e:
+                    logger.error(f"Error replaying spilled audit events: {str(e)}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get pipeline metrics.
+
+        Returns:
+            Dict[str, Any]: Counters, queue depth and the age of the oldest
+            queued event (queue lag) in milliseconds
+        """
+        with self._queue.mutex:
+            oldest = self._queue.queue[0]["created_at"] if self._queue.queue else None
+
+        queue_lag_ms = 0.0
+        if isinstance(oldest, datetime):
+            queue_lag_ms = round((datetime.utcnow() - oldest).total_seconds() * 1000, 2)
+
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+
+        metrics.update({
+            "running": self.is_running,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "queue_lag_ms": queue_lag_ms
+        })
+        return metrics
+
+    def start(self) -> None:
+        """Start the writer in a background thread."""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-pipeline", daemon=True)
+        self._thread.start()
+        logger.info(f"Audit pipeline started (batches of {self.batch_size}, every {self.flush_interval_ms} ms)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background writer after draining the queue.
+
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def _pid_alive(pid: int) -> bool:
+    """
+    Check if a process is running.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        bool: True if the process exists
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
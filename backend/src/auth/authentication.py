@@ -20,11 +20,13 @@ from src.auth.password_security import password_validator
 from src.auth.token_blacklist import token_blacklist_repository
 from src.auth.refresh_token import refresh_token_repository
 from src.auth.audit_logging import audit_logger
+from src.auth.token_claims import TokenPrincipal, build_claims, security_version_cache
 from config.settings import (
     SECRET_KEY,
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    REFRESH_TOKEN_EXPIRE_DAYS
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    STATELESS_AUTH_ENABLED
 )
 
 # OAuth2 scheme for token authentication
@@ -107,16 +109,22 @@ def create_access_token(
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> User:
+) -> Union[User, TokenPrincipal]:
     """
     Get the current user from a JWT token.
     
+    In stateless mode, tokens carrying claims are trusted without loading
+    the user as long as their security version matches the in-memory
+    security version table, and revocation is checked against that table
+    too, so the database is only queried when the table is stale.
+    
     Args:
         token: JWT token
         db: Database session
         
     Returns:
-        User: Current user
+        Union[User, TokenPrincipal]: Current user, or the principal from the
+        token claims in stateless mode
         
     Raises:
         HTTPException: If token is invalid or user not found
@@ -127,13 +135,15 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    revoked_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
     # Check if token is blacklisted
-    if token_blacklist_repository.is_blacklisted(db, token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    if not STATELESS_AUTH_ENABLED and token_blacklist_repository.is_blacklisted(db, token):
+        raise revoked_exception
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -143,6 +153,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    if STATELESS_AUTH_ENABLED:
+        if security_version_cache.is_revoked(db, token):
+            raise revoked_exception
+        
+        principal = TokenPrincipal.from_claims(payload)
+        if principal is not None:
+            if not security_version_cache.validate(db, principal):
+                raise credentials_exception
+            return principal
+    
     user = user_repository.get(db, user_id)
     if user is None:
         raise credentials_exception
@@ -173,38 +193,90 @@ async def get_current_active_user(
     return current_user
 
 
-def create_tokens_for_user(
-    db: Session,
-    user: User
-) -> Dict[str, str]:
+async def get_current_db_user(
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> User:
     """
-    Create access and refresh tokens for a user.
+    Get the current user record from the database.
+    
+    Endpoints that read or modify fields beyond the token claims depend on
+    this instead of get_current_active_user.
     
     Args:
+        current_user: Current active user or principal
         db: Database session
-        user: User
+        
+    Returns:
+        User: Current user record
+        
+    Raises:
+        HTTPException: If the user no longer exists or is inactive
+    """
+    if isinstance(current_user, User):
+        return current_user
+    
+    user = user_repository.get(db, current_user.id)
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+def _build_token_response(
+    user_id: int,
+    refresh_token: str,
+    claims: Optional[Dict[str, Any]] = None
+) -> Dict[str, str]:
+    """
+    Build the token response for a user.
+    
+    Args:
+        user_id: User ID
+        refresh_token: Refresh token string
+        claims: Additional access token claims (stateless mode)
         
     Returns:
         Dict[str, str]: Access and refresh tokens
     """
-    # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data={"sub": str(user_id), **(claims or {})},
         expires_delta=access_token_expires
     )
     
-    # Create refresh token
-    refresh_token = refresh_token_repository.create(db, user.id)
-    
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "refresh_token": refresh_token.token,
+        "refresh_token": refresh_token,
         "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
 
 
+def create_tokens_for_user(
+    db: Session,
+    user: User
+) -> Dict[str, str]:
+    """
+    Create access and refresh tokens for a user.
+    
+    Args:
+        db: Database session
+        user: User
+        
+    Returns:
+        Dict[str, str]: Access and refresh tokens
+    """
+    # Create refresh token (starts a new token family)
+    refresh_token = refresh_token_repository.create(db, user.id)
+    
+    claims = build_claims(user) if STATELESS_AUTH_ENABLED else None
+    return _build_token_response(user.id, refresh_token.token, claims)
+
+
 def refresh_access_token(
     db: Session,
     refresh_token: str
@@ -212,6 +284,10 @@ def refresh_access_token(
     """
     Refresh an access token using a refresh token.
     
+    The refresh token is rotated in a single statement. The token is only
+    looked up again when rotation fails, to report why and to revoke the
+    whole token family if a previously rotated token is being reused.
+    
     Args:
         db: Database session
         refresh_token: Refresh token
@@ -222,8 +298,19 @@ def refresh_access_token(
     Raises:
         HTTPException: If refresh token is invalid
     """
-    # Get refresh token from database
-    db_token = refresh_token_repository.get_by_token(db, refresh_token)
+    rotation = refresh_token_repository.rotate(db, refresh_token)
+    
+    if rotation is not None:
+        user_id, new_refresh_token = rotation
+        
+        # Claims need the current roles, so only stateless mode loads the user
+        claims = None
+        if STATELESS_AUTH_ENABLED:
+            claims = build_claims(user_repository.get(db, user_id))
+        
+        return _build_token_response(user_id, new_refresh_token, claims)
+    
+    db_token = refresh_token_repository.get_by_token(db, refresh_token, include_revoked=True)
     
     if not db_token:
         raise HTTPException(
@@ -232,35 +319,39 @@ def refresh_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Check if token is expired
-    if db_token.is_expired:
-        # Revoke token
-        refresh_token_repository.revoke(db, refresh_token)
+    # A revoked token being presented again means the family is compromised
+    if db_token.is_revoked:
+        refresh_token_repository.revoke_family(db, db_token.family_id)
+        
+        audit_logger.log_activity(
+            db=db,
+            user_id=db_token.user_id,
+            action="refresh_token_reuse",
+            resource_type="token",
+            description=f"Refresh token reuse detected, token family {db_token.family_id} revoked"
+        )
         
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token expired",
+            detail="Invalid refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user
-    user = user_repository.get(db, db_token.user_id)
+    # Revoke token
+    refresh_token_repository.revoke(db, refresh_token)
     
-    if not user or not user.is_active:
-        # Revoke token
-        refresh_token_repository.revoke(db, refresh_token)
-        
+    if db_token.is_expired:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
+            detail="Refresh token expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Revoke old refresh token (token rotation)
-    refresh_token_repository.revoke(db, refresh_token)
-    
-    # Create new tokens
-    return create_tokens_for_user(db, user)
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found or inactive",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 def revoke_token(
@@ -289,6 +380,7 @@ def revoke_token(
             
             # Add token to blacklist
             token_blacklist_repository.create(db, token, token_type, expires_at)
+            security_version_cache.add_revoked(token, expires_at)
             
             # Log token revocation
             if user_id:
@@ -331,6 +423,8 @@ def revoke_all_user_tokens(
     """
     Revoke all tokens for a user.
     
+    Access tokens are invalidated by incrementing the user's security version.
+    
     Args:
         db: Database session
         user_id: User ID
@@ -338,6 +432,9 @@ def revoke_all_user_tokens(
     # Revoke all refresh tokens
     refresh_token_repository.revoke_all_for_user(db, user_id)
     
+    # Invalidate issued access tokens
+    user_repository.bump_security_version(db, user_id)
+    
     # Log token revocation
     audit_logger.log_activity(
         db=db,
@@ -0,0 +1,70 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Blind index module for the Sales Automation System.
+This module provides keyed hashes that make encrypted fields searchable.
+"""
+
+import hashlib
+import hmac
+from typing import Dict, Optional
+
+from config.settings import BLIND_INDEX_KEY
+
+
+class BlindIndex:
+    """
+    Blind index handler for encrypted fields.
+
+    A blind index is a keyed HMAC of a normalized plaintext value. It is
+    deterministic, so it can be stored next to the ciphertext and looked up
+    through a regular B-tree index, while revealing nothing about the value
+    without the key. Each field uses its own subkey, so equal values in
+    different fields don't produce equal indexes.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        """
+        Initialize the blind index handler.
+
+        Args:
+            key: Blind index key (defaults to BLIND_INDEX_KEY from settings)
+        """
+        self.key = (key or BLIND_INDEX_KEY).encode()
+        self._field_keys: Dict[str, bytes] = {}
+
+    def _field_key(self, field: str) -> bytes:
+        """
+        Get the subkey of a field.
+
+        Args:
+            field: Field name
+
+        Returns:
+            bytes: Field subkey
+        """
+        field_key = self._field_keys.get(field)
+        if field_key is None:
+            field_key = hmac.new(self.key, f"blind-index:{field}".encode(), hashlib.sha256).digest()
+            self._field_keys[field] = field_key
+        return field_key
+
+    def compute(self, field: str, value: Optional[str]) -> Optional[str]:
+        """
+        Compute the blind index of a value.
+
+        Args:
+            field: Field name
+            value: Normalized plaintext value
+
+        Returns:
+            Optional[str]: Hex encoded index (64 characters) or None for empty values
+        """
+        if not value:
+            return None
+
+        return hmac.new(self._field_key(field), value.encode(), hashlib.sha256).hexdigest()
+
+
+# Create blind index handler instance
+blind_index = BlindIndex()
@@ -6,47 +6,192 @@ This module provides functionality for encrypting sensitive data.
 """
 
 import base64
+import functools
 import os
-from typing import Dict, Any, Optional
-from cryptography.fernet import Fernet
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from sqlalchemy.orm import Session
 
-from config.settings import ENCRYPTION_KEY, ENCRYPTION_SALT
+from config.settings import (
+    ENCRYPTION_KEY,
+    ENCRYPTION_SALT,
+    ENCRYPTION_KEY_VERSION,
+    ENCRYPTION_PREVIOUS_KEYS,
+    ENCRYPTION_BATCH_WORKERS,
+    ENCRYPTION_BATCH_CHUNK_SIZE
+)
+
+# Format of encrypted values: optional key version prefix and the base64 encoded
+# Fernet token, whose own base64 encoding always starts with version byte 0x80 ("gAAAAA")
+ENCRYPTED_VALUE_PATTERN = re.compile(r"^(v\d+:)?Z0FBQUFB[A-Za-z0-9_=-]+$")
+
+# Shared thread pool for batch encryption, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=32)
+def _derive_fernet(key: str, salt: bytes) -> Fernet:
+    """
+    Derive a Fernet instance from a key and salt.
+    
+    PBKDF2 is deliberately slow, so derived keys are cached per
+    (key, salt) and only computed the first time they are needed.
+    
+    Args:
+        key: Encryption key
+        salt: Encryption salt
+    
+    Returns:
+        Fernet: Fernet instance
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    
+    derived_key = base64.urlsafe_b64encode(kdf.derive(key.encode()))
+    return Fernet(derived_key)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared batch encryption thread pool.
+    
+    Returns:
+        ThreadPoolExecutor: Thread pool
+    """
+    global _executor
+    
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=ENCRYPTION_BATCH_WORKERS, thread_name_prefix="encryption")
+    
+    return _executor
+
+
+def _parse_previous_keys(value: str) -> Dict[int, str]:
+    """
+    Parse previous key versions from a "version:key,version:key" string.
+    
+    Args:
+        value: Configured previous keys
+    
+    Returns:
+        Dict[int, str]: Keys by version
+    """
+    keys = {}
+    for entry in filter(None, (item.strip() for item in value.split(","))):
+        version, _, key = entry.partition(":")
+        keys[int(version)] = key
+    return keys
 
 
 class DataEncryption:
-    """Data encryption handler for sensitive information."""
+    """
+    Data encryption handler for sensitive information.
+    
+    The handler holds a keyring of key versions. Values are encrypted with
+    the active version and prefixed with it ("v2:..."), so values written
+    under older versions keep decrypting after a key rotation. Values
+    without a prefix predate versioning and use the oldest version.
+    """
     
-    def __init__(self, key: Optional[str] = None, salt: Optional[bytes] = None):
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        salt: Optional[bytes] = None,
+        keys: Optional[Dict[int, str]] = None,
+        active_version: Optional[int] = None
+    ):
         """
         Initialize the encryption handler.
         
+        Key derivation is deferred until a key version is first used.
+        
         Args:
-            key: Encryption key (defaults to ENCRYPTION_KEY from settings)
+            key: Encryption key for the active version (defaults to ENCRYPTION_KEY from settings)
             salt: Encryption salt (defaults to ENCRYPTION_SALT from settings)
+            keys: Keyring of keys by version (defaults to ENCRYPTION_KEY plus
+                ENCRYPTION_PREVIOUS_KEYS from settings)
+            active_version: Version used for encryption (defaults to the highest version)
         """
-        self.key = key or ENCRYPTION_KEY
         self.salt = salt or base64.b64decode(ENCRYPTION_SALT)
-        self.fernet = self._create_fernet()
     
-    def _create_fernet(self) -> Fernet:
+        if keys is None:
+            keys = _parse_previous_keys(ENCRYPTION_PREVIOUS_KEYS)
+            keys[ENCRYPTION_KEY_VERSION] = key or ENCRYPTION_KEY
+        
+        self.keys = dict(keys)
+        self.active_version = active_version or max(self.keys)
+        
+        if self.active_version not in self.keys:
+            raise ValueError(f"No key configured for version {self.active_version}")
+    
+    @property
+    def key(self) -> str:
+        """Get the key of the active version."""
+        return self.keys[self.active_version]
+    
+    @property
+    def fernet(self) -> Fernet:
+        """Get the Fernet instance of the active version."""
+        return self._get_fernet(self.active_version)
+    
+    def _get_fernet(self, version: int) -> Fernet:
         """
-        Create a Fernet instance for encryption/decryption.
+        Get the Fernet instance for a key version.
+        
+        Args:
+            version: Key version
         
         Returns:
             Fernet: Fernet instance
+        
+        Raises:
+            ValueError: If the version is not in the keyring
         """
-        # Derive a key using PBKDF2
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=self.salt,
-            iterations=100000,
-        )
+        if version not in self.keys:
+            raise ValueError(f"Unknown encryption key version {version}")
         
-        key = base64.urlsafe_b64encode(kdf.derive(self.key.encode()))
-        return Fernet(key)
+        return _derive_fernet(self.keys[version], self.salt)
+    
+    def activate_from_db(self, db: Session, key_name: str = "data") -> int:
+        """
+        Use the active key version recorded in the encryption_key table.
+        
+        Args:
+            db: Database session
+            key_name: Name of the key
+        
+        Returns:
+            int: Active key version
+        
+        Raises:
+            ValueError: If the recorded version is not in the keyring
+        """
+        # Imported here since the models import this module
+        from src.models.encryption_key import EncryptionKey
+        
+        record = db.query(EncryptionKey).filter(
+            EncryptionKey.key_name == key_name,
+            EncryptionKey.active == True
+        ).order_by(EncryptionKey.key_version.desc()).first()
+        
+        if record is not None:
+            if record.key_version not in self.keys:
+                raise ValueError(f"No key configured for version {record.key_version}")
+            self.active_version = record.key_version
+        
+        return self.active_version
     
     def encrypt(self, data: str) -> str:
         """
@@ -56,13 +201,13 @@ class DataEncryption:
             data: Data to encrypt
             
         Returns:
-            str: Encrypted data (base64 encoded)
+            str: Encrypted data (base64 encoded, prefixed with the key version)
         """
         if not data:
             return data
             
         encrypted_data = self.fernet.encrypt(data.encode())
-        return base64.urlsafe_b64encode(encrypted_data).decode()
+        return f"v{self.active_version}:{base64.urlsafe_b64encode(encrypted_data).decode()}"
     
     def decrypt(self, encrypted_data: str) -> str:
         """
@@ -81,12 +226,117 @@ class DataEncryption:
             return encrypted_data
             
         try:
-            decoded_data = base64.urlsafe_b64decode(encrypted_data)
-            decrypted_data = self.fernet.decrypt(decoded_data)
+            if encrypted_data.startswith("v") and ":" in encrypted_data:
+                version, _, payload = encrypted_data.partition(":")
+                fernet = self._get_fernet(int(version[1:]))
+            else:
+                payload = encrypted_data
+                fernet = self._get_fernet(min(self.keys))
+            
+            decoded_data = base64.urlsafe_b64decode(payload)
+            decrypted_data = fernet.decrypt(decoded_data)
             return decrypted_data.decode()
-        except Exception as e:
+        except (InvalidToken, ValueError, TypeError) as e:
             raise ValueError(f"Decryption failed: {str(e)}")
     
+    @staticmethod
+    def is_encrypted(value: Optional[str]) -> bool:
+        """
+        Check whether a value has the format of data encrypted by this handler.
+        
+        Args:
+            value: Stored value
+            
+        Returns:
+            bool: True if the value is encrypted
+        """
+        return bool(value) and ENCRYPTED_VALUE_PATTERN.match(value) is not None
+    
+    def plaintext(self, value: Optional[str]) -> Optional[str]:
+        """
+        Get the plaintext of a value that may or may not be encrypted.
+        
+        Args:
+            value: Plaintext or encrypted value
+            
+        Returns:
+            Optional[str]: Plaintext value
+            
+        Raises:
+            ValueError: If the value is encrypted and decryption fails
+        """
+        return self.decrypt(value) if self.is_encrypted(value) else value
+    
+    def _map(self, func, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """
+        Apply a function to a batch of values, in parallel for large batches.
+        
+        Args:
+            func: Function applied to each value
+            values: Values to process
+        
+        Returns:
+            List[Optional[str]]: Results in input order
+        """
+        values = list(values)
+        
+        if len(values) <= ENCRYPTION_BATCH_CHUNK_SIZE:
+            return [func(value) for value in values]
+        
+        chunks = [
+            values[i:i + ENCRYPTION_BATCH_CHUNK_SIZE]
+            for i in range(0, len(values), ENCRYPTION_BATCH_CHUNK_SIZE)
+        ]
+        
+        results: List[Optional[str]] = []
+        for chunk_result in _get_executor().map(lambda chunk: [func(value) for value in chunk], chunks):
+            results.extend(chunk_result)
+        return results
+    
+    def encrypt_many(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """
+        Encrypt a batch of values, e.g. a column of an import.
+        
+        Args:
+            values: Values to encrypt (empty values are returned unchanged)
+        
+        Returns:
+            List[Optional[str]]: Encrypted values in input order
+        """
+        # Derive the key once before fanning out to the workers
+        self._get_fernet(self.active_version)
+        return self._map(self.encrypt, values)
+    
+    def decrypt_many(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """
+        Decrypt a batch of values, e.g. a column of a result page.
+        
+        Args:
+            values: Encrypted values (empty values are returned unchanged)
+        
+        Returns:
+            List[Optional[str]]: Decrypted values in input order
+        
+        Raises:
+            ValueError: If decryption of any value fails
+        """
+        return self._map(self.decrypt, values)
+    
+    def plaintext_many(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """
+        Get the plaintext of a batch of values, encrypted or not, e.g. during a migration to encryption.
+        
+        Args:
+            values: Plaintext or encrypted values
+            
+        Returns:
+            List[Optional[str]]: Plaintext values in input order
+            
+        Raises:
+            ValueError: If decryption of any encrypted value fails
+        """
+        return self._map(self.plaintext, values)
+    
     @staticmethod
     def generate_key() -> str:
         """
@@ -110,5 +360,5 @@ class DataEncryption:
         return base64.urlsafe_b64encode(salt).decode()
 
 
-# Create encryption handler instance
+# Create encryption handler instance (keys are derived on first use)
 data_encryption = DataEncryption()
@@ -0,0 +1,98 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Permission definitions module for the Sales Automation System.
+This module provides the resource and action types and their bitmask encoding.
+"""
+
+from enum import Enum
+from typing import Iterable, Optional
+
+
+class ResourceType(str, Enum):
+    """Enumeration of resource types for permission checking."""
+    USER = "user"
+    CONTACT = "contact"
+    LEAD = "lead"
+    OPPORTUNITY = "opportunity"
+    CAMPAIGN = "campaign"
+    REPORT = "report"
+    SETTING = "setting"
+
+
+class ActionType(str, Enum):
+    """Enumeration of action types for permission checking."""
+    CREATE = "create"
+    READ = "read"
+    UPDATE = "update"
+    DELETE = "delete"
+    EXPORT = "export"
+    IMPORT = "import"
+    ASSIGN = "assign"
+    CONVERT = "convert"
+
+
+# Each resource owns a fixed block of 16 bits, one per action, so appending
+# an action doesn't move the bits of other resources. Positions follow
+# declaration order, so new members must be appended.
+_RESOURCES = list(ResourceType)
+_ACTIONS = list(ActionType)
+ACTIONS_PER_RESOURCE = 16
+
+# Version of the bit layout, embedded in access tokens next to the mask.
+# Bump it whenever existing bits change meaning (e.g. a member is removed).
+PERMISSION_LAYOUT_VERSION = 2
+
+
+def permission_bit(resource: str, action: str) -> Optional[int]:
+    """
+    Get the bitmask bit of a permission.
+
+    Args:
+        resource: Resource type value
+        action: Action type value
+
+    Returns:
+        Optional[int]: Bit of the permission or None if it isn't a known
+        resource and action
+    """
+    try:
+        position = _RESOURCES.index(ResourceType(resource)) * ACTIONS_PER_RESOURCE + _ACTIONS.index(ActionType(action))
+    except ValueError:
+        return None
+
+    return 1 << position
+
+
+def encode_permissions(permissions: Iterable) -> int:
+    """
+    Encode permissions into a bitmask.
+
+    Args:
+        permissions: Permission models (with resource and action)
+
+    Returns:
+        int: Permission bitmask
+    """
+    mask = 0
+    for permission in permissions:
+        bit = permission_bit(permission.resource, permission.action)
+        if bit is not None:
+            mask |= bit
+    return mask
+
+
+def mask_has_permission(mask: int, resource: ResourceType, action: ActionType) -> bool:
+    """
+    Check if a permission bitmask grants an action on a resource.
+
+    Args:
+        mask: Permission bitmask
+        resource: Resource type
+        action: Action type
+
+    Returns:
+        bool: True if the permission is granted, False otherwise
+    """
+    bit = permission_bit(resource.value, action.value)
+    return bit is not None and bool(mask & bit)
@@ -5,7 +5,6 @@ Role-based access control module for the Sales Automation System.
 This module provides functionality for RBAC implementation.
 """
 
-from enum import Enum
 from typing import Dict, Any, List, Optional, Set
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
@@ -14,29 +13,11 @@ import functools
 from src.models.user import User, Role, Permission
 from src.utils.database_utils import get_db
 from src.auth.authentication import get_current_active_user
+from src.auth.scoping import AccessScope
+from src.auth.permissions import ResourceType, ActionType, mask_has_permission
 
-
-class ResourceType(str, Enum):
-    """Enumeration of resource types for permission checking."""
-    USER = "user"
-    CONTACT = "contact"
-    LEAD = "lead"
-    OPPORTUNITY = "opportunity"
-    CAMPAIGN = "campaign"
-    REPORT = "report"
-    SETTING = "setting"
-
-
-class ActionType(str, Enum):
-    """Enumeration of action types for permission checking."""
-    CREATE = "create"
-    READ = "read"
-    UPDATE = "update"
-    DELETE = "delete"
-    EXPORT = "export"
-    IMPORT = "import"
-    ASSIGN = "assign"
-    CONVERT = "convert"
+# Roles that see every row regardless of ownership
+UNRESTRICTED_ROLES = {"admin", "manager"}
 
 
 class RBACHandler:
@@ -63,12 +44,17 @@ class RBACHandler:
         if any(role.name == "admin" for role in user.roles):
             return True
         
+        # Users authenticated from token claims carry their permissions as a bitmask
+        permission_mask = getattr(user, "permission_mask", None)
+        if permission_mask is not None:
+            return mask_has_permission(permission_mask, resource, action)
+        
         # Check if user has the specific permission
         permission_name = f"{resource.value}:{action.value}"
         
         for role in user.roles:
-            for permission in role.permissions:
-                if permission.name == permission_name:
+            for role_permission in role.permissions:
+                if role_permission.permission.name == permission_name:
                     return True
         
         return False
@@ -112,6 +98,42 @@ class RBACHandler:
         # For other roles, check specific permissions
         resource_type = ResourceType(obj.__tablename__)
         return RBACHandler.has_permission(user, resource_type, action)
+    
+    @staticmethod
+    def get_access_scope(user: User) -> AccessScope:
+        """
+        Get the row ownership scope for a user.
+        
+        Admins and managers get an unrestricted scope; everyone else is
+        limited to rows they own or created.
+        
+        Args:
+            user: User to scope
+            
+        Returns:
+            AccessScope: Access scope for the user
+        """
+        unrestricted = any(role.name in UNRESTRICTED_ROLES for role in user.roles)
+        return AccessScope(user.id, unrestricted=unrestricted)
+
+
+def get_access_scope(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> AccessScope:
+    """
+    Get the access scope for the current user and bind it to the session.
+    
+    Args:
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        AccessScope: Access scope for the current user
+    """
+    scope = RBACHandler.get_access_scope(current_user)
+    scope.bind(db)
+    return scope
 
 
 def require_permission(resource: ResourceType, action: ActionType):
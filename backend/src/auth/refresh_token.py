@@ -6,13 +6,17 @@ This module provides functionality for refresh token management.
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey
+from typing import Dict, Any, Optional, List, Tuple
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, insert, literal, select, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, relationship
+import hashlib
 import secrets
+import uuid
 
 from src.models.base import BaseModel
 from src.models.user import User
+from src.utils.database_utils import delete_batch
 from config.database import Base
 from config.settings import REFRESH_TOKEN_EXPIRE_DAYS
 
@@ -21,11 +25,14 @@ class RefreshToken(BaseModel):
     """
     RefreshToken model for the Sales Automation System.
     
-    This class represents a refresh token in the system.
+    This class represents a refresh token in the system. Only the SHA-256
+    hash of the token is stored; tokens issued by rotation share the
+    family_id of the token issued at login so reuse can be detected.
     """
     __tablename__ = 'refresh_token'
     
-    token = Column(String(255), nullable=False, index=True, unique=True)
+    token_hash = Column(String(64), nullable=False, index=True, unique=True)
+    family_id = Column(String(36), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
     expires_at = Column(DateTime, nullable=False)
     is_revoked = Column(Boolean, default=False, nullable=False)
@@ -35,7 +42,7 @@ class RefreshToken(BaseModel):
     
     def __repr__(self) -> str:
         """String representation of the RefreshToken model."""
-        return f"<RefreshToken {self.token[:10]}... for user {self.user_id}>"
+        return f"<RefreshToken {self.token_hash[:10]}... for user {self.user_id}>"
     
     @property
     def is_expired(self) -> bool:
@@ -46,13 +53,30 @@ class RefreshToken(BaseModel):
 class RefreshTokenRepository:
     """Repository for RefreshToken model operations."""
     
-    def create(self, db: Session, user_id: int) -> RefreshToken:
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """
+        Hash a refresh token for storage and lookup.
+        
+        Args:
+            token: Token string
+            
+        Returns:
+            str: Hex encoded SHA-256 hash of the token
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    def create(self, db: Session, user_id: int, family_id: Optional[str] = None) -> RefreshToken:
         """
         Create a new refresh token.
         
+        The plain token is only available on the returned object's ``token``
+        attribute; it is never persisted.
+        
         Args:
             db: Database session
             user_id: User ID
+            family_id: Token family ID (defaults to a new family)
             
         Returns:
             RefreshToken: Created refresh token
@@ -65,31 +89,99 @@ class RefreshTokenRepository:
         
         # Create token
         db_obj = RefreshToken(
-            token=token,
+            token_hash=self.hash_token(token),
+            family_id=family_id or str(uuid.uuid4()),
             user_id=user_id,
             expires_at=expires_at,
             is_revoked=False
         )
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
+        db_obj.token = token
         return db_obj
     
-    def get_by_token(self, db: Session, token: str) -> Optional[RefreshToken]:
+    def rotate(self, db: Session, token: str) -> Optional[Tuple[int, str]]:
+        """
+        Revoke a refresh token and issue its replacement in one statement.
+        
+        The old token is revoked with UPDATE ... RETURNING and the new token
+        of the same family is inserted from its result in a single CTE, so a
+        rotation costs one statement plus the commit. Rotation only happens
+        if the token is valid, unexpired and belongs to an active user.
+        
+        Args:
+            db: Database session
+            token: Token string to rotate
+            
+        Returns:
+            Optional[Tuple[int, str]]: (user ID, new token string), or None
+            if the token could not be rotated
+        """
+        tokens = RefreshToken.__table__
+        users = User.__table__
+        now = datetime.utcnow()
+        new_token = secrets.token_urlsafe(64)
+        
+        rotated = (
+            update(tokens)
+            .where(
+                tokens.c.token_hash == self.hash_token(token),
+                tokens.c.is_revoked == False,
+                tokens.c.expires_at > now,
+                tokens.c.user_id == users.c.id,
+                users.c.is_active == True
+            )
+            .values(is_revoked=True, updated_at=now)
+            .returning(tokens.c.user_id, tokens.c.family_id)
+            .cte("rotated")
+        )
+        
+        replacement = select(
+            literal(self.hash_token(new_token)),
+            rotated.c.family_id,
+            rotated.c.user_id,
+            literal(now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)),
+            literal(False),
+            literal(True),
+            literal(now),
+            literal(now)
+        )
+        
+        statement = insert(tokens).from_select(
+            ["token_hash", "family_id", "user_id", "expires_at", "is_revoked", "is_active", "created_at", "updated_at"],
+            replacement
+        ).returning(tokens.c.user_id)
+        
+        try:
+            row = db.execute(statement).first()
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+        
+        if row is None:
+            return None
+        
+        return row.user_id, new_token
+    
+    def get_by_token(self, db: Session, token: str, include_revoked: bool = False) -> Optional[RefreshToken]:
         """
         Get a refresh token by token string.
         
         Args:
             db: Database session
             token: Token string
+            include_revoked: Whether to return revoked tokens too
             
         Returns:
             Optional[RefreshToken]: Refresh token or None
         """
-        return db.query(RefreshToken).filter(
-            RefreshToken.token == token,
-            RefreshToken.is_revoked == False
-        ).first()
+        query = db.query(RefreshToken).filter(RefreshToken.token_hash == self.hash_token(token))
+        
+        if not include_revoked:
+            query = query.filter(RefreshToken.is_revoked == False)
+        
+        return query.first()
     
     def get_by_user(self, db: Session, user_id: int) -> List[RefreshToken]:
         """
@@ -107,7 +199,7 @@ class RefreshTokenRepository:
             RefreshToken.is_revoked == False
         ).all()
     
-    def revoke(self, db: Session, token: str) -> Optional[RefreshToken]:
+    def revoke(self, db: Session, token: str) -> bool:
         """
         Revoke a refresh token.
         
@@ -116,16 +208,37 @@ class RefreshTokenRepository:
             token: Token string
             
         Returns:
-            Optional[RefreshToken]: Revoked token or None
+            bool: True if a token was revoked, False otherwise
         """
-        db_obj = self.get_by_token(db, token)
+        count = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == self.hash_token(token),
+            RefreshToken.is_revoked == False
+        ).update({"is_revoked": True, "updated_at": datetime.utcnow()}, synchronize_session=False)
         
-        if db_obj:
-            db_obj.is_revoked = True
-            db.commit()
-            db.refresh(db_obj)
+        db.commit()
+        return count > 0
+    
+    def revoke_family(self, db: Session, family_id: str) -> int:
+        """
+        Revoke every token of a token family.
+        
+        Used when a rotated token is presented again, which means the
+        family has been compromised.
+        
+        Args:
+            db: Database session
+            family_id: Token family ID
             
-        return db_obj
+        Returns:
+            int: Number of tokens revoked
+        """
+        count = db.query(RefreshToken).filter(
+            RefreshToken.family_id == family_id,
+            RefreshToken.is_revoked == False
+        ).update({"is_revoked": True, "updated_at": datetime.utcnow()}, synchronize_session=False)
+        
+        db.commit()
+        return count
     
     def revoke_all_for_user(self, db: Session, user_id: int) -> int:
         """
@@ -138,35 +251,51 @@ class RefreshTokenRepository:
         Returns:
             int: Number of tokens revoked
         """
-        tokens = self.get_by_user(db, user_id)
-        
-        for token in tokens:
-            token.is_revoked = True
+        count = db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == False
+        ).update({"is_revoked": True, "updated_at": datetime.utcnow()}, synchronize_session=False)
         
         db.commit()
-        return len(tokens)
+        return count
+    
+    def delete_expired_batch(self, db: Session, now: datetime, batch_size: int) -> int:
+        """
+        Delete one batch of expired refresh tokens.
+        
+        Args:
+            db: Database session
+            now: Tokens that expired before this time are deleted
+            batch_size: Maximum number of rows to delete
+            
+        Returns:
+            int: Number of rows deleted
+        """
+        table = RefreshToken.__table__
+        return delete_batch(db, table, table.c.expires_at < now, batch_size)
     
-    def clean_expired_tokens(self, db: Session) -> int:
+    def clean_expired_tokens(self, db: Session, batch_size: int = 1000) -> int:
         """
         Remove expired tokens.
         
+        Rows are deleted in bounded batches, each in its own transaction.
+        
         Args:
             db: Database session
+            batch_size: Maximum number of rows deleted per batch
             
         Returns:
             int: Number of tokens removed
         """
         now = datetime.utcnow()
-        expired_tokens = db.query(RefreshToken).filter(
-            RefreshToken.expires_at < now
-        ).all()
+        count = 0
         
-        count = len(expired_tokens)
+        while True:
+            deleted = self.delete_expired_batch(db, now, batch_size)
+            count += deleted
+            if deleted < batch_size:
+                break
         
-        for token in expired_tokens:
-            db.delete(token)
-        
-        db.commit()
         return count
 
 
@@ -0,0 +1,129 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Access scoping module for the Sales Automation System.
+This module provides ownership scopes that repositories push down into SQL.
+"""
+
+from typing import Any, Iterable, Optional, Tuple
+from sqlalchemy import event, or_, text
+from sqlalchemy.orm import Query, Session
+
+from config.settings import SCOPED_RLS_ENABLED
+
+# Columns that mark a row as belonging to a user
+OWNERSHIP_COLUMNS = ("owner_id", "created_by")
+
+# Session info key holding the user id for row-level security
+RLS_USER_KEY = "app_user_id"
+
+
+class AccessScope:
+    """
+    Row ownership scope for the current user.
+
+    Unrestricted scopes (admins and managers) leave queries untouched. All
+    other scopes restrict queries to rows owned or created by the user or
+    by any of the additional member ids (e.g. members of the user's team).
+    """
+
+    def __init__(self, user_id: int, unrestricted: bool = False, member_ids: Optional[Iterable[int]] = None):
+        """
+        Initialize the access scope.
+
+        Args:
+            user_id: ID of the user the scope belongs to
+            unrestricted: Whether the user may see all rows
+            member_ids: Additional user IDs whose rows are visible
+        """
+        self.user_id = user_id
+        self.unrestricted = unrestricted
+        self.member_ids = frozenset(member_ids or ()) | {user_id}
+
+    def __repr__(self) -> str:
+        """String representation of the AccessScope."""
+        if self.unrestricted:
+            return f"<AccessScope user {self.user_id} unrestricted>"
+        return f"<AccessScope user {self.user_id} members {sorted(self.member_ids)}>"
+
+    @property
+    def cache_key(self) -> Tuple[Any, ...]:
+        """Get a key identifying the rows visible in this scope, for caches."""
+        if self.unrestricted:
+            return ("all",)
+        return tuple(sorted(self.member_ids))
+
+    def predicate(self, model: Any) -> Optional[Any]:
+        """
+        Build the SQL predicate restricting a model to this scope.
+
+        Args:
+            model: Model class to restrict
+
+        Returns:
+            Optional[Any]: SQL expression, or None if no restriction applies
+        """
+        if self.unrestricted:
+            return None
+
+        columns = [getattr(model, name) for name in OWNERSHIP_COLUMNS if hasattr(model, name)]
+        if not columns:
+            return None
+
+        member_ids = sorted(self.member_ids)
+        if len(member_ids) == 1:
+            clauses = [column == member_ids[0] for column in columns]
+        else:
+            clauses = [column.in_(member_ids) for column in columns]
+
+        return or_(*clauses)
+
+    def apply(self, query: Query, model: Any) -> Query:
+        """
+        Restrict a query to the rows visible in this scope.
+
+        Args:
+            query: Query to restrict
+            model: Model class the query selects from
+
+        Returns:
+            Query: Restricted query
+        """
+        clause = self.predicate(model)
+        if clause is None:
+            return query
+        return query.filter(clause)
+
+    def bind(self, db: Session) -> None:
+        """
+        Bind the scope to a session for Postgres row-level security.
+
+        When SCOPED_RLS_ENABLED is set, every transaction the session begins
+        sets the transaction-local ``app.user_id`` setting read by the
+        ``get_user_id()`` function used in the RLS policies.
+
+        Args:
+            db: Database session
+        """
+        if not SCOPED_RLS_ENABLED or self.unrestricted:
+            return
+
+        db.info[RLS_USER_KEY] = self.user_id
+
+        # Apply to a transaction that is already in progress
+        if db.in_transaction():
+            db.execute(
+                text("SELECT set_config('app.user_id', :user_id, true)"),
+                {"user_id": str(self.user_id)}
+            )
+
+
+@event.listens_for(Session, "after_begin")
+def _set_rls_user(session: Session, transaction: Any, connection: Any) -> None:
+    """Set app.user_id for each new transaction of a scoped session."""
+    user_id = session.info.get(RLS_USER_KEY)
+    if user_id is not None:
+        connection.execute(
+            text("SELECT set_config('app.user_id', :user_id, true)"),
+            {"user_id": str(user_id)}
+        )
@@ -11,6 +11,7 @@ from sqlalchemy import Column, String, DateTime, Boolean
 from sqlalchemy.orm import Session
 
 from src.models.base import BaseModel
+from src.utils.database_utils import delete_batch
 from config.database import Base
 
 
@@ -75,27 +76,43 @@ class TokenBlacklistRepository:
             TokenBlacklist.is_revoked == True
         ).first() is not None
     
-    def clean_expired_tokens(self, db: Session) -> int:
+    def delete_expired_batch(self, db: Session, now: datetime, batch_size: int) -> int:
+        """
+        Delete one batch of expired blacklist entries.
+        
+        Args:
+            db: Database session
+            now: Tokens that expired before this time are deleted
+            batch_size: Maximum number of rows to delete
+            
+        Returns:
+            int: Number of rows deleted
+        """
+        table = TokenBlacklist.__table__
+        return delete_batch(db, table, table.c.expires_at < now, batch_size)
+    
+    def clean_expired_tokens(self, db: Session, batch_size: int = 1000) -> int:
         """
         Remove expired tokens from the blacklist.
         
+        Rows are deleted in bounded batches, each in its own transaction.
+        
         Args:
             db: Database session
+            batch_size: Maximum number of rows deleted per batch
             
         Returns:
             int: Number of tokens removed
         """
         now = datetime.utcnow()
-        expired_tokens = db.query(TokenBlacklist).filter(
-            TokenBlacklist.expires_at < now
-        ).all()
+        count = 0
         
-        count = len(expired_tokens)
+        while True:
+            deleted = self.delete_expired_batch(db, now, batch_size)
+            count += deleted
+            if deleted < batch_size:
+                break
         
-        for token in expired_tokens:
-            db.delete(token)
-        
-        db.commit()
         return count
 
 
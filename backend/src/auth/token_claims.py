@@ -0,0 +1,359 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Token claims module for the Sales Automation System.
+This module provides stateless access token claims and the in-memory
+security version table used to validate them.
+"""
+
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Any, Dict, List, Optional
+import hashlib
+import logging
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from src.models.user import User
+from src.auth.permissions import PERMISSION_LAYOUT_VERSION, encode_permissions
+from src.auth.token_blacklist import TokenBlacklist
+from config.settings import SECURITY_VERSION_REFRESH_SECONDS, SECURITY_VERSION_FULL_RELOAD_SECONDS
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class ClaimRole:
+    """Role of a user authenticated from token claims."""
+
+    def __init__(self, name: str):
+        """
+        Initialize the role.
+
+        Args:
+            name: Role name
+        """
+        self.name = name
+
+    def __repr__(self) -> str:
+        """String representation of the ClaimRole."""
+        return f"<ClaimRole {self.name}>"
+
+
+class TokenPrincipal:
+    """
+    User authenticated from access token claims without a database lookup.
+
+    The principal exposes the attributes authorization needs (id, roles,
+    is_active) plus the permission bitmask. Endpoints that need the full
+    user record should depend on get_current_db_user instead.
+    """
+
+    def __init__(self, user_id: int, role_names: List[str], permission_mask: int, security_version: int):
+        """
+        Initialize the principal.
+
+        Args:
+            user_id: User ID
+            role_names: Names of the user's roles
+            permission_mask: Permission bitmask
+            security_version: Security version the token was issued with
+        """
+        self.id = user_id
+        self.roles = [ClaimRole(name) for name in role_names]
+        self.permission_mask = permission_mask
+        self.security_version = security_version
+        self.is_active = True
+
+    def __repr__(self) -> str:
+        """String representation of the TokenPrincipal."""
+        return f"<TokenPrincipal user {self.id} v{self.security_version}>"
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> Optional['TokenPrincipal']:
+        """
+        Create a principal from decoded token claims.
+
+        Args:
+            payload: Decoded token payload
+
+        Returns:
+            Optional[TokenPrincipal]: Principal, or None if the token was
+            issued without stateless claims or with another permission layout
+        """
+        if "sv" not in payload or "perm" not in payload:
+            return None
+        if payload.get("pv") != PERMISSION_LAYOUT_VERSION:
+            return None
+
+        return cls(int(payload["sub"]), list(payload.get("roles", [])), int(payload["perm"]), int(payload["sv"]))
+
+
+def build_claims(user: User) -> Dict[str, Any]:
+    """
+    Build the stateless claims of a user's access token.
+
+    Args:
+        user: User
+
+    Returns:
+        Dict[str, Any]: Token claims
+    """
+    return {
+        "roles": [role.name for role in user.roles],
+        "perm": encode_permissions(
+            role_permission.permission
+            for role in user.roles
+            for role_permission in role.permissions
+        ),
+        "sv": user.security_version,
+        "pv": PERMISSION_LAYOUT_VERSION
+    }
+
+
+def _hash_token(token: str) -> str:
+    """
+    Hash an access token for the in-memory revocation set.
+
+    Args:
+        token: Token string
+
+    Returns:
+        str: Hex encoded SHA-256 hash of the token
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SecurityVersionCache:
+    """
+    In-memory table of user security versions and revoked access tokens.
+
+    Every refresh interval the table is brought up to date with the users
+    updated and the tokens revoked since the previous reload, so a reload
+    costs as much as the recent changes rather than the user count. The
+    lookback overlaps the previous reload by one refresh interval for
+    transactions that committed late. Deleted users and anything missed
+    are caught by a full reload every full reload interval. Changes made
+    in this process update the table immediately; changes made by other
+    workers become visible after the next reload.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: int = SECURITY_VERSION_REFRESH_SECONDS,
+        full_reload_seconds: int = SECURITY_VERSION_FULL_RELOAD_SECONDS
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            refresh_seconds: Maximum age of the table in seconds
+            full_reload_seconds: Seconds between full reloads of the table
+        """
+        self.refresh_seconds = refresh_seconds
+        self.full_reload_seconds = full_reload_seconds
+        self._versions: Dict[int, int] = {}
+        self._revoked: Dict[str, datetime] = {}
+        self._loaded_at: Optional[float] = None
+        self._full_loaded_at: Optional[float] = None
+        # Latest user update and token revocation times seen, where the next reload continues
+        self._users_seen: Optional[datetime] = None
+        self._tokens_seen: Optional[datetime] = None
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0, "full_reloads": 0}
+
+    def _reload_if_due(self, db: Session) -> None:
+        """
+        Reload the table if it is older than the refresh interval.
+
+        Args:
+            db: Database session
+        """
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+
+        # Invalidations wait for the lock, so they apply on top of the reloaded table
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+
+            loaded_at = time.monotonic()
+            now = datetime.utcnow()
+            full = self._full_loaded_at is None or loaded_at - self._full_loaded_at >= self.full_reload_seconds
+            overlap = timedelta(seconds=self.refresh_seconds)
+
+            users = db.query(User.id, User.security_version, User.is_active, User.updated_at)
+            tokens = db.query(TokenBlacklist.token, TokenBlacklist.expires_at, TokenBlacklist.created_at).filter(
+                TokenBlacklist.is_revoked == True,
+                TokenBlacklist.expires_at > now
+            )
+            if full:
+                users = users.filter(User.is_active == True)
+                versions: Dict[int, int] = {}
+                revoked: Dict[str, datetime] = {}
+            else:
+                if self._users_seen is not None:
+                    users = users.filter(User.updated_at >= self._users_seen - overlap)
+                if self._tokens_seen is not None:
+                    tokens = tokens.filter(TokenBlacklist.created_at >= self._tokens_seen - overlap)
+                versions = dict(self._versions)
+                revoked = {token: expires_at for token, expires_at in self._revoked.items() if expires_at > now}
+
+            user_rows = users.all()
+            token_rows = tokens.all()
+
+            for user_id, version, is_active, _ in user_rows:
+                if is_active:
+                    versions[user_id] = version
+                else:
+                    versions.pop(user_id, None)
+            for token, expires_at, _ in token_rows:
+                revoked[_hash_token(token)] = expires_at
+
+            self._users_seen = max(
+                filter(None, chain([self._users_seen], (row.updated_at for row in user_rows))), default=None
+            )
+            self._tokens_seen = max(
+                filter(None, chain([self._tokens_seen], (row.created_at for row in token_rows))), default=None
+            )
+            self._versions = versions
+            self._revoked = revoked
+            self._loaded_at = loaded_at
+            self.stats["reloads"] += 1
+            if full:
+                self._full_loaded_at = loaded_at
+                self.stats["full_reloads"] += 1
+
+        logger.debug(
+            f"Security version table {'reloaded' if full else 'updated'}: "
+            f"{len(user_rows)} users, {len(token_rows)} revoked tokens"
+        )
+
+    def get_version(self, db: Session, user_id: int) -> Optional[int]:
+        """
+        Get the security version of a user.
+
+        Args:
+            db: Database session (only used when the table is due for a reload)
+            user_id: User ID
+
+        Returns:
+            Optional[int]: Security version or None if the user is unknown
+        """
+        self._reload_if_due(db)
+        return self._versions.get(user_id)
+
+    def set_version(self, user_id: int, version: int) -> None:
+        """
+        Record the current security version of a user.
+
+        Args:
+            user_id: User ID
+            version: Security version
+        """
+        with self._lock:
+            self._versions[user_id] = version
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Forget the security version of a user so it is read from the database.
+
+        Args:
+            user_id: User ID
+        """
+        with self._lock:
+            self._versions.pop(user_id, None)
+
+    def is_revoked(self, db: Session, token: str) -> bool:
+        """
+        Check if an access token has been revoked.
+
+        Args:
+            db: Database session (only used when the table is due for a reload)
+            token: Token string
+
+        Returns:
+            bool: True if the token is revoked, False otherwise
+        """
+        self._reload_if_due(db)
+        return _hash_token(token) in self._revoked
+
+    def add_revoked(self, token: str, expires_at: datetime) -> None:
+        """
+        Record a revoked access token.
+
+        Args:
+            token: Token string
+            expires_at: Token expiration time
+        """
+        with self._lock:
+            self._revoked[_hash_token(token)] = expires_at
+
+    def validate(self, db: Session, principal: TokenPrincipal) -> bool:
+        """
+        Check if a principal's security version is current.
+
+        The database is only queried when the table has no matching
+        version for the user, e.g. after a change in another worker.
+
+        Args:
+            db: Database session
+            principal: Principal from token claims
+
+        Returns:
+            bool: True if the token's claims can be trusted, False otherwise
+        """
+        if self.get_version(db, principal.id) == principal.security_version:
+            self.stats["hits"] += 1
+            return True
+
+        self.stats["misses"] += 1
+        row = db.query(User.security_version, User.is_active).filter(User.id == principal.id).first()
+        if row is None or not row.is_active:
+            self.invalidate(principal.id)
+            return False
+
+        self.set_version(principal.id, row.security_version)
+        return row.security_version == principal.security_version
+
+
+# Create security version cache instance
+security_version_cache = SecurityVersionCache()
+
+
+# Session info key holding users whose security version changed
+_CHANGED_USERS_KEY = "security_version_changed"
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_security_version(mapper, connection, target: User) -> None:
+    """Drop the cached security version of a user whose version changed."""
+    if not inspect(target).attrs.security_version.history.has_changes():
+        return
+
+    security_version_cache.invalidate(target.id)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS_KEY, set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _forget_deleted_user(mapper, connection, target: User) -> None:
+    """Drop the cached security version of a deleted user."""
+    security_version_cache.invalidate(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_versions(session: Session) -> None:
+    """Drop cached versions again once the change is visible to other sessions."""
+    for user_id in session.info.pop(_CHANGED_USERS_KEY, ()):
+        security_version_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_versions(session: Session) -> None:
+    """Forget version changes that were rolled back."""
+    session.info.pop(_CHANGED_USERS_KEY, None)
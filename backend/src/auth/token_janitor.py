@@ -0,0 +1,207 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Token janitor module for the Sales Automation System.
+This module provides a background service that removes expired tokens.
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import (
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    TOKEN_JANITOR_INTERVAL_SECONDS,
+    TOKEN_JANITOR_BATCH_SIZE,
+    TOKEN_JANITOR_THROTTLE_MS,
+    TOKEN_PARTITION_DAYS_AHEAD
+)
+from src.auth.refresh_token import RefreshToken, refresh_token_repository
+from src.auth.token_blacklist import TokenBlacklist, token_blacklist_repository
+from src.utils.database_utils import advisory_lock
+from src.utils.partition_utils import is_partitioned, create_range_partition, drop_partitions_before
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class TokenJanitor:
+    """
+    Background service that removes expired tokens.
+
+    Expired rows are deleted in bounded batches with a pause between
+    batches so cleanup never holds long locks or saturates the database.
+    Tables that have been partitioned by expiry day are cleaned by dropping
+    whole past partitions instead, and upcoming partitions are pre-created.
+    Every worker runs the janitor, but a run only proceeds in the worker
+    holding its advisory lock.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int = TOKEN_JANITOR_INTERVAL_SECONDS,
+        batch_size: int = TOKEN_JANITOR_BATCH_SIZE,
+        throttle_ms: int = TOKEN_JANITOR_THROTTLE_MS,
+        partition_days_ahead: int = TOKEN_PARTITION_DAYS_AHEAD,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the token janitor.
+
+        Args:
+            interval_seconds: Seconds between cleanup runs
+            batch_size: Maximum number of rows deleted per batch
+            throttle_ms: Pause between batches in milliseconds
+            partition_days_ahead: Daily partitions to keep created ahead, raised
+                to the refresh token lifetime so new tokens always have a partition
+            session_factory: Factory for database sessions
+        """
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.throttle_ms = throttle_ms
+        self.partition_days_ahead = max(partition_days_ahead, REFRESH_TOKEN_EXPIRE_DAYS)
+        self.session_factory = session_factory
+        self.runs: deque = deque(maxlen=100)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._targets = [
+            (TokenBlacklist.__tablename__, token_blacklist_repository),
+            (RefreshToken.__tablename__, refresh_token_repository)
+        ]
+
+    def _clean_partitions(self, db: Session, table_name: str, now: datetime) -> Dict[str, Any]:
+        """
+        Clean a table partitioned by expiry day.
+
+        Args:
+            db: Database session
+            table_name: Table name
+            now: Current time
+
+        Returns:
+            Dict[str, Any]: Table statistics
+        """
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        created = 0
+        for offset in range(self.partition_days_ahead + 1):
+            start = today + timedelta(days=offset)
+            if create_range_partition(db, table_name, f"{table_name}_p{start:%Y%m%d}",
+                                      start, start + timedelta(days=1)):
+                created += 1
+
+        dropped = drop_partitions_before(db, table_name, today)
+
+        return {"mode": "partition", "partitions_created": created, "partitions_dropped": len(dropped)}
+
+    def _clean_batches(self, db: Session, repository: Any, now: datetime) -> Dict[str, Any]:
+        """
+        Clean an unpartitioned table in throttled batches.
+
+        Args:
+            db: Database session
+            repository: Token repository for the table
+            now: Current time
+
+        Returns:
+            Dict[str, Any]: Table statistics
+        """
+        deleted = 0
+        batches = 0
+
+        while not self._stop_event.is_set():
+            count = repository.delete_expired_batch(db, now, self.batch_size)
+            deleted += count
+            batches += 1
+            if count < self.batch_size:
+                break
+            time.sleep(self.throttle_ms / 1000)
+
+        return {"mode": "batch", "deleted": deleted, "batches": batches}
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run one cleanup pass over all token tables.
+
+        Returns:
+            Dict[str, Any]: Statistics for the run
+        """
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        stats: Dict[str, Any] = {"started_at": started_at, "tables": {}, "errors": []}
+
+        db = self.session_factory()
+        try:
+            with advisory_lock(db.get_bind(), "token_janitor") as acquired:
+                if not acquired:
+                    stats["skipped"] = True
+                    logger.debug("Token janitor run skipped: another worker holds the lock")
+                    return stats
+
+                for table_name, repository in self._targets:
+                    try:
+                        if is_partitioned(db, table_name):
+                            stats["tables"][table_name] = self._clean_partitions(db, table_name, started_at)
+                        else:
+                            stats["tables"][table_name] = self._clean_batches(db, repository, started_at)
+                    except Exception as e:
+                        db.rollback()
+                        logger.error(f"Token janitor failed on {table_name}: {str(e)}")
+                        stats["errors"].append(f"{table_name}: {str(e)}")
+        finally:
+            db.close()
+
+        stats["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.runs.append(stats)
+        logger.info(f"Token janitor run finished: {stats['tables']} in {stats['duration_ms']} ms")
+        return stats
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get statistics of the most recent runs.
+
+        Returns:
+            List[Dict[str, Any]]: Run statistics, oldest first
+        """
+        return list(self.runs)
+
+    def _run_forever(self) -> None:
+        """Run cleanup passes until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Token janitor run failed: {str(e)}")
+            self._stop_event.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the janitor in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_forever, name="token-janitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Token janitor started (every {self.interval_seconds} s)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread.
+
+        Args:
+            timeout: Seconds to wait for the current run to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Create janitor instance
+token_janitor = TokenJanitor()
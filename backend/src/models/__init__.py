@@ -7,8 +7,12 @@ This module imports and exposes all models.
 
 from src.models.base import BaseModel
 from src.models.user import User, Role, Permission, RolePermission, AuditLog
-from src.models.contact import Contact, Company, Tag, ContactActivity
-from src.models.lead import Lead, LeadActivity, Opportunity, OpportunityActivity, LeadStatus, LeadSource, OpportunityStage
+from src.models.contact import Contact, Company, Tag, ContactActivity, ContactDuplicate, DuplicateStatus
+from src.models.lead import Lead, LeadActivity, LeadScore, LeadAssignmentProfile, LeadIngestKey, StatusTransition, Opportunity, OpportunityActivity, LeadStatus, LeadSource, OpportunityStage
+from src.models.saved_search import SavedSearch, SavedSearchMember
+from src.models.import_job import ImportJob
+from src.models.task import FollowUpTask
+from src.models.encryption_key import EncryptionKey
 
 __all__ = [
     'BaseModel',
@@ -21,11 +25,22 @@ __all__ = [
     'Company',
     'Tag',
     'ContactActivity',
+    'ContactDuplicate',
+    'DuplicateStatus',
     'Lead',
     'LeadActivity',
+    'LeadScore',
+    'LeadAssignmentProfile',
+    'LeadIngestKey',
+    'StatusTransition',
     'LeadStatus',
     'LeadSource',
     'Opportunity',
     'OpportunityActivity',
-    'OpportunityStage'
+    'OpportunityStage',
+    'SavedSearch',
+    'SavedSearchMember',
+    'ImportJob',
+    'FollowUpTask',
+    'EncryptionKey'
 ]
@@ -40,10 +40,17 @@ class BaseModel(Base):
         """
         Convert model instance to dictionary.
         
+        Columns marked with info={"serialize": False} (e.g. search vectors)
+        are left out.
+        
         Returns:
             Dict[str, Any]: Dictionary representation of the model
         """
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        return {
+            c.name: getattr(self, c.name)
+            for c in self.__table__.columns
+            if c.info.get("serialize", True)
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BaseModel':
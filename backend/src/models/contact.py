@@ -5,11 +5,20 @@ Contact model module for the Sales Automation System.
 This module provides the contact management models and related functionality.
 """
 
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, Date, Text, Table
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, Date, Text, Table, Float, Enum, UniqueConstraint, event
 from sqlalchemy.orm import relationship
+import enum
 
 from src.models.base import BaseModel
 from src.models.user import User
+from src.auth.blind_index import blind_index
+from src.auth.encryption import data_encryption
+from src.utils.normalization import normalize_email, normalize_phone
+from src.utils.dedupe import dedupe_key
+from src.utils.search_utils import search_vector_column, search_vector_index, autocomplete_expression, trigram_index
+from src.utils.autocomplete import autocomplete_cache
 from config.database import Base
 
 # Many-to-many relationship between contacts and tags
@@ -27,6 +36,10 @@ class Contact(BaseModel):
     This class represents a contact in the system.
     """
     __tablename__ = 'contact'
+    __table_args__ = (search_vector_index('contact'),)
+    
+    # Text search configuration of the search vector (names aren't stemmed)
+    search_config = "simple"
     
     # Basic contact information
     first_name = Column(String(50), nullable=False)
@@ -35,6 +48,13 @@ class Contact(BaseModel):
     phone = Column(String(20), nullable=True)
     mobile = Column(String(20), nullable=True)
     
+    # Blind indexes of email and phone, computed from the plaintext on assignment
+    email_bidx = Column(String(64), index=True, nullable=True)
+    phone_bidx = Column(String(64), index=True, nullable=True)
+    
+    # Duplicate detection blocking key (email domain and phonetic last name)
+    dedupe_key = Column(String(64), index=True, nullable=True)
+    
     # Company information
     company_name = Column(String(100), nullable=True)
     job_title = Column(String(100), nullable=True)
@@ -63,8 +83,12 @@ class Contact(BaseModel):
     notes = Column(Text, nullable=True)
     source = Column(String(100), nullable=True)  # Where the contact came from
     
+    # Activity rollups, kept up to date by the activity rollup maintainer
+    activity_count = Column(Integer, default=0, nullable=False)
+    last_activity_date = Column(Date, nullable=True, index=True)
+    
     # Relationships
-    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True)
+    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     owner = relationship("User", foreign_keys=[owner_id])
     
     company_id = Column(Integer, ForeignKey('company.id'), nullable=True)
@@ -74,9 +98,14 @@ class Contact(BaseModel):
     activities = relationship("ContactActivity", back_populates="contact")
     
     # Audit information
-    created_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
     
+    # Full-text search vector, generated by the database
+    search_vector = search_vector_column(
+        "simple", ("first_name", "A"), ("last_name", "A"), ("company_name", "B"), ("email", "C")
+    )
+    
     def __repr__(self) -> str:
         """String representation of the Contact model."""
         return f"<Contact {self.first_name} {self.last_name}>"
@@ -91,6 +120,80 @@ class Contact(BaseModel):
         elif self.last_name:
             return self.last_name
         return "Unnamed Contact"
+    
+    @classmethod
+    def autocomplete_text(cls) -> Any:
+        """Get the expression matched by autocomplete (name, email and company)."""
+        return autocomplete_expression(cls.first_name, cls.last_name, cls.email, cls.company_name)
+
+
+def email_blind_index(email: Optional[str]) -> Optional[str]:
+    """
+    Compute the blind index of a contact email.
+    
+    Args:
+        email: Plaintext email
+        
+    Returns:
+        Optional[str]: Blind index or None if the email is empty
+    """
+    return blind_index.compute("contact.email", normalize_email(email))
+
+
+def phone_blind_index(phone: Optional[str]) -> Optional[str]:
+    """
+    Compute the blind index of a contact phone number.
+    
+    Args:
+        phone: Plaintext phone number
+        
+    Returns:
+        Optional[str]: Blind index or None if the number is empty
+    """
+    return blind_index.compute("contact.phone", normalize_phone(phone))
+
+
+def contact_derived_keys(
+    email: Optional[str], phone: Optional[str], last_name: Optional[str]
+) -> Dict[str, Optional[str]]:
+    """
+    Compute the blind indexes and the dedupe key of a contact.
+    
+    This is the single place these keys are derived. Email and phone may
+    be passed encrypted; they are decrypted first, so the keys are always
+    computed from the plaintext no matter which path wrote the contact.
+    
+    Args:
+        email: Email, plaintext or encrypted
+        phone: Phone number, plaintext or encrypted
+        last_name: Last name
+        
+    Returns:
+        Dict[str, Optional[str]]: email_bidx, phone_bidx and dedupe_key
+    """
+    email = data_encryption.plaintext(email)
+    phone = data_encryption.plaintext(phone)
+    return {
+        "email_bidx": email_blind_index(email),
+        "phone_bidx": phone_blind_index(phone),
+        "dedupe_key": dedupe_key(email, last_name)
+    }
+
+
+# Contact fields the derived keys are computed from
+DERIVED_KEY_SOURCES = ("email", "phone", "last_name")
+
+
+def _set_derived_keys(target: Contact, value, oldvalue, initiator) -> None:
+    """Keep the blind indexes and the dedupe key in sync with email, phone and last name."""
+    sources = {name: getattr(target, name) for name in DERIVED_KEY_SOURCES}
+    sources[initiator.key] = value
+    for column, key in contact_derived_keys(**sources).items():
+        setattr(target, column, key)
+
+
+for _source in DERIVED_KEY_SOURCES:
+    event.listen(getattr(Contact, _source), "set", _set_derived_keys)
 
 
 class Company(BaseModel):
@@ -100,6 +203,10 @@ class Company(BaseModel):
     This class represents a company in the system.
     """
     __tablename__ = 'company'
+    __table_args__ = (search_vector_index('company'),)
+    
+    # Text search configuration of the search vector
+    search_config = "simple"
     
     # Basic company information
     name = Column(String(100), nullable=False, index=True)
@@ -127,9 +234,74 @@ class Company(BaseModel):
     created_by = Column(Integer, ForeignKey('user.id'), nullable=True)
     updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
     
+    # Full-text search vector, generated by the database
+    search_vector = search_vector_column("simple", ("name", "A"), ("industry", "B"))
+    
     def __repr__(self) -> str:
         """String representation of the Company model."""
         return f"<Company {self.name}>"
+    
+    @classmethod
+    def autocomplete_text(cls) -> Any:
+        """Get the expression matched by autocomplete (name)."""
+        return autocomplete_expression(cls.name)
+
+
+# Trigram indexes serving autocomplete
+trigram_index("ix_contact_autocomplete_trgm", Contact.autocomplete_text())
+trigram_index("ix_company_autocomplete_trgm", Company.autocomplete_text())
+
+
+@event.listens_for(Contact, "after_insert")
+@event.listens_for(Contact, "after_update")
+@event.listens_for(Contact, "after_delete")
+def _invalidate_contact_autocomplete(mapper, connection, target: Contact) -> None:
+    """Drop this worker's cached contact candidates after a write."""
+    autocomplete_cache.invalidate(Contact.__tablename__)
+
+
+@event.listens_for(Company, "after_insert")
+@event.listens_for(Company, "after_update")
+@event.listens_for(Company, "after_delete")
+def _invalidate_company_autocomplete(mapper, connection, target: Company) -> None:
+    """Drop this worker's cached company candidates after a write."""
+    autocomplete_cache.invalidate(Company.__tablename__)
+
+
+class DuplicateStatus(enum.Enum):
+    """Enumeration of possible duplicate candidate statuses."""
+    PENDING = "pending"
+    DISMISSED = "dismissed"
+
+
+class ContactDuplicate(BaseModel):
+    """
+    ContactDuplicate model for the Sales Automation System.
+    
+    This class represents a pair of contacts that may be the same person,
+    found by duplicate detection and awaiting a merge or dismissal.
+    """
+    __tablename__ = 'contact_duplicate'
+    __table_args__ = (UniqueConstraint('contact_id', 'duplicate_id', name='uq_contact_duplicate_pair'),)
+    
+    # The pair is stored with the lower contact ID first
+    contact_id = Column(Integer, ForeignKey('contact.id', ondelete='CASCADE'), nullable=False, index=True)
+    duplicate_id = Column(Integer, ForeignKey('contact.id', ondelete='CASCADE'), nullable=False, index=True)
+    
+    score = Column(Float, nullable=False)
+    reasons = Column(String(100), nullable=True)  # Comma separated matching fields
+    status = Column(Enum(DuplicateStatus), default=DuplicateStatus.PENDING, nullable=False, index=True)
+    
+    # Relationships
+    contact = relationship("Contact", foreign_keys=[contact_id])
+    duplicate = relationship("Contact", foreign_keys=[duplicate_id])
+    
+    # Audit information
+    updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+    
+    def __repr__(self) -> str:
+        """String representation of the ContactDuplicate model."""
+        return f"<ContactDuplicate {self.contact_id} ~ {self.duplicate_id} ({self.score})>"
 
 
 class Tag(BaseModel):
@@ -164,7 +336,7 @@ class ContactActivity(BaseModel):
     """
     __tablename__ = 'contact_activity'
     
-    contact_id = Column(Integer, ForeignKey('contact.id'), nullable=False)
+    contact_id = Column(Integer, ForeignKey('contact.id'), nullable=False, index=True)
     activity_type = Column(String(50), nullable=False)  # call, email, meeting, note, etc.
     subject = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
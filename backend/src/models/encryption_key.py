@@ -0,0 +1,29 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Encryption key model module for the Sales Automation System.
+This module provides the model tracking the versions of encryption keys.
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, Boolean
+
+from src.models.base import BaseModel
+
+
+class EncryptionKey(BaseModel):
+    """
+    EncryptionKey model for the Sales Automation System.
+    
+    This class tracks the versions of an encryption key. Key material is
+    never stored; versions map to keys configured in the environment.
+    """
+    __tablename__ = 'encryption_key'
+    
+    key_name = Column(String(100), nullable=False, index=True)
+    key_version = Column(Integer, nullable=False)
+    rotation_date = Column(DateTime, nullable=True)
+    active = Column(Boolean, default=True, nullable=False)
+    
+    def __repr__(self) -> str:
+        """String representation of the EncryptionKey model."""
+        return f"<EncryptionKey {self.key_name} v{self.key_version}>"
@@ -0,0 +1,61 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Import job model module for the Sales Automation System.
+This module provides the model tracking CSV imports of contacts and leads.
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, DateTime, Text, JSON
+
+from src.models.base import BaseModel
+
+
+class ImportJob(BaseModel):
+    """
+    ImportJob model for the Sales Automation System.
+
+    This class represents an uploaded CSV file of contacts or leads and
+    the progress of importing it.
+    """
+    __tablename__ = 'import_job'
+
+    entity_type = Column(String(20), nullable=False)  # contact, lead
+    filename = Column(String(255), nullable=False)
+    status = Column(String(20), default="pending", nullable=False, index=True)  # pending, running, completed, failed
+
+    # Files in the import storage directory
+    file_path = Column(String(500), nullable=False, info={"serialize": False})
+    error_report_path = Column(String(500), nullable=True, info={"serialize": False})
+
+    # Progress
+    total_bytes = Column(BigInteger, default=0, nullable=False)
+    processed_bytes = Column(BigInteger, default=0, nullable=False)
+    rows_processed = Column(Integer, default=0, nullable=False)
+    rows_created = Column(Integer, default=0, nullable=False)
+    rows_updated = Column(Integer, default=0, nullable=False)
+    rows_failed = Column(Integer, default=0, nullable=False)
+    error_message = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Last sign of life of the runner importing the job; running jobs without one for a lease are failed
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # Importing user's access scope, which limits the contacts imports may update (None for unrestricted)
+    scope_member_ids = Column(JSON, nullable=True)
+
+    # Audit information
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        """String representation of the ImportJob model."""
+        return f"<ImportJob {self.filename} ({self.entity_type}, {self.status})>"
+
+    @property
+    def progress(self) -> float:
+        """Get the share of the file processed so far (0.0-1.0)."""
+        if self.status == "completed":
+            return 1.0
+        if not self.total_bytes:
+            return 0.0
+        return min(self.processed_bytes / self.total_bytes, 1.0)
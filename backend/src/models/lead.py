@@ -5,12 +5,17 @@ Lead model module for the Sales Automation System.
 This module provides the lead management models and related functionality.
 """
 
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, Date, Text, Float, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, SmallInteger, ForeignKey, Boolean, Date, DateTime, Text, Float, Enum, Index, func
+from sqlalchemy.orm import Session, relationship
+from itertools import chain
+from typing import Set
 import enum
 
 from src.models.base import BaseModel
 from src.models.contact import Contact
+from src.utils.search_utils import search_vector_column, search_vector_index
+from src.utils.analytics_cache import analytics_cache
+from src.utils.change_collector import ChangeCollector
 from config.database import Base
 
 
@@ -41,6 +46,10 @@ class Lead(BaseModel):
     This class represents a sales lead in the system.
     """
     __tablename__ = 'lead'
+    __table_args__ = (search_vector_index('lead'),)
+    
+    # Text search configuration of the search vector
+    search_config = "english"
     
     # Basic lead information
     title = Column(String(255), nullable=False)
@@ -65,19 +74,26 @@ class Lead(BaseModel):
     conversion_date = Column(Date, nullable=True)
     opportunity_id = Column(Integer, ForeignKey('opportunity.id'), nullable=True)
     
+    # Activity rollups, kept up to date by the activity rollup maintainer
+    activity_count = Column(Integer, default=0, nullable=False)
+    last_activity_date = Column(Date, nullable=True, index=True)
+    
     # Relationships
     contact_id = Column(Integer, ForeignKey('contact.id'), nullable=False)
     contact = relationship("Contact")
     
-    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True)
+    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     owner = relationship("User", foreign_keys=[owner_id])
     
     activities = relationship("LeadActivity", back_populates="lead")
     
     # Audit information
-    created_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
     
+    # Full-text search vector, generated by the database
+    search_vector = search_vector_column("english", ("title", "A"), ("description", "B"))
+    
     def __repr__(self) -> str:
         """String representation of the Lead model."""
         return f"<Lead {self.title} - {self.status.value}>"
@@ -91,7 +107,7 @@ class LeadActivity(BaseModel):
     """
     __tablename__ = 'lead_activity'
     
-    lead_id = Column(Integer, ForeignKey('lead.id'), nullable=False)
+    lead_id = Column(Integer, ForeignKey('lead.id'), nullable=False, index=True)
     activity_type = Column(String(50), nullable=False)  # call, email, meeting, note, etc.
     subject = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -110,6 +126,100 @@ class LeadActivity(BaseModel):
         return f"<LeadActivity {self.activity_type} for lead {self.lead_id}>"
 
 
+class LeadScore(Base):
+    """
+    LeadScore model for the Sales Automation System.
+    
+    This class represents an entry in the score history of a lead,
+    appended whenever a scoring run changes the lead's score.
+    """
+    __tablename__ = 'lead_scores'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lead_id = Column(Integer, ForeignKey('lead.id', ondelete='CASCADE'), nullable=False, index=True)
+    score = Column(SmallInteger, nullable=False)
+    is_qualified = Column(Boolean, nullable=False)
+    model_version = Column(String(20), nullable=False)
+    scored_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self) -> str:
+        """String representation of the LeadScore model."""
+        return f"<LeadScore {self.score} for lead {self.lead_id}>"
+
+
+class LeadIngestKey(Base):
+    """
+    LeadIngestKey model for the Sales Automation System.
+    
+    This class represents an idempotency key of an ingested lead, so a
+    retried submission doesn't create the lead twice.
+    """
+    __tablename__ = 'lead_ingest_key'
+    
+    key = Column(String(100), primary_key=True)
+    lead_id = Column(Integer, ForeignKey('lead.id', ondelete='SET NULL'), nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+    
+    def __repr__(self) -> str:
+        """String representation of the LeadIngestKey model."""
+        return f"<LeadIngestKey {self.key} for lead {self.lead_id}>"
+
+
+class StatusTransition(Base):
+    """
+    StatusTransition model for the Sales Automation System.
+    
+    This class represents an entry in the append-only status history of a
+    lead (status) or opportunity (stage). The first entry of a record has
+    no from_status and marks its creation.
+    """
+    __tablename__ = 'status_transition'
+    __table_args__ = (
+        Index('ix_status_transition_entity', 'entity_type', 'entity_id', 'transitioned_at'),
+        Index('ix_status_transition_time', 'entity_type', 'transitioned_at'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)  # lead, opportunity
+    entity_id = Column(Integer, nullable=False)
+    from_status = Column(String(30), nullable=True)
+    to_status = Column(String(30), nullable=False)
+    transitioned_at = Column(DateTime, default=func.now(), nullable=False)
+    user_id = Column(Integer, ForeignKey('user.id'), nullable=True)
+    
+    def __repr__(self) -> str:
+        """String representation of the StatusTransition model."""
+        return f"<StatusTransition {self.entity_type} {self.entity_id}: {self.from_status} -> {self.to_status}>"
+
+
+class LeadAssignmentProfile(BaseModel):
+    """
+    LeadAssignmentProfile model for the Sales Automation System.
+    
+    This class represents the lead routing settings of a sales rep:
+    territory, open-lead capacity and share weight.
+    """
+    __tablename__ = 'lead_assignment_profile'
+    
+    user_id = Column(Integer, ForeignKey('user.id', ondelete='CASCADE'), nullable=False, unique=True)
+    user = relationship("User", foreign_keys=[user_id])
+    
+    # Territory served (None for the fallback pool serving every territory)
+    territory = Column(String(50), nullable=True, index=True)
+    
+    # Maximum open leads and relative share of new leads
+    capacity = Column(Integer, nullable=False)
+    weight = Column(Float, default=1.0, nullable=False)
+    is_accepting = Column(Boolean, default=True, nullable=False)
+    
+    # Audit information
+    updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+    
+    def __repr__(self) -> str:
+        """String representation of the LeadAssignmentProfile model."""
+        return f"<LeadAssignmentProfile user {self.user_id} ({self.territory or 'any'})>"
+
+
 class OpportunityStage(enum.Enum):
     """Enumeration of possible opportunity stages."""
     PROSPECTING = "prospecting"
@@ -129,6 +239,10 @@ class Opportunity(BaseModel):
     This class represents a sales opportunity in the system.
     """
     __tablename__ = 'opportunity'
+    __table_args__ = (search_vector_index('opportunity'),)
+    
+    # Text search configuration of the search vector
+    search_config = "english"
     
     # Basic opportunity information
     name = Column(String(255), nullable=False)
@@ -150,6 +264,10 @@ class Opportunity(BaseModel):
     is_won = Column(Boolean, default=False, nullable=False)
     loss_reason = Column(String(255), nullable=True)
     
+    # Activity rollups, kept up to date by the activity rollup maintainer
+    activity_count = Column(Integer, default=0, nullable=False)
+    last_activity_date = Column(Date, nullable=True, index=True)
+    
     # Relationships
     contact_id = Column(Integer, ForeignKey('contact.id'), nullable=False)
     contact = relationship("Contact")
@@ -157,15 +275,18 @@ class Opportunity(BaseModel):
     company_id = Column(Integer, ForeignKey('company.id'), nullable=True)
     company = relationship("Company")
     
-    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True)
+    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     owner = relationship("User", foreign_keys=[owner_id])
     
     activities = relationship("OpportunityActivity", back_populates="opportunity")
     
     # Audit information
-    created_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
     
+    # Full-text search vector, generated by the database
+    search_vector = search_vector_column("english", ("name", "A"), ("description", "B"))
+    
     def __repr__(self) -> str:
         """String representation of the Opportunity model."""
         return f"<Opportunity {self.name} - {self.stage.value}>"
@@ -179,7 +300,7 @@ class OpportunityActivity(BaseModel):
     """
     __tablename__ = 'opportunity_activity'
     
-    opportunity_id = Column(Integer, ForeignKey('opportunity.id'), nullable=False)
+    opportunity_id = Column(Integer, ForeignKey('opportunity.id'), nullable=False, index=True)
     activity_type = Column(String(50), nullable=False)  # call, email, meeting, note, etc.
     subject = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -196,3 +317,20 @@ class OpportunityActivity(BaseModel):
     def __repr__(self) -> str:
         """String representation of the OpportunityActivity model."""
         return f"<OpportunityActivity {self.activity_type} for opportunity {self.opportunity_id}>"
+
+
+def _collect_analytics_tables(session: Session, tables: Set[str]) -> None:
+    """Record the lead and opportunity tables written by a flush."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Lead, Opportunity)) and (obj not in session.dirty or session.is_modified(obj)):
+            tables.add(obj.__tablename__)
+
+
+def _invalidate_analytics(tables: Set[str]) -> None:
+    """Drop this worker's cached reports of the committed tables."""
+    for table_name in tables:
+        analytics_cache.invalidate(table_name)
+
+
+# Invalidate after commit, so reports computed while the write was in flight aren't kept
+_analytics_changes = ChangeCollector("analytics_tables", _collect_analytics_tables, _invalidate_analytics, factory=set)
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from src.models.base import BaseModel
 from src.models.contact import Contact
+from src.utils.search_utils import search_vector_column, search_vector_index
 from config.database import Base
 
 
@@ -52,6 +53,10 @@ class MarketingCampaign(BaseModel):
     This class represents a marketing campaign in the system.
     """
     __tablename__ = 'marketing_campaign'
+    __table_args__ = (search_vector_index('marketing_campaign'),)
+    
+    # Text search configuration of the search vector
+    search_config = "english"
     
     # Basic campaign information
     name = Column(String(255), nullable=False)
@@ -81,7 +86,7 @@ class MarketingCampaign(BaseModel):
     utm_campaign = Column(String(100), nullable=True)
     
     # Relationships
-    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True)
+    owner_id = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     owner = relationship("User", foreign_keys=[owner_id])
     
     contacts = relationship("Contact", secondary=campaign_contacts, backref="campaigns")
@@ -89,9 +94,12 @@ class MarketingCampaign(BaseModel):
     metrics = relationship("CampaignMetric", back_populates="campaign")
     
     # Audit information
-    created_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
     updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
     
+    # Full-text search vector, generated by the database
+    search_vector = search_vector_column("english", ("name", "A"), ("description", "B"))
+    
     def __repr__(self) -> str:
         """String representation of the MarketingCampaign model."""
         return f"<MarketingCampaign {self.name} - {self.status.value}>"
@@ -0,0 +1,65 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Saved search model module for the Sales Automation System.
+This module provides the saved search (smart list) models.
+"""
+
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime, JSON
+from sqlalchemy.orm import relationship
+
+from src.models.base import BaseModel
+from config.database import Base
+
+
+class SavedSearch(BaseModel):
+    """
+    SavedSearch model for the Sales Automation System.
+
+    This class represents a saved filter over leads or contacts whose
+    matching IDs are materialized in saved_search_member.
+    """
+    __tablename__ = 'saved_search'
+
+    name = Column(String(100), nullable=False)
+    entity_type = Column(String(20), nullable=False, index=True)  # lead, contact
+    filters = Column(JSON, nullable=False)  # List of {"field", "op", "value"} conditions, all must match
+
+    # Owner's access scope when last materialized (None for unrestricted)
+    scope_member_ids = Column(JSON, nullable=True)
+
+    # Whether the filters are relative to the current date and need periodic refreshes
+    time_dependent = Column(Boolean, default=False, nullable=False)
+
+    # Materialization state
+    result_count = Column(Integer, default=0, nullable=False)
+    refreshed_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    owner_id = Column(Integer, ForeignKey('user.id'), nullable=False, index=True)
+    owner = relationship("User", foreign_keys=[owner_id])
+
+    # Audit information
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+    updated_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+
+    def __repr__(self) -> str:
+        """String representation of the SavedSearch model."""
+        return f"<SavedSearch {self.name} ({self.entity_type})>"
+
+
+class SavedSearchMember(Base):
+    """
+    SavedSearchMember model for the Sales Automation System.
+
+    This class represents one entity ID in the materialized result set of
+    a saved search.
+    """
+    __tablename__ = 'saved_search_member'
+
+    saved_search_id = Column(Integer, ForeignKey('saved_search.id', ondelete='CASCADE'), primary_key=True)
+    entity_id = Column(Integer, primary_key=True)
+
+    def __repr__(self) -> str:
+        """String representation of the SavedSearchMember model."""
+        return f"<SavedSearchMember {self.saved_search_id}:{self.entity_id}>"
@@ -0,0 +1,48 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Task model module for the Sales Automation System.
+This module provides the follow-up task model.
+"""
+
+from sqlalchemy import Column, String, Integer, ForeignKey, Date, DateTime, Index, text
+
+from src.models.base import BaseModel
+
+
+class FollowUpTask(BaseModel):
+    """
+    FollowUpTask model for the Sales Automation System.
+
+    This class represents a reminder for a user to follow up on a lead,
+    contact or opportunity, e.g. one that has aged past its SLA without
+    any activity.
+    """
+    __tablename__ = 'follow_up_task'
+    __table_args__ = (
+        Index('ix_follow_up_task_entity', 'entity_type', 'entity_id', 'status'),
+        # At most one open SLA task per record, whichever worker creates it
+        Index(
+            'uq_follow_up_task_open_sla', 'entity_type', 'entity_id', unique=True,
+            postgresql_where=text("status = 'open' AND reason = 'sla'"),
+            sqlite_where=text("status = 'open' AND reason = 'sla'")
+        ),
+    )
+
+    entity_type = Column(String(20), nullable=False)  # lead, contact, opportunity
+    entity_id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=False)
+    reason = Column(String(50), nullable=False)  # sla, manual
+    due_date = Column(Date, nullable=False)
+    status = Column(String(20), default="open", nullable=False)  # open, done
+
+    # Assignment
+    assignee_id = Column(Integer, ForeignKey('user.id'), nullable=True, index=True)
+
+    # Completion
+    completed_at = Column(DateTime, nullable=True)
+    completed_by = Column(Integer, ForeignKey('user.id'), nullable=True)
+
+    def __repr__(self) -> str:
+        """String representation of the FollowUpTask model."""
+        return f"<FollowUpTask {self.title} ({self.entity_type} {self.entity_id}, {self.status})>"
@@ -7,7 +7,7 @@ This module provides the user model and related functionality.
 
 from typing import Optional
 import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Table
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Table, Index, event, inspect
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -30,6 +30,8 @@ class User(BaseModel):
     and authorization information.
     """
     __tablename__ = 'user'
+    # Serves the security version table's reloads of recently changed users
+    __table_args__ = (Index('ix_user_updated_at', 'updated_at'),)
     
     # User identification and authentication
     username = Column(String(50), unique=True, index=True, nullable=False)
@@ -56,6 +58,10 @@ class User(BaseModel):
     login_attempts = Column(Integer, default=0, nullable=False)
     locked_until = Column(DateTime, nullable=True)
     
+    # Incremented whenever credentials, status or roles change, which
+    # invalidates access tokens issued with an older version
+    security_version = Column(Integer, default=1, server_default="1", nullable=False)
+    
     # Relationships
     roles = relationship("Role", secondary=user_roles, back_populates="users")
     
@@ -103,6 +109,18 @@ class User(BaseModel):
         self.reset_login_attempts()
 
 
+# User attributes whose changes invalidate issued access tokens
+SECURITY_ATTRIBUTES = ("hashed_password", "is_active", "roles")
+
+
+@event.listens_for(User, "before_update")
+def _bump_security_version(mapper, connection, target: User) -> None:
+    """Increment the security version when a security attribute changes."""
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in SECURITY_ATTRIBUTES):
+        target.security_version = (target.security_version or 0) + 1
+
+
 class Role(BaseModel):
     """
     Role model for the Sales Automation System.
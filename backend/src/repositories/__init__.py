@@ -8,7 +8,17 @@ This module imports and exposes all repositories.
 from src.repositories.base import BaseRepository
 from src.repositories.user_repository import UserRepository, RoleRepository, PermissionRepository, AuditLogRepository
 from src.repositories.contact_repository import ContactRepository, CompanyRepository, TagRepository, ContactActivityRepository
-from src.repositories.lead_repository import LeadRepository, LeadActivityRepository, OpportunityRepository, OpportunityActivityRepository
+from src.repositories.lead_repository import LeadActivityRepository, OpportunityActivityRepository
+from src.repositories.lead_repository import lead_repository, opportunity_repository
+from src.repositories.contact_repository import contact_duplicate_repository
+from src.repositories.search_repository import global_search_repository
+from src.repositories.saved_search_repository import saved_search_repository
+from src.repositories.assignment_repository import lead_assignment_profile_repository, lead_assignment_engine
+from src.repositories.ingestion_repository import lead_ingestion_pipeline
+from src.repositories.import_repository import import_job_repository, import_job_runner
+from src.repositories.activity_repository import activity_rollup_maintainer
+from src.repositories.sla_repository import follow_up_task_repository, sla_monitor
+from src.repositories.transition_repository import status_analytics_repository
 
 # Create repository instances
 user_repository = UserRepository()
@@ -21,9 +31,7 @@ company_repository = CompanyRepository()
 tag_repository = TagRepository()
 contact_activity_repository = ContactActivityRepository()
 
-lead_repository = LeadRepository()
 lead_activity_repository = LeadActivityRepository()
-opportunity_repository = OpportunityRepository()
 opportunity_activity_repository = OpportunityActivityRepository()
 
 __all__ = [
@@ -39,5 +47,17 @@ __all__ = [
     'lead_repository',
     'lead_activity_repository',
     'opportunity_repository',
-    'opportunity_activity_repository'
+    'opportunity_activity_repository',
+    'contact_duplicate_repository',
+    'global_search_repository',
+    'saved_search_repository',
+    'lead_assignment_profile_repository',
+    'lead_assignment_engine',
+    'lead_ingestion_pipeline',
+    'import_job_repository',
+    'import_job_runner',
+    'activity_rollup_maintainer',
+    'follow_up_task_repository',
+    'sla_monitor',
+    'status_analytics_repository'
 ]
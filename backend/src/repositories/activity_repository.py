@@ -0,0 +1,218 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Activity rollup repository module for the Sales Automation System.
+This module keeps the activity counts and latest activity dates of leads,
+contacts and opportunities up to date.
+"""
+
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Set
+import logging
+
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import ACTIVITY_ROLLUP_FLUSH_INTERVAL_MS, ACTIVITY_ROLLUP_BATCH_SIZE
+from src.models.contact import Contact, ContactActivity
+from src.models.lead import Lead, LeadActivity, Opportunity, OpportunityActivity
+from src.repositories.saved_search_repository import saved_search_maintainer
+from src.utils.change_collector import ChangeCollector, ChangeMaintainer, merge_changes
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Rolled-up entity types: entity model, activity model and the activity's entity ID attribute
+ROLLUP_ENTITIES = {
+    "lead": (Lead, LeadActivity, "lead_id"),
+    "contact": (Contact, ContactActivity, "contact_id"),
+    "opportunity": (Opportunity, OpportunityActivity, "opportunity_id")
+}
+
+# Activity model to entity type
+ROLLUP_SOURCES = {activity_model: entity_type for entity_type, (_, activity_model, _) in ROLLUP_ENTITIES.items()}
+
+# Entity types whose rollups feed saved searches
+SAVED_SEARCH_TYPES = ("lead", "contact")
+
+
+def refresh_rollups(db: Session, entity_type: str, entity_ids: Iterable[int]) -> int:
+    """
+    Recompute the activity rollups of entities with one set-based UPDATE.
+
+    The counts and dates are recomputed from the activities rather than
+    incremented, so updated, moved and deleted activities are handled
+    the same way as new ones and repeated refreshes are harmless. The
+    entities' updated_at is left as is. The caller commits.
+
+    Args:
+        db: Database session
+        entity_type: Entity type (lead, contact or opportunity)
+        entity_ids: Entity IDs
+
+    Returns:
+        int: Number of updated entities
+    """
+    model, activity_model, attribute = ROLLUP_ENTITIES[entity_type]
+    foreign_key = getattr(activity_model, attribute)
+
+    result = db.execute(
+        update(model)
+        .where(model.id.in_(list(entity_ids)))
+        .values(
+            activity_count=select(func.count(activity_model.id)).where(foreign_key == model.id).scalar_subquery(),
+            last_activity_date=select(func.max(activity_model.date)).where(foreign_key == model.id).scalar_subquery(),
+            updated_at=model.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+class ActivityRollupMaintainer(ChangeMaintainer):
+    """
+    Background service that keeps the activity rollup columns up to date.
+
+    Committed transactions report the leads, contacts and opportunities
+    whose activities they added, changed or deleted. The IDs are collected
+    and their rollups recomputed in one statement per entity type and
+    batch each flush interval, instead of per activity row. Refreshed
+    leads and contacts are then handed to the saved search maintainer,
+    since searches may filter on last_activity_date. While the service
+    isn't running, rollups are refreshed right after each commit.
+    """
+
+    def __init__(
+        self,
+        flush_interval_ms: int = ACTIVITY_ROLLUP_FLUSH_INTERVAL_MS,
+        batch_size: int = ACTIVITY_ROLLUP_BATCH_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the maintainer.
+
+        Args:
+            flush_interval_ms: Milliseconds between batches
+            batch_size: Maximum entities per UPDATE statement
+            session_factory: Factory for database sessions
+        """
+        super().__init__("Activity rollup maintainer")
+        self.flush_interval_ms = flush_interval_ms
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._pending: Dict[str, Set[int]] = {}
+
+    @property
+    def interval_seconds(self) -> float:
+        """Seconds between batches."""
+        return self.flush_interval_ms / 1000
+
+    def enqueue(self, changes: Dict[str, Set[int]]) -> None:
+        """
+        Queue entities whose activities changed.
+
+        Args:
+            changes: Entity IDs by entity type
+        """
+        with self._lock:
+            merge_changes(self._pending, changes)
+
+        self._apply_if_stopped()
+
+    def flush(self) -> int:
+        """
+        Refresh the rollups of the queued entities.
+
+        Returns:
+            int: Number of refreshed entities
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        refreshed = 0
+        db = self.session_factory()
+        try:
+            for entity_type, entity_ids in pending.items():
+                ids = sorted(entity_ids)
+                for start in range(0, len(ids), self.batch_size):
+                    refreshed += refresh_rollups(db, entity_type, ids[start:start + self.batch_size])
+                db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error refreshing activity rollups: {str(e)}")
+            # Retry with the next flush
+            with self._lock:
+                merge_changes(self._pending, pending)
+            return 0
+        finally:
+            db.close()
+
+        saved_search_maintainer.enqueue({
+            entity_type: entity_ids for entity_type, entity_ids in pending.items() if entity_type in SAVED_SEARCH_TYPES
+        })
+        return refreshed
+
+    def backfill(self, db: Session, entity_type: str) -> int:
+        """
+        Recompute the rollups of all entities of a type in ID batches.
+
+        Args:
+            db: Database session
+            entity_type: Entity type (lead, contact or opportunity)
+
+        Returns:
+            int: Number of refreshed entities
+        """
+        model = ROLLUP_ENTITIES[entity_type][0]
+        refreshed = 0
+        last_id = 0
+
+        while True:
+            ids = list(db.execute(
+                select(model.id).where(model.id > last_id).order_by(model.id).limit(self.batch_size)
+            ).scalars())
+            if not ids:
+                return refreshed
+
+            try:
+                refreshed += refresh_rollups(db, entity_type, ids)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Error backfilling {entity_type} activity rollups: {str(e)}")
+                raise
+
+            last_id = ids[-1]
+            logger.info(f"Backfilled {entity_type} activity rollups up to ID {last_id}")
+
+
+# Create activity rollup maintainer instance
+activity_rollup_maintainer = ActivityRollupMaintainer()
+
+
+def _previous_values(obj: Any, attribute: str) -> Iterable[Any]:
+    """Get the values an attribute had before the current flush."""
+    return inspect(obj).attrs[attribute].history.deleted or ()
+
+
+def _collect_rollup_changes(session: Session, changes: Dict[str, Set[int]]) -> None:
+    """Record the entities whose activities a flush added, changed or deleted."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        entity_type = ROLLUP_SOURCES.get(type(obj))
+        if entity_type is None or (obj in session.dirty and not session.is_modified(obj)):
+            continue
+
+        attribute = ROLLUP_ENTITIES[entity_type][2]
+        changed = changes.setdefault(entity_type, set())
+        # An activity moved to another entity changes both
+        for entity_id in chain([getattr(obj, attribute)], _previous_values(obj, attribute)):
+            if entity_id is not None:
+                changed.add(entity_id)
+
+
+# Hand the entities whose activities a transaction changed to the maintainer once it commits
+_rollup_changes = ChangeCollector("activity_rollup_changes", _collect_rollup_changes, activity_rollup_maintainer.enqueue)
@@ -0,0 +1,463 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Lead assignment repository module for the Sales Automation System.
+This module provides the routing of new leads to sales reps by territory,
+capacity and round-robin fairness.
+"""
+
+from collections import deque
+from itertools import chain
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+import heapq
+import logging
+import threading
+import time
+
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.settings import LEAD_ASSIGNMENT_DEFAULT_CAPACITY, LEAD_ASSIGNMENT_REBUILD_SECONDS
+from src.models.contact import Contact
+from src.models.lead import Lead, LeadAssignmentProfile, LeadStatus
+from src.models.user import User
+from src.repositories.base import BaseRepository
+from src.repositories.saved_search_repository import saved_search_maintainer
+from src.utils.change_collector import ChangeCollector
+from src.utils.database_utils import advisory_xact_lock
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Statuses of leads counted against a rep's capacity
+OPEN_LEAD_STATUSES = (LeadStatus.NEW, LeadStatus.CONTACTED, LeadStatus.QUALIFIED)
+
+# Assignment latency samples kept for the metrics
+LATENCY_SAMPLES = 1000
+
+
+def normalize_territory(territory: Optional[str]) -> Optional[str]:
+    """
+    Normalize a territory name for matching.
+
+    Args:
+        territory: Territory (e.g. a country)
+
+    Returns:
+        Optional[str]: Upper-case territory or None if empty
+    """
+    territory = (territory or "").strip().upper()
+    return territory or None
+
+
+class _RepLoad:
+    """Routing state of one sales rep."""
+
+    __slots__ = ("user_id", "territory", "capacity", "weight", "open_count", "last_assigned", "version")
+
+    def __init__(self, user_id: int, territory: Optional[str], capacity: int, weight: float, open_count: int):
+        self.user_id = user_id
+        self.territory = territory
+        self.capacity = capacity
+        self.weight = weight if weight > 0 else 1.0
+        self.open_count = open_count
+        self.last_assigned = 0
+        self.version = 0
+
+    @property
+    def utilization(self) -> float:
+        """Share of the capacity in use."""
+        return self.open_count / self.capacity if self.capacity else 1.0
+
+
+class LeadAssignmentProfileRepository(BaseRepository[LeadAssignmentProfile]):
+    """Repository for LeadAssignmentProfile model operations."""
+
+    def __init__(self):
+        super().__init__(LeadAssignmentProfile)
+
+    def get_by_user(self, db: Session, user_id: int) -> Optional[LeadAssignmentProfile]:
+        """
+        Get the assignment profile of a user.
+
+        Args:
+            db: Database session
+            user_id: User ID
+
+        Returns:
+            Optional[LeadAssignmentProfile]: Profile or None
+        """
+        return self._query(db).filter(LeadAssignmentProfile.user_id == user_id).first()
+
+    def upsert(self, db: Session, user_id: int, data: Dict[str, Any]) -> LeadAssignmentProfile:
+        """
+        Create or update the assignment profile of a user.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            data: Profile fields (territory, capacity, weight, is_accepting, updated_by)
+
+        Returns:
+            LeadAssignmentProfile: Saved profile
+        """
+        fields = {key: data[key] for key in ("territory", "capacity", "weight", "is_accepting", "updated_by") if key in data}
+        if "territory" in fields:
+            fields["territory"] = normalize_territory(fields["territory"])
+
+        profile = self.get_by_user(db, user_id)
+        if profile is None:
+            fields.setdefault("capacity", LEAD_ASSIGNMENT_DEFAULT_CAPACITY)
+            profile = self.create(db, {"user_id": user_id, **fields})
+        else:
+            profile = self.update(db, db_obj=profile, obj_in=fields)
+
+        lead_assignment_engine.invalidate()
+        return profile
+
+
+class LeadAssignmentEngine:
+    """
+    In-memory router assigning leads to sales reps.
+
+    Each territory has a min-heap of its accepting reps keyed by weighted
+    load (open leads / weight) and then by the time of their last
+    assignment, so reps with equal load take turns. Reps at capacity are
+    left out of the heaps until their load drops. Picking a rep is a heap
+    pop and push, O(log n). Leads are routed to their territory's reps
+    first and then to the fallback pool of reps without a territory.
+
+    Loads are rebuilt from open-lead counts at first use and every
+    LEAD_ASSIGNMENT_REBUILD_SECONDS, and updated in between when
+    committed transactions open, close or reassign leads. Heap entries
+    are invalidated lazily with a per-rep version number.
+
+    The engine is per worker and only sees its own worker's commits, so
+    capacity is enforced in the database: assignments are serialized
+    across workers with a transaction advisory lock, and the picked reps'
+    open leads are counted in SQL before writing. Reps found at capacity
+    get their load corrected and their leads are picked again.
+    """
+
+    def __init__(self, rebuild_seconds: int = LEAD_ASSIGNMENT_REBUILD_SECONDS):
+        """
+        Initialize the engine.
+
+        Args:
+            rebuild_seconds: Seconds after which the loads are rebuilt from the database
+        """
+        self.rebuild_seconds = rebuild_seconds
+        self._reps: Dict[int, _RepLoad] = {}
+        self._heaps: Dict[Optional[str], List[Tuple[float, int, int, int]]] = {}
+        self._sequence = 0
+        self._built_at: Optional[float] = None
+        self._lock = threading.RLock()
+        self._latencies_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.metrics = {
+            "assigned": 0,
+            "fallback_assigned": 0,
+            "unassigned": 0,
+            "rebuilds": 0
+        }
+
+    def invalidate(self) -> None:
+        """Rebuild the loads before the next assignment (e.g. after a profile changed)."""
+        with self._lock:
+            self._built_at = None
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Rebuild the rep loads from the profiles and open-lead counts.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of accepting reps
+        """
+        open_counts = select(Lead.owner_id, func.count().label("open_count")).where(
+            Lead.status.in_(OPEN_LEAD_STATUSES), Lead.owner_id.isnot(None)
+        ).group_by(Lead.owner_id).subquery()
+
+        rows = db.execute(
+            select(
+                LeadAssignmentProfile.user_id,
+                LeadAssignmentProfile.territory,
+                LeadAssignmentProfile.capacity,
+                LeadAssignmentProfile.weight,
+                func.coalesce(open_counts.c.open_count, 0)
+            )
+            .join(User, User.id == LeadAssignmentProfile.user_id)
+            .outerjoin(open_counts, open_counts.c.owner_id == LeadAssignmentProfile.user_id)
+            .where(
+                LeadAssignmentProfile.is_accepting.is_(True),
+                LeadAssignmentProfile.is_active.is_(True),
+                User.is_active.is_(True)
+            )
+        ).all()
+
+        with self._lock:
+            previous = self._reps
+            self._reps = {}
+            self._heaps = {}
+            for user_id, territory, capacity, weight, open_count in rows:
+                rep = _RepLoad(user_id, normalize_territory(territory), capacity, weight, open_count)
+                # Keep the round-robin order across rebuilds
+                if user_id in previous:
+                    rep.last_assigned = previous[user_id].last_assigned
+                self._reps[user_id] = rep
+                self._push(rep)
+            self._built_at = time.monotonic()
+            self.metrics["rebuilds"] += 1
+
+        logger.info(f"Lead assignment loads rebuilt for {len(rows)} reps")
+        return len(rows)
+
+    def _ensure_built(self, db: Session) -> None:
+        """Rebuild the loads if they were never built or are due for a rebuild."""
+        with self._lock:
+            built_at = self._built_at
+        if built_at is None or time.monotonic() - built_at >= self.rebuild_seconds:
+            self.rebuild(db)
+
+    def _push(self, rep: _RepLoad) -> None:
+        """Push the current state of a rep, invalidating its older heap entries."""
+        rep.version += 1
+        if rep.open_count < rep.capacity:
+            heapq.heappush(
+                self._heaps.setdefault(rep.territory, []),
+                (rep.open_count / rep.weight, rep.last_assigned, rep.user_id, rep.version)
+            )
+
+    def _pick(self, territory: Optional[str]) -> Optional[_RepLoad]:
+        """
+        Take the least loaded rep of a territory, falling back to the territory-less pool.
+
+        Args:
+            territory: Normalized territory
+
+        Returns:
+            Optional[_RepLoad]: Rep with its load already increased, or None if all are full
+        """
+        for key in dict.fromkeys((territory, None)):
+            heap = self._heaps.get(key)
+            while heap:
+                _, _, user_id, version = heapq.heappop(heap)
+                rep = self._reps.get(user_id)
+                if rep is None or rep.version != version:
+                    continue
+
+                self._sequence += 1
+                rep.open_count += 1
+                rep.last_assigned = self._sequence
+                self._push(rep)
+                return rep
+        return None
+
+    def adjust(self, deltas: Dict[int, int]) -> None:
+        """
+        Apply committed changes to the open-lead counts of reps.
+
+        Args:
+            deltas: Open-lead count change by user ID
+        """
+        with self._lock:
+            for user_id, delta in deltas.items():
+                rep = self._reps.get(user_id)
+                if rep is not None and delta:
+                    rep.open_count = max(rep.open_count + delta, 0)
+                    self._push(rep)
+
+    def _open_counts(self, db: Session, user_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Count the open leads of reps in the database.
+
+        Args:
+            db: Database session
+            user_ids: User IDs of the reps
+
+        Returns:
+            Dict[int, int]: Open-lead count by user ID (reps without open leads are left out)
+        """
+        return dict(db.execute(
+            select(Lead.owner_id, func.count())
+            .where(Lead.owner_id.in_(list(user_ids)), Lead.status.in_(OPEN_LEAD_STATUSES))
+            .group_by(Lead.owner_id)
+        ).all())
+
+    def assign(self, db: Session, lead_ids: Iterable[int], territory: Optional[str] = None) -> Dict[int, Optional[int]]:
+        """
+        Assign open leads to reps in one transaction.
+
+        Args:
+            db: Database session
+            lead_ids: IDs of the leads to assign
+            territory: Territory of all leads (defaults to each contact's country)
+
+        Returns:
+            Dict[int, Optional[int]]: Assigned owner ID by lead ID (None when
+            no rep had capacity); closed or missing leads are left out
+        """
+        started = time.perf_counter()
+        self._ensure_built(db)
+        lead_ids = sorted(set(lead_ids))
+
+        assignments: Dict[int, Optional[int]] = {}
+        by_owner: Dict[int, List[int]] = {}
+        released: Dict[int, int] = {}
+        fallback = 0
+        kept: Dict[int, int] = {}  # Leads given to each rep so far, not yet in the counts
+        try:
+            # Serialize with assignments in other workers until the commit
+            advisory_xact_lock(db, "lead_assignment")
+            rows = db.execute(
+                select(Lead.id, Lead.owner_id, Contact.country)
+                .join(Contact, Contact.id == Lead.contact_id)
+                .where(Lead.id.in_(lead_ids), Lead.status.in_(OPEN_LEAD_STATUSES))
+            ).all() if lead_ids else []
+
+            while rows:
+                with self._lock:
+                    picks = []
+                    for lead_id, previous_owner, country in rows:
+                        lead_territory = normalize_territory(territory or country)
+                        rep = self._pick(lead_territory)
+                        assignments[lead_id] = rep.user_id if rep is not None else None
+                        if rep is not None:
+                            picks.append(((lead_id, previous_owner, country), lead_territory, rep))
+                if not picks:
+                    break
+
+                open_counts = self._open_counts(db, {rep.user_id for _, _, rep in picks})
+                rows = []
+                with self._lock:
+                    for row, lead_territory, rep in picks:
+                        lead_id, previous_owner, _ = row
+                        if open_counts.get(rep.user_id, 0) + kept.get(rep.user_id, 0) >= rep.capacity:
+                            rows.append(row)
+                            continue
+                        kept[rep.user_id] = kept.get(rep.user_id, 0) + 1
+                        by_owner.setdefault(rep.user_id, []).append(lead_id)
+                        if rep.territory != lead_territory:
+                            fallback += 1
+                        if previous_owner is not None:
+                            released[previous_owner] = released.get(previous_owner, 0) - 1
+                    # Correct the loads with the leads other workers assigned
+                    for rep in {rep.user_id: rep for _, _, rep in picks}.values():
+                        rep.open_count = open_counts.get(rep.user_id, 0) + kept.get(rep.user_id, 0)
+                        self._push(rep)
+
+            # One statement per rep, bypassing the flush so the loads aren't counted twice
+            for owner_id, owned_ids in by_owner.items():
+                db.execute(
+                    update(Lead).where(Lead.id.in_(owned_ids)).values(owner_id=owner_id, updated_at=func.now()),
+                    execution_options={"synchronize_session": False}
+                )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            self.invalidate()
+            logger.error(f"Error assigning {len(assignments)} leads: {str(e)}")
+            raise
+
+        self.adjust(released)
+        assigned = sum(len(owned_ids) for owned_ids in by_owner.values())
+        if assigned:
+            saved_search_maintainer.enqueue({"lead": set(chain.from_iterable(by_owner.values()))})
+
+        with self._lock:
+            self.metrics["assigned"] += assigned
+            self.metrics["fallback_assigned"] += fallback
+            self.metrics["unassigned"] += len(assignments) - assigned
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+
+        return assignments
+
+    def get_loads(self) -> List[Dict[str, Any]]:
+        """
+        Get the current loads of the accepting reps.
+
+        Returns:
+            List[Dict[str, Any]]: User ID, territory, capacity, weight, open leads and utilization
+        """
+        with self._lock:
+            return [
+                {
+                    "user_id": rep.user_id,
+                    "territory": rep.territory,
+                    "capacity": rep.capacity,
+                    "weight": rep.weight,
+                    "open_leads": rep.open_count,
+                    "utilization": round(rep.utilization, 4)
+                }
+                for rep in sorted(self._reps.values(), key=lambda rep: rep.user_id)
+            ]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get assignment metrics.
+
+        Returns:
+            Dict[str, Any]: Counters, assignment call latency percentiles in
+            milliseconds and fairness of the weighted loads (Jain's index,
+            1.0 when all reps carry the same load per weight)
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            latencies = sorted(self._latencies_ms)
+            loads = [rep.open_count / rep.weight for rep in self._reps.values()]
+            utilizations = [rep.utilization for rep in self._reps.values()]
+            full = sum(1 for rep in self._reps.values() if rep.open_count >= rep.capacity)
+
+        def percentile(fraction: float) -> float:
+            return round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)], 3) if latencies else 0.0
+
+        squares = sum(load * load for load in loads)
+        metrics.update({
+            "reps": len(loads),
+            "reps_at_capacity": full,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1], 3) if latencies else 0.0,
+            "fairness_index": round(sum(loads) ** 2 / (len(loads) * squares), 4) if squares else 1.0,
+            "min_utilization": round(min(utilizations), 4) if utilizations else 0.0,
+            "max_utilization": round(max(utilizations), 4) if utilizations else 0.0
+        })
+        return metrics
+
+
+# Create lead assignment repository and engine instances
+lead_assignment_profile_repository = LeadAssignmentProfileRepository()
+lead_assignment_engine = LeadAssignmentEngine()
+
+
+def _previous_value(obj: Any, field: str) -> Any:
+    """Get the value of an attribute before the current flush."""
+    history = inspect(obj).attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(obj, field)
+
+
+def _collect_load_changes(session: Session, changes: Dict[int, int]) -> None:
+    """Record the open-lead count changes of the reps caused by a flush."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, Lead):
+            continue
+
+        deltas = {}
+        if obj not in session.new:
+            owner_id = _previous_value(obj, "owner_id")
+            if owner_id is not None and _previous_value(obj, "status") in OPEN_LEAD_STATUSES:
+                deltas[owner_id] = deltas.get(owner_id, 0) - 1
+        if obj not in session.deleted and obj.owner_id is not None and obj.status in OPEN_LEAD_STATUSES:
+            deltas[obj.owner_id] = deltas.get(obj.owner_id, 0) + 1
+
+        for owner_id, delta in deltas.items():
+            if delta:
+                changes[owner_id] = changes.get(owner_id, 0) + delta
+
+
+# Apply the open-lead count changes of a transaction to the engine once it commits
+_load_changes = ChangeCollector("lead_assignment_load_changes", _collect_load_changes, lead_assignment_engine.adjust)
@@ -5,13 +5,23 @@ Base repository module for the Sales Automation System.
 This module provides the base repository class for all repositories in the system.
 """
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+from sqlalchemy import func, null
+from sqlalchemy.orm import Query, Session
 from sqlalchemy.exc import SQLAlchemyError
+import copy
 import logging
 
 from src.models.base import BaseModel
+from src.auth.scoping import AccessScope
+from src.auth.audit_diff import capture_changes
+from src.auth.audit_logging import audit_logger
 from src.utils.database_utils import db_session
+from src.utils.search_utils import HEADLINE_OPTIONS, prefix_tsquery, escape_like
+from src.utils.autocomplete import autocomplete_cache, normalize_autocomplete_text, match_similarity
+from src.utils.inverted_index import search_engine, tokenize, highlight
+from config.settings import AUDIT_CAPTURE_CHANGES, AUTOCOMPLETE_MIN_LENGTH, AUTOCOMPLETE_CANDIDATES
 
 # Define a type variable for the model
 T = TypeVar('T', bound=BaseModel)
@@ -24,8 +34,28 @@ class BaseRepository(Generic[T]):
     Base repository class for all repositories in the system.
     
     This class provides common CRUD operations for all repositories.
+    A repository bound to an AccessScope via ``scoped`` restricts every
+    query it issues to the rows visible in that scope. Updates record the
+    changed fields with their old and new values in the audit log.
+    With the in-process search engine enabled, committed writes keep the
+    model's inverted index current and searches are served from it.
     """
     
+    # Columns left out of audit diffs
+    audit_exclude_fields = ("updated_at", "updated_by")
+    
+    # Columns whose values are never written to audit diffs
+    audit_redact_fields = ()
+    
+    # Columns highlighted in full-text search snippets
+    snippet_fields: Sequence[str] = ()
+    
+    # Columns returned with autocomplete suggestions
+    autocomplete_fields: Sequence[str] = ()
+    
+    # Columns indexed by the in-process search engine, with their weights
+    search_index_fields: Dict[str, int] = {}
+    
     def __init__(self, model: Type[T]):
         """
         Initialize the repository with the model class.
@@ -34,6 +64,39 @@ class BaseRepository(Generic[T]):
             model: The model class this repository handles
         """
         self.model = model
+        self.scope: Optional[AccessScope] = None
+        if self.search_index_fields and search_engine.enabled:
+            search_engine.register(model.__tablename__, self.search_index_fields)
+    
+    def scoped(self, scope: Optional[AccessScope]) -> 'BaseRepository[T]':
+        """
+        Get a copy of this repository restricted to an access scope.
+        
+        Args:
+            scope: Access scope to apply (None for unscoped access)
+            
+        Returns:
+            BaseRepository[T]: Scoped repository
+        """
+        repository = copy.copy(self)
+        repository.scope = scope
+        return repository
+    
+    def _query(self, db: Session, *entities: Any) -> Query:
+        """
+        Start a query on the model with the repository scope applied.
+        
+        Args:
+            db: Database session
+            entities: Entities to select (defaults to the model)
+            
+        Returns:
+            Query: Scoped query
+        """
+        query = db.query(*(entities or (self.model,)))
+        if self.scope is not None:
+            query = self.scope.apply(query, self.model)
+        return query
     
     def create(self, db: Session, obj_in: Union[Dict[str, Any], BaseModel]) -> T:
         """
@@ -56,6 +119,7 @@ class BaseRepository(Generic[T]):
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            search_engine.add_object(db_obj)
             return db_obj
         except SQLAlchemyError as e:
             db.rollback()
@@ -73,7 +137,7 @@ class BaseRepository(Generic[T]):
         Returns:
             Optional[T]: Found object or None
         """
-        return db.query(self.model).filter(self.model.id == id).first()
+        return self._query(db).filter(self.model.id == id).first()
     
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
@@ -89,18 +153,207 @@ class BaseRepository(Generic[T]):
         Returns:
             List[T]: List of objects
         """
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self._query(db).order_by(self.model.id).offset(skip).limit(limit).all()
+    
+    def full_text_search(
+        self, db: Session, query: str, skip: int = 0, limit: int = 100, normalization: int = 0
+    ) -> List[Tuple[T, float, Optional[str]]]:
+        """
+        Search records through the model's GIN-indexed search vector.
+        
+        Every term of the query matches as a prefix and all terms must
+        match. Results are ordered by ts_rank; snippets are only built for
+        the returned page.
+        
+        Args:
+            db: Database session
+            query: Search text
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            normalization: ts_rank normalization flags (e.g. 32 scales ranks to 0..1)
+            
+        Returns:
+            List[Tuple[T, float, Optional[str]]]: Records with their rank and
+            highlighted snippet
+        """
+        if search_engine.enabled:
+            return self._local_search(db, query, skip, limit, normalization)
+        
+        tsquery = prefix_tsquery(self.model.search_config, query)
+        if tsquery is None:
+            return []
+        
+        rank = func.ts_rank(self.model.search_vector, tsquery, normalization).label("rank")
+        page = self._query(db, self.model.id, rank).filter(
+            self.model.search_vector.op("@@")(tsquery)
+        ).order_by(rank.desc(), self.model.id).offset(skip).limit(limit).subquery()
+        
+        snippet = null()
+        if self.snippet_fields:
+            document = func.concat_ws(" ... ", *(getattr(self.model, field) for field in self.snippet_fields))
+            snippet = func.ts_headline(self.model.search_config, document, tsquery, HEADLINE_OPTIONS)
+        
+        rows = db.query(self.model, page.c.rank, snippet).join(
+            page, self.model.id == page.c.id
+        ).order_by(page.c.rank.desc(), self.model.id).all()
+        
+        return [(obj, score, text) for obj, score, text in rows]
+    
+    def _local_search(
+        self, db: Session, query: str, skip: int, limit: int, normalization: int
+    ) -> List[Tuple[T, float, Optional[str]]]:
+        """
+        Search records through the in-process search engine.
+        
+        Ranked IDs are checked against the database in chunks, which
+        applies the repository scope and drops records deleted elsewhere.
+        
+        Args:
+            db: Database session
+            query: Search text
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            normalization: Rank normalization flags (32 scales scores to 0..1)
+            
+        Returns:
+            List[Tuple[T, float, Optional[str]]]: Records with their BM25
+            score and highlighted snippet
+        """
+        index = search_engine.get_index(self.model.__tablename__)
+        if index is None:
+            return []
+        
+        ranked = index.search(query)
+        page_ids: List[int] = []
+        for start in range(0, len(ranked), 1000):
+            chunk = [doc_id for doc_id, _ in ranked[start:start + 1000]]
+            visible = {row.id for row in self._query(db, self.model.id).filter(self.model.id.in_(chunk))}
+            page_ids.extend(doc_id for doc_id in chunk if doc_id in visible)
+            if len(page_ids) >= skip + limit:
+                break
+        page_ids = page_ids[skip:skip + limit]
+        if not page_ids:
+            return []
+        
+        scores = dict(ranked)
+        objs = {obj.id: obj for obj in db.query(self.model).filter(self.model.id.in_(page_ids))}
+        terms = tokenize(query)
+        
+        results = []
+        for doc_id in page_ids:
+            obj = objs[doc_id]
+            score = scores[doc_id] / (scores[doc_id] + 1) if normalization & 32 else scores[doc_id]
+            snippet = None
+            if self.snippet_fields:
+                document = " ... ".join(filter(None, (getattr(obj, field) for field in self.snippet_fields)))
+                snippet = highlight(document, terms)
+            results.append((obj, score, snippet))
+        return results
+    
+    def reindex(self, db: Session, since: Optional[datetime] = None) -> int:
+        """
+        Load records into the in-process search engine.
+        
+        Args:
+            db: Database session
+            since: Only load records updated at or after this time (optional)
+            
+        Returns:
+            int: Number of records indexed
+        """
+        if search_engine.get_index(self.model.__tablename__) is None:
+            return 0
+        
+        fields = list(self.search_index_fields)
+        query = db.query(self.model.id, self.model.updated_at, *(getattr(self.model, field) for field in fields))
+        if since is not None:
+            query = query.filter(self.model.updated_at >= since)
+        
+        count = 0
+        for row in query.order_by(self.model.id).yield_per(1000):
+            values = {field: getattr(row, field) for field in fields}
+            search_engine.add(self.model.__tablename__, row.id, values, row.updated_at)
+            count += 1
+        
+        logger.info(f"Indexed {count} {self.model.__name__} records in the in-process search engine")
+        return count
+    
+    def _autocomplete_candidates(self, db: Session, text: str) -> List[Dict[str, Any]]:
+        """
+        Load the best autocomplete candidates containing a text.
+        
+        Args:
+            db: Database session
+            text: Normalized typed text
+            
+        Returns:
+            List[Dict[str, Any]]: Up to AUTOCOMPLETE_CANDIDATES rows with id,
+            the matched text and the autocomplete fields
+        """
+        expression = self.model.autocomplete_text()
+        fields = [getattr(self.model, field) for field in self.autocomplete_fields]
+        
+        rows = self._query(db, self.model.id, expression.label("text"), *fields).filter(
+            expression.like(f"%{escape_like(text)}%", escape="\\")
+        ).order_by(func.word_similarity(text, expression).desc(), self.model.id).limit(AUTOCOMPLETE_CANDIDATES).all()
+        
+        return [dict(row._mapping) for row in rows]
+    
+    def autocomplete(self, db: Session, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggest records for text typed into a search box.
+        
+        Records whose autocomplete text contains the typed text are ranked
+        by the trigram similarity of their best matching words. Candidate sets are cached per worker and
+        access scope, so the following keystrokes are usually served by
+        narrowing a cached set instead of querying the database.
+        
+        Args:
+            db: Database session
+            text: Typed text
+            limit: Maximum number of suggestions
+            
+        Returns:
+            List[Dict[str, Any]]: Suggestions with id, similarity and the
+            autocomplete fields
+        """
+        text = normalize_autocomplete_text(text)
+        if len(text) < AUTOCOMPLETE_MIN_LENGTH:
+            return []
+        
+        namespace = (self.model.__tablename__, self.scope.cache_key if self.scope is not None else ("all",))
+        candidates = autocomplete_cache.get(namespace, text)
+        if candidates is None:
+            candidates = self._autocomplete_candidates(db, text)
+            autocomplete_cache.put(namespace, text, candidates, complete=len(candidates) < AUTOCOMPLETE_CANDIDATES)
+        
+        ranked = sorted(
+            ((match_similarity(text, candidate["text"]), candidate) for candidate in candidates),
+            key=lambda item: (-item[0], item[1]["id"])
+        )
+        
+        suggestions = []
+        for similarity, candidate in ranked[:limit]:
+            suggestion = {key: value for key, value in candidate.items() if key != "text"}
+            suggestion["similarity"] = round(similarity, 4)
+            suggestions.append(suggestion)
+        return suggestions
     
     def update(
-        self, db: Session, *, db_obj: T, obj_in: Union[Dict[str, Any], BaseModel]
+        self, db: Session, *, db_obj: T, obj_in: Union[Dict[str, Any], BaseModel],
+        actor_id: Optional[int] = None
     ) -> T:
         """
         Update a record.
         
+        The changed fields are logged as an audit diff, in the same
+        transaction as the change, unless nothing changed.
+        
         Args:
             db: Database session
             db_obj: Existing database object
             obj_in: New object data
+            actor_id: ID of the user making the change (defaults to updated_by)
             
         Returns:
             T: Updated object
@@ -114,16 +367,54 @@ class BaseRepository(Generic[T]):
             for field in update_data:
                 if hasattr(db_obj, field):
                     setattr(db_obj, field, update_data[field])
+            
+            old_values, new_values = {}, {}
+            if AUDIT_CAPTURE_CHANGES:
+                old_values, new_values = capture_changes(
+                    db_obj, self.audit_exclude_fields, self.audit_redact_fields
+                )
                     
             db.add(db_obj)
+            # The diff commits with the change, so the history never misses a committed update
+            if new_values:
+                audit_logger.log_activity(
+                    db=db,
+                    user_id=actor_id if actor_id is not None else getattr(db_obj, "updated_by", None),
+                    action="update",
+                    resource_type=self.model.__tablename__,
+                    resource_id=db_obj.id,
+                    old_values=old_values,
+                    new_values=new_values,
+                    commit=False
+                )
             db.commit()
             db.refresh(db_obj)
+            search_engine.add_object(db_obj)
             return db_obj
         except SQLAlchemyError as e:
             db.rollback()
             logger.error(f"Error updating {self.model.__name__}: {str(e)}")
             raise
     
+    def get_state_at(self, db: Session, id: int, at: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Reconstruct a record as it was at a point in time from its audit diffs.
+        
+        Args:
+            db: Database session
+            id: Record ID
+            at: Point in time
+            
+        Returns:
+            Optional[Dict[str, Any]]: Column values at the given time or None
+            if the record doesn't exist (anymore)
+        """
+        obj = self.get(db, id)
+        if obj is None or at < obj.created_at:
+            return None
+        
+        return audit_logger.get_state_at(db, obj, at)
+    
     def delete(self, db: Session, *, id: int) -> T:
         """
         Delete a record.
@@ -136,12 +427,13 @@ class BaseRepository(Generic[T]):
             T: Deleted object
         """
         try:
-            obj = db.query(self.model).get(id)
+            obj = self._query(db).filter(self.model.id == id).first()
             if obj is None:
                 raise ValueError(f"{self.model.__name__} with id {id} not found")
                 
             db.delete(obj)
             db.commit()
+            search_engine.remove(self.model.__tablename__, id)
             return obj
         except SQLAlchemyError as e:
             db.rollback()
@@ -158,7 +450,7 @@ class BaseRepository(Generic[T]):
         Returns:
             int: Total count of records
         """
-        return db.query(self.model).count()
+        return self._query(db).count()
     
     def exists(self, db: Session, id: int) -> bool:
         """
@@ -171,4 +463,4 @@ class BaseRepository(Generic[T]):
         Returns:
             bool: True if record exists, False otherwise
         """
-        return db.query(self.model).filter(self.model.id == id).first() is not None
+        return self._query(db, self.model.id).filter(self.model.id == id).first() is not None
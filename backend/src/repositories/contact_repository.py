@@ -5,17 +5,73 @@ Contact repository module for the Sales Automation System.
 This module provides repository classes for contact-related models.
 """
 
-from typing import List, Optional, Dict, Any, Union
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from itertools import combinations
+from typing import Callable, List, Optional, Dict, Any, Sequence, Tuple, Union
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import or_, and_, update, insert, delete, select, literal, func, bindparam, inspect
+import logging
 
 from src.repositories.base import BaseRepository
-from src.models.contact import Contact, Company, Tag, ContactActivity
+from src.repositories.activity_repository import activity_rollup_maintainer
+from src.repositories.lead_repository import lead_rescoring_worker
+from src.repositories.saved_search_repository import saved_search_maintainer
+from src.models.contact import (
+    Contact, Company, Tag, ContactActivity, ContactDuplicate, DuplicateStatus, contact_tags,
+    email_blind_index, phone_blind_index, contact_derived_keys
+)
+from src.models.lead import Lead, Opportunity
+from src.models.marketing import CampaignActivity, campaign_contacts
+from src.auth.audit_diff import capture_changes
+from src.auth.audit_logging import audit_logger
+from src.utils.autocomplete import autocomplete_cache
+from src.utils.dedupe import match_score
+from src.utils.inverted_index import search_engine
+from config.settings import (
+    BLIND_INDEX_BACKFILL_BATCH_SIZE,
+    DEDUPE_MATCH_THRESHOLD,
+    DEDUPE_MAX_BLOCK_SIZE,
+    DEDUPE_BATCH_SIZE
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Tables whose rows belong to a single contact, moved to the survivor on merge
+MERGE_REPARENTED_TABLES = (ContactActivity.__table__, Lead.__table__, Opportunity.__table__, CampaignActivity.__table__)
+
+# Association tables merged into the survivor's set on merge, with their other key
+MERGE_ASSOCIATION_TABLES = ((contact_tags, "tag_id"), (campaign_contacts, "campaign_id"))
+
+# Contact columns never copied from a duplicate on merge
+MERGE_SKIPPED_FIELDS = (
+    "id", "created_at", "updated_at", "created_by", "updated_by", "email_bidx", "phone_bidx", "dedupe_key",
+    "activity_count", "last_activity_date"
+)
+
+# Flags set on the survivor if any merged contact has them set
+MERGE_FLAG_FIELDS = ("do_not_contact", "do_not_email", "do_not_call")
+
+# Blocking keys of duplicate detection, in the order pairs are attributed to them
+DEDUPE_BLOCKING_KEYS = ("email_bidx", "phone_bidx", "dedupe_key")
+
+# Columns loaded to score duplicate candidates
+DEDUPE_COLUMNS = (
+    Contact.id, Contact.first_name, Contact.last_name, Contact.email, Contact.company_name,
+    Contact.email_bidx, Contact.phone_bidx, Contact.dedupe_key
+)
 
 
 class ContactRepository(BaseRepository[Contact]):
     """Repository for Contact model operations."""
     
+    snippet_fields = ("first_name", "last_name", "company_name")
+    autocomplete_fields = ("first_name", "last_name", "email", "company_name")
+    search_index_fields = {"first_name": 3, "last_name": 3, "company_name": 2, "email": 1}
+    
+    # Blind indexes and the dedupe key are derived from email, phone and last name
+    audit_exclude_fields = BaseRepository.audit_exclude_fields + ("email_bidx", "phone_bidx", "dedupe_key")
+    
     def __init__(self):
         super().__init__(Contact)
     
@@ -23,6 +79,9 @@ class ContactRepository(BaseRepository[Contact]):
         """
         Get a contact by email.
         
+        The lookup goes through the email blind index, so it works even
+        when emails are stored encrypted, and ignores case and whitespace.
+        
         Args:
             db: Database session
             email: Contact email
@@ -30,7 +89,133 @@ class ContactRepository(BaseRepository[Contact]):
         Returns:
             Optional[Contact]: Found contact or None
         """
-        return db.query(Contact).filter(Contact.email == email).first()
+        index = email_blind_index(email)
+        if index is None:
+            return None
+        
+        return self._query(db).filter(Contact.email_bidx == index).first()
+    
+    def get_by_emails(self, db: Session, emails: List[str]) -> Dict[str, Contact]:
+        """
+        Get contacts for a batch of emails, e.g. to deduplicate an import.
+        
+        Args:
+            db: Database session
+            emails: Contact emails
+            
+        Returns:
+            Dict[str, Contact]: Found contacts by the email they were looked up with
+        """
+        indexes: Dict[str, List[str]] = {}
+        for email in emails:
+            index = email_blind_index(email)
+            if index is not None:
+                indexes.setdefault(index, []).append(email)
+        
+        if not indexes:
+            return {}
+        
+        found = {}
+        for contact in self._query(db).filter(Contact.email_bidx.in_(list(indexes))).all():
+            for email in indexes[contact.email_bidx]:
+                found.setdefault(email, contact)
+        return found
+    
+    def get_by_phone(self, db: Session, phone: str) -> Optional[Contact]:
+        """
+        Get a contact by phone number.
+        
+        The lookup goes through the phone blind index, so formatting
+        characters in the number are ignored.
+        
+        Args:
+            db: Database session
+            phone: Contact phone number
+            
+        Returns:
+            Optional[Contact]: Found contact or None
+        """
+        index = phone_blind_index(phone)
+        if index is None:
+            return None
+        
+        return self._query(db).filter(Contact.phone_bidx == index).first()
+    
+    def backfill_blind_indexes(
+        self,
+        db: Session,
+        batch_size: int = BLIND_INDEX_BACKFILL_BATCH_SIZE,
+        rebuild: bool = False,
+        decrypt_many: Optional[Callable[[Sequence[Optional[str]]], List[Optional[str]]]] = None
+    ) -> int:
+        """
+        Compute missing blind indexes of existing contacts in batches.
+        
+        Contacts are walked in primary key order and each batch is written
+        with a single executemany update and committed, so the backfill can
+        run on a live table and be resumed after an interruption. The keys
+        come from contact_derived_keys, like on assignment, so the dedupe
+        key is rewritten along with the indexes.
+        
+        Args:
+            db: Database session
+            batch_size: Number of contacts per batch
+            rebuild: Recompute every index, e.g. after changing BLIND_INDEX_KEY
+            decrypt_many: Batch decryption function for stored values that
+                are encrypted (e.g. DataEncryption.decrypt_many)
+            
+        Returns:
+            int: Number of updated contacts
+        """
+        table = Contact.__table__
+        statement = update(table).where(table.c.id == bindparam("contact_id")).values(
+            email_bidx=bindparam("new_email_bidx"),
+            phone_bidx=bindparam("new_phone_bidx"),
+            dedupe_key=bindparam("new_dedupe_key")
+        )
+        
+        query = db.query(Contact.id, Contact.email, Contact.phone, Contact.last_name)
+        if not rebuild:
+            query = query.filter(or_(
+                and_(Contact.email.isnot(None), Contact.email_bidx.is_(None)),
+                and_(Contact.phone.isnot(None), Contact.phone_bidx.is_(None))
+            ))
+        
+        updated = 0
+        last_id = 0
+        try:
+            while True:
+                rows = query.filter(Contact.id > last_id).order_by(Contact.id).limit(batch_size).all()
+                if not rows:
+                    break
+                
+                emails = [row.email for row in rows]
+                phones = [row.phone for row in rows]
+                if decrypt_many is not None:
+                    emails = decrypt_many(emails)
+                    phones = decrypt_many(phones)
+                
+                params = []
+                for row, email, phone in zip(rows, emails, phones):
+                    keys = contact_derived_keys(email, phone, row.last_name)
+                    params.append({
+                        "contact_id": row.id,
+                        "new_email_bidx": keys["email_bidx"],
+                        "new_phone_bidx": keys["phone_bidx"],
+                        "new_dedupe_key": keys["dedupe_key"]
+                    })
+                db.execute(statement, params)
+                db.commit()
+                
+                updated += len(rows)
+                last_id = rows[-1].id
+                logger.info(f"Backfilled blind indexes of {updated} contacts (last id {last_id})")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error backfilling contact blind indexes: {str(e)}")
+            raise
+        
+        return updated
     
     def get_by_company(self, db: Session, company_id: int, skip: int = 0, limit: int = 100) -> List[Contact]:
         """
@@ -45,7 +230,7 @@ class ContactRepository(BaseRepository[Contact]):
         Returns:
             List[Contact]: List of contacts
         """
-        return db.query(Contact).filter(Contact.company_id == company_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(Contact.company_id == company_id).offset(skip).limit(limit).all()
     
     def get_by_owner(self, db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[Contact]:
         """
@@ -60,11 +245,11 @@ class ContactRepository(BaseRepository[Contact]):
         Returns:
             List[Contact]: List of contacts
         """
-        return db.query(Contact).filter(Contact.owner_id == owner_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(Contact.owner_id == owner_id).offset(skip).limit(limit).all()
     
     def search(self, db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Contact]:
         """
-        Search contacts by name, email, or company name.
+        Search contacts by name, email, or company name, ranked by relevance.
         
         Args:
             db: Database session
@@ -75,15 +260,7 @@ class ContactRepository(BaseRepository[Contact]):
         Returns:
             List[Contact]: List of matching contacts
         """
-        search_term = f"%{query}%"
-        return db.query(Contact).filter(
-            or_(
-                Contact.first_name.ilike(search_term),
-                Contact.last_name.ilike(search_term),
-                Contact.email.ilike(search_term),
-                Contact.company_name.ilike(search_term)
-            )
-        ).offset(skip).limit(limit).all()
+        return [obj for obj, _, _ in self.full_text_search(db, query, skip=skip, limit=limit)]
     
     def add_tag(self, db: Session, contact_id: int, tag_id: int) -> Contact:
         """
@@ -132,9 +309,174 @@ class ContactRepository(BaseRepository[Contact]):
         return contact
 
 
+    def backfill_dedupe_keys(self, db: Session, batch_size: int = DEDUPE_BATCH_SIZE) -> int:
+        """
+        Compute missing dedupe keys of existing contacts in batches.
+        
+        Args:
+            db: Database session
+            batch_size: Number of contacts per batch
+            
+        Returns:
+            int: Number of updated contacts
+        """
+        table = Contact.__table__
+        statement = update(table).where(table.c.id == bindparam("contact_id")).values(
+            dedupe_key=bindparam("new_dedupe_key")
+        )
+        query = db.query(Contact.id, Contact.email, Contact.last_name).filter(
+            Contact.email.isnot(None), Contact.last_name.isnot(None), Contact.dedupe_key.is_(None)
+        )
+        
+        updated = 0
+        last_id = 0
+        try:
+            while True:
+                rows = query.filter(Contact.id > last_id).order_by(Contact.id).limit(batch_size).all()
+                if not rows:
+                    break
+                
+                params = [
+                    {
+                        "contact_id": row.id,
+                        "new_dedupe_key": contact_derived_keys(row.email, None, row.last_name)["dedupe_key"]
+                    }
+                    for row in rows
+                ]
+                db.execute(statement, params)
+                db.commit()
+                
+                updated += len(rows)
+                last_id = rows[-1].id
+                logger.info(f"Backfilled dedupe keys of {updated} contacts (last id {last_id})")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error backfilling contact dedupe keys: {str(e)}")
+            raise
+        
+        return updated
+    
+    def merge(
+        self, db: Session, survivor_id: int, duplicate_ids: Sequence[int], actor_id: Optional[int] = None
+    ) -> Tuple[Contact, Dict[str, int]]:
+        """
+        Merge duplicate contacts into a surviving contact.
+        
+        Empty fields of the survivor are filled from the duplicates (most
+        recently updated first) and do-not-contact flags are kept if any
+        contact has them. Activities, leads, opportunities, campaign
+        activities, tags and campaign memberships are moved to the survivor
+        with one set-based statement per table, then the duplicates are
+        deleted, all in one transaction.
+        
+        Args:
+            db: Database session
+            survivor_id: ID of the contact to keep
+            duplicate_ids: IDs of the contacts merged into it
+            actor_id: ID of the user merging the contacts
+            
+        Returns:
+            Tuple[Contact, Dict[str, int]]: Survivor and the number of rows
+            moved per table
+            
+        Raises:
+            ValueError: If no duplicates are given or a contact isn't found
+        """
+        duplicate_ids = sorted(set(duplicate_ids) - {survivor_id})
+        if not duplicate_ids:
+            raise ValueError("No contacts to merge")
+        
+        survivor = self.get(db, survivor_id)
+        duplicates = self._query(db).filter(Contact.id.in_(duplicate_ids)).order_by(Contact.updated_at.desc()).all()
+        if survivor is None or len(duplicates) != len(duplicate_ids):
+            raise ValueError(f"Contact with id {survivor_id} or one of {duplicate_ids} not found")
+        
+        try:
+            for attr in inspect(survivor).mapper.column_attrs:
+                key = attr.key
+                if key in MERGE_SKIPPED_FIELDS or any(column.computed is not None for column in attr.columns):
+                    continue
+                if key in MERGE_FLAG_FIELDS:
+                    if any(getattr(duplicate, key) for duplicate in duplicates):
+                        setattr(survivor, key, True)
+                elif getattr(survivor, key) in (None, ""):
+                    value = next((getattr(d, key) for d in duplicates if getattr(d, key) not in (None, "")), None)
+                    if value is not None:
+                        setattr(survivor, key, value)
+            
+            old_values, new_values = capture_changes(survivor, self.audit_exclude_fields, self.audit_redact_fields)
+            if actor_id is not None:
+                survivor.updated_by = actor_id
+            
+            # Leads of the survivor after the merge: moved ones, and its own whose contact fields may be filled
+            lead_ids = set(db.execute(
+                select(Lead.id).where(Lead.contact_id.in_([survivor_id, *duplicate_ids]))
+            ).scalars())
+            
+            moved: Dict[str, int] = {}
+            for table in MERGE_REPARENTED_TABLES:
+                result = db.execute(
+                    update(table).where(table.c.contact_id.in_(duplicate_ids)).values(contact_id=survivor_id)
+                )
+                moved[table.name] = result.rowcount
+            
+            for table, key in MERGE_ASSOCIATION_TABLES:
+                other = table.c[key]
+                existing = select(other).where(table.c.contact_id == survivor_id)
+                result = db.execute(insert(table).from_select(
+                    ["contact_id", key],
+                    select(literal(survivor_id), other).where(
+                        table.c.contact_id.in_(duplicate_ids), other.not_in(existing)
+                    ).distinct()
+                ))
+                moved[table.name] = result.rowcount
+                db.execute(delete(table).where(table.c.contact_id.in_(duplicate_ids)))
+            
+            duplicate_table = ContactDuplicate.__table__
+            db.execute(delete(duplicate_table).where(or_(
+                duplicate_table.c.contact_id.in_(duplicate_ids),
+                duplicate_table.c.duplicate_id.in_(duplicate_ids)
+            )))
+            db.execute(delete(Contact.__table__).where(Contact.__table__.c.id.in_(duplicate_ids)))
+            
+            db.commit()
+            db.refresh(survivor)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error merging contacts {duplicate_ids} into {survivor_id}: {str(e)}")
+            raise
+        
+        for duplicate_id in duplicate_ids:
+            search_engine.remove(Contact.__tablename__, duplicate_id)
+        search_engine.add_object(survivor)
+        autocomplete_cache.invalidate(Contact.__tablename__)
+        # The moved rows were reparented and the duplicates deleted without session events
+        activity_rollup_maintainer.enqueue({"contact": {survivor_id}})
+        saved_search_maintainer.enqueue({"contact": {survivor_id, *duplicate_ids}, "lead": lead_ids})
+        lead_rescoring_worker.enqueue([], lead_ids)
+        
+        new_values["merged_contact_ids"] = duplicate_ids
+        audit_logger.log_activity(
+            db=db,
+            user_id=actor_id,
+            action="merge",
+            resource_type=Contact.__tablename__,
+            resource_id=survivor_id,
+            old_values=old_values,
+            new_values=new_values
+        )
+        
+        logger.info(f"Merged contacts {duplicate_ids} into {survivor_id}: {moved}")
+        return survivor, moved
+
+
 class CompanyRepository(BaseRepository[Company]):
     """Repository for Company model operations."""
     
+    snippet_fields = ("name", "industry")
+    autocomplete_fields = ("name", "industry", "website")
+    search_index_fields = {"name": 3, "industry": 2}
+    
     def __init__(self):
         super().__init__(Company)
     
@@ -149,11 +491,11 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             Optional[Company]: Found company or None
         """
-        return db.query(Company).filter(Company.name == name).first()
+        return self._query(db).filter(Company.name == name).first()
     
     def search(self, db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Company]:
         """
-        Search companies by name or industry.
+        Search companies by name or industry, ranked by relevance.
         
         Args:
             db: Database session
@@ -164,13 +506,7 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             List[Company]: List of matching companies
         """
-        search_term = f"%{query}%"
-        return db.query(Company).filter(
-            or_(
-                Company.name.ilike(search_term),
-                Company.industry.ilike(search_term)
-            )
-        ).offset(skip).limit(limit).all()
+        return [obj for obj, _, _ in self.full_text_search(db, query, skip=skip, limit=limit)]
     
     def get_by_industry(self, db: Session, industry: str, skip: int = 0, limit: int = 100) -> List[Company]:
         """
@@ -185,7 +521,7 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             List[Company]: List of companies
         """
-        return db.query(Company).filter(Company.industry == industry).offset(skip).limit(limit).all()
+        return self._query(db).filter(Company.industry == industry).offset(skip).limit(limit).all()
 
 
 class TagRepository(BaseRepository[Tag]):
@@ -205,7 +541,7 @@ class TagRepository(BaseRepository[Tag]):
         Returns:
             Optional[Tag]: Found tag or None
         """
-        return db.query(Tag).filter(Tag.name == name).first()
+        return self._query(db).filter(Tag.name == name).first()
     
     def get_contacts_with_tag(self, db: Session, tag_id: int, skip: int = 0, limit: int = 100) -> List[Contact]:
         """
@@ -246,7 +582,7 @@ class ContactActivityRepository(BaseRepository[ContactActivity]):
         Returns:
             List[ContactActivity]: List of contact activities
         """
-        return db.query(ContactActivity).filter(
+        return self._query(db).filter(
             ContactActivity.contact_id == contact_id
         ).order_by(ContactActivity.date.desc()).offset(skip).limit(limit).all()
     
@@ -263,6 +599,241 @@ class ContactActivityRepository(BaseRepository[ContactActivity]):
         Returns:
             List[ContactActivity]: List of contact activities
         """
-        return db.query(ContactActivity).filter(
+        return self._query(db).filter(
             ContactActivity.activity_type == activity_type
         ).order_by(ContactActivity.date.desc()).offset(skip).limit(limit).all()
+
+
+class ContactDuplicateRepository(BaseRepository[ContactDuplicate]):
+    """
+    Repository for duplicate contact detection.
+    
+    Candidates are only compared within blocks of contacts sharing a
+    blocking key (normalized email, normalized phone, or email domain and
+    phonetic last name), all of them indexed columns, so detection never
+    compares every pair of contacts. Pairs scoring at least the match
+    threshold are recorded for review.
+    """
+    
+    def __init__(self):
+        super().__init__(ContactDuplicate)
+    
+    def _query(self, db: Session, *entities: Any) -> Query:
+        """
+        Start a query on duplicate pairs with both contacts in the repository scope.
+        
+        Args:
+            db: Database session
+            entities: Entities to select (defaults to the model)
+            
+        Returns:
+            Query: Scoped query
+        """
+        query = db.query(*(entities or (self.model,)))
+        clause = self.scope.predicate(Contact) if self.scope is not None else None
+        if clause is not None:
+            visible = select(Contact.id).where(clause)
+            query = query.filter(ContactDuplicate.contact_id.in_(visible), ContactDuplicate.duplicate_id.in_(visible))
+        return query
+    
+    def record_pairs(self, db: Session, pairs: Sequence[Tuple[int, int, float, Sequence[str]]]) -> int:
+        """
+        Record scored pairs that aren't recorded yet (dismissed pairs stay dismissed).
+        
+        Args:
+            db: Database session
+            pairs: Contact IDs, score and matching fields of each pair
+            
+        Returns:
+            int: Number of new pairs
+        """
+        rows = {}
+        for first_id, second_id, score, reasons in pairs:
+            key = (min(first_id, second_id), max(first_id, second_id))
+            rows[key] = {
+                "contact_id": key[0],
+                "duplicate_id": key[1],
+                "score": score,
+                "reasons": ",".join(reasons) or None,
+                "status": DuplicateStatus.PENDING
+            }
+        if not rows:
+            return 0
+        
+        contact_ids = sorted({key[0] for key in rows})
+        existing = db.query(ContactDuplicate.contact_id, ContactDuplicate.duplicate_id).filter(
+            ContactDuplicate.contact_id.in_(contact_ids)
+        )
+        for key in existing:
+            rows.pop(tuple(key), None)
+        
+        if rows:
+            db.execute(insert(ContactDuplicate.__table__), list(rows.values()))
+        return len(rows)
+    
+    def check_contact(
+        self, db: Session, contact: Contact, threshold: float = DEDUPE_MATCH_THRESHOLD
+    ) -> List[Tuple[int, float, List[str]]]:
+        """
+        Find and record the likely duplicates of one contact, e.g. when it's created.
+        
+        All likely duplicates are recorded for review; only those in the
+        repository scope are returned.
+        
+        Args:
+            db: Database session
+            contact: Contact to check
+            threshold: Minimum score of a match
+            
+        Returns:
+            List[Tuple[int, float, List[str]]]: IDs, scores and matching fields
+            of the likely duplicates, best first
+        """
+        keys = [
+            getattr(Contact, key) == getattr(contact, key)
+            for key in DEDUPE_BLOCKING_KEYS if getattr(contact, key) is not None
+        ]
+        if not keys:
+            return []
+        
+        candidates = db.query(*DEDUPE_COLUMNS).filter(
+            Contact.id != contact.id, or_(*keys)
+        ).order_by(Contact.id.desc()).limit(DEDUPE_MAX_BLOCK_SIZE).all()
+        
+        matches = []
+        for candidate in candidates:
+            score, reasons = match_score(contact, candidate)
+            if score >= threshold:
+                matches.append((candidate.id, score, reasons))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        
+        if matches:
+            try:
+                self.record_pairs(db, [(contact.id, *match) for match in matches])
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Error recording duplicates of contact {contact.id}: {str(e)}")
+                raise
+        
+        clause = self.scope.predicate(Contact) if self.scope is not None else None
+        if clause is not None and matches:
+            visible = {row.id for row in db.query(Contact.id).filter(Contact.id.in_([m[0] for m in matches]), clause)}
+            matches = [match for match in matches if match[0] in visible]
+        return matches
+    
+    def scan(
+        self,
+        db: Session,
+        threshold: float = DEDUPE_MATCH_THRESHOLD,
+        batch_size: int = DEDUPE_BATCH_SIZE,
+        max_block_size: int = DEDUPE_MAX_BLOCK_SIZE
+    ) -> int:
+        """
+        Find duplicates among all contacts as a batch job.
+        
+        For each blocking key, the key values shared by several contacts are
+        paged through with a grouped index scan, and the contacts of each
+        page of blocks are loaded and compared pairwise within their block.
+        A pair sharing several keys is only scored in the block of its first
+        key. Blocks larger than max_block_size (e.g. a shared office phone)
+        are skipped. Each page is committed, so the job can run on a live
+        table and be rerun at any time.
+        
+        Args:
+            db: Database session
+            threshold: Minimum score of a match
+            batch_size: Number of blocks per page
+            max_block_size: Largest block compared pairwise
+            
+        Returns:
+            int: Number of new pairs recorded
+        """
+        recorded = 0
+        for position, key in enumerate(DEDUPE_BLOCKING_KEYS):
+            column = getattr(Contact, key)
+            earlier_keys = DEDUPE_BLOCKING_KEYS[:position]
+            last_value = ""
+            
+            while True:
+                blocks = db.query(column, func.count().label("size")).filter(
+                    column.isnot(None), column > last_value
+                ).group_by(column).having(func.count() > 1).order_by(column).limit(batch_size).all()
+                if not blocks:
+                    break
+                last_value = blocks[-1][0]
+                
+                values = []
+                for value, size in blocks:
+                    if size > max_block_size:
+                        logger.warning(f"Skipping dedupe block {key}={value} of {size} contacts")
+                    else:
+                        values.append(value)
+                
+                members: Dict[str, List[Any]] = {}
+                for row in db.query(*DEDUPE_COLUMNS).filter(column.in_(values)).order_by(Contact.id):
+                    members.setdefault(getattr(row, key), []).append(row)
+                
+                pairs = []
+                for rows in members.values():
+                    for a, b in combinations(rows, 2):
+                        if any(getattr(a, earlier) is not None and getattr(a, earlier) == getattr(b, earlier)
+                               for earlier in earlier_keys):
+                            continue
+                        score, reasons = match_score(a, b)
+                        if score >= threshold:
+                            pairs.append((a.id, b.id, score, reasons))
+                
+                try:
+                    recorded += self.record_pairs(db, pairs)
+                    db.commit()
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    logger.error(f"Error recording duplicate contacts: {str(e)}")
+                    raise
+                
+                logger.info(f"Dedupe scan of {key} up to {last_value}: {recorded} new pairs")
+        
+        return recorded
+    
+    def get_pending(
+        self, db: Session, min_score: float = 0.0, skip: int = 0, limit: int = 100
+    ) -> List[ContactDuplicate]:
+        """
+        Get the pairs awaiting review, best first.
+        
+        Args:
+            db: Database session
+            min_score: Minimum score
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            List[ContactDuplicate]: Pending pairs
+        """
+        return self._query(db).filter(
+            ContactDuplicate.status == DuplicateStatus.PENDING,
+            ContactDuplicate.score >= min_score
+        ).order_by(ContactDuplicate.score.desc(), ContactDuplicate.id).offset(skip).limit(limit).all()
+    
+    def dismiss(self, db: Session, pair_id: int, actor_id: Optional[int] = None) -> ContactDuplicate:
+        """
+        Mark a pair as not being duplicates.
+        
+        Args:
+            db: Database session
+            pair_id: Pair ID
+            actor_id: ID of the user dismissing the pair
+            
+        Returns:
+            ContactDuplicate: Dismissed pair
+        """
+        pair = self.get(db, pair_id)
+        if pair is None:
+            raise ValueError(f"Duplicate pair with id {pair_id} not found")
+        
+        return self.update(db, db_obj=pair, obj_in={"status": DuplicateStatus.DISMISSED, "updated_by": actor_id})
+
+
+# Create duplicate detection repository instance
+contact_duplicate_repository = ContactDuplicateRepository()
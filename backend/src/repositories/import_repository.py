@@ -0,0 +1,627 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Import repository module for the Sales Automation System.
+This module provides CSV import jobs for contacts and leads.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import csv
+import io
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import IMPORT_STORAGE_DIR, IMPORT_CHUNK_SIZE, IMPORT_VALIDATION_WORKERS, IMPORT_JOB_LEASE_SECONDS
+from src.auth.scoping import AccessScope
+from src.models.contact import Contact, contact_derived_keys
+from src.models.import_job import ImportJob
+from src.repositories.base import BaseRepository
+from src.repositories.contact_repository import ContactRepository
+from src.repositories.ingestion_repository import EMAIL_PATTERN, validate_submission, insert_leads, after_insert_leads
+from src.repositories.saved_search_repository import saved_search_maintainer
+from src.utils.autocomplete import autocomplete_cache
+from src.utils.inverted_index import search_engine
+from src.utils.normalization import normalize_email
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Entity types that can be imported
+IMPORT_ENTITY_TYPES = ("contact", "lead")
+
+# Importable contact columns and their maximum lengths (None for unbounded text)
+CONTACT_FIELDS = {
+    "first_name": 50,
+    "last_name": 50,
+    "email": 100,
+    "phone": 20,
+    "mobile": 20,
+    "company_name": 100,
+    "job_title": 100,
+    "department": 100,
+    "address_line1": 255,
+    "address_line2": 255,
+    "city": 100,
+    "state": 100,
+    "postal_code": 20,
+    "country": 100,
+    "linkedin": 255,
+    "twitter": 255,
+    "facebook": 255,
+    "source": 100,
+    "notes": None
+}
+
+# Chunks validated ahead of the writer per validation process
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Seconds between checks for pending jobs and expired leases while the runner is idle
+PENDING_POLL_SECONDS = 30
+
+
+def validate_contact(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Validate and normalize an imported contact row.
+
+    Args:
+        data: Row values by column name
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], List[str]]: Normalized contact
+        (None if invalid) and the validation errors
+    """
+    errors = []
+    contact: Dict[str, Any] = {}
+    for field, max_length in CONTACT_FIELDS.items():
+        value = (data.get(field) or "").strip()
+        if max_length is not None and len(value) > max_length:
+            errors.append(f"{field} is longer than {max_length} characters")
+        if value:
+            contact[field] = value
+
+    if "email" in contact:
+        contact["email"] = normalize_email(contact["email"])
+        if not EMAIL_PATTERN.match(contact["email"]):
+            errors.append("email is invalid")
+    if not any(field in contact for field in ("first_name", "email", "phone")):
+        errors.append("first_name, email or phone is required")
+
+    if errors:
+        return None, errors
+
+    contact.setdefault("first_name", (contact.get("email") or "").split("@")[0][:50] or "Unknown")
+    return contact, []
+
+
+def validate_chunk(
+    entity_type: str,
+    rows: List[Tuple[int, Dict[str, Any]]]
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, Dict[str, Any], List[str]]]]:
+    """
+    Validate a chunk of rows (runs in validation processes when configured).
+
+    Args:
+        entity_type: Entity type (contact or lead)
+        rows: Line numbers and row values
+
+    Returns:
+        Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, Dict[str, Any], List[str]]]]:
+        Valid rows with their line numbers, and rejected rows with their line numbers and errors
+    """
+    validate = validate_contact if entity_type == "contact" else validate_submission
+    valid = []
+    rejected = []
+    for line, row in rows:
+        record, errors = validate(row)
+        if errors:
+            rejected.append((line, row, errors))
+        else:
+            valid.append((line, record))
+    return valid, rejected
+
+
+def upsert_contacts(
+    db: Session,
+    contacts: List[Dict[str, Any]],
+    scope: AccessScope
+) -> Tuple[List[int], List[int]]:
+    """
+    Insert or update imported contacts using multi-row statements.
+
+    Contacts are matched by email blind index among the contacts visible
+    in the importing user's scope; matched contacts get the non-empty
+    imported values, the others are inserted. Rows sharing an email are
+    merged first, later values winning. Blind indexes and dedupe keys come
+    from contact_derived_keys, like on attribute assignment, because
+    multi-row statements bypass the attribute events setting them.
+
+    Args:
+        db: Database session
+        contacts: Contacts from validate_contact
+        scope: Access scope of the importing user
+
+    Returns:
+        Tuple[List[int], List[int]]: IDs of the created and of the updated contacts
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    anonymous = []
+    for contact in contacts:
+        index = contact_derived_keys(contact.get("email"), contact.get("phone"), contact.get("last_name"))["email_bidx"]
+        if index is None:
+            anonymous.append(contact)
+        else:
+            merged.setdefault(index, {}).update(contact)
+
+    existing = {}
+    if merged:
+        query = select(Contact.email_bidx, func.min(Contact.id)).where(Contact.email_bidx.in_(list(merged)))
+        clause = scope.predicate(Contact)
+        if clause is not None:
+            query = query.where(clause)
+        existing = dict(db.execute(query.group_by(Contact.email_bidx)).all())
+
+    now = datetime.now()
+    updates = []
+    new_rows = []
+    for index, contact in list(merged.items()) + [(None, contact) for contact in anonymous]:
+        row = dict(contact)
+        keys = contact_derived_keys(row.get("email"), row.get("phone"), row.get("last_name"))
+
+        if index in existing:
+            # Only the keys whose source values are imported change; the email is the same
+            if "phone" in row:
+                row["phone_bidx"] = keys["phone_bidx"]
+            if "last_name" in row:
+                row["dedupe_key"] = keys["dedupe_key"]
+            row.update({"id": existing[index], "updated_by": scope.user_id, "updated_at": now})
+            updates.append(row)
+        else:
+            row.update(keys)
+            row.update({"owner_id": scope.user_id, "created_by": scope.user_id})
+            new_rows.append(row)
+
+    if updates:
+        db.execute(update(Contact), updates)
+
+    created = []
+    if new_rows:
+        created = list(db.execute(
+            insert(Contact).returning(Contact.id, sort_by_parameter_order=True), new_rows
+        ).scalars())
+
+    return created, [row["id"] for row in updates]
+
+
+class ImportJobRepository(BaseRepository[ImportJob]):
+    """
+    Repository for import jobs.
+    """
+
+    def __init__(self):
+        """Initialize the import job repository."""
+        super().__init__(ImportJob)
+
+    def create_job(
+        self,
+        db: Session,
+        scope: AccessScope,
+        entity_type: str,
+        filename: str,
+        file_path: str,
+        total_bytes: int
+    ) -> ImportJob:
+        """
+        Create a pending import job for an uploaded file.
+
+        Args:
+            db: Database session
+            scope: Access scope of the importing user
+            entity_type: Entity type (contact or lead)
+            filename: Name of the uploaded file
+            file_path: Path of the stored upload
+            total_bytes: Size of the upload
+
+        Returns:
+            ImportJob: Created import job
+
+        Raises:
+            ValueError: If the entity type is not importable
+        """
+        if entity_type not in IMPORT_ENTITY_TYPES:
+            raise ValueError(f"entity_type must be one of {', '.join(IMPORT_ENTITY_TYPES)}")
+
+        return self.create(db, {
+            "entity_type": entity_type,
+            "filename": filename[:255],
+            "file_path": file_path,
+            "total_bytes": total_bytes,
+            "scope_member_ids": None if scope.unrestricted else sorted(scope.member_ids),
+            "created_by": scope.user_id
+        })
+
+    def get_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[ImportJob]:
+        """
+        Get the import jobs of a user, newest first.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List[ImportJob]: Import jobs
+        """
+        return db.query(ImportJob).filter(ImportJob.created_by == user_id).order_by(
+            ImportJob.id.desc()
+        ).offset(skip).limit(limit).all()
+
+
+class ImportInterrupted(Exception):
+    """Raised inside a running import when the runner is stopped."""
+
+
+class ImportJobRunner:
+    """
+    Background runner of CSV import jobs.
+
+    Uploads are streamed to IMPORT_STORAGE_DIR by the endpoint and the job
+    is claimed by whichever worker's runner gets to it first, with a
+    conditional update from pending to running, so the directory must be
+    shared by every host running imports (a runner that can't see the
+    file leaves the job to the others). The runner then reads each file with the csv module in chunks of chunk_size rows,
+    so memory stays bounded whatever the file size. Chunks are validated
+    (in validation_workers processes when set, a few chunks ahead of the
+    writer) and written with multi-row statements, one transaction per
+    chunk together with the job's progress. Rejected rows are written to
+    an error report CSV with their line number and errors, ready to be
+    fixed and imported again. A running job's heartbeat is renewed with
+    every chunk; jobs whose heartbeat is older than the lease are failed,
+    since their runner is gone.
+    """
+
+    def __init__(
+        self,
+        storage_dir: str = IMPORT_STORAGE_DIR,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        validation_workers: int = IMPORT_VALIDATION_WORKERS,
+        lease_seconds: int = IMPORT_JOB_LEASE_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the import runner.
+
+        Args:
+            storage_dir: Directory of uploaded files and error reports
+            chunk_size: Number of rows validated and written together
+            validation_workers: Number of validation processes (0 to validate in the runner thread)
+            lease_seconds: Seconds without a heartbeat after which a running job is failed
+            session_factory: Factory for database sessions
+        """
+        self.storage_dir = Path(storage_dir)
+        self.chunk_size = chunk_size
+        self.validation_workers = validation_workers
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+        self._queue: queue.Queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the background runner is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def upload_path(self, job_key: str) -> Path:
+        """
+        Get the path an upload is stored at.
+
+        Args:
+            job_key: Unique name of the upload
+
+        Returns:
+            Path: File path
+        """
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        return self.storage_dir / f"{job_key}.csv"
+
+    def enqueue(self, job_id: int) -> None:
+        """
+        Queue a pending job (while the runner isn't running, it stays pending for the runners polling for jobs).
+
+        Args:
+            job_id: Import job ID
+        """
+        if self.is_running:
+            self._queue.put(job_id)
+
+    def _read_chunks(self, reader: csv.DictReader) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Read rows in chunks with their line numbers.
+
+        Args:
+            reader: CSV reader
+
+        Yields:
+            List[Tuple[int, Dict[str, Any]]]: Chunk of line numbers and row values
+        """
+        while True:
+            chunk = [(reader.line_num, row) for row in islice(reader, self.chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+    def _validated_chunks(
+        self,
+        entity_type: str,
+        chunks: Iterator[List[Tuple[int, Dict[str, Any]]]],
+        executor: Optional[ProcessPoolExecutor]
+    ) -> Iterator[Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, Dict[str, Any], List[str]]]]]:
+        """
+        Validate chunks in order, keeping a bounded number ahead of the writer.
+
+        Args:
+            entity_type: Entity type (contact or lead)
+            chunks: Chunks to validate
+            executor: Validation processes (None to validate inline)
+
+        Yields:
+            Validated chunks (see validate_chunk)
+        """
+        if executor is None:
+            for chunk in chunks:
+                yield validate_chunk(entity_type, chunk)
+            return
+
+        pending: "queue.Queue[Future]" = queue.Queue()
+        window = self.validation_workers * CHUNKS_IN_FLIGHT_PER_WORKER
+        for chunk in chunks:
+            pending.put(executor.submit(validate_chunk, entity_type, chunk))
+            if pending.qsize() >= window:
+                yield pending.get().result()
+        while not pending.empty():
+            yield pending.get().result()
+
+    def _write_chunk(
+        self,
+        db: Session,
+        job: ImportJob,
+        scope: AccessScope,
+        records: List[Dict[str, Any]]
+    ) -> Callable[[], None]:
+        """
+        Write the valid rows of a chunk (uncommitted).
+
+        Args:
+            db: Database session
+            job: Import job
+            scope: Access scope of the importing user
+            records: Validated rows
+
+        Returns:
+            Callable[[], None]: Follow-ups to run after commit
+        """
+        if job.entity_type == "contact":
+            created, updated = upsert_contacts(db, records, scope)
+            job.rows_created += len(created)
+            job.rows_updated += len(updated)
+
+            def after_commit() -> None:
+                autocomplete_cache.invalidate(Contact.__tablename__)
+                saved_search_maintainer.enqueue({"contact": set(created) | set(updated)})
+            return after_commit
+
+        today = date.today()
+        inserted = insert_leads(db, records, today, user_id=scope.user_id)
+        job.rows_created += len(inserted["lead_ids"])
+        return lambda: after_insert_leads(records, inserted, today)
+
+    def _import(self, db: Session, job: ImportJob, scope: AccessScope) -> None:
+        """
+        Import the file of a job chunk by chunk.
+
+        Args:
+            db: Database session
+            job: Running import job
+            scope: Access scope of the importing user
+
+        Raises:
+            ImportInterrupted: If the runner is stopped
+            ValueError: If the file is not a usable CSV file
+            SQLAlchemyError: If a chunk can't be written
+        """
+        report_path = self.storage_dir / f"{Path(job.file_path).stem}-errors.csv"
+        report_file = None
+        # Spawned rather than forked, so the processes don't inherit the runner's threads, locks and connections
+        executor = ProcessPoolExecutor(
+            self.validation_workers, mp_context=multiprocessing.get_context("spawn")
+        ) if self.validation_workers > 0 else None
+
+        try:
+            with open(job.file_path, "rb") as binary:
+                text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+                reader = csv.DictReader(text)
+                if not reader.fieldnames:
+                    raise ValueError("The file is empty")
+                reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+
+                report = None
+                chunks = self._read_chunks(reader)
+                for valid, rejected in self._validated_chunks(job.entity_type, chunks, executor):
+                    if self._stop_event.is_set():
+                        raise ImportInterrupted()
+
+                    after_commit = None
+                    if valid:
+                        after_commit = self._write_chunk(db, job, scope, [record for _, record in valid])
+
+                    job.rows_processed += len(valid) + len(rejected)
+                    job.rows_failed += len(rejected)
+                    job.processed_bytes = binary.tell()
+                    job.heartbeat_at = datetime.now()
+                    db.commit()
+                    if after_commit is not None:
+                        after_commit()
+
+                    if rejected:
+                        if report is None:
+                            report_file = open(report_path, "w", newline="", encoding="utf-8")
+                            report = csv.writer(report_file)
+                            report.writerow(["line", "errors"] + reader.fieldnames)
+                            job.error_report_path = str(report_path)
+                        for line, row, errors in rejected:
+                            report.writerow([line, "; ".join(errors)] + [row.get(name) for name in reader.fieldnames])
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValueError(f"Unreadable CSV file: {str(e)}")
+        finally:
+            if report_file is not None:
+                report_file.close()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def run(self, job_id: int) -> Optional[ImportJob]:
+        """
+        Claim a pending import job and run it to completion.
+
+        Args:
+            job_id: Import job ID
+
+        Returns:
+            Optional[ImportJob]: Finished job, or None if it wasn't pending,
+            another runner claimed it first or its file isn't reachable here
+        """
+        db = self.session_factory()
+        try:
+            job = db.get(ImportJob, job_id)
+            if job is None or job.status != "pending":
+                return None
+            if not Path(job.file_path).is_file():
+                logger.info(f"File of import job {job_id} is not in this host's storage, leaving it to other runners")
+                return None
+
+            now = datetime.now()
+            claimed = db.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.status == "pending")
+                .values(status="running", started_at=now, heartbeat_at=now),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return None
+            db.refresh(job)
+
+            scope = AccessScope(
+                job.created_by, unrestricted=job.scope_member_ids is None, member_ids=job.scope_member_ids
+            )
+            scope.bind(db)
+            logger.info(f"Importing {job.entity_type} file {job.filename} (job {job.id})")
+
+            try:
+                self._import(db, job, scope)
+                job.status = "completed"
+            except ImportInterrupted:
+                job.status = "failed"
+                job.error_message = f"Interrupted by shutdown after {job.rows_processed} rows"
+            except (ValueError, OSError, SQLAlchemyError) as e:
+                db.rollback()
+                logger.error(f"Error importing {job.filename} (job {job.id}): {str(e)}")
+                job.status = "failed"
+                job.error_message = f"{str(e)} (after {job.rows_processed} rows)"
+
+            job.finished_at = datetime.now()
+            db.commit()
+
+            if job.entity_type == "contact" and search_engine.enabled:
+                ContactRepository().reindex(db, since=job.started_at)
+
+            logger.info(
+                f"Import job {job.id} {job.status}: {job.rows_created} created, "
+                f"{job.rows_updated} updated, {job.rows_failed} rejected"
+            )
+            return job
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error running import job {job_id}: {str(e)}")
+            raise
+        finally:
+            db.close()
+
+    def resume(self) -> None:
+        """Queue the pending jobs and fail the running ones whose runner stopped sending heartbeats."""
+        db = self.session_factory()
+        try:
+            now = datetime.now()
+            db.execute(
+                update(ImportJob).where(
+                    ImportJob.status == "running",
+                    or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < now - timedelta(seconds=self.lease_seconds))
+                ).values(status="failed", error_message="Interrupted: its runner stopped", finished_at=now)
+            )
+            db.commit()
+            for job_id in db.execute(
+                select(ImportJob.id).where(ImportJob.status == "pending").order_by(ImportJob.id)
+            ).scalars():
+                self._queue.put(job_id)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error resuming import jobs: {str(e)}")
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        """Run queued jobs one at a time until stopped, polling for pending jobs while idle."""
+        polled_at = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                job_id = self._queue.get(timeout=1)
+            except queue.Empty:
+                if time.monotonic() - polled_at >= PENDING_POLL_SECONDS:
+                    polled_at = time.monotonic()
+                    self.resume()
+                continue
+
+            try:
+                self.run(job_id)
+            except SQLAlchemyError:
+                pass
+
+    def start(self) -> None:
+        """Start the runner in a background thread."""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self.resume()
+        self._thread = threading.Thread(target=self._run, name="import-runner", daemon=True)
+        self._thread.start()
+        logger.info("Import runner started")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background runner; a running job stops after its current chunk.
+
+        Args:
+            timeout: Seconds to wait for the thread to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Create import instances
+import_job_repository = ImportJobRepository()
+import_job_runner = ImportJobRunner()
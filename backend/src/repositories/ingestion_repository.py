@@ -0,0 +1,669 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Lead ingestion repository module for the Sales Automation System.
+This module provides buffered, batched ingestion of inbound leads from
+web forms and ad platforms.
+"""
+
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import queue
+import re
+import threading
+import time
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import (
+    LEAD_INGEST_QUEUE_SIZE,
+    LEAD_INGEST_BATCH_SIZE,
+    LEAD_INGEST_FLUSH_INTERVAL_MS,
+    LEAD_INGEST_RETRY_SECONDS,
+    LEAD_INGEST_KEY_TTL_HOURS,
+    LEAD_INGEST_AUTO_ASSIGN
+)
+from src.models.contact import Contact, email_blind_index, contact_derived_keys
+from src.models.lead import Lead, LeadActivity, LeadIngestKey, LeadSource, LeadStatus
+from src.repositories.assignment_repository import lead_assignment_engine
+from src.repositories.lead_repository import lead_rescoring_worker
+from src.repositories.saved_search_repository import saved_search_maintainer
+from src.repositories.transition_repository import record_transitions
+from src.utils.analytics_cache import analytics_cache
+from src.utils.autocomplete import autocomplete_cache
+from src.utils.inverted_index import search_engine
+from src.utils.normalization import normalize_email
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Loose email syntax check; deliverability is not our concern here
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Accepted submission fields and their maximum lengths (None for unbounded text)
+TEXT_FIELDS = {
+    "first_name": 50,
+    "last_name": 50,
+    "email": 100,
+    "phone": 20,
+    "company_name": 100,
+    "job_title": 100,
+    "country": 100,
+    "title": 255,
+    "description": None,
+    "source_details": 255,
+    "territory": 50,
+    "idempotency_key": 100
+}
+
+# Idempotency keys remembered in memory to answer retries without queueing them
+RECENT_KEYS = 100_000
+
+# Seconds between prunings of expired idempotency keys
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def validate_submission(data: Any) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Validate and normalize an inbound lead submission.
+
+    Args:
+        data: Submitted lead (first_name, last_name, email, phone,
+            company_name, job_title, country, title, description, source,
+            source_details, estimated_value, territory, idempotency_key)
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], List[str]]: Normalized submission
+        (None if invalid) and the validation errors
+    """
+    if not isinstance(data, dict):
+        return None, ["Lead must be an object"]
+
+    errors = []
+    submission: Dict[str, Any] = {}
+    for field, max_length in TEXT_FIELDS.items():
+        value = data.get(field)
+        if value is None:
+            continue
+        value = str(value).strip()
+        if max_length is not None and len(value) > max_length:
+            errors.append(f"{field} is longer than {max_length} characters")
+        if value:
+            submission[field] = value
+
+    if "email" in submission:
+        submission["email"] = normalize_email(submission["email"])
+        if not EMAIL_PATTERN.match(submission["email"]):
+            errors.append("email is invalid")
+    if "email" not in submission and "phone" not in submission:
+        errors.append("email or phone is required")
+
+    try:
+        submission["source"] = LeadSource(data.get("source") or LeadSource.WEBSITE.value).value
+    except ValueError:
+        errors.append(f"source must be one of {', '.join(source.value for source in LeadSource)}")
+
+    if data.get("estimated_value") not in (None, ""):
+        try:
+            submission["estimated_value"] = float(data["estimated_value"])
+        except (TypeError, ValueError):
+            errors.append("estimated_value must be a number")
+
+    if errors:
+        return None, errors
+
+    submission.setdefault("first_name", (submission.get("email") or "").split("@")[0][:50] or "Unknown")
+    name = " ".join(filter(None, (submission["first_name"], submission.get("last_name"))))
+    submission.setdefault("title", f"Inbound lead: {name}"[:255])
+    return submission, []
+
+
+def resolve_contacts(
+    db: Session,
+    submissions: List[Dict[str, Any]],
+    user_id: Optional[int] = None
+) -> Tuple[List[int], List[int], int]:
+    """
+    Find or create the contact of each lead submission.
+
+    Existing contacts are matched by email blind index for the whole
+    batch at once; submissions sharing an unknown email share one new
+    contact. Blind indexes and dedupe keys are computed here because
+    multi-row inserts bypass the attribute events setting them.
+
+    Args:
+        db: Database session
+        submissions: Submissions from validate_submission
+        user_id: Owner and creator of the new contacts (optional)
+
+    Returns:
+        Tuple[List[int], List[int], int]: Contact ID of each submission,
+        IDs of the created contacts and number of matched submissions
+    """
+    indexes = [email_blind_index(submission.get("email")) for submission in submissions]
+    wanted = {index for index in indexes if index is not None}
+    existing = dict(db.execute(
+        select(Contact.email_bidx, func.min(Contact.id))
+        .where(Contact.email_bidx.in_(wanted))
+        .group_by(Contact.email_bidx)
+    ).all()) if wanted else {}
+    matched = sum(1 for index in indexes if index in existing)
+
+    new_positions = []
+    new_rows = []
+    for position, (submission, index) in enumerate(zip(submissions, indexes)):
+        if index is not None and index in existing:
+            continue
+        if index is not None:
+            existing[index] = None
+        new_positions.append(position)
+        new_rows.append({
+            "first_name": submission["first_name"],
+            "last_name": submission.get("last_name"),
+            "email": submission.get("email"),
+            "phone": submission.get("phone"),
+            "company_name": submission.get("company_name"),
+            "job_title": submission.get("job_title"),
+            "country": submission.get("country"),
+            "source": submission["source"],
+            **contact_derived_keys(submission.get("email"), submission.get("phone"), submission.get("last_name")),
+            "owner_id": user_id,
+            "created_by": user_id
+        })
+
+    created = []
+    if new_rows:
+        created = list(db.execute(
+            insert(Contact).returning(Contact.id, sort_by_parameter_order=True), new_rows
+        ).scalars())
+
+    contact_ids: List[Optional[int]] = [None] * len(submissions)
+    for position, contact_id in zip(new_positions, created):
+        contact_ids[position] = contact_id
+        if indexes[position] is not None:
+            existing[indexes[position]] = contact_id
+    for position, index in enumerate(indexes):
+        if contact_ids[position] is None:
+            contact_ids[position] = existing[index]
+
+    return contact_ids, created, matched
+
+
+def insert_leads(
+    db: Session,
+    submissions: List[Dict[str, Any]],
+    today: date,
+    user_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Insert new leads with their contacts and initial activities using multi-row statements.
+
+    The caller commits and then runs after_insert_leads.
+
+    Args:
+        db: Database session
+        submissions: Submissions from validate_submission
+        today: Date of the initial activities
+        user_id: Owner and creator of the new records (optional)
+
+    Returns:
+        Dict[str, Any]: contact_ids, lead_ids and activity_ids (one per
+        submission), created_contact_ids and matched_contacts
+    """
+    contact_ids, created_contact_ids, matched = resolve_contacts(db, submissions, user_id)
+
+    lead_ids = list(db.execute(
+        insert(Lead).returning(Lead.id, sort_by_parameter_order=True),
+        [
+            {
+                "title": submission["title"],
+                "description": submission.get("description"),
+                "status": LeadStatus.NEW,
+                "source": LeadSource(submission["source"]),
+                "source_details": submission.get("source_details"),
+                "estimated_value": submission.get("estimated_value"),
+                "contact_id": contact_id,
+                "owner_id": user_id,
+                "created_by": user_id,
+                "activity_count": 1,
+                "last_activity_date": today
+            }
+            for submission, contact_id in zip(submissions, contact_ids)
+        ]
+    ).scalars())
+    record_transitions(db, "lead", [(lead_id, None, LeadStatus.NEW) for lead_id in lead_ids], user_id)
+
+    activity_ids = list(db.execute(
+        insert(LeadActivity).returning(LeadActivity.id, sort_by_parameter_order=True),
+        [
+            {
+                "lead_id": lead_id,
+                "activity_type": "created",
+                "subject": "Lead received",
+                "description": f"Lead received from {submission['source']}",
+                "date": today,
+                "created_by": user_id
+            }
+            for submission, lead_id in zip(submissions, lead_ids)
+        ]
+    ).scalars())
+
+    return {
+        "contact_ids": contact_ids,
+        "lead_ids": lead_ids,
+        "activity_ids": activity_ids,
+        "created_contact_ids": created_contact_ids,
+        "matched_contacts": matched
+    }
+
+
+def after_insert_leads(submissions: List[Dict[str, Any]], inserted: Dict[str, Any], today: date) -> None:
+    """
+    Run the follow-ups that ORM writes trigger through events, which multi-row inserts skip.
+
+    Args:
+        submissions: Written submissions
+        inserted: Result of insert_leads
+        today: Date of the initial activities
+    """
+    created_contact_ids = inserted["created_contact_ids"]
+    lead_ids = inserted["lead_ids"]
+
+    if created_contact_ids:
+        autocomplete_cache.invalidate(Contact.__tablename__)
+    analytics_cache.invalidate(Lead.__tablename__)
+
+    if search_engine.enabled:
+        created = set(created_contact_ids)
+        for submission, contact_id, lead_id in zip(submissions, inserted["contact_ids"], lead_ids):
+            if contact_id in created:
+                search_engine.add(Contact.__tablename__, contact_id, submission)
+            search_engine.add(Lead.__tablename__, lead_id, submission)
+
+    saved_search_maintainer.enqueue({"lead": set(lead_ids), "contact": set(created_contact_ids)})
+    lead_rescoring_worker.enqueue([
+        (lead_id, activity_id, today) for lead_id, activity_id in zip(lead_ids, inserted["activity_ids"])
+    ])
+
+
+class LeadIngestionPipeline:
+    """
+    Buffered writer for inbound leads.
+
+    Validated submissions are put on a bounded in-memory queue and
+    acknowledged right away. A background thread writes them in batches:
+    idempotency keys are claimed first (retried submissions are skipped),
+    contacts are matched by email blind index with one lookup for the
+    whole batch, and the new contacts, leads and initial activities are
+    inserted with one multi-row statement each, all in one transaction.
+
+    When a batch can't be written it is retried after
+    LEAD_INGEST_RETRY_SECONDS while the queue absorbs new submissions;
+    once the queue is full, submitters are asked to retry later. Queued
+    submissions are lost if the process dies, which is why clients
+    should send idempotency keys and retry until they get an
+    acknowledgement.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = LEAD_INGEST_QUEUE_SIZE,
+        batch_size: int = LEAD_INGEST_BATCH_SIZE,
+        flush_interval_ms: int = LEAD_INGEST_FLUSH_INTERVAL_MS,
+        retry_seconds: int = LEAD_INGEST_RETRY_SECONDS,
+        key_ttl_hours: int = LEAD_INGEST_KEY_TTL_HOURS,
+        auto_assign: bool = LEAD_INGEST_AUTO_ASSIGN,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the ingestion pipeline.
+
+        Args:
+            queue_size: Maximum number of queued submissions
+            batch_size: Maximum number of submissions per write
+            flush_interval_ms: Maximum time a submission waits for its batch in milliseconds
+            retry_seconds: Seconds before a failed batch is retried
+            key_ttl_hours: Hours idempotency keys are kept
+            auto_assign: Whether to route new leads to reps with the assignment engine
+            session_factory: Factory for database sessions
+        """
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.retry_seconds = retry_seconds
+        self.key_ttl_hours = key_ttl_hours
+        self.auto_assign = auto_assign
+        self.session_factory = session_factory
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._recent_keys: "OrderedDict[str, None]" = OrderedDict()
+        self._keys_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_prune_at = 0.0
+        self.metrics = {
+            "enqueued": 0,
+            "duplicates": 0,
+            "rejected_full": 0,
+            "leads_written": 0,
+            "contacts_created": 0,
+            "contacts_matched": 0,
+            "batches": 0,
+            "write_failures": 0,
+            "last_write_lag_ms": 0.0,
+            "max_write_lag_ms": 0.0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the background writer is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _count(self, metric: str, amount: int = 1) -> None:
+        """
+        Increment a counter metric.
+
+        Args:
+            metric: Metric name
+            amount: Increment
+        """
+        with self._metrics_lock:
+            self.metrics[metric] += amount
+
+    def _remember_key(self, key: str) -> bool:
+        """
+        Remember an idempotency key.
+
+        Args:
+            key: Idempotency key
+
+        Returns:
+            bool: False if the key was already seen recently
+        """
+        with self._keys_lock:
+            if key in self._recent_keys:
+                self._recent_keys.move_to_end(key)
+                return False
+            self._recent_keys[key] = None
+            if len(self._recent_keys) > RECENT_KEYS:
+                self._recent_keys.popitem(last=False)
+            return True
+
+    def _forget_key(self, key: str) -> None:
+        """Forget an idempotency key whose submission wasn't queued."""
+        with self._keys_lock:
+            self._recent_keys.pop(key, None)
+
+    def submit(self, submission: Dict[str, Any]) -> str:
+        """
+        Queue a validated submission for writing.
+
+        Args:
+            submission: Submission from validate_submission
+
+        Returns:
+            str: "accepted", "duplicate" (idempotency key seen before) or
+            "full" (queue full, retry later)
+        """
+        key = submission.get("idempotency_key")
+        if key is not None and not self._remember_key(key):
+            self._count("duplicates")
+            return "duplicate"
+
+        try:
+            self._queue.put_nowait({**submission, "received_at": datetime.utcnow()})
+        except queue.Full:
+            if key is not None:
+                self._forget_key(key)
+            self._count("rejected_full")
+            return "full"
+
+        self._count("enqueued")
+        return "accepted"
+
+    def _claim_keys(self, db: Session, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Claim the idempotency keys of a batch, dropping submissions whose key is taken.
+
+        Args:
+            db: Database session
+            submissions: Submissions
+
+        Returns:
+            List[Dict[str, Any]]: Submissions to write
+        """
+        keys = list(dict.fromkeys(
+            submission["idempotency_key"] for submission in submissions if "idempotency_key" in submission
+        ))
+        if not keys:
+            return submissions
+
+        if db.get_bind().dialect.name == "postgresql":
+            claimed = set(db.execute(
+                postgresql_insert(LeadIngestKey)
+                .values([{"key": key} for key in keys])
+                .on_conflict_do_nothing(index_elements=["key"])
+                .returning(LeadIngestKey.key)
+            ).scalars())
+        else:
+            taken = set(db.execute(select(LeadIngestKey.key).where(LeadIngestKey.key.in_(keys))).scalars())
+            claimed = [key for key in keys if key not in taken]
+            if claimed:
+                db.execute(insert(LeadIngestKey), [{"key": key} for key in claimed])
+            claimed = set(claimed)
+
+        accepted = []
+        for submission in submissions:
+            key = submission.get("idempotency_key")
+            if key is None:
+                accepted.append(submission)
+            elif key in claimed:
+                claimed.discard(key)
+                accepted.append(submission)
+
+        self._count("duplicates", len(submissions) - len(accepted))
+        return accepted
+
+    def _write(self, submissions: List[Dict[str, Any]]) -> None:
+        """
+        Write a batch of submissions in one transaction.
+
+        Args:
+            submissions: Submissions
+
+        Raises:
+            SQLAlchemyError: If the batch can't be written
+        """
+        today = date.today()
+        db = self.session_factory()
+        try:
+            submissions = self._claim_keys(db, submissions)
+            if not submissions:
+                db.commit()
+                return
+
+            inserted = insert_leads(db, submissions, today)
+
+            keyed = [
+                {"ingest_key": submission["idempotency_key"], "ingest_lead_id": lead_id}
+                for submission, lead_id in zip(submissions, inserted["lead_ids"]) if "idempotency_key" in submission
+            ]
+            if keyed:
+                db.execute(
+                    update(LeadIngestKey.__table__)
+                    .where(LeadIngestKey.key == bindparam("ingest_key"))
+                    .values(lead_id=bindparam("ingest_lead_id")),
+                    keyed
+                )
+
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        lag_ms = (datetime.utcnow() - min(submission["received_at"] for submission in submissions)).total_seconds() * 1000
+        with self._metrics_lock:
+            self.metrics["leads_written"] += len(inserted["lead_ids"])
+            self.metrics["contacts_created"] += len(inserted["created_contact_ids"])
+            self.metrics["contacts_matched"] += inserted["matched_contacts"]
+            self.metrics["batches"] += 1
+            self.metrics["last_write_lag_ms"] = round(lag_ms, 2)
+            self.metrics["max_write_lag_ms"] = max(self.metrics["max_write_lag_ms"], round(lag_ms, 2))
+
+        after_insert_leads(submissions, inserted, today)
+        if self.auto_assign:
+            self._assign(submissions, inserted["lead_ids"])
+
+    def _assign(self, submissions: List[Dict[str, Any]], lead_ids: List[int]) -> None:
+        """
+        Route written leads to reps, grouped by the submitted territory.
+
+        Args:
+            submissions: Written submissions
+            lead_ids: Lead ID of each submission
+        """
+        by_territory: Dict[Optional[str], List[int]] = {}
+        for submission, lead_id in zip(submissions, lead_ids):
+            by_territory.setdefault(submission.get("territory"), []).append(lead_id)
+
+        db = self.session_factory()
+        try:
+            for territory, territory_lead_ids in by_territory.items():
+                lead_assignment_engine.assign(db, territory_lead_ids, territory=territory)
+        except SQLAlchemyError as e:
+            logger.error(f"Error assigning {len(lead_ids)} ingested leads: {str(e)}")
+        finally:
+            db.close()
+
+    def prune_keys(self) -> int:
+        """
+        Delete idempotency keys older than the key TTL.
+
+        Returns:
+            int: Number of deleted keys
+        """
+        db = self.session_factory()
+        try:
+            cutoff = datetime.now() - timedelta(hours=self.key_ttl_hours)
+            deleted = db.execute(delete(LeadIngestKey).where(LeadIngestKey.created_at < cutoff)).rowcount
+            db.commit()
+            return deleted
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error pruning lead ingestion keys: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        """
+        Collect the next batch from the queue.
+
+        Returns:
+            List[Dict[str, Any]]: Submissions, empty if none arrived within the flush interval
+        """
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval_ms / 1000
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far in batches (used when the thread isn't running).
+
+        Returns:
+            int: Number of written submissions
+        """
+        written = 0
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return written
+            self._write(batch)
+            written += len(batch)
+
+    def _run(self) -> None:
+        """Write queued submissions until stopped and the queue is drained."""
+        batch: List[Dict[str, Any]] = []
+        while not (self._stop_event.is_set() and self._queue.empty() and not batch):
+            if time.monotonic() >= self._next_prune_at:
+                self._next_prune_at = time.monotonic() + PRUNE_INTERVAL_SECONDS
+                self.prune_keys()
+
+            batch = batch or self._collect()
+            if not batch:
+                continue
+
+            try:
+                self._write(batch)
+                batch = []
+            except SQLAlchemyError as e:
+                self._count("write_failures")
+                logger.error(f"Error writing {len(batch)} ingested leads, retrying: {str(e)}")
+                if self._stop_event.wait(self.retry_seconds):
+                    logger.error(f"Stopped with {len(batch) + self._queue.qsize()} ingested leads unwritten")
+                    return
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get pipeline metrics.
+
+        Returns:
+            Dict[str, Any]: Counters, queue depth and write lag in milliseconds
+        """
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+
+        metrics.update({
+            "running": self.is_running,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize
+        })
+        return metrics
+
+    def start(self) -> None:
+        """Start the writer in a background thread."""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="lead-ingestion", daemon=True)
+        self._thread.start()
+        logger.info(f"Lead ingestion started (batches of {self.batch_size}, every {self.flush_interval_ms} ms)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background writer after draining the queue.
+
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Create lead ingestion pipeline instance
+lead_ingestion_pipeline = LeadIngestionPipeline()
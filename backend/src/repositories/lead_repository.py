@@ -5,18 +5,71 @@ Lead repository module for the Sales Automation System.
 This module provides repository classes for lead-related models.
 """
 
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Callable, Iterable, Iterator, Tuple
+from sqlalchemy import Integer, bindparam, case, func, insert, inspect, literal, literal_column, or_, select, text, tuple_, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from datetime import date
+from datetime import date, datetime
+from collections import OrderedDict
+from itertools import chain
+import logging
+import time
 
+import numpy as np
+
+from config.database import SessionLocal
+from config.settings import (
+    LEAD_SCORING_BATCH_SIZE, LEAD_RESCORE_DEBOUNCE_MS, LEAD_RESCORE_MAX_DELAY_MS, LEAD_RESCORE_CACHE_SIZE,
+    LEAD_RESCORE_CACHE_TTL_SECONDS, LEAD_CONVERT_MAX_LEADS
+)
+from src.repositories.activity_repository import activity_rollup_maintainer
+from src.repositories.assignment_repository import OPEN_LEAD_STATUSES, lead_assignment_engine
 from src.repositories.base import BaseRepository
-from src.models.lead import Lead, LeadActivity, Opportunity, OpportunityActivity, LeadStatus, OpportunityStage
+from src.repositories.saved_search_repository import saved_search_maintainer
+from src.repositories.transition_repository import record_transitions
+from src.utils.analytics_cache import analytics_cache
+from src.utils.change_collector import ChangeCollector, ChangeMaintainer
+from src.utils.inverted_index import search_engine
+from src.utils.lead_scoring import LeadScoringModel, lead_scoring_model
+from src.models.contact import Contact
+from src.models.lead import (
+    Lead, LeadActivity, LeadScore, Opportunity, OpportunityActivity, LeadStatus, LeadSource, OpportunityStage
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Lead fields feeding the score, whose changes trigger a rescore
+SCORING_LEAD_FIELDS = ("status", "source", "estimated_value", "contact_id")
+
+# Pipeline summary groupings by the GROUPING() bitmask of (stage, owner_id, close month)
+# marking their rows: result key, field name and conversion of the grouped value
+PIPELINE_GROUPINGS = {
+    3: ("by_stage", "stage", lambda stage: stage.value),
+    5: ("by_owner", "owner_id", int),
+    6: ("by_close_month", "month", lambda month: str(month)[:7])
+}
+
+# Score write-back on PostgreSQL: one statement per batch from parallel arrays
+_POSTGRES_SCORE_UPDATE = text(
+    "UPDATE lead SET score = v.score, is_qualified = v.is_qualified "
+    "FROM unnest(:ids, :scores, :flags) AS v(id, score, is_qualified) "
+    "WHERE lead.id = v.id"
+)
+_POSTGRES_SCORE_HISTORY = text(
+    "INSERT INTO lead_scores (lead_id, score, is_qualified, model_version, scored_at) "
+    "SELECT v.lead_id, v.score, v.is_qualified, :version, :scored_at "
+    "FROM unnest(:ids, :scores, :flags) AS v(lead_id, score, is_qualified)"
+)
 
 
 class LeadRepository(BaseRepository[Lead]):
     """Repository for Lead model operations."""
     
+    snippet_fields = ("title", "description")
+    search_index_fields = {"title": 3, "description": 1}
+    
     def __init__(self):
         super().__init__(Lead)
     
@@ -33,7 +86,7 @@ class LeadRepository(BaseRepository[Lead]):
         Returns:
             List[Lead]: List of leads
         """
-        return db.query(Lead).filter(Lead.contact_id == contact_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(Lead.contact_id == contact_id).offset(skip).limit(limit).all()
     
     def get_by_owner(self, db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[Lead]:
         """
@@ -48,7 +101,7 @@ class LeadRepository(BaseRepository[Lead]):
         Returns:
             List[Lead]: List of leads
         """
-        return db.query(Lead).filter(Lead.owner_id == owner_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(Lead.owner_id == owner_id).offset(skip).limit(limit).all()
     
     def get_by_status(self, db: Session, status: LeadStatus, skip: int = 0, limit: int = 100) -> List[Lead]:
         """
@@ -63,7 +116,7 @@ class LeadRepository(BaseRepository[Lead]):
         Returns:
             List[Lead]: List of leads
         """
-        return db.query(Lead).filter(Lead.status == status).offset(skip).limit(limit).all()
+        return self._query(db).filter(Lead.status == status).offset(skip).limit(limit).all()
     
     def get_by_source(self, db: Session, source: str, skip: int = 0, limit: int = 100) -> List[Lead]:
         """
@@ -78,11 +131,11 @@ class LeadRepository(BaseRepository[Lead]):
         Returns:
             List[Lead]: List of leads
         """
-        return db.query(Lead).filter(Lead.source == source).offset(skip).limit(limit).all()
+        return self._query(db).filter(Lead.source == source).offset(skip).limit(limit).all()
     
     def search(self, db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Lead]:
         """
-        Search leads by title or description.
+        Search leads by title or description, ranked by relevance.
         
         Args:
             db: Database session
@@ -93,13 +146,7 @@ class LeadRepository(BaseRepository[Lead]):
         Returns:
             List[Lead]: List of matching leads
         """
-        search_term = f"%{query}%"
-        return db.query(Lead).filter(
-            or_(
-                Lead.title.ilike(search_term),
-                Lead.description.ilike(search_term)
-            )
-        ).offset(skip).limit(limit).all()
+        return [obj for obj, _, _ in self.full_text_search(db, query, skip=skip, limit=limit)]
     
     def convert_to_opportunity(self, db: Session, lead_id: int, opportunity_data: Dict[str, Any]) -> Opportunity:
         """
@@ -131,19 +178,450 @@ class LeadRepository(BaseRepository[Lead]):
             updated_by=lead.updated_by
         )
         
-        db.add(opportunity)
-        
-        # Update lead
-        lead.converted_to_opportunity = True
-        lead.conversion_date = date.today()
-        lead.opportunity_id = opportunity.id
-        lead.status = LeadStatus.CONVERTED
+        try:
+            db.add(opportunity)
+            # Flush so the lead can be linked to the new opportunity's ID
+            db.flush()
+            
+            # Update lead
+            lead.converted_to_opportunity = True
+            lead.conversion_date = date.today()
+            lead.opportunity_id = opportunity.id
+            lead.status = LeadStatus.CONVERTED
+            
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error converting lead {lead_id}: {str(e)}")
+            raise
         
-        db.commit()
         db.refresh(opportunity)
-        db.refresh(lead)
+        search_engine.add_object(opportunity)
         
         return opportunity
+    
+    def _link_opportunities(
+        self, db: Session, lead_ids: List[int], opportunity_ids: List[int], actor_id: Optional[int]
+    ) -> None:
+        """
+        Mark leads as converted and link them to their new opportunities.
+        
+        Args:
+            db: Database session
+            lead_ids: Lead IDs
+            opportunity_ids: Opportunity ID of each lead
+            actor_id: ID of the converting user
+        """
+        values = {
+            "converted_to_opportunity": True,
+            "conversion_date": date.today(),
+            "status": LeadStatus.CONVERTED,
+            "updated_by": actor_id,
+            "updated_at": datetime.now()
+        }
+        
+        if db.get_bind().dialect.name == "postgresql":
+            links = func.unnest(
+                bindparam("lead_ids", lead_ids, type_=postgresql.ARRAY(Integer)),
+                bindparam("opportunity_ids", opportunity_ids, type_=postgresql.ARRAY(Integer))
+            ).table_valued("lead_id", "opportunity_id").render_derived()
+            db.execute(
+                update(Lead).where(Lead.id == links.c.lead_id).values(opportunity_id=links.c.opportunity_id, **values),
+                execution_options={"synchronize_session": False}
+            )
+            return
+        
+        db.execute(update(Lead), [
+            {"id": lead_id, "opportunity_id": opportunity_id, **values}
+            for lead_id, opportunity_id in zip(lead_ids, opportunity_ids)
+        ])
+    
+    def convert_many(
+        self,
+        db: Session,
+        opportunity_data: Dict[str, Any],
+        actor_id: Optional[int] = None,
+        lead_ids: Optional[Iterable[int]] = None,
+        condition: Optional[Any] = None,
+        max_leads: int = LEAD_CONVERT_MAX_LEADS
+    ) -> Dict[int, int]:
+        """
+        Convert many leads to opportunities in one transaction.
+        
+        The unconverted leads among lead_ids and/or matching condition
+        (within the repository scope) are locked and loaded with one query.
+        Their opportunities are created with one multi-row INSERT ...
+        RETURNING, the leads are linked to them with one set-based UPDATE,
+        and the conversion activities of both are inserted in bulk.
+        
+        Args:
+            db: Database session
+            opportunity_data: Values shared by the new opportunities (stage,
+            probability, close_date, amount, owner_id); name, description,
+            contact, owner, amount and close date default to the lead's
+            actor_id: ID of the converting user
+            lead_ids: IDs of the leads to convert (optional)
+            condition: SQL condition selecting the leads to convert (optional)
+            max_leads: Maximum number of leads per call
+            
+        Returns:
+            Dict[int, int]: New opportunity ID by converted lead ID
+            
+        Raises:
+            ValueError: If neither leads nor a condition are given or too many leads match
+        """
+        if lead_ids is None and condition is None:
+            raise ValueError("Leads to convert must be given by IDs or filters")
+        
+        query = self._query(
+            db, Lead.id, Lead.title, Lead.description, Lead.status, Lead.contact_id, Lead.owner_id,
+            Lead.estimated_value, Lead.estimated_close_date
+        ).filter(Lead.converted_to_opportunity.is_(False), Lead.status != LeadStatus.CONVERTED)
+        if lead_ids is not None:
+            query = query.filter(Lead.id.in_(list(lead_ids)))
+        if condition is not None:
+            query = query.filter(condition)
+        
+        today = date.today()
+        try:
+            leads = query.order_by(Lead.id).limit(max_leads + 1).with_for_update(of=Lead).all()
+            if len(leads) > max_leads:
+                raise ValueError(f"More than {max_leads} leads match; narrow the selection")
+            if not leads:
+                db.commit()
+                return {}
+            
+            stage = opportunity_data.get("stage", OpportunityStage.PROSPECTING)
+            opportunity_ids = list(db.execute(
+                insert(Opportunity).returning(Opportunity.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "name": lead.title,
+                        "description": lead.description,
+                        "stage": OpportunityStage(stage),
+                        "probability": opportunity_data.get("probability", 0),
+                        "amount": opportunity_data.get("amount", lead.estimated_value),
+                        "close_date": opportunity_data.get("close_date", lead.estimated_close_date),
+                        "contact_id": lead.contact_id,
+                        "owner_id": opportunity_data.get("owner_id", lead.owner_id),
+                        "created_by": actor_id,
+                        "updated_by": actor_id,
+                        "activity_count": 1,
+                        "last_activity_date": today
+                    }
+                    for lead in leads
+                ]
+            ).scalars())
+            
+            converted_ids = [lead.id for lead in leads]
+            self._link_opportunities(db, converted_ids, opportunity_ids, actor_id)
+            # The set-based writes skip the session events that record status history
+            record_transitions(db, "lead", [(lead.id, lead.status, LeadStatus.CONVERTED) for lead in leads], actor_id)
+            record_transitions(
+                db, "opportunity", [(opportunity_id, None, OpportunityStage(stage)) for opportunity_id in opportunity_ids], actor_id
+            )
+            
+            db.execute(insert(OpportunityActivity), [
+                {
+                    "opportunity_id": opportunity_id,
+                    "activity_type": "conversion",
+                    "subject": "Converted from lead",
+                    "description": f"Converted from lead {lead.id}: {lead.title}",
+                    "date": today,
+                    "created_by": actor_id
+                }
+                for lead, opportunity_id in zip(leads, opportunity_ids)
+            ])
+            activity_ids = list(db.execute(
+                insert(LeadActivity).returning(LeadActivity.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "lead_id": lead.id,
+                        "activity_type": "conversion",
+                        "subject": "Converted to opportunity",
+                        "description": f"Converted to opportunity {opportunity_id}",
+                        "date": today,
+                        "created_by": actor_id
+                    }
+                    for lead, opportunity_id in zip(leads, opportunity_ids)
+                ]
+            ).scalars())
+            
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error converting leads to opportunities: {str(e)}")
+            raise
+        except ValueError:
+            db.rollback()
+            raise
+        
+        # Follow-ups that ORM writes trigger through session events
+        if search_engine.enabled:
+            for lead, opportunity_id in zip(leads, opportunity_ids):
+                search_engine.add(Opportunity.__tablename__, opportunity_id, {"name": lead.title, "description": lead.description})
+        saved_search_maintainer.enqueue({"lead": set(converted_ids)})
+        activity_rollup_maintainer.enqueue({"lead": set(converted_ids)})
+        analytics_cache.invalidate(Lead.__tablename__)
+        analytics_cache.invalidate(Opportunity.__tablename__)
+        lead_rescoring_worker.enqueue([
+            (lead_id, activity_id, today) for lead_id, activity_id in zip(converted_ids, activity_ids)
+        ])
+        released: Dict[int, int] = {}
+        for lead in leads:
+            if lead.owner_id is not None and lead.status in OPEN_LEAD_STATUSES:
+                released[lead.owner_id] = released.get(lead.owner_id, 0) - 1
+        lead_assignment_engine.adjust(released)
+        
+        logger.info(f"Converted {len(leads)} leads to opportunities")
+        return dict(zip(converted_ids, opportunity_ids))
+    
+    def add_activity(self, db: Session, activity_data: Dict[str, Any]) -> LeadActivity:
+        """
+        Add an activity to a lead.
+        
+        The lead is rescored by the lead rescoring worker shortly after
+        the activity is committed.
+        
+        Args:
+            db: Database session
+            activity_data: Activity data with lead_id and activity_type
+            (date defaults to today and subject to the activity type)
+            
+        Returns:
+            LeadActivity: Created activity
+        """
+        activity_data = dict(activity_data)
+        activity_data.setdefault("date", date.today())
+        if not activity_data.get("subject"):
+            activity_data["subject"] = str(activity_data.get("activity_type", "activity")).replace("_", " ").capitalize()
+        
+        try:
+            activity = LeadActivity(**activity_data)
+            db.add(activity)
+            db.commit()
+            db.refresh(activity)
+            return activity
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error adding activity to lead {activity_data.get('lead_id')}: {str(e)}")
+            raise
+    
+    def _score_batches(self, db: Session, lead_ids: Optional[Iterable[int]], batch_size: int) -> Iterator[Tuple[Any, Any]]:
+        """
+        Split the leads to score into batches.
+        
+        Args:
+            db: Database session
+            lead_ids: IDs of the leads to score, or None for all leads
+            batch_size: Maximum leads per batch
+            
+        Yields:
+            Tuple[Any, Any]: Conditions selecting the batch on Lead.id and on LeadActivity.lead_id
+        """
+        if lead_ids is not None:
+            lead_ids = sorted(set(lead_ids))
+            for start in range(0, len(lead_ids), batch_size):
+                chunk = lead_ids[start:start + batch_size]
+                yield Lead.id.in_(chunk), LeadActivity.lead_id.in_(chunk)
+            return
+        
+        # Keyset ranges of batch_size IDs, so each batch aggregates only its own activities
+        after = 0
+        while True:
+            last = db.execute(
+                select(Lead.id).where(Lead.id > after).order_by(Lead.id).offset(batch_size - 1).limit(1)
+            ).scalar()
+            if last is None:
+                yield Lead.id > after, LeadActivity.lead_id > after
+                return
+            yield Lead.id.between(after + 1, last), LeadActivity.lead_id.between(after + 1, last)
+            after = last
+    
+    def get_activity_aggregates(self, db: Session, lead_ids: Iterable[int]) -> Dict[int, Tuple[int, Optional[date], int]]:
+        """
+        Get the activity count, last activity date and last activity ID of leads.
+        
+        Args:
+            db: Database session
+            lead_ids: Lead IDs
+            
+        Returns:
+            Dict[int, Tuple[int, Optional[date], int]]: Aggregates by lead ID
+            (leads without activities get (0, None, 0))
+        """
+        lead_ids = list(lead_ids)
+        aggregates = {lead_id: (0, None, 0) for lead_id in lead_ids}
+        
+        rows = db.execute(
+            select(LeadActivity.lead_id, func.count(), func.max(LeadActivity.date), func.max(LeadActivity.id))
+            .where(LeadActivity.lead_id.in_(lead_ids))
+            .group_by(LeadActivity.lead_id)
+        ).all()
+        for lead_id, count, last_activity, last_activity_id in rows:
+            aggregates[lead_id] = (count, last_activity, last_activity_id)
+        
+        return aggregates
+    
+    def _load_features(
+        self,
+        db: Session,
+        condition: Any,
+        activity_condition: Any,
+        aggregates: Optional[Dict[int, Tuple[int, Optional[date], int]]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Load the scoring features of a batch of leads as columns.
+        
+        Enum columns are mapped to their indexes in SQL, so every feature
+        arrives as a number or a date.
+        
+        Args:
+            db: Database session
+            condition: Condition selecting the batch's leads
+            activity_condition: Condition selecting the batch's activities
+            aggregates: Known activity aggregates of the batch's leads (skips aggregating activities)
+            
+        Returns:
+            Tuple: Lead IDs, current scores, current qualification flags and feature arrays
+        """
+        if aggregates is None:
+            activity = select(
+                LeadActivity.lead_id,
+                func.count().label("activity_count"),
+                func.max(LeadActivity.date).label("last_activity")
+            ).where(activity_condition).group_by(LeadActivity.lead_id).subquery()
+            activity_columns = (func.coalesce(activity.c.activity_count, 0), activity.c.last_activity)
+        else:
+            activity = None
+            activity_columns = (literal(0), literal(None))
+        
+        filled = [
+            Contact.email.isnot(None),
+            or_(Contact.phone.isnot(None), Contact.mobile.isnot(None)),
+            Contact.job_title.isnot(None),
+            or_(Contact.company_id.isnot(None), Contact.company_name.isnot(None))
+        ]
+        
+        query = (
+            select(
+                Lead.id,
+                Lead.score,
+                Lead.is_qualified,
+                case(*((Lead.source == member, index) for index, member in enumerate(LeadSource)), else_=-1),
+                case(*((Lead.status == member, index) for index, member in enumerate(LeadStatus)), else_=0),
+                Lead.estimated_value,
+                *activity_columns,
+                sum(case((field, 1), else_=0) for field in filled)
+            )
+            .join(Contact, Contact.id == Lead.contact_id)
+            .where(condition)
+        )
+        if activity is not None:
+            query = query.outerjoin(activity, activity.c.lead_id == Lead.id)
+        rows = db.execute(query).all()
+        
+        columns = list(zip(*rows)) if rows else [()] * 9
+        if aggregates is not None:
+            known = [aggregates.get(lead_id, (0, None, 0)) for lead_id in columns[0]]
+            columns[6] = [count for count, _, _ in known]
+            columns[7] = [last_activity for _, last_activity, _ in known]
+        features = {
+            "source": np.array(columns[3], dtype=np.int8),
+            "status": np.array(columns[4], dtype=np.int8),
+            "estimated_value": np.array(columns[5], dtype=np.float64),
+            "activity_count": np.array(columns[6], dtype=np.int32),
+            "last_activity": np.array(columns[7], dtype="datetime64[D]"),
+            "contact_fields": np.array(columns[8], dtype=np.int8)
+        }
+        return (
+            np.array(columns[0], dtype=np.int64),
+            np.array(columns[1], dtype=np.int16),
+            np.array(columns[2], dtype=bool),
+            features
+        )
+    
+    def _write_scores(self, db: Session, ids: List[int], scores: List[int], flags: List[bool], version: str) -> None:
+        """
+        Write changed scores back to the leads and append them to the score history.
+        
+        Args:
+            db: Database session
+            ids: Lead IDs
+            scores: New scores
+            flags: New qualification flags
+            version: Scoring model version
+        """
+        scored_at = datetime.now()
+        
+        if db.get_bind().dialect.name == "postgresql":
+            params = {"ids": ids, "scores": scores, "flags": flags}
+            db.execute(_POSTGRES_SCORE_UPDATE, params)
+            db.execute(_POSTGRES_SCORE_HISTORY, {**params, "version": version, "scored_at": scored_at})
+            return
+        
+        db.execute(update(Lead), [
+            {"id": lead_id, "score": score, "is_qualified": flag}
+            for lead_id, score, flag in zip(ids, scores, flags)
+        ])
+        db.execute(insert(LeadScore), [
+            {"lead_id": lead_id, "score": score, "is_qualified": flag, "model_version": version, "scored_at": scored_at}
+            for lead_id, score, flag in zip(ids, scores, flags)
+        ])
+    
+    def rescore(
+        self,
+        db: Session,
+        lead_ids: Optional[Iterable[int]] = None,
+        batch_size: int = LEAD_SCORING_BATCH_SIZE,
+        model: LeadScoringModel = lead_scoring_model,
+        aggregates: Optional[Dict[int, Tuple[int, Optional[date], int]]] = None
+    ) -> Dict[str, int]:
+        """
+        Recompute lead scores and qualification flags in batches.
+        
+        Each batch's features are loaded with one query, scored as arrays
+        and only the leads whose score or qualification changed are
+        written back, with an entry in the score history. Each batch is
+        committed on its own, so a long run can be interrupted and resumed.
+        
+        Args:
+            db: Database session
+            lead_ids: IDs of the leads to rescore, or None for all leads
+            batch_size: Maximum leads per batch
+            model: Scoring model
+            aggregates: Known activity aggregates of the leads (see get_activity_aggregates)
+            
+        Returns:
+            Dict[str, int]: Number of scored and changed leads
+        """
+        scored = changed = 0
+        today = np.datetime64(date.today(), "D")
+        
+        for condition, activity_condition in self._score_batches(db, lead_ids, batch_size):
+            try:
+                ids, old_scores, old_flags, features = self._load_features(db, condition, activity_condition, aggregates)
+                if ids.size == 0:
+                    continue
+                
+                scores, flags = model.score(features, today)
+                changes = np.flatnonzero((scores != old_scores) | (flags != old_flags))
+                if changes.size:
+                    self._write_scores(
+                        db, ids[changes].tolist(), scores[changes].tolist(), flags[changes].tolist(), model.version
+                    )
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Error rescoring leads: {str(e)}")
+                raise
+            
+            if changes.size:
+                saved_search_maintainer.enqueue({"lead": set(ids[changes].tolist())})
+            scored += ids.size
+            changed += changes.size
+        
+        return {"scored": scored, "changed": changed}
 
 
 class LeadActivityRepository(BaseRepository[LeadActivity]):
@@ -165,7 +643,7 @@ class LeadActivityRepository(BaseRepository[LeadActivity]):
         Returns:
             List[LeadActivity]: List of lead activities
         """
-        return db.query(LeadActivity).filter(
+        return self._query(db).filter(
             LeadActivity.lead_id == lead_id
         ).order_by(LeadActivity.date.desc()).offset(skip).limit(limit).all()
     
@@ -182,7 +660,7 @@ class LeadActivityRepository(BaseRepository[LeadActivity]):
         Returns:
             List[LeadActivity]: List of lead activities
         """
-        return db.query(LeadActivity).filter(
+        return self._query(db).filter(
             LeadActivity.activity_type == activity_type
         ).order_by(LeadActivity.date.desc()).offset(skip).limit(limit).all()
 
@@ -190,6 +668,9 @@ class LeadActivityRepository(BaseRepository[LeadActivity]):
 class OpportunityRepository(BaseRepository[Opportunity]):
     """Repository for Opportunity model operations."""
     
+    snippet_fields = ("name", "description")
+    search_index_fields = {"name": 3, "description": 1}
+    
     def __init__(self):
         super().__init__(Opportunity)
     
@@ -206,7 +687,7 @@ class OpportunityRepository(BaseRepository[Opportunity]):
         Returns:
             List[Opportunity]: List of opportunities
         """
-        return db.query(Opportunity).filter(Opportunity.contact_id == contact_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(Opportunity.contact_id == contact_id).offset(skip).limit(limit).all()
     
     def get_by_company(self, db: Session, company_id: int, skip: int = 0, limit: int = 100) -> List[Opportunity]:
         """
@@ -221,7 +702,7 @@ class OpportunityRepository(BaseRepository[Opportunity]):
         Returns:
             List[Opportunity]: List of opportunities
         """
-        return db.query(Opportunity).filter(Opportunity.company_id == company_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(Opportunity.company_id == company_id).offset(skip).limit(limit).all()
     
     def get_by_owner(self, db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[Opportunity]:
         """
@@ -236,7 +717,7 @@ class OpportunityRepository(BaseRepository[Opportunity]):
         Returns:
             List[Opportunity]: List of opportunities
         """
-        return db.query(Opportunity).filter(Opportunity.owner_id == owner_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(Opportunity.owner_id == owner_id).offset(skip).limit(limit).all()
     
     def get_by_stage(self, db: Session, stage: OpportunityStage, skip: int = 0, limit: int = 100) -> List[Opportunity]:
         """
@@ -251,11 +732,11 @@ class OpportunityRepository(BaseRepository[Opportunity]):
         Returns:
             List[Opportunity]: List of opportunities
         """
-        return db.query(Opportunity).filter(Opportunity.stage == stage).offset(skip).limit(limit).all()
+        return self._query(db).filter(Opportunity.stage == stage).offset(skip).limit(limit).all()
     
     def search(self, db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Opportunity]:
         """
-        Search opportunities by name or description.
+        Search opportunities by name or description, ranked by relevance.
         
         Args:
             db: Database session
@@ -266,13 +747,7 @@ class OpportunityRepository(BaseRepository[Opportunity]):
         Returns:
             List[Opportunity]: List of matching opportunities
         """
-        search_term = f"%{query}%"
-        return db.query(Opportunity).filter(
-            or_(
-                Opportunity.name.ilike(search_term),
-                Opportunity.description.ilike(search_term)
-            )
-        ).offset(skip).limit(limit).all()
+        return [obj for obj, _, _ in self.full_text_search(db, query, skip=skip, limit=limit)]
     
     def close_won(self, db: Session, opportunity_id: int, close_details: Dict[str, Any] = None) -> Opportunity:
         """
@@ -330,6 +805,92 @@ class OpportunityRepository(BaseRepository[Opportunity]):
         db.commit()
         db.refresh(opportunity)
         return opportunity
+    
+    def _pipeline_rows(self, db: Session) -> List[Tuple[Any, ...]]:
+        """
+        Aggregate the opportunities in scope by stage, owner and close month and in total.
+        
+        On PostgreSQL all four groupings come from one GROUPING SETS scan;
+        other databases run one GROUP BY per grouping.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            List[Tuple[Any, ...]]: GROUPING() bitmask of (stage, owner_id, close
+            month), grouped value, count, amount, expected revenue and
+            probability-weighted amount
+        """
+        measures = (
+            func.count(),
+            func.sum(Opportunity.amount),
+            func.sum(Opportunity.expected_revenue),
+            func.sum(Opportunity.amount * Opportunity.probability / 100.0)
+        )
+        
+        if db.get_bind().dialect.name == "postgresql":
+            month = func.date_trunc(literal_column("'month'"), Opportunity.close_date)
+            rows = self._query(
+                db, func.grouping(Opportunity.stage, Opportunity.owner_id, month),
+                Opportunity.stage, Opportunity.owner_id, month, *measures
+            ).group_by(func.grouping_sets(
+                tuple_(Opportunity.stage), tuple_(Opportunity.owner_id), tuple_(month), tuple_()
+            )).all()
+            # Keep the one grouped value of each row
+            keys = {3: 1, 5: 2, 6: 3, 7: 1}
+            return [(row[0], row[keys[row[0]]], *row[4:]) for row in rows]
+        
+        rows = [(7, None, *totals) for totals in self._query(db, *measures).all()]
+        month = func.strftime("%Y-%m-01", Opportunity.close_date)
+        for grouping, column in ((3, Opportunity.stage), (5, Opportunity.owner_id), (6, month)):
+            rows.extend((grouping, *row) for row in self._query(db, column, *measures).group_by(column).all())
+        return rows
+    
+    def get_pipeline_summary(self, db: Session) -> Dict[str, Any]:
+        """
+        Get the opportunity pipeline in scope summed by stage, owner and close month.
+        
+        Results are cached per worker and access scope. They are dropped
+        when this worker commits opportunity writes and otherwise expire
+        after ANALYTICS_CACHE_TTL_SECONDS.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Dict[str, Any]: Totals, and per stage, owner and close month
+            (YYYY-MM) the count, amount, expected revenue and
+            probability-weighted amount
+        """
+        namespace = (Opportunity.__tablename__, self.scope.cache_key if self.scope is not None else ("all",))
+        result = analytics_cache.get(namespace, "pipeline_summary")
+        if result is not None:
+            return result
+        
+        result = {"totals": {"count": 0, "amount": 0.0, "expected_revenue": 0.0, "weighted_amount": 0.0}}
+        result.update({name: [] for name, _, _ in PIPELINE_GROUPINGS.values()})
+        
+        for grouping, value, count, amount, expected_revenue, weighted in self._pipeline_rows(db):
+            entry = {
+                "count": count,
+                "amount": round(amount or 0, 2),
+                "expected_revenue": round(expected_revenue or 0, 2),
+                "weighted_amount": round(weighted or 0, 2)
+            }
+            if grouping == 7:
+                result["totals"] = entry
+                continue
+            
+            name, field, convert = PIPELINE_GROUPINGS[grouping]
+            result[name].append({field: convert(value) if value is not None else None, **entry})
+        
+        stage_order = {stage.value: index for index, stage in enumerate(OpportunityStage)}
+        result["by_stage"].sort(key=lambda entry: stage_order.get(entry["stage"], len(stage_order)))
+        result["by_owner"].sort(key=lambda entry: (entry["owner_id"] is None, entry["owner_id"] or 0))
+        result["by_close_month"].sort(key=lambda entry: (entry["month"] is None, entry["month"] or ""))
+        
+        analytics_cache.put(namespace, "pipeline_summary", result)
+        return result
 
 
 class OpportunityActivityRepository(BaseRepository[OpportunityActivity]):
@@ -351,7 +912,7 @@ class OpportunityActivityRepository(BaseRepository[OpportunityActivity]):
         Returns:
             List[OpportunityActivity]: List of opportunity activities
         """
-        return db.query(OpportunityActivity).filter(
+        return self._query(db).filter(
             OpportunityActivity.opportunity_id == opportunity_id
         ).order_by(OpportunityActivity.date.desc()).offset(skip).limit(limit).all()
     
@@ -368,6 +929,191 @@ class OpportunityActivityRepository(BaseRepository[OpportunityActivity]):
         Returns:
             List[OpportunityActivity]: List of opportunity activities
         """
-        return db.query(OpportunityActivity).filter(
+        return self._query(db).filter(
             OpportunityActivity.activity_type == activity_type
         ).order_by(OpportunityActivity.date.desc()).offset(skip).limit(limit).all()
+
+
+class LeadRescoringWorker(ChangeMaintainer):
+    """
+    Background service that rescores leads shortly after their activities change.
+    
+    Committed transactions report the leads whose activities or scoring
+    fields changed. Each lead waits until it has been quiet for the
+    debounce interval (or at most the maximum delay), so a burst of
+    activities costs one rescore. Due leads are rescored together in one
+    batch from cached activity aggregates: a new activity updates its
+    lead's cached count and date in memory, and only leads missing from
+    the cache are aggregated in the database. The cache is per worker and
+    misses activities written by other workers, so entries are counted
+    again in the database once they are older than the cache TTL. While
+    the service isn't running, leads are rescored right after each commit.
+    """
+    
+    def __init__(
+        self,
+        repository: LeadRepository,
+        debounce_ms: int = LEAD_RESCORE_DEBOUNCE_MS,
+        max_delay_ms: int = LEAD_RESCORE_MAX_DELAY_MS,
+        cache_size: int = LEAD_RESCORE_CACHE_SIZE,
+        cache_ttl_seconds: int = LEAD_RESCORE_CACHE_TTL_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the worker.
+        
+        Args:
+            repository: Lead repository
+            debounce_ms: Milliseconds a lead must be quiet before it is rescored
+            max_delay_ms: Maximum milliseconds a lead waits during a continuous burst
+            cache_size: Maximum leads with cached activity aggregates
+            cache_ttl_seconds: Seconds after which cached aggregates are loaded again
+            session_factory: Factory for database sessions
+        """
+        super().__init__("Lead rescoring worker")
+        self.repository = repository
+        self.debounce_ms = debounce_ms
+        self.max_delay_ms = max_delay_ms
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.session_factory = session_factory
+        # Lead ID to activity aggregates and the time they were loaded
+        self._aggregates: "OrderedDict[int, Tuple[Tuple[int, Optional[date], int], float]]" = OrderedDict()
+        self._pending: Dict[int, Tuple[float, float]] = {}  # Lead ID to first and last enqueue time
+    
+    @property
+    def interval_seconds(self) -> float:
+        """Seconds between checks for due leads."""
+        return min(self.debounce_ms, self.max_delay_ms) / 4000
+    
+    def enqueue(self, activities: List[Tuple[int, int, date]], invalidated: Iterable[int] = ()) -> None:
+        """
+        Queue leads for rescoring.
+        
+        Args:
+            activities: New activities as (lead ID, activity ID, date)
+            invalidated: Leads whose cached aggregates are no longer valid
+            (updated or deleted activities) or whose own fields changed
+        """
+        now = time.monotonic()
+        with self._lock:
+            for lead_id in invalidated:
+                self._aggregates.pop(lead_id, None)
+            
+            for lead_id, activity_id, activity_date in activities:
+                cached = self._aggregates.get(lead_id)
+                if cached is not None and now - cached[1] >= self.cache_ttl_seconds:
+                    del self._aggregates[lead_id]
+                # Aggregates loaded after the activity was committed already count it
+                elif cached is not None and activity_id > cached[0][2]:
+                    (count, last_activity, _), loaded_at = cached
+                    if last_activity is None or (activity_date is not None and activity_date > last_activity):
+                        last_activity = activity_date
+                    self._aggregates[lead_id] = ((count + 1, last_activity, activity_id), loaded_at)
+            
+            for lead_id in chain((lead_id for lead_id, _, _ in activities), invalidated):
+                first, _ = self._pending.get(lead_id, (now, now))
+                self._pending[lead_id] = (first, now)
+        
+        self._apply_if_stopped()
+    
+    def _cached_aggregates(self, db: Session, lead_ids: List[int]) -> Dict[int, Tuple[int, Optional[date], int]]:
+        """
+        Get the activity aggregates of leads, loading and caching the missing and expired ones.
+        
+        Args:
+            db: Database session
+            lead_ids: Lead IDs
+            
+        Returns:
+            Dict[int, Tuple[int, Optional[date], int]]: Aggregates by lead ID
+        """
+        now = time.monotonic()
+        with self._lock:
+            aggregates = {}
+            for lead_id in lead_ids:
+                cached = self._aggregates.get(lead_id)
+                if cached is not None and now - cached[1] < self.cache_ttl_seconds:
+                    aggregates[lead_id] = cached[0]
+                    self._aggregates.move_to_end(lead_id)
+        
+        missing = [lead_id for lead_id in lead_ids if lead_id not in aggregates]
+        if missing:
+            loaded = self.repository.get_activity_aggregates(db, missing)
+            aggregates.update(loaded)
+            with self._lock:
+                for lead_id, aggregate in loaded.items():
+                    cached = self._aggregates.get(lead_id)
+                    # Keep entries advanced by activities enqueued during the load
+                    if cached is None or now - cached[1] >= self.cache_ttl_seconds or cached[0][2] < aggregate[2]:
+                        self._aggregates[lead_id] = (aggregate, now)
+                        self._aggregates.move_to_end(lead_id)
+                while len(self._aggregates) > self.cache_size:
+                    self._aggregates.popitem(last=False)
+        
+        return aggregates
+    
+    def flush(self, force: bool = False) -> int:
+        """
+        Rescore the leads that are due.
+        
+        Args:
+            force: Rescore all queued leads regardless of the debounce interval
+            
+        Returns:
+            int: Number of leads whose score or qualification changed
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                lead_id for lead_id, (first, last) in self._pending.items()
+                if force or now - last >= self.debounce_ms / 1000 or now - first >= self.max_delay_ms / 1000
+            ]
+            for lead_id in due:
+                del self._pending[lead_id]
+        if not due:
+            return 0
+        
+        db = self.session_factory()
+        try:
+            aggregates = self._cached_aggregates(db, due)
+            return self.repository.rescore(db, lead_ids=due, aggregates=aggregates)["changed"]
+        except SQLAlchemyError as e:
+            logger.error(f"Error rescoring {len(due)} leads: {str(e)}")
+            return 0
+        finally:
+            db.close()
+    
+    def drain(self) -> None:
+        """Rescore all queued leads."""
+        self.flush(force=True)
+
+
+# Create lead repository and rescoring worker instances
+lead_repository = LeadRepository()
+opportunity_repository = OpportunityRepository()
+lead_rescoring_worker = LeadRescoringWorker(lead_repository)
+
+
+def _collect_rescoring_changes(session: Session, changes: Dict[str, Any]) -> None:
+    """Record the activities and leads changed by a flush that affect lead scores."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, LeadActivity):
+            if obj in session.new:
+                changes.setdefault("activities", []).append((obj.lead_id, obj.id, obj.date))
+            elif obj in session.deleted or session.is_modified(obj):
+                changes.setdefault("invalidated", set()).add(obj.lead_id)
+        elif isinstance(obj, Lead) and obj not in session.deleted:
+            state = inspect(obj)
+            if obj in session.new or any(state.attrs[field].history.has_changes() for field in SCORING_LEAD_FIELDS):
+                changes.setdefault("leads", set()).add(obj.id)
+
+
+def _queue_rescoring_changes(changes: Dict[str, Any]) -> None:
+    """Hand the committed changes to the rescoring worker."""
+    # Changed lead fields don't touch the cached aggregates, but invalidating them is harmless
+    lead_rescoring_worker.enqueue(changes.get("activities", []), changes.get("invalidated", set()) | changes.get("leads", set()))
+
+
+# Rescore the leads whose activities or scoring fields a transaction changed once it commits
+_rescoring_changes = ChangeCollector("lead_rescoring_changes", _collect_rescoring_changes, _queue_rescoring_changes)
@@ -7,7 +7,6 @@ This module provides repository classes for marketing-related models.
 
 from typing import List, Optional, Dict, Any, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from datetime import date
 
 from src.repositories.base import BaseRepository
@@ -17,6 +16,8 @@ from src.models.marketing import MarketingCampaign, CampaignActivity, CampaignMe
 class MarketingCampaignRepository(BaseRepository[MarketingCampaign]):
     """Repository for MarketingCampaign model operations."""
     
+    snippet_fields = ("name", "description")
+    
     def __init__(self):
         super().__init__(MarketingCampaign)
     
@@ -33,7 +34,7 @@ class MarketingCampaignRepository(BaseRepository[MarketingCampaign]):
         Returns:
             List[MarketingCampaign]: List of campaigns
         """
-        return db.query(MarketingCampaign).filter(MarketingCampaign.status == status).offset(skip).limit(limit).all()
+        return self._query(db).filter(MarketingCampaign.status == status).offset(skip).limit(limit).all()
     
     def get_by_type(self, db: Session, campaign_type: CampaignType, skip: int = 0, limit: int = 100) -> List[MarketingCampaign]:
         """
@@ -48,7 +49,7 @@ class MarketingCampaignRepository(BaseRepository[MarketingCampaign]):
         Returns:
             List[MarketingCampaign]: List of campaigns
         """
-        return db.query(MarketingCampaign).filter(MarketingCampaign.campaign_type == campaign_type).offset(skip).limit(limit).all()
+        return self._query(db).filter(MarketingCampaign.campaign_type == campaign_type).offset(skip).limit(limit).all()
     
     def get_active_campaigns(self, db: Session, skip: int = 0, limit: int = 100) -> List[MarketingCampaign]:
         """
@@ -63,7 +64,7 @@ class MarketingCampaignRepository(BaseRepository[MarketingCampaign]):
             List[MarketingCampaign]: List of active campaigns
         """
         today = date.today()
-        return db.query(MarketingCampaign).filter(
+        return self._query(db).filter(
             MarketingCampaign.status == CampaignStatus.ACTIVE,
             (MarketingCampaign.start_date <= today) | (MarketingCampaign.start_date == None),
             (MarketingCampaign.end_date >= today) | (MarketingCampaign.end_date == None)
@@ -82,11 +83,11 @@ class MarketingCampaignRepository(BaseRepository[MarketingCampaign]):
         Returns:
             List[MarketingCampaign]: List of campaigns
         """
-        return db.query(MarketingCampaign).filter(MarketingCampaign.owner_id == owner_id).offset(skip).limit(limit).all()
+        return self._query(db).filter(MarketingCampaign.owner_id == owner_id).offset(skip).limit(limit).all()
     
     def search(self, db: Session, query: str, skip: int = 0, limit: int = 100) -> List[MarketingCampaign]:
         """
-        Search campaigns by name or description.
+        Search campaigns by name or description, ranked by relevance.
         
         Args:
             db: Database session
@@ -97,13 +98,7 @@ class MarketingCampaignRepository(BaseRepository[MarketingCampaign]):
         Returns:
             List[MarketingCampaign]: List of matching campaigns
         """
-        search_term = f"%{query}%"
-        return db.query(MarketingCampaign).filter(
-            or_(
-                MarketingCampaign.name.ilike(search_term),
-                MarketingCampaign.description.ilike(search_term)
-            )
-        ).offset(skip).limit(limit).all()
+        return [obj for obj, _, _ in self.full_text_search(db, query, skip=skip, limit=limit)]
     
     def add_contact(self, db: Session, campaign_id: int, contact_id: int) -> MarketingCampaign:
         """
@@ -171,7 +166,7 @@ class CampaignActivityRepository(BaseRepository[CampaignActivity]):
         Returns:
             List[CampaignActivity]: List of campaign activities
         """
-        return db.query(CampaignActivity).filter(
+        return self._query(db).filter(
             CampaignActivity.campaign_id == campaign_id
         ).order_by(CampaignActivity.timestamp.desc()).offset(skip).limit(limit).all()
     
@@ -188,7 +183,7 @@ class CampaignActivityRepository(BaseRepository[CampaignActivity]):
         Returns:
             List[CampaignActivity]: List of campaign activities
         """
-        return db.query(CampaignActivity).filter(
+        return self._query(db).filter(
             CampaignActivity.contact_id == contact_id
         ).order_by(CampaignActivity.timestamp.desc()).offset(skip).limit(limit).all()
     
@@ -205,7 +200,7 @@ class CampaignActivityRepository(BaseRepository[CampaignActivity]):
         Returns:
             List[CampaignActivity]: List of campaign activities
         """
-        return db.query(CampaignActivity).filter(
+        return self._query(db).filter(
             CampaignActivity.activity_type == activity_type
         ).order_by(CampaignActivity.timestamp.desc()).offset(skip).limit(limit).all()
 
@@ -229,7 +224,7 @@ class CampaignMetricRepository(BaseRepository[CampaignMetric]):
         Returns:
             List[CampaignMetric]: List of campaign metrics
         """
-        return db.query(CampaignMetric).filter(
+        return self._query(db).filter(
             CampaignMetric.campaign_id == campaign_id
         ).order_by(CampaignMetric.date.desc()).offset(skip).limit(limit).all()
     
@@ -246,7 +241,7 @@ class CampaignMetricRepository(BaseRepository[CampaignMetric]):
         Returns:
             List[CampaignMetric]: List of campaign metrics
         """
-        return db.query(CampaignMetric).filter(
+        return self._query(db).filter(
             CampaignMetric.metric_type == metric_type
         ).order_by(CampaignMetric.date.desc()).offset(skip).limit(limit).all()
     
@@ -0,0 +1,508 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Saved search repository module for the Sales Automation System.
+This module provides saved searches (smart lists) whose matching IDs are
+materialized and kept up to date incrementally as leads, contacts and
+their activities change.
+"""
+
+from datetime import date, datetime, timedelta
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import time
+
+from sqlalchemy import and_, delete, insert, literal, not_, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import SAVED_SEARCH_FLUSH_INTERVAL_MS, SAVED_SEARCH_TIME_REFRESH_SECONDS
+from src.auth.scoping import AccessScope
+from src.models.contact import Contact
+from src.models.lead import Lead
+from src.models.saved_search import SavedSearch, SavedSearchMember
+from src.repositories.base import BaseRepository
+from src.utils.change_collector import ChangeCollector, ChangeMaintainer, merge_changes
+from src.utils.search_utils import escape_like
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Entity types of saved searches
+SAVED_SEARCH_ENTITIES = {
+    "lead": Lead,
+    "contact": Contact
+}
+
+# Changed rows that can change saved search results: entity type and the attribute holding the entity ID.
+# Activity changes arrive through the activity rollup maintainer once last_activity_date is refreshed.
+CHANGE_SOURCES = {
+    Lead: ("lead", "id"),
+    Contact: ("contact", "id")
+}
+
+# Columns that can't be filtered on
+HIDDEN_FIELDS = ("search_vector", "email_bidx", "phone_bidx", "dedupe_key")
+
+# Filter value replaced by the ID of the saved search's owner
+OWNER_PLACEHOLDER = "$me"
+
+# Operators whose result depends on the current date
+TIME_OPERATORS = ("older_than_days", "within_days")
+
+# Filter operators: column, value and date cutoff (for time operators) to SQL condition
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any, Optional[date]], Any]] = {
+    "eq": lambda column, value, cutoff: column == value,
+    "ne": lambda column, value, cutoff: column != value,
+    "lt": lambda column, value, cutoff: column < value,
+    "lte": lambda column, value, cutoff: column <= value,
+    "gt": lambda column, value, cutoff: column > value,
+    "gte": lambda column, value, cutoff: column >= value,
+    "in": lambda column, value, cutoff: column.in_(value),
+    "contains": lambda column, value, cutoff: column.ilike(f"%{escape_like(str(value))}%", escape="\\"),
+    "is_null": lambda column, value, cutoff: column.is_(None),
+    "not_null": lambda column, value, cutoff: column.isnot(None),
+    "older_than_days": lambda column, value, cutoff: or_(column.is_(None), column < cutoff),
+    "within_days": lambda column, value, cutoff: column >= cutoff
+}
+
+# Maximum changed IDs per incremental update statement
+CHANGE_CHUNK_SIZE = 1000
+
+
+def _filter_column(entity_type: str, field: str) -> Any:
+    """
+    Get the SQL expression of a filter field.
+
+    Args:
+        entity_type: Entity type
+        field: Column name
+
+    Returns:
+        Any: SQL expression
+
+    Raises:
+        ValueError: If the field can't be filtered on
+    """
+    model = SAVED_SEARCH_ENTITIES[entity_type]
+    if field in HIDDEN_FIELDS or field not in model.__table__.columns:
+        raise ValueError(f"Unknown {entity_type} filter field: {field}")
+    return getattr(model, field)
+
+
+def _coerce_value(column: Any, value: Any) -> Any:
+    """
+    Convert a filter value to the enum of an enum column.
+
+    Args:
+        column: Filtered column
+        value: Filter value (or list of values)
+
+    Returns:
+        Any: Converted value
+    """
+    enum_class = getattr(getattr(column, "type", None), "enum_class", None)
+    if enum_class is None or value is None:
+        return value
+    if isinstance(value, list):
+        return [_coerce_value(column, item) for item in value]
+
+    try:
+        return enum_class(value)
+    except ValueError:
+        try:
+            return enum_class[str(value).upper()]
+        except KeyError:
+            raise ValueError(f"Invalid value for {column.key}: {value}")
+
+
+def compile_filters(
+    entity_type: str, filters: List[Dict[str, Any]], owner_id: int, today: Optional[date] = None
+) -> Tuple[Any, bool]:
+    """
+    Compile saved search filters into a SQL condition.
+
+    Args:
+        entity_type: Entity type (lead or contact)
+        filters: Conditions, each with field, op and value; all must match
+        owner_id: ID of the saved search's owner (replaces "$me" values)
+        today: Date time operators are relative to (defaults to today)
+
+    Returns:
+        Tuple[Any, bool]: SQL condition and whether it depends on the current date
+
+    Raises:
+        ValueError: If the entity type, a field, an operator or a value is invalid
+    """
+    if entity_type not in SAVED_SEARCH_ENTITIES:
+        raise ValueError(f"Unknown saved search entity type: {entity_type}")
+    if not isinstance(filters, list):
+        raise ValueError("Filters must be a list of conditions")
+
+    today = today or date.today()
+    clauses = []
+    time_dependent = False
+    for condition in filters:
+        if not isinstance(condition, dict):
+            raise ValueError("Each filter must be an object with field, op and value")
+
+        op = condition.get("op", "eq")
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator: {op}")
+
+        column = _filter_column(entity_type, condition.get("field"))
+        value = condition.get("value")
+        if value == OWNER_PLACEHOLDER:
+            value = owner_id
+
+        cutoff = None
+        if op in TIME_OPERATORS:
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"{op} needs a number of days")
+            cutoff = today - timedelta(days=value)
+            time_dependent = True
+        elif op == "in" and not isinstance(value, list):
+            raise ValueError("in needs a list of values")
+        else:
+            value = _coerce_value(column, value)
+
+        clauses.append(FILTER_OPERATORS[op](column, value, cutoff))
+
+    return and_(*clauses) if clauses else literal(True), time_dependent
+
+
+class SavedSearchRepository(BaseRepository[SavedSearch]):
+    """
+    Repository for saved searches.
+
+    A saved search stores its filters and the IDs of the matching rows.
+    The owner's access scope at materialization time is stored with it,
+    so incremental updates apply it without loading the owner. Counts and
+    pages are served from the materialized IDs instead of re-running the
+    filters.
+    """
+
+    def __init__(self):
+        super().__init__(SavedSearch)
+
+    def get_by_owner(self, db: Session, owner_id: int) -> List[SavedSearch]:
+        """
+        Get the saved searches of a user.
+
+        Args:
+            db: Database session
+            owner_id: Owner ID
+
+        Returns:
+            List[SavedSearch]: Saved searches by name
+        """
+        return self._query(db).filter(SavedSearch.owner_id == owner_id).order_by(SavedSearch.name).all()
+
+    def _condition(self, search: SavedSearch, today: Optional[date] = None) -> Any:
+        """
+        Build the SQL condition of a saved search including the owner's scope.
+
+        Args:
+            search: Saved search
+            today: Date time operators are relative to
+
+        Returns:
+            Any: SQL condition on the entity model
+        """
+        model = SAVED_SEARCH_ENTITIES[search.entity_type]
+        clause, _ = compile_filters(search.entity_type, search.filters, search.owner_id, today)
+
+        if search.scope_member_ids is not None:
+            scope = AccessScope(search.owner_id, member_ids=search.scope_member_ids)
+            predicate = scope.predicate(model)
+            if predicate is not None:
+                clause = and_(clause, predicate)
+        return clause
+
+    def create_search(
+        self, db: Session, scope: AccessScope, name: str, entity_type: str, filters: List[Dict[str, Any]]
+    ) -> SavedSearch:
+        """
+        Create and materialize a saved search.
+
+        Args:
+            db: Database session
+            scope: Access scope of the owner
+            name: Name of the search
+            entity_type: Entity type (lead or contact)
+            filters: Filter conditions
+
+        Returns:
+            SavedSearch: Created saved search
+
+        Raises:
+            ValueError: If the filters are invalid
+        """
+        _, time_dependent = compile_filters(entity_type, filters, scope.user_id)
+
+        search = self.create(db, {
+            "name": name,
+            "entity_type": entity_type,
+            "filters": filters,
+            "time_dependent": time_dependent,
+            "owner_id": scope.user_id,
+            "created_by": scope.user_id
+        })
+        return self.materialize(db, search, scope)
+
+    def materialize(self, db: Session, search: SavedSearch, scope: Optional[AccessScope] = None) -> SavedSearch:
+        """
+        Replace the materialized result set of a saved search.
+
+        Args:
+            db: Database session
+            search: Saved search
+            scope: Current access scope of the owner (keeps the stored one if omitted)
+
+        Returns:
+            SavedSearch: Refreshed saved search
+        """
+        model = SAVED_SEARCH_ENTITIES[search.entity_type]
+        members = SavedSearchMember.__table__
+
+        try:
+            if scope is not None:
+                search.scope_member_ids = None if scope.unrestricted else sorted(scope.member_ids)
+
+            db.execute(delete(members).where(members.c.saved_search_id == search.id))
+            result = db.execute(insert(members).from_select(
+                ["saved_search_id", "entity_id"],
+                select(literal(search.id), model.id).where(self._condition(search))
+            ))
+
+            search.result_count = result.rowcount
+            search.refreshed_at = datetime.now()
+            db.commit()
+            db.refresh(search)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error materializing saved search {search.id}: {str(e)}")
+            raise
+
+        return search
+
+    def apply_changes(self, db: Session, entity_type: str, entity_ids: Iterable[int]) -> int:
+        """
+        Update the result sets of all saved searches of an entity type for changed rows.
+
+        Each saved search is brought up to date with two set-based
+        statements over the changed IDs only: one removing rows that no
+        longer match (or were deleted) and one adding rows that now match.
+
+        Args:
+            db: Database session
+            entity_type: Entity type
+            entity_ids: IDs of the changed entities
+
+        Returns:
+            int: Number of result set rows added or removed
+        """
+        entity_ids = sorted(set(entity_ids))
+        if not entity_ids:
+            return 0
+
+        model = SAVED_SEARCH_ENTITIES[entity_type]
+        members = SavedSearchMember.__table__
+        today = date.today()
+        changed = 0
+
+        try:
+            for search in db.query(SavedSearch).filter(SavedSearch.entity_type == entity_type).all():
+                condition = self._condition(search, today)
+                current = select(members.c.entity_id).where(members.c.saved_search_id == search.id)
+                removed = added = 0
+
+                for start in range(0, len(entity_ids), CHANGE_CHUNK_SIZE):
+                    chunk = entity_ids[start:start + CHANGE_CHUNK_SIZE]
+                    matching = select(model.id).where(model.id.in_(chunk), condition)
+
+                    removed += db.execute(delete(members).where(
+                        members.c.saved_search_id == search.id,
+                        members.c.entity_id.in_(chunk),
+                        members.c.entity_id.not_in(matching)
+                    )).rowcount
+                    added += db.execute(insert(members).from_select(
+                        ["saved_search_id", "entity_id"],
+                        select(literal(search.id), model.id).where(
+                            model.id.in_(chunk), condition, not_(model.id.in_(current))
+                        )
+                    )).rowcount
+
+                if removed or added:
+                    search.result_count = SavedSearch.result_count + added - removed
+                    changed += added + removed
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error updating saved searches of {entity_type}: {str(e)}")
+            raise
+
+        return changed
+
+    def get_results(self, db: Session, search: SavedSearch, skip: int = 0, limit: int = 100) -> List[Any]:
+        """
+        Get a page of the materialized results of a saved search.
+
+        Args:
+            db: Database session
+            search: Saved search
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List[Any]: Matching leads or contacts, newest first
+        """
+        model = SAVED_SEARCH_ENTITIES[search.entity_type]
+        return db.query(model).join(
+            SavedSearchMember,
+            and_(SavedSearchMember.entity_id == model.id, SavedSearchMember.saved_search_id == search.id)
+        ).order_by(model.id.desc()).offset(skip).limit(limit).all()
+
+    def get_stale(self, db: Session, refreshed_before: datetime) -> List[SavedSearch]:
+        """
+        Get the date-relative saved searches not refreshed since a time.
+
+        Args:
+            db: Database session
+            refreshed_before: Refresh time limit
+
+        Returns:
+            List[SavedSearch]: Saved searches due for a refresh
+        """
+        return db.query(SavedSearch).filter(
+            SavedSearch.time_dependent.is_(True),
+            or_(SavedSearch.refreshed_at.is_(None), SavedSearch.refreshed_at < refreshed_before)
+        ).all()
+
+
+class SavedSearchMaintainer(ChangeMaintainer):
+    """
+    Background service that keeps saved search results up to date.
+
+    Committed transactions report the IDs of the leads and contacts they
+    changed (directly or through an activity). The IDs are collected and
+    applied in one batch per flush interval. Date-relative searches are
+    also refreshed completely once per refresh interval, since their
+    results change as time passes. While the service isn't running,
+    changes are applied right after each commit.
+    """
+
+    def __init__(
+        self,
+        repository: SavedSearchRepository,
+        flush_interval_ms: int = SAVED_SEARCH_FLUSH_INTERVAL_MS,
+        time_refresh_seconds: int = SAVED_SEARCH_TIME_REFRESH_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the maintainer.
+
+        Args:
+            repository: Saved search repository
+            flush_interval_ms: Milliseconds between batches of changes
+            time_refresh_seconds: Seconds between refreshes of date-relative searches
+            session_factory: Factory for database sessions
+        """
+        super().__init__("Saved search maintainer")
+        self.repository = repository
+        self.flush_interval_ms = flush_interval_ms
+        self.time_refresh_seconds = time_refresh_seconds
+        self.session_factory = session_factory
+        self._pending: Dict[str, Set[int]] = {}
+        self._last_refresh = 0.0
+
+    @property
+    def interval_seconds(self) -> float:
+        """Seconds between batches."""
+        return self.flush_interval_ms / 1000
+
+    def enqueue(self, changes: Dict[str, Set[int]]) -> None:
+        """
+        Queue changed entity IDs.
+
+        Args:
+            changes: Changed IDs by entity type
+        """
+        with self._lock:
+            merge_changes(self._pending, changes)
+
+        self._apply_if_stopped()
+
+    def flush(self) -> int:
+        """
+        Apply the queued changes.
+
+        Returns:
+            int: Number of result set rows added or removed
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        db = self.session_factory()
+        try:
+            return sum(
+                self.repository.apply_changes(db, entity_type, entity_ids)
+                for entity_type, entity_ids in pending.items()
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Error applying saved search changes: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def refresh_stale(self) -> int:
+        """
+        Refresh the date-relative saved searches that are due.
+
+        Returns:
+            int: Number of refreshed searches
+        """
+        db = self.session_factory()
+        try:
+            searches = self.repository.get_stale(db, datetime.now() - timedelta(seconds=self.time_refresh_seconds))
+            for search in searches:
+                self.repository.materialize(db, search)
+            return len(searches)
+        except SQLAlchemyError as e:
+            logger.error(f"Error refreshing saved searches: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def tick(self) -> None:
+        """Apply the queued changes and refresh date-relative searches when due."""
+        self.flush()
+        if time.monotonic() - self._last_refresh >= self.time_refresh_seconds:
+            self._last_refresh = time.monotonic()
+            self.refresh_stale()
+
+
+# Create saved search repository and maintainer instances
+saved_search_repository = SavedSearchRepository()
+saved_search_maintainer = SavedSearchMaintainer(saved_search_repository)
+
+
+def _collect_saved_search_changes(session: Session, changes: Dict[str, Set[int]]) -> None:
+    """Record the leads and contacts changed by a flush."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        source = CHANGE_SOURCES.get(type(obj))
+        if source is None or (obj in session.dirty and not session.is_modified(obj)):
+            continue
+
+        entity_type, attribute = source
+        entity_id = getattr(obj, attribute)
+        if entity_id is not None:
+            changes.setdefault(entity_type, set()).add(entity_id)
+
+
+# Hand the leads and contacts a transaction changed to the maintainer once it commits
+_saved_search_changes = ChangeCollector("saved_search_changes", _collect_saved_search_changes, saved_search_maintainer.enqueue)
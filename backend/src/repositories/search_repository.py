@@ -0,0 +1,261 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Global search repository module for the Sales Automation System.
+This module provides one search across contacts, companies, leads,
+opportunities and marketing campaigns.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import heapq
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import SEARCH_SOURCE_TIMEOUT_MS, SEARCH_MAX_WORKERS
+from src.auth.scoping import AccessScope
+from src.repositories.base import BaseRepository
+from src.repositories.contact_repository import ContactRepository, CompanyRepository
+from src.repositories.lead_repository import LeadRepository, OpportunityRepository
+from src.repositories.marketing_repository import MarketingCampaignRepository
+from src.utils.inverted_index import search_engine
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# ts_rank normalization: divide by 1 + log(document length), then scale to rank / (rank + 1),
+# so ranks of different tables fall into the same 0..1 range
+RANK_NORMALIZATION = 1 | 32
+
+
+class SearchSource:
+    """An entity type searched by the global search."""
+
+    def __init__(
+        self,
+        name: str,
+        repository: BaseRepository,
+        title: Callable[[Any], str],
+        subtitle: Optional[Callable[[Any], Optional[str]]] = None,
+        scoped: bool = True,
+        weight: float = 1.0
+    ):
+        """
+        Initialize the search source.
+
+        Args:
+            name: Source name (entity type) in results
+            repository: Repository searched
+            title: Function returning the title of a hit
+            subtitle: Function returning the subtitle of a hit (optional)
+            scoped: Whether ownership scoping applies to the source
+            weight: Factor applied to the source's normalized scores
+        """
+        self.name = name
+        self.repository = repository
+        self.title = title
+        self.subtitle = subtitle
+        self.scoped = scoped
+        self.weight = weight
+
+    def to_hit(self, obj: Any, rank: float, snippet: Optional[str]) -> Dict[str, Any]:
+        """
+        Convert a search result into a hit.
+
+        Args:
+            obj: Matching model instance
+            rank: Normalized rank
+            snippet: Highlighted snippet
+
+        Returns:
+            Dict[str, Any]: Hit
+        """
+        return {
+            "type": self.name,
+            "id": obj.id,
+            "title": self.title(obj),
+            "subtitle": self.subtitle(obj) if self.subtitle else None,
+            "score": round(rank * self.weight, 6),
+            "snippet": snippet
+        }
+
+
+class GlobalSearchRepository:
+    """
+    Search across all searchable entity types at once.
+
+    Every source is queried concurrently on its own session against its
+    full-text index, with a statement timeout of the time budget. Sources
+    that miss the budget are reported as timed out instead of delaying the
+    response. The sorted hit lists are blended by a k-way heap merge on
+    their normalized scores.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[SearchSource],
+        timeout_ms: int = SEARCH_SOURCE_TIMEOUT_MS,
+        max_workers: int = SEARCH_MAX_WORKERS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the global search.
+
+        Args:
+            sources: Searched sources
+            timeout_ms: Time budget of each source in milliseconds
+            max_workers: Maximum number of concurrent source queries
+            session_factory: Factory for database sessions
+        """
+        self.sources = {source.name: source for source in sources}
+        self.timeout_ms = timeout_ms
+        self.session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="global-search")
+
+    def _search_source(
+        self,
+        source: SearchSource,
+        scope: Optional[AccessScope],
+        query: str,
+        limit: int,
+        timeout_ms: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Search one source on its own session.
+
+        Args:
+            source: Source to search
+            scope: Access scope of the current user
+            query: Search text
+            limit: Maximum number of hits
+            timeout_ms: Statement timeout in milliseconds
+
+        Returns:
+            List[Dict[str, Any]]: Hits ordered by score
+        """
+        db = self.session_factory()
+        try:
+            repository = source.repository
+            if source.scoped and scope is not None:
+                scope.bind(db)
+                repository = repository.scoped(scope)
+
+            # Cancel the query in the database once the budget is spent
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(
+                    text("SELECT set_config('statement_timeout', :timeout, true)"),
+                    {"timeout": str(timeout_ms)}
+                )
+
+            results = repository.full_text_search(db, query, limit=limit, normalization=RANK_NORMALIZATION)
+            return [source.to_hit(obj, rank, snippet) for obj, rank, snippet in results]
+        finally:
+            db.close()
+
+    def search(
+        self,
+        query: str,
+        scope: Optional[AccessScope] = None,
+        limit: int = 20,
+        types: Optional[Iterable[str]] = None,
+        timeout_ms: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Search all (or the selected) sources.
+
+        Args:
+            query: Search text
+            scope: Access scope of the current user
+            limit: Maximum number of hits, blended and per source
+            types: Names of the sources to search (defaults to all)
+            timeout_ms: Time budget of each source (defaults to the configured budget)
+
+        Returns:
+            Dict[str, Any]: Blended results, results grouped by source, and
+            the sources that timed out or failed
+
+        Raises:
+            ValueError: If an unknown source is requested
+        """
+        names = list(types) if types else list(self.sources)
+        unknown = [name for name in names if name not in self.sources]
+        if unknown:
+            raise ValueError(f"Unknown search types: {', '.join(unknown)}")
+
+        timeout_ms = timeout_ms or self.timeout_ms
+        started = time.perf_counter()
+
+        futures = {
+            self._executor.submit(self._search_source, self.sources[name], scope, query, limit, timeout_ms): name
+            for name in names
+        }
+        done, _ = wait(futures, timeout=timeout_ms / 1000)
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        timed_out = []
+        failed = []
+        for future, name in futures.items():
+            if future not in done:
+                future.cancel()
+                timed_out.append(name)
+                continue
+            try:
+                groups[name] = future.result()
+            except Exception as e:
+                logger.error(f"Global search of {name} failed: {str(e)}")
+                failed.append(name)
+
+        if timed_out:
+            logger.warning(f"Global search sources timed out after {timeout_ms} ms: {timed_out}")
+
+        results = list(islice(heapq.merge(*groups.values(), key=lambda hit: -hit["score"]), limit))
+
+        return {
+            "query": query,
+            "results": results,
+            "groups": groups,
+            "timed_out": timed_out,
+            "failed": failed,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+
+    def load_search_index(self, db: Session) -> None:
+        """
+        Load the in-process search engine for a warm start.
+
+        Indexes found in the snapshot are brought up to date with the rows
+        changed since it was written; the others are built from scratch.
+
+        Args:
+            db: Database session
+        """
+        loaded = search_engine.load()
+        for source in self.sources.values():
+            name = source.repository.model.__tablename__
+            since = search_engine.watermark(name) if name in loaded else None
+            source.repository.reindex(db, since)
+
+
+def _enum_value(value: Any) -> Optional[str]:
+    """Get the value of an optional enum."""
+    return value.value if value is not None else None
+
+
+# Create global search repository instance
+global_search_repository = GlobalSearchRepository([
+    SearchSource("contact", ContactRepository(), lambda contact: contact.full_name,
+                 lambda contact: contact.company_name or contact.email),
+    SearchSource("company", CompanyRepository(), lambda company: company.name,
+                 lambda company: company.industry, scoped=False),
+    SearchSource("lead", LeadRepository(), lambda lead: lead.title, lambda lead: _enum_value(lead.status)),
+    SearchSource("opportunity", OpportunityRepository(), lambda opportunity: opportunity.name,
+                 lambda opportunity: _enum_value(opportunity.stage)),
+    SearchSource("campaign", MarketingCampaignRepository(), lambda campaign: campaign.name,
+                 lambda campaign: _enum_value(campaign.status)),
+])
@@ -0,0 +1,335 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+SLA repository module for the Sales Automation System.
+This module provides follow-up tasks and the monitor that creates them for
+leads, contacts and opportunities without recent activity.
+"""
+
+from collections import deque
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy import and_, func, insert, not_, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import (
+    SLA_MONITOR_INTERVAL_SECONDS,
+    SLA_MONITOR_BATCH_SIZE,
+    SLA_LEAD_DAYS,
+    SLA_OPPORTUNITY_DAYS,
+    SLA_CONTACT_DAYS,
+    SLA_TASK_DUE_DAYS
+)
+from src.models.contact import Contact
+from src.models.lead import Lead, Opportunity
+from src.models.task import FollowUpTask
+from src.repositories.base import BaseRepository
+from src.repositories.assignment_repository import OPEN_LEAD_STATUSES
+from src.utils.database_utils import advisory_lock
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Follow-up task statuses
+TASK_STATUSES = ("open", "done")
+
+# SLA rules by entity type: model, days without activity, condition for being
+# subject to the SLA and the column naming the entity in task titles
+SLA_RULES = {
+    "lead": (Lead, SLA_LEAD_DAYS, Lead.status.in_(OPEN_LEAD_STATUSES), Lead.title),
+    "opportunity": (Opportunity, SLA_OPPORTUNITY_DAYS, Opportunity.is_closed.is_(False), Opportunity.name),
+    "contact": (Contact, SLA_CONTACT_DAYS, Contact.do_not_contact.is_(False), Contact.first_name)
+}
+
+
+class FollowUpTaskRepository(BaseRepository[FollowUpTask]):
+    """
+    Repository for follow-up tasks.
+    """
+
+    def __init__(self):
+        super().__init__(FollowUpTask)
+
+    def get_by_assignee(
+        self, db: Session, assignee_id: int, status: str = "open", skip: int = 0, limit: int = 100
+    ) -> List[FollowUpTask]:
+        """
+        Get the follow-up tasks assigned to a user, most urgent first.
+
+        Args:
+            db: Database session
+            assignee_id: Assignee ID
+            status: Task status (open or done)
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List[FollowUpTask]: Follow-up tasks by due date
+        """
+        return self._query(db).filter(
+            FollowUpTask.assignee_id == assignee_id,
+            FollowUpTask.status == status
+        ).order_by(FollowUpTask.due_date, FollowUpTask.id).offset(skip).limit(limit).all()
+
+    def complete(self, db: Session, task: FollowUpTask, user_id: int) -> FollowUpTask:
+        """
+        Mark a follow-up task as done.
+
+        Args:
+            db: Database session
+            task: Follow-up task
+            user_id: ID of the user completing the task
+
+        Returns:
+            FollowUpTask: Completed task
+        """
+        return self.update(
+            db,
+            db_obj=task,
+            obj_in={"status": "done", "completed_at": datetime.utcnow(), "completed_by": user_id},
+            actor_id=user_id
+        )
+
+
+# Create follow-up task repository instance
+follow_up_task_repository = FollowUpTaskRepository()
+
+
+class SlaMonitor:
+    """
+    Background service that creates follow-up tasks for aging records.
+
+    Open leads, open opportunities and contactable contacts whose latest
+    activity (or creation, without any activity) is older than their SLA
+    get a follow-up task for their owner. Aging records are found with
+    the indexed last_activity_date rollup in ID batches, skipping records
+    that already have an open SLA task, and their tasks are inserted in
+    one statement per batch. SLA tasks are closed again once the record
+    has new activity or no longer falls under its SLA. Runs take an
+    advisory lock, so only one worker checks at a time, and a partial
+    unique index keeps a record from getting a second open SLA task.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int = SLA_MONITOR_INTERVAL_SECONDS,
+        batch_size: int = SLA_MONITOR_BATCH_SIZE,
+        task_due_days: int = SLA_TASK_DUE_DAYS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the SLA monitor.
+
+        Args:
+            interval_seconds: Seconds between runs
+            batch_size: Maximum records checked per batch
+            task_due_days: Days until created tasks are due
+            session_factory: Factory for database sessions
+        """
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.task_due_days = task_due_days
+        self.session_factory = session_factory
+        self.runs: deque = deque(maxlen=100)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _create_tasks(self, db: Session, entity_type: str, today: date) -> int:
+        """
+        Create follow-up tasks for the records of a type that aged past their SLA.
+
+        Args:
+            db: Database session
+            entity_type: Entity type (lead, opportunity or contact)
+            today: Date the SLA is measured from
+
+        Returns:
+            int: Number of created tasks
+        """
+        model, days, condition, label = SLA_RULES[entity_type]
+        cutoff = today - timedelta(days=days)
+        aging = or_(
+            model.last_activity_date < cutoff,
+            and_(model.last_activity_date.is_(None), model.created_at < datetime.combine(cutoff, dt_time.min))
+        )
+        has_open_task = select(FollowUpTask.id).where(
+            FollowUpTask.entity_type == entity_type,
+            FollowUpTask.entity_id == model.id,
+            FollowUpTask.status == "open"
+        ).exists()
+
+        created = 0
+        last_id = 0
+        while not self._stop_event.is_set():
+            rows = db.execute(
+                select(model.id, label, func.coalesce(model.owner_id, model.created_by))
+                .where(model.id > last_id, condition, aging, ~has_open_task)
+                .order_by(model.id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                break
+
+            tasks = [
+                {
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "title": f"Follow up on {entity_type} {name}"[:255],
+                    "reason": "sla",
+                    "due_date": today + timedelta(days=self.task_due_days),
+                    "status": "open",
+                    "assignee_id": assignee_id
+                }
+                for entity_id, name, assignee_id in rows
+            ]
+            try:
+                if db.get_bind().dialect.name == "postgresql":
+                    # Records given a task since the select are skipped
+                    result = db.execute(
+                        postgresql_insert(FollowUpTask)
+                        .values(tasks)
+                        .on_conflict_do_nothing(
+                            index_elements=["entity_type", "entity_id"],
+                            index_where=text("status = 'open' AND reason = 'sla'")
+                        )
+                    )
+                    inserted = result.rowcount
+                else:
+                    db.execute(insert(FollowUpTask), tasks)
+                    inserted = len(tasks)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Error creating {entity_type} SLA tasks: {str(e)}")
+                raise
+
+            created += inserted
+            last_id = rows[-1][0]
+
+        return created
+
+    def _close_tasks(self, db: Session, entity_type: str) -> int:
+        """
+        Close the open SLA tasks of records with new activity or no longer under their SLA.
+
+        Args:
+            db: Database session
+            entity_type: Entity type (lead, opportunity or contact)
+
+        Returns:
+            int: Number of closed tasks
+        """
+        model, _, condition, _ = SLA_RULES[entity_type]
+        resolved = select(model.id).where(
+            model.id == FollowUpTask.entity_id,
+            or_(model.last_activity_date >= func.date(FollowUpTask.created_at), not_(condition))
+        ).exists()
+
+        try:
+            result = db.execute(
+                update(FollowUpTask)
+                .where(
+                    FollowUpTask.entity_type == entity_type,
+                    FollowUpTask.reason == "sla",
+                    FollowUpTask.status == "open",
+                    resolved
+                )
+                .values(status="done", completed_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error closing {entity_type} SLA tasks: {str(e)}")
+            raise
+
+    def run_once(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Run one SLA check over all entity types.
+
+        Args:
+            today: Date the SLAs are measured from (defaults to today)
+
+        Returns:
+            Dict[str, Any]: Statistics for the run
+        """
+        today = today or date.today()
+        start = time.perf_counter()
+        stats: Dict[str, Any] = {"started_at": datetime.utcnow(), "created": {}, "closed": {}, "errors": []}
+
+        db = self.session_factory()
+        try:
+            with advisory_lock(db.get_bind(), "sla_monitor") as acquired:
+                if not acquired:
+                    stats["skipped"] = True
+                    logger.debug("SLA monitor run skipped: another worker holds the lock")
+                    return stats
+
+                for entity_type in SLA_RULES:
+                    try:
+                        stats["closed"][entity_type] = self._close_tasks(db, entity_type)
+                        stats["created"][entity_type] = self._create_tasks(db, entity_type, today)
+                    except SQLAlchemyError as e:
+                        stats["errors"].append(f"{entity_type}: {str(e)}")
+        finally:
+            db.close()
+
+        stats["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.runs.append(stats)
+        logger.info(
+            f"SLA monitor run finished: created {stats['created']}, closed {stats['closed']} "
+            f"in {stats['duration_ms']} ms"
+        )
+        return stats
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get statistics of the most recent runs.
+
+        Returns:
+            List[Dict[str, Any]]: Run statistics, oldest first
+        """
+        return list(self.runs)
+
+    def _run_forever(self) -> None:
+        """Run SLA checks until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"SLA monitor run failed: {str(e)}")
+            self._stop_event.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the monitor in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_forever, name="sla-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"SLA monitor started (every {self.interval_seconds} s)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread.
+
+        Args:
+            timeout: Seconds to wait for the current run to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Create SLA monitor instance
+sla_monitor = SlaMonitor()
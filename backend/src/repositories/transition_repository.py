@@ -0,0 +1,375 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Status transition repository module for the Sales Automation System.
+This module records the status history of leads and opportunities and
+provides the time-in-stage, conversion and velocity analytics built on it.
+"""
+
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import enum
+import logging
+
+from sqlalchemy import case, distinct, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from src.auth.scoping import AccessScope
+from src.models.lead import Lead, LeadStatus, Opportunity, OpportunityStage, StatusTransition
+from src.utils.analytics_cache import analytics_cache
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Entity types with a status history: model, status attribute, status enum and the status counted as converted
+TRANSITION_ENTITIES = {
+    "lead": (Lead, "status", LeadStatus, LeadStatus.CONVERTED),
+    "opportunity": (Opportunity, "stage", OpportunityStage, OpportunityStage.CLOSED_WON)
+}
+
+# Model to entity type
+TRANSITION_SOURCES = {model: entity_type for entity_type, (model, _, _, _) in TRANSITION_ENTITIES.items()}
+
+# Seconds per day, for durations reported in days
+SECONDS_PER_DAY = 86400
+
+
+def status_value(enum_class: Any, value: Any) -> Optional[str]:
+    """
+    Get the stored value of a status.
+
+    Args:
+        enum_class: Status enum
+        value: Status as enum member or member name
+
+    Returns:
+        Optional[str]: Enum value (e.g. "qualified"), or None for no status
+    """
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.value
+    try:
+        return enum_class[str(value)].value
+    except KeyError:
+        return str(value)
+
+
+def record_transitions(
+    db: Session, entity_type: str, changes: Iterable[Tuple[int, Any, Any]], user_id: Optional[int] = None
+) -> int:
+    """
+    Record status transitions written without session events, e.g. by multi-row statements.
+
+    The caller commits.
+
+    Args:
+        db: Database session
+        entity_type: Entity type (lead or opportunity)
+        changes: Entity ID, old status (None for new records) and new status
+        user_id: ID of the user making the change
+
+    Returns:
+        int: Number of recorded transitions
+    """
+    enum_class = TRANSITION_ENTITIES[entity_type][2]
+    rows = [
+        {
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "from_status": status_value(enum_class, old_status),
+            "to_status": status_value(enum_class, new_status),
+            "user_id": user_id
+        }
+        for entity_id, old_status, new_status in changes
+    ]
+    if rows:
+        db.execute(insert(StatusTransition), rows)
+    return len(rows)
+
+
+def _days(seconds: Optional[float]) -> Optional[float]:
+    """
+    Convert a duration to days.
+
+    Args:
+        seconds: Duration in seconds
+
+    Returns:
+        Optional[float]: Duration in days rounded to hundredths, or None
+    """
+    return None if seconds is None else round(float(seconds) / SECONDS_PER_DAY, 2)
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    """
+    Compute a rate.
+
+    Args:
+        part: Count of the matching part
+        whole: Total count
+
+    Returns:
+        Optional[float]: Rate rounded to four places, or None for an empty total
+    """
+    return round(part / whole, 4) if whole else None
+
+
+class StatusAnalyticsRepository:
+    """
+    Repository for status history analytics of leads and opportunities.
+
+    Every query starts from a transitioned_at range of one entity type,
+    served by the (entity_type, transitioned_at) index, and derives the
+    stints between transitions with window functions instead of self-joins.
+    Results are cached per access scope and dropped when this worker
+    writes to the entity table.
+    """
+
+    def _transitions(self, entity_type: str, scope: Optional[AccessScope], *columns: Any) -> Any:
+        """
+        Select from the transitions of an entity type visible in a scope.
+
+        Args:
+            entity_type: Entity type (lead or opportunity)
+            scope: Access scope (None for unscoped access)
+            *columns: Columns to select
+
+        Returns:
+            Any: Select statement
+        """
+        model = TRANSITION_ENTITIES[entity_type][0]
+        statement = select(*columns).where(StatusTransition.entity_type == entity_type)
+
+        predicate = scope.predicate(model) if scope is not None else None
+        if predicate is not None:
+            statement = statement.join(model, model.id == StatusTransition.entity_id).where(predicate)
+        return statement
+
+    def _seconds(self, db: Session, start: Any, end: Any) -> Any:
+        """
+        Build the SQL expression of the seconds between two timestamps.
+
+        Args:
+            db: Database session
+            start: Start timestamp expression
+            end: End timestamp expression
+
+        Returns:
+            Any: SQL expression
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            return func.extract("epoch", end - start)
+        return (func.julianday(end) - func.julianday(start)) * SECONDS_PER_DAY
+
+    def time_in_stage(
+        self, db: Session, entity_type: str, start: datetime, end: datetime, scope: Optional[AccessScope] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get how long records stayed in each status, for stints entered in a range.
+
+        Args:
+            db: Database session
+            entity_type: Entity type (lead or opportunity)
+            start: Start of the range
+            end: End of the range (exclusive)
+            scope: Access scope (None for unscoped access)
+
+        Returns:
+            List[Dict[str, Any]]: Per status the entered and exited stints and
+            the average and longest days of the exited ones
+        """
+        t = StatusTransition
+        # A stint ends when the next one starts, which is always inside the range too
+        stints = self._transitions(
+            entity_type, scope,
+            t.to_status.label("status"),
+            t.transitioned_at.label("entered_at"),
+            func.lead(t.transitioned_at).over(partition_by=t.entity_id, order_by=(t.transitioned_at, t.id)).label("left_at")
+        ).where(t.transitioned_at >= start).subquery()
+        duration = self._seconds(db, stints.c.entered_at, stints.c.left_at)
+
+        rows = db.execute(
+            select(stints.c.status, func.count(), func.count(stints.c.left_at), func.avg(duration), func.max(duration))
+            .where(stints.c.entered_at < end)
+            .group_by(stints.c.status)
+            .order_by(stints.c.status)
+        ).all()
+
+        return [
+            {"status": status, "entered": entered, "exited": exited, "avg_days": _days(average), "max_days": _days(longest)}
+            for status, entered, exited, average, longest in rows
+        ]
+
+    def conversion_rates(
+        self, db: Session, entity_type: str, start: datetime, end: datetime, scope: Optional[AccessScope] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the conversion of the records created in a range, overall and by the statuses they passed.
+
+        Args:
+            db: Database session
+            entity_type: Entity type (lead or opportunity)
+            start: Start of the range
+            end: End of the range (exclusive)
+            scope: Access scope (None for unscoped access)
+
+        Returns:
+            Dict[str, Any]: Target status, cohort size, converted records and
+            rate, and per status the records that passed it and their rate
+        """
+        t = StatusTransition
+        target = TRANSITION_ENTITIES[entity_type][3].value
+        # Records created before the range have no creation entry in it and drop out
+        cohort = self._transitions(
+            entity_type, scope,
+            t.entity_id,
+            t.to_status,
+            func.max(case((t.from_status.is_(None), t.transitioned_at))).over(partition_by=t.entity_id).label("created_at"),
+            func.max(case((t.to_status == target, 1), else_=0)).over(partition_by=t.entity_id).label("converted")
+        ).where(t.transitioned_at >= start).subquery()
+        converted = func.count(distinct(case((cohort.c.converted == 1, cohort.c.entity_id))))
+
+        total, total_converted = db.execute(
+            select(func.count(distinct(cohort.c.entity_id)), converted).where(cohort.c.created_at < end)
+        ).one()
+        rows = db.execute(
+            select(cohort.c.to_status, func.count(distinct(cohort.c.entity_id)), converted)
+            .where(cohort.c.created_at < end)
+            .group_by(cohort.c.to_status)
+            .order_by(cohort.c.to_status)
+        ).all()
+
+        return {
+            "target": target,
+            "cohort": total,
+            "converted": total_converted,
+            "rate": _rate(total_converted, total),
+            "stages": [
+                {"status": status, "entities": entities, "converted": count, "rate": _rate(count, entities)}
+                for status, entities, count in rows
+            ]
+        }
+
+    def velocity(
+        self, db: Session, entity_type: str, start: datetime, end: datetime, scope: Optional[AccessScope] = None
+    ) -> Dict[str, Any]:
+        """
+        Get how long the records converted in a range took from creation to conversion.
+
+        Args:
+            db: Database session
+            entity_type: Entity type (lead or opportunity)
+            start: Start of the range
+            end: End of the range (exclusive)
+            scope: Access scope (None for unscoped access)
+
+        Returns:
+            Dict[str, Any]: Target status, converted records and their average,
+            fastest and slowest days to conversion
+        """
+        t = StatusTransition
+        target = TRANSITION_ENTITIES[entity_type][3].value
+        reached = select(t.entity_id).where(
+            t.entity_type == entity_type, t.to_status == target, t.transitioned_at >= start, t.transitioned_at < end
+        )
+        histories = self._transitions(
+            entity_type, scope,
+            t.to_status,
+            t.transitioned_at,
+            func.max(case((t.from_status.is_(None), t.transitioned_at))).over(partition_by=t.entity_id).label("created_at")
+        ).where(t.entity_id.in_(reached)).subquery()
+        duration = self._seconds(db, histories.c.created_at, histories.c.transitioned_at)
+
+        count, average, fastest, slowest = db.execute(
+            select(func.count(), func.avg(duration), func.min(duration), func.max(duration)).where(
+                histories.c.to_status == target,
+                histories.c.transitioned_at >= start,
+                histories.c.transitioned_at < end,
+                histories.c.created_at.isnot(None)
+            )
+        ).one()
+
+        return {
+            "target": target,
+            "count": count,
+            "avg_days": _days(average),
+            "min_days": _days(fastest),
+            "max_days": _days(slowest)
+        }
+
+    def get_analytics(
+        self, db: Session, entity_type: str, start: datetime, end: datetime, scope: Optional[AccessScope] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the time-in-stage, conversion and velocity analytics of a range, cached per scope.
+
+        Args:
+            db: Database session
+            entity_type: Entity type (lead or opportunity)
+            start: Start of the range
+            end: End of the range (exclusive)
+            scope: Access scope (None for unscoped access)
+
+        Returns:
+            Dict[str, Any]: Analytics
+        """
+        model = TRANSITION_ENTITIES[entity_type][0]
+        namespace = (model.__tablename__, scope.cache_key if scope is not None else ("all",))
+        key = ("status_analytics", start, end)
+
+        result = analytics_cache.get(namespace, key)
+        if result is None:
+            result = {
+                "entity_type": entity_type,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "time_in_stage": self.time_in_stage(db, entity_type, start, end, scope),
+                "conversion": self.conversion_rates(db, entity_type, start, end, scope),
+                "velocity": self.velocity(db, entity_type, start, end, scope)
+            }
+            analytics_cache.put(namespace, key, result)
+        return result
+
+
+# Create status analytics repository instance
+status_analytics_repository = StatusAnalyticsRepository()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_status_transitions(session: Session, flush_context: Any) -> None:
+    """Append a transition for each lead or opportunity a flush created or moved to another status."""
+    rows = []
+    for obj in chain(session.new, session.dirty):
+        entity_type = TRANSITION_SOURCES.get(type(obj))
+        if entity_type is None:
+            continue
+
+        _, attribute, enum_class, _ = TRANSITION_ENTITIES[entity_type]
+        state = inspect(obj)
+        if obj in session.new:
+            old_status, user_id = None, obj.created_by
+        else:
+            history = state.attrs[attribute].history
+            if not history.added:
+                continue
+            old_status = history.deleted[0] if history.deleted else None
+            # Only attribute the change to updated_by if this flush set it
+            user_id = state.attrs.updated_by.history.added[0] if state.attrs.updated_by.history.added else None
+
+        new_status = status_value(enum_class, getattr(obj, attribute))
+        old_status = status_value(enum_class, old_status)
+        if new_status is None or new_status == old_status:
+            continue
+
+        rows.append({
+            "entity_type": entity_type,
+            "entity_id": obj.id,
+            "from_status": old_status,
+            "to_status": new_status,
+            "user_id": user_id
+        })
+
+    if rows:
+        session.connection().execute(insert(StatusTransition.__table__), rows)
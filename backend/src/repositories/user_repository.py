@@ -16,6 +16,8 @@ from src.models.user import User, Role, Permission, RolePermission, AuditLog
 class UserRepository(BaseRepository[User]):
     """Repository for User model operations."""
     
+    audit_redact_fields = ("hashed_password", "verification_token", "password_reset_token")
+    
     def __init__(self):
         super().__init__(User)
     
@@ -30,7 +32,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Optional[User]: Found user or None
         """
-        return db.query(User).filter(User.email == email).first()
+        return self._query(db).filter(User.email == email).first()
     
     def get_by_username(self, db: Session, username: str) -> Optional[User]:
         """
@@ -43,7 +45,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Optional[User]: Found user or None
         """
-        return db.query(User).filter(User.username == username).first()
+        return self._query(db).filter(User.username == username).first()
     
     def get_by_email_or_username(self, db: Session, identifier: str) -> Optional[User]:
         """
@@ -56,7 +58,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Optional[User]: Found user or None
         """
-        return db.query(User).filter(
+        return self._query(db).filter(
             or_(User.email == identifier, User.username == identifier)
         ).first()
     
@@ -72,7 +74,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             List[User]: List of active users
         """
-        return db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+        return self._query(db).filter(User.is_active == True).offset(skip).limit(limit).all()
     
     def add_role_to_user(self, db: Session, user_id: int, role_id: int) -> User:
         """
@@ -119,6 +121,26 @@ class UserRepository(BaseRepository[User]):
         db.commit()
         db.refresh(user)
         return user
+    
+    def bump_security_version(self, db: Session, user_id: int) -> Optional[User]:
+        """
+        Increment a user's security version, invalidating issued access tokens.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            Optional[User]: Updated user or None if not found
+        """
+        user = self.get(db, user_id)
+        if user is None:
+            return None
+        
+        user.security_version += 1
+        db.commit()
+        db.refresh(user)
+        return user
 
 
 class RoleRepository(BaseRepository[Role]):
@@ -138,7 +160,7 @@ class RoleRepository(BaseRepository[Role]):
         Returns:
             Optional[Role]: Found role or None
         """
-        return db.query(Role).filter(Role.name == name).first()
+        return self._query(db).filter(Role.name == name).first()
     
     def get_users_with_role(self, db: Session, role_id: int) -> List[User]:
         """
@@ -177,6 +199,11 @@ class RoleRepository(BaseRepository[Role]):
         
         role_permission = RolePermission(role_id=role_id, permission_id=permission_id)
         db.add(role_permission)
+        
+        # Tokens of users with the role carry the old permissions
+        for user in role.users:
+            user.security_version += 1
+        
         db.commit()
         db.refresh(role)
         return role
@@ -199,7 +226,7 @@ class PermissionRepository(BaseRepository[Permission]):
         Returns:
             Optional[Permission]: Found permission or None
         """
-        return db.query(Permission).filter(Permission.name == name).first()
+        return self._query(db).filter(Permission.name == name).first()
     
     def get_by_resource_and_action(self, db: Session, resource: str, action: str) -> Optional[Permission]:
         """
@@ -213,7 +240,7 @@ class PermissionRepository(BaseRepository[Permission]):
         Returns:
             Optional[Permission]: Found permission or None
         """
-        return db.query(Permission).filter(
+        return self._query(db).filter(
             Permission.resource == resource,
             Permission.action == action
         ).first()
@@ -255,7 +282,7 @@ class AuditLogRepository(BaseRepository[AuditLog]):
         Returns:
             List[AuditLog]: List of audit logs
         """
-        return db.query(AuditLog).filter(AuditLog.user_id == user_id).order_by(
+        return self._query(db).filter(AuditLog.user_id == user_id).order_by(
             AuditLog.timestamp.desc()
         ).offset(skip).limit(limit).all()
     
@@ -272,7 +299,7 @@ class AuditLogRepository(BaseRepository[AuditLog]):
         Returns:
             List[AuditLog]: List of audit logs
         """
-        return db.query(AuditLog).filter(AuditLog.action == action).order_by(
+        return self._query(db).filter(AuditLog.action == action).order_by(
             AuditLog.timestamp.desc()
         ).offset(skip).limit(limit).all()
     
@@ -291,7 +318,7 @@ class AuditLogRepository(BaseRepository[AuditLog]):
         Returns:
             List[AuditLog]: List of audit logs
         """
-        query = db.query(AuditLog).filter(AuditLog.resource_type == resource_type)
+        query = self._query(db).filter(AuditLog.resource_type == resource_type)
         
         if resource_id is not None:
             query = query.filter(AuditLog.resource_id == resource_id)
@@ -4,7 +4,7 @@ Author Sadeq Obaid and Abdallah Obaid
 Utilities package for the Sales Automation System.
 """
 
-from src.utils.database_utils import init_db, db_session, check_database_connection
+from src.utils.database_utils import init_db, db_session, check_database_connection, delete_batch, advisory_lock, advisory_xact_lock
 from src.utils.connection_pool import configure_connection_pool
 from src.utils.migration_utils import (
     create_migration,
@@ -13,15 +13,32 @@ from src.utils.migration_utils import (
     get_migration_history,
     get_current_revision
 )
+from src.utils.partition_utils import (
+    is_partitioned,
+    list_partitions,
+    list_detached_partitions,
+    create_range_partition,
+    detach_partition,
+    drop_partitions_before
+)
 
 __all__ = [
     'init_db',
     'db_session',
     'check_database_connection',
+    'delete_batch',
+    'advisory_lock',
+    'advisory_xact_lock',
     'configure_connection_pool',
     'create_migration',
     'apply_migrations',
     'rollback_migration',
     'get_migration_history',
-    'get_current_revision'
+    'get_current_revision',
+    'is_partitioned',
+    'list_partitions',
+    'list_detached_partitions',
+    'create_range_partition',
+    'detach_partition',
+    'drop_partitions_before'
 ]
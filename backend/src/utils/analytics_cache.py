@@ -0,0 +1,91 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Analytics cache module for the Sales Automation System.
+This module provides the per-worker cache of aggregated report results.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+import threading
+import time
+
+from config.settings import ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL_SECONDS
+
+
+class ResultCache:
+    """
+    Per-worker LRU cache of aggregated report results.
+
+    Entries are keyed by a namespace (the table the report reads and the
+    access scope it was computed for) and the report's parameters. They
+    expire after the TTL and a table's entries are cleared once this
+    worker commits a write to it; writes by other workers show up once
+    the entries expire.
+    """
+
+    def __init__(self, max_entries: int = ANALYTICS_CACHE_SIZE, ttl_seconds: int = ANALYTICS_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl_seconds: Lifetime of an entry in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[Hashable, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, namespace: Hashable, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached result.
+
+        Args:
+            namespace: Cache namespace (table and access scope)
+            key: Report parameters
+
+        Returns:
+            Optional[Any]: Result, or None if not cached or expired
+        """
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._entries.pop((namespace, key), None)
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end((namespace, key))
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, namespace: Hashable, key: Hashable, result: Any) -> None:
+        """
+        Cache a result, evicting the least recently used one.
+
+        Args:
+            namespace: Cache namespace (table and access scope)
+            key: Report parameters
+            result: Result
+        """
+        with self._lock:
+            self._entries[(namespace, key)] = (time.monotonic(), result)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table_name: str) -> None:
+        """
+        Drop all cached results of a table.
+
+        Args:
+            table_name: Table name (first element of the namespaces)
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0][0] == table_name]:
+                del self._entries[key]
+
+
+# Create analytics cache instance
+analytics_cache = ResultCache()
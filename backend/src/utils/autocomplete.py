@@ -0,0 +1,215 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Autocomplete module for the Sales Automation System.
+This module provides trigram ranking and the per-worker prefix cache used
+by typeahead lookups.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import re
+import threading
+import time
+
+from config.settings import AUTOCOMPLETE_MIN_LENGTH, AUTOCOMPLETE_CACHE_SIZE, AUTOCOMPLETE_CACHE_TTL_SECONDS
+
+# Words as split by pg_trgm (alphanumeric runs)
+_WORD_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def normalize_autocomplete_text(text: str) -> str:
+    """
+    Normalize typed text for matching against the lower-cased autocomplete text.
+
+    Args:
+        text: Text as typed by the user
+
+    Returns:
+        str: Lower-cased text with runs of whitespace collapsed
+    """
+    return " ".join(text.lower().split())
+
+
+def trigrams(text: str) -> set:
+    """
+    Extract the trigrams of a text the way pg_trgm does.
+
+    Each word is padded with two spaces in front and one behind.
+
+    Args:
+        text: Text
+
+    Returns:
+        set: Trigrams
+    """
+    result = set()
+    for word in _WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """
+    Compute the trigram similarity of two texts, like pg_trgm's similarity().
+
+    Args:
+        a: First text
+        b: Second text
+
+    Returns:
+        float: Shared trigrams divided by all distinct trigrams (0 to 1)
+    """
+    trigrams_a = trigrams(a)
+    trigrams_b = trigrams(b)
+    if not trigrams_a or not trigrams_b:
+        return 0.0
+
+    shared = len(trigrams_a & trigrams_b)
+    return shared / (len(trigrams_a) + len(trigrams_b) - shared)
+
+
+def match_similarity(text: str, candidate: str) -> float:
+    """
+    Rank a candidate for typed text by its best matching run of words.
+
+    Like pg_trgm's word_similarity(), a short text typed against a long
+    candidate is compared with the words it matches rather than with the
+    whole candidate, so "smith" ranks "John Smith" above "Jon Smithers".
+
+    Args:
+        text: Normalized typed text
+        candidate: Candidate text
+
+    Returns:
+        float: Highest trigram similarity of the text to a run of words (0 to 1)
+    """
+    words = _WORD_PATTERN.findall(candidate.lower())
+    width = len(_WORD_PATTERN.findall(text)) or 1
+
+    best = 0.0
+    for size in range(1, width + 2):
+        for start in range(max(len(words) - size + 1, 1)):
+            best = max(best, trigram_similarity(text, " ".join(words[start:start + size])))
+    return best
+
+
+class PrefixCache:
+    """
+    Per-worker LRU cache of autocomplete candidate sets by typed prefix.
+
+    Candidates match when their text contains the typed text, so the
+    matches of "smit" are a subset of the matches of "smi". A candidate
+    set that held every match of a prefix (complete) is narrowed in memory
+    for the following keystrokes instead of querying the database again.
+    Entries expire after the TTL and a namespace is cleared when this
+    worker writes to its table; writes by other workers show up once
+    the entries expire.
+    """
+
+    def __init__(self, max_entries: int = AUTOCOMPLETE_CACHE_SIZE, ttl_seconds: int = AUTOCOMPLETE_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached prefixes
+            ttl_seconds: Lifetime of an entry in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, bool, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "narrowed": 0, "misses": 0}
+
+    def _get(self, key: Tuple[Hashable, str]) -> Optional[Tuple[float, bool, List[Dict[str, Any]]]]:
+        """
+        Get a live entry and mark it as recently used (lock must be held).
+
+        Args:
+            key: Namespace and prefix
+
+        Returns:
+            Optional[Tuple[float, bool, List[Dict[str, Any]]]]: Entry or None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, namespace: Hashable, text: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the candidates of a text from the cache.
+
+        Args:
+            namespace: Cache namespace (table and access scope)
+            text: Normalized typed text
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Candidates, or None if neither the
+            text nor a completely cached prefix of it is cached
+        """
+        with self._lock:
+            entry = self._get((namespace, text))
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry[2]
+
+            for length in range(len(text) - 1, AUTOCOMPLETE_MIN_LENGTH - 1, -1):
+                entry = self._get((namespace, text[:length]))
+                if entry is None or not entry[1]:
+                    continue
+
+                candidates = [candidate for candidate in entry[2] if text in candidate["text"]]
+                self.stats["narrowed"] += 1
+                self._put((namespace, text), True, candidates)
+                return candidates
+
+            self.stats["misses"] += 1
+            return None
+
+    def _put(self, key: Tuple[Hashable, str], complete: bool, candidates: List[Dict[str, Any]]) -> None:
+        """
+        Store an entry, evicting the least recently used one (lock must be held).
+
+        Args:
+            key: Namespace and prefix
+            complete: Whether the candidates are all matches of the prefix
+            candidates: Candidates
+        """
+        self._entries[key] = (time.monotonic(), complete, candidates)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, namespace: Hashable, text: str, candidates: List[Dict[str, Any]], complete: bool) -> None:
+        """
+        Cache the candidates of a text.
+
+        Args:
+            namespace: Cache namespace (table and access scope)
+            text: Normalized typed text
+            candidates: Candidates, each with the matched "text"
+            complete: Whether the candidates are all matches of the text
+        """
+        with self._lock:
+            self._put((namespace, text), complete, candidates)
+
+    def invalidate(self, table_name: str) -> None:
+        """
+        Drop all cached candidates of a table.
+
+        Args:
+            table_name: Table name (first element of the namespaces)
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0][0] == table_name]:
+                del self._entries[key]
+
+
+# Create autocomplete cache instance
+autocomplete_cache = PrefixCache()
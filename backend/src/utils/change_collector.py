@@ -0,0 +1,170 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Change collector module for the Sales Automation System.
+This module provides the transaction change collector and the background
+maintainer base shared by the services that keep derived data up to date.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set
+import logging
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def merge_changes(pending: Dict[Hashable, Set[Any]], changes: Dict[Hashable, Iterable[Any]]) -> None:
+    """
+    Add changed IDs to a pending set per type.
+
+    Args:
+        pending: Pending IDs by type, updated in place
+        changes: Changed IDs by type
+    """
+    for change_type, ids in changes.items():
+        if ids:
+            pending.setdefault(change_type, set()).update(ids)
+
+
+class ChangeCollector:
+    """
+    Collects the changes of a session's transaction and hands them on once it commits.
+
+    After each flush, the collect function adds the flushed changes to a
+    container kept in the session info under the collector's key. After
+    commit the container is passed to the handler if it isn't empty, and
+    after rollback it is dropped, so only committed changes are handled.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        collect: Callable[[Session, Any], None],
+        handle: Callable[[Any], None],
+        factory: Callable[[], Any] = dict
+    ):
+        """
+        Initialize the collector and listen to all sessions.
+
+        Args:
+            key: Session info key of the collected changes
+            collect: Function adding the changes of a flushed session to the container
+            handle: Function receiving the committed changes
+            factory: Factory for empty change containers
+        """
+        self.key = key
+        self.collect = collect
+        self.handle = handle
+        self.factory = factory
+
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session: Session, flush_context: Any) -> None:
+        """Record the changes of a flush."""
+        changes = session.info.get(self.key)
+        if changes is None:
+            changes = self.factory()
+        self.collect(session, changes)
+        if changes:
+            session.info[self.key] = changes
+
+    def _after_commit(self, session: Session) -> None:
+        """Hand the committed changes on."""
+        changes = session.info.pop(self.key, None)
+        if changes:
+            self.handle(changes)
+
+    def _after_rollback(self, session: Session) -> None:
+        """Forget changes that were rolled back."""
+        session.info.pop(self.key, None)
+
+
+class ChangeMaintainer:
+    """
+    Base of the background services that apply collected changes in batches.
+
+    Subclasses queue changes in enqueue and apply them in flush, which the
+    background thread calls every interval. While the thread isn't
+    running, queued changes are applied right away instead, and stopping
+    applies whatever is still queued.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the maintainer.
+
+        Args:
+            name: Name used for the thread and in log messages
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background thread is running."""
+        return self._thread is not None
+
+    @property
+    def interval_seconds(self) -> float:
+        """Seconds between batches."""
+        raise NotImplementedError
+
+    def flush(self) -> int:
+        """
+        Apply the queued changes that are due.
+
+        Returns:
+            int: Number of applied changes
+        """
+        raise NotImplementedError
+
+    def drain(self) -> None:
+        """Apply all queued changes."""
+        self.flush()
+
+    def tick(self) -> None:
+        """Do one round of background work."""
+        self.flush()
+
+    def _apply_if_stopped(self) -> None:
+        """Apply queued changes right away while the background thread isn't running."""
+        if self._thread is None:
+            self.drain()
+
+    def _run_forever(self) -> None:
+        """Apply changes until stopped."""
+        while not self._stop_event.wait(self.interval_seconds):
+            self.tick()
+
+    def start(self) -> None:
+        """Start the maintainer in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run_forever, name=self.name.lower().replace(" ", "-"), daemon=True
+        )
+        self._thread.start()
+        logger.info(f"{self.name} started (every {self.interval_seconds * 1000:g} ms)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread and apply the remaining changes.
+
+        Args:
+            timeout: Seconds to wait for the current batch to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.drain()
@@ -5,10 +5,13 @@ Database connection module for the Sales Automation System.
 This module provides database connection utilities and pooling.
 """
 
+import hashlib
 import logging
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Generator
 
+from sqlalchemy import Table, delete, literal_column, select, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -69,3 +72,89 @@ def check_database_connection() -> bool:
     except SQLAlchemyError as e:
         logger.error(f"Database connection error: {str(e)}")
         return False
+
+def delete_batch(db: Session, table: Table, condition: Any, batch_size: int) -> int:
+    """
+    Delete up to batch_size rows matching a condition and commit.
+    
+    Rows are addressed by ctid (DELETE ... WHERE ctid IN (SELECT ctid ...
+    LIMIT n)) so each batch is a short transaction that holds few locks.
+    
+    Args:
+        db: Database session
+        table: Table to delete from
+        condition: SQL condition selecting the rows to delete
+        batch_size: Maximum number of rows to delete
+        
+    Returns:
+        int: Number of rows deleted
+    """
+    ctid = literal_column("ctid")
+    batch = select(ctid).select_from(table).where(condition).limit(batch_size)
+    
+    try:
+        result = db.execute(delete(table).where(ctid.in_(batch)))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error deleting batch from {table.name}: {str(e)}")
+        raise
+    
+    return result.rowcount
+
+def advisory_lock_key(name: str) -> int:
+    """
+    Derive the 64-bit PostgreSQL advisory lock key of a lock name.
+    
+    Args:
+        name: Lock name
+        
+    Returns:
+        int: Signed 64-bit lock key
+    """
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+@contextmanager
+def advisory_lock(bind: Engine, name: str) -> Generator[bool, None, None]:
+    """
+    Context manager that tries to take a PostgreSQL session advisory lock.
+    
+    The lock is held on a connection of its own, so the work done under it
+    may commit and release its session's connection without losing the
+    lock. Other databases have no advisory locks and always acquire it.
+    
+    Args:
+        bind: Engine of the database
+        name: Lock name, shared by every worker running the same job
+        
+    Yields:
+        bool: Whether this worker holds the lock
+    """
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+    
+    key = advisory_lock_key(name)
+    with bind.connect() as connection:
+        acquired = bool(connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar())
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
+
+def advisory_xact_lock(db: Session, name: str) -> None:
+    """
+    Wait for a PostgreSQL transaction advisory lock in a session's transaction.
+    
+    The lock is released when the transaction commits or rolls back. Other
+    databases have no advisory locks and don't wait.
+    
+    Args:
+        db: Database session
+        name: Lock name, shared by every worker serializing the same work
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": advisory_lock_key(name)})
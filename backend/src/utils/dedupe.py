@@ -0,0 +1,194 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Duplicate detection utilities module for the Sales Automation System.
+This module provides the blocking keys and pair scoring used to find
+duplicate contacts.
+"""
+
+from typing import Any, List, Optional, Tuple
+
+from src.utils.normalization import normalize_email
+
+# Weights of the compared fields in a pair score
+MATCH_WEIGHTS = {
+    "email": 0.35,
+    "phone": 0.2,
+    "name": 0.35,
+    "company": 0.1
+}
+
+# Field similarity above which a field is reported as a match reason
+REASON_SIMILARITY = 0.9
+
+# Soundex digit of each consonant
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6"
+}
+
+
+def soundex(name: Optional[str]) -> Optional[str]:
+    """
+    Compute the American Soundex code of a name.
+
+    Args:
+        name: Name
+
+    Returns:
+        Optional[str]: Four character code (e.g. S530) or None if the name
+        has no letters
+    """
+    letters = [char for char in (name or "").lower() if "a" <= char <= "z"]
+    if not letters:
+        return None
+
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0])
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char)
+        if digit is not None and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate equal codes, vowels do
+        if char not in "hw":
+            previous = digit
+
+    return code.ljust(4, "0")
+
+
+def email_domain(email: Optional[str]) -> Optional[str]:
+    """
+    Get the normalized domain of an email address.
+
+    Args:
+        email: Email address
+
+    Returns:
+        Optional[str]: Domain or None if the address has none
+    """
+    email = normalize_email(email)
+    if not email or "@" not in email:
+        return None
+    return email.rsplit("@", 1)[1] or None
+
+
+def dedupe_key(email: Optional[str], last_name: Optional[str]) -> Optional[str]:
+    """
+    Compute the name blocking key of a contact: email domain and phonetic last name.
+
+    Args:
+        email: Email address
+        last_name: Last name
+
+    Returns:
+        Optional[str]: Key (e.g. acme.com:S530) or None if either part is missing
+    """
+    domain = email_domain(email)
+    code = soundex(last_name)
+    if domain is None or code is None:
+        return None
+    return f"{domain}:{code}"[:64]
+
+
+def jaro_winkler(a: Optional[str], b: Optional[str]) -> float:
+    """
+    Compute the Jaro-Winkler similarity of two strings (case-insensitive).
+
+    Args:
+        a: First string
+        b: Second string
+
+    Returns:
+        float: Similarity from 0 to 1
+    """
+    a = (a or "").strip().lower()
+    b = (b or "").strip().lower()
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    matched_b = [False] * len(b)
+    matches_a = []
+    for i, char in enumerate(a):
+        for j in range(max(i - window, 0), min(i + window + 1, len(b))):
+            if not matched_b[j] and b[j] == char:
+                matched_b[j] = True
+                matches_a.append(char)
+                break
+
+    if not matches_a:
+        return 0.0
+
+    matches_b = [char for char, matched in zip(b, matched_b) if matched]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    count = len(matches_a)
+    jaro = (count / len(a) + count / len(b) + (count - transpositions) / count) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def _email_similarity(a: Any, b: Any) -> Optional[float]:
+    """Compare the emails of two contacts (same address or similar local part at the same domain)."""
+    if a.email_bidx and a.email_bidx == b.email_bidx:
+        return 1.0
+
+    email_a = normalize_email(a.email)
+    email_b = normalize_email(b.email)
+    if not email_a or not email_b:
+        return None
+
+    local_a, _, domain_a = email_a.partition("@")
+    local_b, _, domain_b = email_b.partition("@")
+    return jaro_winkler(local_a, local_b) if domain_a == domain_b else 0.0
+
+
+def match_score(a: Any, b: Any) -> Tuple[float, List[str]]:
+    """
+    Score how likely two contacts are the same person.
+
+    Fields are compared only when both contacts have them; the score is
+    the weighted average of the compared fields' similarities.
+
+    Args:
+        a: First contact (object or row with the contact columns)
+        b: Second contact
+
+    Returns:
+        Tuple[float, List[str]]: Score from 0 to 1 and the matching fields
+    """
+    similarities = {"email": _email_similarity(a, b)}
+
+    if a.phone_bidx and b.phone_bidx:
+        similarities["phone"] = 1.0 if a.phone_bidx == b.phone_bidx else 0.0
+
+    if a.first_name and b.first_name:
+        name = jaro_winkler(a.first_name, b.first_name)
+        if a.last_name and b.last_name:
+            name = (name + jaro_winkler(a.last_name, b.last_name)) / 2
+        similarities["name"] = name
+
+    if a.company_name and b.company_name:
+        similarities["company"] = jaro_winkler(a.company_name, b.company_name)
+
+    compared = {field: value for field, value in similarities.items() if value is not None}
+    total_weight = sum(MATCH_WEIGHTS[field] for field in compared)
+    if total_weight == 0:
+        return 0.0, []
+
+    score = sum(MATCH_WEIGHTS[field] * value for field, value in compared.items()) / total_weight
+    reasons = [field for field, value in compared.items() if value >= REASON_SIMILARITY]
+    return round(score, 4), reasons
@@ -0,0 +1,583 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Inverted index module for the Sales Automation System.
+This module provides an in-process search engine with BM25 ranking for
+deployments without PostgreSQL full-text search.
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import base64
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+
+from config.settings import SEARCH_BACKEND, SEARCH_SNAPSHOT_PATH
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Words indexed and searched (alphanumeric runs, like the database parser)
+_TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Maximum number of vocabulary terms a query prefix expands to
+MAX_PREFIX_EXPANSIONS = 64
+
+# Weight of a word that a query term is a prefix of, relative to an exact match
+PREFIX_MATCH_WEIGHT = 0.5
+
+# Snapshot format version
+SNAPSHOT_VERSION = 1
+
+# Minimum number of tombstones and pending postings before a posting list is compacted
+COMPACT_MIN_GARBAGE = 64
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split a text into lower-cased terms.
+
+    Args:
+        text: Text (may be None)
+
+    Returns:
+        List[str]: Terms in order of occurrence
+    """
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def highlight(text: Optional[str], terms: Iterable[str], max_words: int = 25) -> Optional[str]:
+    """
+    Build a snippet of a text with words matching query terms marked.
+
+    Args:
+        text: Text to highlight
+        terms: Query terms (matched as prefixes)
+        max_words: Maximum number of words in the snippet
+
+    Returns:
+        Optional[str]: Snippet around the first match, or None if nothing matches
+    """
+    if not text:
+        return None
+
+    terms = tuple(terms)
+    words = text.split()
+    matches = [i for i, word in enumerate(words) if any(token.startswith(terms) for token in tokenize(word))]
+    if not matches:
+        return None
+
+    start = max(matches[0] - max_words // 3, 0)
+    window = words[start:start + max_words]
+    marked = [
+        f"<mark>{word}</mark>" if start + i in matches else word
+        for i, word in enumerate(window)
+    ]
+    return " ".join(marked)
+
+
+class PostingList:
+    """
+    Posting list of one term: the sorted IDs of the documents containing
+    it, stored as deltas in an unsigned int array, with the term frequency
+    of each document in a parallel array.
+
+    Removing a document only records a tombstone, and re-adding one below
+    the highest ID keeps it in a pending map, so updates never rewrite the
+    arrays. Tombstones and pending postings are merged into the arrays in
+    one pass once they make up a quarter of the list (see needs_compaction).
+    """
+
+    __slots__ = ("_deltas", "_freqs", "_last", "_dead", "_pending")
+
+    def __init__(self):
+        """Initialize an empty posting list."""
+        self._deltas = array("I")
+        self._freqs = array("H")
+        self._last = 0
+        self._dead: Set[int] = set()
+        self._pending: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        """Get the number of documents."""
+        return len(self._deltas) - len(self._dead) + len(self._pending)
+
+    @property
+    def garbage(self) -> int:
+        """Get the number of tombstones and pending postings."""
+        return len(self._dead) + len(self._pending)
+
+    def needs_compaction(self) -> bool:
+        """Check if enough updates have accumulated to rewrite the arrays."""
+        return self.garbage >= max(COMPACT_MIN_GARBAGE, len(self) // 4)
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate over the postings.
+
+        Yields:
+            Tuple[int, int]: Document ID and term frequency, by ascending ID
+            for the arrays followed by the pending postings
+        """
+        doc_id = 0
+        for delta, freq in zip(self._deltas, self._freqs):
+            doc_id += delta
+            if doc_id not in self._dead:
+                yield doc_id, freq
+        yield from self._pending.items()
+
+    def _encode(self, items: List[Tuple[int, int]]) -> None:
+        """
+        Replace the postings.
+
+        Args:
+            items: Document IDs and term frequencies, by ascending ID
+        """
+        self._deltas = array("I")
+        self._freqs = array("H")
+        self._last = 0
+        self._dead = set()
+        self._pending = {}
+        for doc_id, freq in items:
+            self._deltas.append(doc_id - self._last)
+            self._freqs.append(freq)
+            self._last = doc_id
+
+    def compact(self) -> None:
+        """Merge the tombstones and pending postings into the arrays."""
+        if self.garbage:
+            self._encode(sorted(self.items()))
+
+    def add(self, doc_id: int, freq: int) -> None:
+        """
+        Add a document that isn't in the list (remove it first otherwise).
+
+        Appending a document with a higher ID than all others (the common
+        case for new records) doesn't touch the existing postings; others
+        are kept pending until the next compaction.
+
+        Args:
+            doc_id: Document ID
+            freq: Term frequency in the document
+        """
+        freq = min(freq, 0xFFFF)
+        if not self._deltas or doc_id > self._last:
+            self._deltas.append(doc_id - self._last)
+            self._freqs.append(freq)
+            self._last = doc_id
+            return
+
+        self._pending[doc_id] = freq
+
+    def remove(self, doc_id: int) -> None:
+        """
+        Remove a document.
+
+        Args:
+            doc_id: Document ID
+        """
+        if self._pending.pop(doc_id, None) is None:
+            self._dead.add(doc_id)
+
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Serialize the posting list, compacting it first.
+
+        Returns:
+            Dict[str, str]: Base64 encoded arrays
+        """
+        self.compact()
+        return {
+            "d": base64.b64encode(self._deltas.tobytes()).decode(),
+            "f": base64.b64encode(self._freqs.tobytes()).decode()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> 'PostingList':
+        """
+        Deserialize a posting list.
+
+        Args:
+            data: Serialized posting list
+
+        Returns:
+            PostingList: Posting list
+        """
+        postings = cls()
+        postings._deltas.frombytes(base64.b64decode(data["d"]))
+        postings._freqs.frombytes(base64.b64decode(data["f"]))
+        postings._last = sum(postings._deltas)
+        return postings
+
+
+class InvertedIndex:
+    """
+    Inverted index over the text fields of one entity type, ranked by BM25.
+
+    Field weights multiply the term frequencies, so a term in a name counts
+    more than the same term in a description. Every query term matches as
+    a prefix, ranked below exact word matches, and all terms must match.
+    Updating a document costs O(its terms): the posting lists only record
+    tombstones and compact themselves in batches.
+    """
+
+    def __init__(self, fields: Dict[str, int], k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the index.
+
+        Args:
+            fields: Indexed fields and their weights
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.fields = dict(fields)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, PostingList] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._vocabulary: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Get the number of indexed documents."""
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: int, values: Dict[str, Optional[str]]) -> None:
+        """
+        Index a document, replacing an earlier version of it.
+
+        Args:
+            doc_id: Document ID
+            values: Field values
+        """
+        freqs: Dict[str, int] = {}
+        for field, weight in self.fields.items():
+            for term in tokenize(values.get(field)):
+                freqs[term] = freqs.get(term, 0) + weight
+
+        with self._lock:
+            self.remove(doc_id)
+            if not freqs:
+                return
+
+            for term, freq in freqs.items():
+                if term not in self._postings:
+                    self._postings[term] = PostingList()
+                    self._vocabulary = None
+                postings = self._postings[term]
+                postings.add(doc_id, freq)
+                if postings.needs_compaction():
+                    postings.compact()
+
+            length = sum(freqs.values())
+            self._doc_terms[doc_id] = tuple(freqs)
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def remove(self, doc_id: int) -> None:
+        """
+        Remove a document.
+
+        Args:
+            doc_id: Document ID
+        """
+        with self._lock:
+            terms = self._doc_terms.pop(doc_id, None)
+            if terms is None:
+                return
+
+            for term in terms:
+                postings = self._postings[term]
+                postings.remove(doc_id)
+                if not postings:
+                    del self._postings[term]
+                    self._vocabulary = None
+                elif postings.needs_compaction():
+                    postings.compact()
+
+            self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def _expand(self, prefix: str) -> List[str]:
+        """
+        Get the vocabulary terms starting with a prefix (lock must be held).
+
+        Args:
+            prefix: Term prefix
+
+        Returns:
+            List[str]: Matching terms
+        """
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+
+        terms = []
+        for i in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            term = self._vocabulary[i]
+            if not term.startswith(prefix) or len(terms) >= MAX_PREFIX_EXPANSIONS:
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Search the index.
+
+        Args:
+            query: Search text
+            limit: Maximum number of results (optional)
+
+        Returns:
+            List[Tuple[int, float]]: Document IDs and BM25 scores, best first
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            count = len(self._doc_lengths)
+            if count == 0:
+                return []
+            average_length = self._total_length / count
+
+            scores: Optional[Dict[int, float]] = None
+            for term in terms:
+                # A query term is scored as one term over all its expansions,
+                # with words it's only a prefix of counting less than exact matches
+                freqs: Dict[int, float] = {}
+                for expansion in self._expand(term):
+                    weight = 1.0 if expansion == term else PREFIX_MATCH_WEIGHT
+                    for doc_id, freq in self._postings[expansion].items():
+                        freqs[doc_id] = freqs.get(doc_id, 0.0) + weight * freq
+
+                idf = math.log(1 + (count - len(freqs) + 0.5) / (len(freqs) + 0.5))
+                term_scores = {}
+                for doc_id, freq in freqs.items():
+                    norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / average_length
+                    term_scores[doc_id] = idf * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+
+                # All query terms must match
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        Serialize the index.
+
+        Returns:
+            Dict[str, object]: Serialized index
+        """
+        with self._lock:
+            return {
+                "fields": self.fields,
+                "postings": {term: postings.to_dict() for term, postings in self._postings.items()},
+                "docs": {str(doc_id): [self._doc_lengths[doc_id], list(terms)] for doc_id, terms in self._doc_terms.items()}
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> 'InvertedIndex':
+        """
+        Deserialize an index.
+
+        Args:
+            data: Serialized index
+
+        Returns:
+            InvertedIndex: Index
+        """
+        index = cls(data["fields"])
+        index._postings = {term: PostingList.from_dict(postings) for term, postings in data["postings"].items()}
+        for doc_id, (length, terms) in data["docs"].items():
+            index._doc_terms[int(doc_id)] = tuple(terms)
+            index._doc_lengths[int(doc_id)] = length
+        index._total_length = sum(index._doc_lengths.values())
+        return index
+
+
+class SearchEngine:
+    """
+    In-process search engine holding one inverted index per entity type.
+
+    Indexes are kept current by the repositories after each committed
+    write and snapshotted to disk. A snapshot records the newest
+    updated_at indexed per type, so a warm restart only reindexes the rows
+    changed since; rows deleted since are dropped when search results are
+    loaded from the database.
+
+    The engine lives in each worker process and only sees the writes
+    committed through that worker. Writes made by other workers or
+    processes show up after the next restart (or reindex), so the engine
+    suits single-worker deployments; multi-worker deployments should use
+    the PostgreSQL backend.
+    """
+
+    def __init__(self, snapshot_path: str = SEARCH_SNAPSHOT_PATH, enabled: bool = SEARCH_BACKEND == "memory"):
+        """
+        Initialize the search engine.
+
+        Args:
+            snapshot_path: Path of the snapshot file
+            enabled: Whether searches are served by this engine
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.enabled = enabled
+        self._indexes: Dict[str, InvertedIndex] = {}
+        self._watermarks: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, fields: Dict[str, int]) -> InvertedIndex:
+        """
+        Get the index of an entity type, creating it if needed.
+
+        Args:
+            name: Entity type (table name)
+            fields: Indexed fields and their weights
+
+        Returns:
+            InvertedIndex: Index
+        """
+        with self._lock:
+            if name not in self._indexes or self._indexes[name].fields != fields:
+                self._indexes[name] = InvertedIndex(fields)
+            return self._indexes[name]
+
+    def get_index(self, name: str) -> Optional[InvertedIndex]:
+        """
+        Get the index of an entity type.
+
+        Args:
+            name: Entity type (table name)
+
+        Returns:
+            Optional[InvertedIndex]: Index or None if the type isn't registered
+        """
+        return self._indexes.get(name)
+
+    def watermark(self, name: str) -> Optional[datetime]:
+        """
+        Get the newest updated_at indexed for an entity type.
+
+        Args:
+            name: Entity type (table name)
+
+        Returns:
+            Optional[datetime]: Watermark or None if nothing was indexed
+        """
+        return self._watermarks.get(name)
+
+    def add(self, name: str, doc_id: int, values: Dict[str, Optional[str]], updated_at: Optional[datetime] = None) -> None:
+        """
+        Index a document of a registered entity type.
+
+        Args:
+            name: Entity type (table name)
+            doc_id: Document ID
+            values: Field values
+            updated_at: Last update of the document (optional)
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            return
+
+        index.add(doc_id, values)
+        if updated_at is not None:
+            with self._lock:
+                if name not in self._watermarks or updated_at > self._watermarks[name]:
+                    self._watermarks[name] = updated_at
+
+    def remove(self, name: str, doc_id: int) -> None:
+        """
+        Remove a document of a registered entity type.
+
+        Args:
+            name: Entity type (table name)
+            doc_id: Document ID
+        """
+        index = self._indexes.get(name)
+        if index is not None:
+            index.remove(doc_id)
+
+    def add_object(self, obj: Any) -> None:
+        """
+        Index a model instance if its table is registered.
+
+        Args:
+            obj: Model instance
+        """
+        index = self._indexes.get(obj.__tablename__)
+        if index is not None:
+            values = {field: getattr(obj, field) for field in index.fields}
+            self.add(obj.__tablename__, obj.id, values, getattr(obj, "updated_at", None))
+
+    def save(self) -> None:
+        """Write a snapshot of all indexes to disk."""
+        with self._lock:
+            snapshot = {
+                "version": SNAPSHOT_VERSION,
+                "watermarks": {name: value.isoformat() for name, value in self._watermarks.items()},
+                "indexes": {name: index.to_dict() for name, index in self._indexes.items()}
+            }
+
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(zlib.compress(json.dumps(snapshot).encode()))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+        logger.info(f"Search index snapshot written to {self.snapshot_path}")
+
+    def load(self) -> Set[str]:
+        """
+        Load the indexes from the snapshot.
+
+        Only indexes whose fields match the registered ones are loaded.
+
+        Returns:
+            Set[str]: Names of the loaded indexes
+        """
+        if not self.snapshot_path.exists():
+            return set()
+
+        try:
+            with open(self.snapshot_path, "rb") as snapshot_file:
+                snapshot = json.loads(zlib.decompress(snapshot_file.read()))
+        except (OSError, ValueError, zlib.error) as e:
+            logger.error(f"Error reading search index snapshot: {str(e)}")
+            return set()
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return set()
+
+        loaded = set()
+        with self._lock:
+            for name, data in snapshot["indexes"].items():
+                if name in self._indexes and self._indexes[name].fields == data["fields"]:
+                    self._indexes[name] = InvertedIndex.from_dict(data)
+                    if name in snapshot["watermarks"]:
+                        self._watermarks[name] = datetime.fromisoformat(snapshot["watermarks"][name])
+                    loaded.add(name)
+
+        logger.info(f"Search index snapshot loaded: {sorted(loaded)}")
+        return loaded
+
+
+# Create search engine instance
+search_engine = SearchEngine()
@@ -0,0 +1,49 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Value normalization utilities for the Sales Automation System.
+This module provides canonical forms of contact fields used for lookups.
+"""
+
+import re
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """
+    Normalize an email address for exact matching.
+
+    Args:
+        email: Email address
+
+    Returns:
+        Optional[str]: Lower-cased, trimmed email or None if empty
+    """
+    if not email:
+        return None
+
+    email = email.strip().lower()
+    return email or None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Normalize a phone number for exact matching.
+
+    Args:
+        phone: Phone number
+
+    Returns:
+        Optional[str]: Digits of the number (with a leading + if it had
+        one) or None if it contains no digits
+    """
+    if not phone:
+        return None
+
+    digits = _NON_DIGITS.sub("", phone)
+    if not digits:
+        return None
+
+    return f"+{digits}" if phone.strip().startswith("+") else digits
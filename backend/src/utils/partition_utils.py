@@ -0,0 +1,196 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Table partition utilities for the Sales Automation System.
+This module provides helpers for managing PostgreSQL range partitions.
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Matches the bounds of a range partition, e.g.
+# FOR VALUES FROM ('2025-01-01 00:00:00') TO ('2025-02-01 00:00:00')
+_RANGE_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def _parse_bound(value: str) -> datetime:
+    """
+    Parse a partition bound value.
+
+    Args:
+        value: Bound value as rendered by pg_get_expr
+
+    Returns:
+        datetime: Parsed bound
+    """
+    return datetime.fromisoformat(value.split("+")[0])
+
+
+def is_partitioned(db: Session, table_name: str) -> bool:
+    """
+    Check if a table is a partitioned table.
+
+    Args:
+        db: Database session
+        table_name: Table name
+
+    Returns:
+        bool: True if the table is partitioned, False otherwise
+    """
+    return db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :table_name"
+        ),
+        {"table_name": table_name}
+    ).first() is not None
+
+
+def list_partitions(db: Session, table_name: str) -> List[Tuple[str, datetime, datetime]]:
+    """
+    List the range partitions attached to a table.
+
+    Args:
+        db: Database session
+        table_name: Parent table name
+
+    Returns:
+        List[Tuple[str, datetime, datetime]]: (partition name, lower bound,
+        upper bound) tuples ordered by lower bound
+    """
+    rows = db.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table_name"
+        ),
+        {"table_name": table_name}
+    ).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _RANGE_BOUND.search(bound or "")
+        if match is None:
+            # Default partition or a bound we don't manage
+            continue
+        partitions.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def list_detached_partitions(db: Session, table_name: str) -> List[str]:
+    """
+    List managed partitions of a table that have been detached.
+
+    Args:
+        db: Database session
+        table_name: Parent table name
+
+    Returns:
+        List[str]: Names of standalone tables named after the parent table
+    """
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relkind = 'r' AND NOT c.relispartition "
+            "AND n.nspname = current_schema() AND c.relname LIKE :pattern "
+            "ORDER BY c.relname"
+        ),
+        {"pattern": f"{table_name}\\_%"}
+    ).all()
+
+    return [name for name, in rows]
+
+
+def create_range_partition(db: Session, table_name: str, partition_name: str,
+                           start: datetime, end: datetime) -> bool:
+    """
+    Create a range partition if it doesn't exist yet.
+
+    Args:
+        db: Database session
+        table_name: Parent table name
+        partition_name: Partition table name
+        start: Inclusive lower bound
+        end: Exclusive upper bound
+
+    Returns:
+        bool: True if the partition was created, False if it already existed
+    """
+    if any(name == partition_name for name, _, _ in list_partitions(db, table_name)):
+        return False
+
+    try:
+        db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{partition_name}" PARTITION OF "{table_name}" '
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+        ))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error creating partition {partition_name}: {str(e)}")
+        raise
+
+    logger.info(f"Created partition {partition_name} of {table_name}")
+    return True
+
+
+def detach_partition(db: Session, table_name: str, partition_name: str, drop: bool = False) -> None:
+    """
+    Detach a partition from its parent table, optionally dropping it.
+
+    Detaching is a catalog-only operation, so removing a whole range of
+    rows this way takes constant time regardless of the partition size.
+
+    Args:
+        db: Database session
+        table_name: Parent table name
+        partition_name: Partition table name
+        drop: Whether to drop the detached table
+    """
+    try:
+        db.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{partition_name}"'))
+        if drop:
+            db.execute(text(f'DROP TABLE "{partition_name}"'))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error detaching partition {partition_name}: {str(e)}")
+        raise
+
+    logger.info(f"{'Dropped' if drop else 'Detached'} partition {partition_name} of {table_name}")
+
+
+def drop_partitions_before(db: Session, table_name: str, cutoff: datetime) -> List[str]:
+    """
+    Drop every managed partition whose whole range lies before a cutoff.
+
+    Only partitions named after the parent table are touched.
+
+    Args:
+        db: Database session
+        table_name: Parent table name
+        cutoff: Partitions with an upper bound at or before this are dropped
+
+    Returns:
+        List[str]: Names of the dropped partitions
+    """
+    dropped = []
+    for name, _, upper in list_partitions(db, table_name):
+        if upper <= cutoff and name.startswith(table_name):
+            detach_partition(db, table_name, name, drop=True)
+            dropped.append(name)
+    return dropped
@@ -0,0 +1,199 @@
+"""
+Author Sadeq Obaid and Abdallah Obaid
+
+Search utilities module for the Sales Automation System.
+This module provides helpers for PostgreSQL full-text search.
+Search vectors are only generated and indexed on PostgreSQL; other
+databases get an empty placeholder column and use the in-process search
+engine.
+"""
+
+from functools import reduce
+from typing import Any, Dict, Optional, Tuple
+import re
+
+from sqlalchemy import DDL, Column, Computed, Index, event, func, literal
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import deferred
+from sqlalchemy.schema import CreateColumn
+
+from config.database import Base
+
+# Options of the highlighted snippets returned with search results
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=8, MaxFragments=2"
+
+# Characters that form search terms; everything else separates terms
+_TERM_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Emails, URLs and host names, which the text search parser keeps as single
+# tokens, so they must be matched whole instead of split into terms
+_COMPOUND_PATTERN = re.compile(
+    r"^(?:[\w.+-]+@[\w-]+(?:\.[\w-]+)*|(?:[a-z][a-z0-9+.-]*://)?[\w-]+(?:\.[\w-]+)+(?::\d+)?(?:/[\w./%~+-]*)?)$",
+    re.UNICODE
+)
+
+# Punctuation trimmed from the ends of a typed word
+_WORD_PUNCTUATION = ".,;:!?()[]{}<>\"'"
+
+
+def search_vector_expression(config: str, *weighted_columns: Tuple[str, str]) -> str:
+    """
+    Build the SQL expression of a generated search vector column.
+
+    Args:
+        config: Text search configuration (e.g. simple, english)
+        weighted_columns: (column, weight) pairs, weights A (highest) to D
+
+    Returns:
+        str: SQL expression
+    """
+    return " || ".join(
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    )
+
+
+def search_vector_column(config: str, *weighted_columns: Tuple[str, str]) -> Any:
+    """
+    Create a deferred, generated tsvector column.
+
+    Args:
+        config: Text search configuration
+        weighted_columns: (column, weight) pairs
+
+    Returns:
+        Any: Deferred column property
+    """
+    return deferred(Column(
+        TSVECTOR,
+        Computed(search_vector_expression(config, *weighted_columns), persisted=True),
+        info={"serialize": False}
+    ))
+
+
+def search_vector_index(table_name: str) -> Index:
+    """
+    Create the GIN index of a table's search vector.
+
+    Args:
+        table_name: Table name
+
+    Returns:
+        Index: GIN index on the search_vector column
+    """
+    return Index(f"ix_{table_name}_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql")
+
+
+def autocomplete_expression(*columns: Any) -> Any:
+    """
+    Build the lower-cased text matched by autocomplete.
+
+    Only immutable functions are used, so the expression can be indexed.
+
+    Args:
+        columns: Columns to match, joined by single spaces
+
+    Returns:
+        Any: SQL expression
+    """
+    # Literals are rendered inline so queries repeat the indexed expression exactly
+    empty = literal("", literal_execute=True)
+    space = literal(" ", literal_execute=True)
+    return func.lower(reduce(lambda left, right: left + space + right, [func.coalesce(column, empty) for column in columns]))
+
+
+def trigram_index(name: str, expression: Any) -> Index:
+    """
+    Create a pg_trgm GIN index on an expression.
+
+    The index serves LIKE '%text%' and similarity filters on the expression.
+
+    Args:
+        name: Index name
+        expression: Indexed expression (as used in queries)
+
+    Returns:
+        Index: GIN index with gin_trgm_ops
+    """
+    return Index(
+        name, expression.label(name), postgresql_using="gin", postgresql_ops={name: "gin_trgm_ops"}
+    ).ddl_if(dialect="postgresql")
+
+
+def escape_like(text: str) -> str:
+    """
+    Escape LIKE wildcards in a text (escape character is a backslash).
+
+    Args:
+        text: Text
+
+    Returns:
+        str: Escaped text
+    """
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def prefix_tsquery(config: str, text: str) -> Optional[Any]:
+    """
+    Build a query matching all terms of a search text, the last one as a prefix.
+
+    Earlier terms match as prefixes too, so "jo smi" finds "John Smith".
+    Emails and URLs stay one quoted operand, which to_tsquery runs through
+    the same parser as the search vector, so they match the tokens it
+    stored for them (a whole email is a single lexeme).
+
+    Args:
+        config: Text search configuration
+        text: Search text as typed by the user
+
+    Returns:
+        Optional[Any]: tsquery expression or None if the text has no terms
+    """
+    operands = []
+    for word in text.lower().split():
+        word = word.strip(_WORD_PUNCTUATION)
+        if _COMPOUND_PATTERN.match(word):
+            operands.append(f"'{word}':*")
+        else:
+            operands.extend(f"{term}:*" for term in _TERM_PATTERN.findall(word))
+
+    if not operands:
+        return None
+
+    return func.to_tsquery(config, " & ".join(operands))
+
+
+def search_result(obj: Any, rank: float, snippet: Optional[str]) -> Dict[str, Any]:
+    """
+    Convert a full-text search hit into a response dictionary.
+
+    Args:
+        obj: Matching model instance
+        rank: ts_rank of the match
+        snippet: Highlighted snippet
+
+    Returns:
+        Dict[str, Any]: Model fields plus search_rank and search_snippet
+    """
+    result = obj.to_dict()
+    result["search_rank"] = rank
+    result["search_snippet"] = snippet
+    return result
+
+
+@compiles(CreateColumn)
+def _compile_create_column(element: CreateColumn, compiler: Any, **kw: Any) -> Optional[str]:
+    """Create search vector columns outside PostgreSQL as empty placeholders."""
+    column = element.element
+    if isinstance(column.type, TSVECTOR) and compiler.dialect.name != "postgresql":
+        return f"{compiler.preparer.format_column(column)} TEXT"
+    return compiler.visit_create_column(element, **kw)
+
+
+# Trigram indexes need the pg_trgm extension before the tables are created
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)